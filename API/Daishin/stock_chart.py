@@ -8,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 # Import the DaishinAPI base class
 from API.Daishin.api import DaishinAPI
+from Util.profiler import PROFILER
 
 
 class CpStockChart(DaishinAPI):
@@ -54,7 +55,8 @@ class CpStockChart(DaishinAPI):
             return False
         
         # 호출 제한 대기
-        self.wait_for_limit()  # 이미 __init__에서 limit_type=1로 설정했으므로 인자 없이 호출
+        with PROFILER.stage('api_wait'):
+            self.wait_for_limit()  # 이미 __init__에서 limit_type=1로 설정했으므로 인자 없이 호출
         
         if not continue_query:
             self.obj_stock_chart.SetInputValue(0, code)  # 종목코드
@@ -81,9 +83,10 @@ class CpStockChart(DaishinAPI):
             
             self.obj_stock_chart.SetInputValue(9, ord(adjust_price))  # 수정주가 사용
         
-        # 동기식 호출
+        # 동기식 호출 (요청 ~ 수신 완료 = api_transfer)
         try:
-            self.obj_stock_chart.BlockRequest()
+            with PROFILER.stage('api_transfer'):
+                self.obj_stock_chart.BlockRequest()
         except Exception as e:
             print("BlockRequest 실패:", e)
             return False
@@ -116,25 +119,27 @@ class CpStockChart(DaishinAPI):
         closes = []
         vols = []
         
-        for i in range(record_count):
-            dates.append(self.obj_stock_chart.GetDataValue(0, i))
+        # COM 객체에서 값 꺼내기 (레코드 x 필드 단위 호출)
+        with PROFILER.stage('api_parse'):
+            for i in range(record_count):
+                dates.append(self.obj_stock_chart.GetDataValue(0, i))
             
-            # Current index for retrieving data from the requested fields list
-            current_field_index_in_response = 1 
+                # Current index for retrieving data from the requested fields list
+                current_field_index_in_response = 1 
 
-            if expect_time_data:
-                times.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
-                current_field_index_in_response += 1
+                if expect_time_data:
+                    times.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
+                    current_field_index_in_response += 1
 
-            opens.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
-            current_field_index_in_response += 1
-            highs.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
-            current_field_index_in_response += 1
-            lows.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
-            current_field_index_in_response += 1
-            closes.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
-            current_field_index_in_response += 1
-            vols.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
+                opens.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
+                current_field_index_in_response += 1
+                highs.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
+                current_field_index_in_response += 1
+                lows.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
+                current_field_index_in_response += 1
+                closes.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
+                current_field_index_in_response += 1
+                vols.append(self.obj_stock_chart.GetDataValue(current_field_index_in_response, i))
         
             
         # set attributes on caller for backward compatibility
@@ -29,18 +29,16 @@ class DaishinRealtimeReceiver:
         # 1. 가격 돌파 체크
         if not self.is_bought and cur_price >= self.target_price:
             # 2. 전략 필터 조건 체크 (VolatilityBreakout 로직 활용)
-            if self.check_strategy_filters():
+            if self.check_strategy_filters(cur_price):
                 self.parent.execute_order(self.ticker, cur_price)
                 self.is_bought = True
 
-    def check_strategy_filters(self):
-        """기존 strategy_filter에서 도출된 필터 수치 검증"""
-        # MACD 기울기, 몸통비율, 밴드위치 등 미리 계산된 params 활용
-        if self.params['macd_hist_slope'] > 30 and \
-           self.params['body_ratio'] > 0.5 and \
-           self.params['band_p'] > 0.6:
-            return True
-        return False
+    def check_strategy_filters(self, cur_price):
+        """백테스트와 같은 규칙 정의(VolatilityBreakout.ENTRY_RULES)로 필터 수치 검증"""
+        # MACD 기울기, 몸통비율, 밴드위치 등 미리 계산된 일봉 params를 d_ 접두어 컬럼으로 전달
+        row = {'close': cur_price, 'target_price': self.target_price}
+        row.update({f"d_{key}": value for key, value in self.params.items()})
+        return self.parent.strategy.get_signal(row)
 
 class StrategyMonitor:
     def __init__(self):
@@ -68,7 +66,8 @@ class StrategyMonitor:
             params = {
                 'macd_hist_slope': row['Sharpe Ratio'], # 실제 지표값으로 확장 가능
                 'body_ratio': 0.6, # 예시 기준값
-                'band_p': 0.7      # 예시 기준값
+                'band_p': 0.7,     # 예시 기준값
+                'gap_ratio': 0.0   # 예시 기준값
             }
             # 전일 데이터를 기반으로 목표가 계산 로직 추가 필요
             target_price = 0 # 실제 계산값 대입
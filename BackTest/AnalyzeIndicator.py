@@ -1,19 +1,32 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 import matplotlib.pyplot as plt
 import pandas_ta as ta
 from tqdm import tqdm
 import warnings
 
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.trade_store import TradeStore
+from Indicators.trade_join import join_trade_features
+from BackTest.binned_stats import binned_win_rate
+
 # 경고 메시지 무시 설정
 warnings.filterwarnings('ignore', category=FutureWarning)
 
 class IndicatorAnalyzer:
+    # 결합할 일봉 지표 {지표 컬럼: 결과 컬럼}
+    FEATURE_COLUMNS = {'rsi': 'rsi', 'macd_h': 'macd_h', 'adx': 'adx', 'bb_width': 'bb_width', 'mfi': 'mfi',
+                       'noise_avg': 'noise', 'rvi': 'rvi', 'inertia': 'inertia'}
+
     def __init__(self):
         # 1. 경로 설정 (프로젝트 루트 기준)
         self.report_path = os.path.join('data', 'backtest', 'volatility', 'summary', 'total_backtest_report.csv')
-        self.result_dir = os.path.join('data', 'backtest', 'volatility', 'result')
+        self.trade_store = TradeStore()
         self.daily_dir = os.path.join('data', 'chart', 'daily')
         
         if not os.path.exists(self.report_path):
@@ -82,18 +95,18 @@ class IndicatorAnalyzer:
             
         return df
 
-    def get_trade_analysis(self, ticker):
-        """매매 기록과 일봉 지표 결합"""
+    def get_trade_analysis(self, ticker, trades_df):
+        """
+        매매 기록과 일봉 지표 결합 (trades_df: 거래 저장소에서 읽은 해당 종목 거래)
+        :return: 거래별 is_win + 지표 DataFrame 또는 None
+        """
         t_str = str(ticker).zfill(6)
-        trade_path = os.path.join(self.result_dir, f"trades_{t_str}.parquet")
         daily_path = os.path.join(self.daily_dir, f"{t_str}.parquet")
         
-        if not (os.path.exists(trade_path) and os.path.exists(daily_path)):
+        if trades_df is None or trades_df.empty or not os.path.exists(daily_path):
             return None
             
         try:
-            trades_df = pd.read_parquet(trade_path)
-            if trades_df.empty: return None
             
             d_df = pd.read_parquet(daily_path)
             if 'date' in d_df.columns:
@@ -102,26 +115,14 @@ class IndicatorAnalyzer:
             d_df.index = pd.to_datetime(d_df.index).tz_localize(None).normalize()
             d_df = self.calculate_indicators(d_df).sort_index()
             
-            analysis_results = []
-            for _, trade in trades_df.iterrows():
-                entry_dt = pd.to_datetime(trade['entry_date']).tz_localize(None).normalize()
-                prev_data = d_df[d_df.index < entry_dt]
-                if prev_data.empty: continue
-                
-                ind = prev_data.iloc[-1]
-                pnl_val = trade.get('return', trade.get('pnl', 0))
-                
-                analysis_results.append({
-                    'is_win': float(pnl_val) > 0,
-                    'rsi': float(ind.get('rsi', np.nan)),
-                    'macd_h': float(ind.get('macd_h', np.nan)),
-                    'adx': float(ind.get('adx', np.nan)),
-                    'bb_width': float(ind.get('bb_width', np.nan)),
-                    'mfi': float(ind.get('mfi', np.nan)),
-                    'noise': float(ind.get('noise_avg', np.nan)),
-                    'rvi': float(ind.get('rvi', np.nan)),
-                    'inertia': float(ind.get('inertia', np.nan))
-                })
+            # 진입 전날까지 확정된 일봉 지표를 전 거래에 한 번에 결합 (전일 행이 없는 거래는 제외)
+            joined = join_trade_features(trades_df, d_df, columns=self.FEATURE_COLUMNS, lag=1, by_day=True,
+                                         how='inner')
+            p_col = next((c for c in ['return', 'pnl'] if c in joined.columns), None)
+            pnl = joined[p_col].astype(float) if p_col else pd.Series(0.0, index=joined.index)
+
+            analysis_results = joined[list(self.FEATURE_COLUMNS.values())].reset_index(drop=True)
+            analysis_results.insert(0, 'is_win', (pnl > 0).to_numpy())
             return analysis_results
         except Exception:
             return None
@@ -141,14 +142,18 @@ class IndicatorAnalyzer:
         
         for col, bins, labels in configs:
             if col not in df.columns: continue
-            valid_df = df.dropna(subset=[col]).copy()
+            valid_df = df.dropna(subset=[col])
             if valid_df.empty: continue
 
-            valid_df[f'{col}_bin'] = pd.cut(valid_df[col], bins=bins, labels=labels)
-            analysis = valid_df.groupby(f'{col}_bin', observed=False)['is_win'].agg(['count', 'mean'])
-            analysis['Win Rate'] = (analysis['mean'] * 100).round(2).astype(str) + '%'
+            # 구간별 거래 수 / 승률 / Wilson 95% 신뢰구간 (BackTest/binned_stats.py)
+            analysis = binned_win_rate(valid_df[col].to_numpy(), valid_df['is_win'].to_numpy(), edges=bins,
+                                       labels=labels)
+            analysis['count'] = analysis['count'].astype(int)
+            analysis['Win Rate'] = (analysis['win_rate'] * 100).round(2).astype(str) + '%'
+            analysis['95% CI'] = [f"{lo * 100:.1f}~{hi * 100:.1f}%" if lo == lo else '-'
+                                  for lo, hi in zip(analysis['ci_low'], analysis['ci_high'])]
             print(f"\n[{col.upper()} 구간별 승률]")
-            print(analysis[['count', 'Win Rate']])
+            print(analysis[['count', 'Win Rate', '95% CI']])
 
     def run_analysis(self):
         valid_tickers = self.report[self.report['Total Trades'] > 0]['Ticker'].unique()
@@ -156,15 +161,18 @@ class IndicatorAnalyzer:
         all_trade_data = []
         print(f"🔍 총 {len(valid_tickers)}개 종목 분석 시작...")
         
+        # 전 종목 거래 내역을 저장소에서 한 번에 스캔
+        trades_by_ticker = self.trade_store.by_ticker(tickers=valid_tickers, columns=['entry_date', 'return', 'pnl'])
+        
         for ticker in tqdm(valid_tickers):
-            res = self.get_trade_analysis(ticker)
-            if res: all_trade_data.extend(res)
+            res = self.get_trade_analysis(ticker, trades_by_ticker.get(ticker))
+            if res is not None and not res.empty: all_trade_data.append(res)
                 
         if not all_trade_data:
             print("\n[!] 분석할 데이터가 없습니다.")
             return
 
-        df_res = pd.DataFrame(all_trade_data)
+        df_res = pd.concat(all_trade_data, ignore_index=True)
         self.print_win_rate_report(df_res)
         
         # 4. 시각화 (3x3 레이아웃)
@@ -1,40 +1,54 @@
 import pandas as pd
 import numpy as np
 import os
-import yfinance as yf
-import FinanceDataReader as fdr  # 권장: 한국 주식 데이터 전용 라이브러리
-from tqdm import tqdm
+import sys
 import warnings
 
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.trade_store import TradeStore
+from Collector.index_store import IndexStore
+from Indicators.trade_join import asof_row_index
+
 warnings.filterwarnings('ignore')
 
 class AdvancedContextSimulator:
-    def __init__(self):
+    def __init__(self, refresh=False, lag=1):
+        """
+        :param refresh: True면 시작 전에 지수 로컬 저장소를 증분 갱신 (네트워크 필요)
+        :param lag: 지수 결합 기준 (1 = 진입 전날 확정 종가/이평, 0 = 진입 당일 종가 포함 - 미래 참조)
+        """
         self.report_path = os.path.join('data', 'backtest', 'volatility', 'summary', 'total_backtest_report.csv')
-        self.result_dir = os.path.join('data', 'backtest', 'volatility', 'result')
+        self.trade_store = TradeStore()
+        self.index_store = IndexStore()
         self.code_path = 'stock_codes.csv' # 업로드된 파일 경로 확인 필요
-        
-        # 1. 지수 데이터 확보 (FDR 우선 사용 -> YFinance 백업)
-        print("📥 시장 지수 데이터 다운로드 중...")
-        try:
-            self.kospi = fdr.DataReader('KS11', '2024-01-01', '2026-03-01')
-            self.kosdaq = fdr.DataReader('KQ11', '2024-01-01', '2026-03-01')
-            print(f"✅ FDR 데이터 확보 완료 (KOSPI: {len(self.kospi)}건)")
-        except:
-            print("⚠️ FDR 실패, YFinance 시도...")
-            self.kospi = yf.download('^KS11', start='2024-01-01', end='2026-03-01', progress=False)
-            self.kosdaq = yf.download('^KQ11', start='2024-01-01', end='2026-03-01', progress=False)
-        
+        self.lag = lag
+
+        # 1. 지수 데이터 (로컬 저장소, 오프라인)
+        if refresh:
+            print("📥 시장 지수 데이터 증분 갱신 중...")
+            self.index_store.update()
+        self.kospi = self.index_store.load(IndexStore.MARKETS['KOSPI'])
+        self.kosdaq = self.index_store.load(IndexStore.MARKETS['KOSDAQ'])
+
         # 데이터 검증
         if self.kospi.empty or self.kosdaq.empty:
-            print("❌ 지수 데이터 다운로드 실패. 인터넷 연결을 확인하세요.")
+            print("❌ 로컬 지수 데이터가 없습니다. 'python Collector/index_store.py'로 먼저 갱신하세요.")
             self.market_data_ok = False
         else:
             self.market_data_ok = True
+            print(f"✅ 로컬 지수 데이터 로드 완료 (KOSPI: {len(self.kospi)}건, ~{self.kospi.index.max().date()})")
             # 이동평균선 계산
             for df in [self.kospi, self.kosdaq]:
-                df['MA5'] = df['Close'].rolling(5).mean()
-                df['MA20'] = df['Close'].rolling(20).mean()
+                df['MA5'] = df['close'].rolling(5).mean()
+                df['MA20'] = df['close'].rolling(20).mean()
+
+        # 합성 분봉 지수 (Collector/minute_index.py, 없으면 장중 필터 생략)
+        self.kospi_min = self.index_store.load_minute('KOSPI', columns=['vw_ret'])
+        self.kosdaq_min = self.index_store.load_minute('KOSDAQ', columns=['vw_ret'])
+        self.intraday_ok = not (self.kospi_min.empty or self.kosdaq_min.empty)
 
         # 2. 섹터 정보 로드
         if os.path.exists(self.code_path):
@@ -43,22 +57,55 @@ class AdvancedContextSimulator:
         else:
             self.codes = pd.DataFrame()
 
-    def get_market_status(self, date, market_type='KOSPI'):
-        if not self.market_data_ok: return True # 데이터 없으면 통과(기존 오류 원인)
-        
-        market_df = self.kospi if 'KOSPI' in str(market_type).upper() else self.kosdaq
-        target_date = pd.to_datetime(date).tz_localize(None)
-        
-        try:
-            # 해당 날짜의 데이터 조회 (asof)
-            idx = market_df.index.get_indexer([target_date], method='pad')[0]
-            if idx == -1: return True
-            row = market_df.iloc[idx]
-            
+    def market_status(self, entry_dates, market_types) -> np.ndarray:
+        """
+        거래별 시장 상승 추세 여부 (지수 종가 > 5일선), 전 거래를 지수별 as-of 결합으로 한 번에 계산
+        지수 데이터가 없거나 진입 시점 이전 지수 행이 없으면 통과(True)
+        :param entry_dates: 진입 시각 배열
+        :param market_types: 거래별 시장 구분 ('KOSPI' 포함이면 KOSPI 지수, 그 외 KOSDAQ)
+        :return: bool 배열
+        """
+        entry_dates = pd.DatetimeIndex(entry_dates)
+        status = np.ones(len(entry_dates), dtype=np.bool_)
+        if not self.market_data_ok or len(entry_dates) == 0:
+            return status
+
+        is_kospi = pd.Series(market_types).astype(str).str.upper().str.contains('KOSPI').to_numpy()
+        for mask, market_df in [(is_kospi, self.kospi), (~is_kospi, self.kosdaq)]:
+            if not mask.any():
+                continue
             # 필터: 지수가 5일선 위에 있는가? (상승 추세)
-            return row['Close'] > row['MA5']
-        except:
-            return True
+            bull = (market_df['close'] > market_df['MA5']).to_numpy()
+            row = asof_row_index(entry_dates[mask], market_df.index, lag=self.lag, by_day=True)
+            status[mask] = np.where(row >= 0, bull[np.maximum(row, 0)], True)
+        return status
+
+    def intraday_status(self, entry_dates, market_types) -> np.ndarray:
+        """
+        거래별 장중 시장 상승 여부 (진입 직전 분의 시가총액가중 합성 지수가 전일 종가 위)
+        진입 시각보다 엄격히 이전인 같은 날 지수 분봉만 사용하고, 없으면 통과(True)
+        """
+        entry_dates = pd.DatetimeIndex(entry_dates)
+        if entry_dates.tz is not None:
+            entry_dates = entry_dates.tz_localize(None)
+        status = np.ones(len(entry_dates), dtype=np.bool_)
+        if not self.intraday_ok or len(entry_dates) == 0:
+            return status
+
+        is_kospi = pd.Series(market_types).astype(str).str.upper().str.contains('KOSPI').to_numpy()
+        for mask, index_df in [(is_kospi, self.kospi_min), (~is_kospi, self.kosdaq_min)]:
+            if not mask.any():
+                continue
+            row = asof_row_index(entry_dates[mask], index_df.index, lag=1)
+            safe_row = np.maximum(row, 0)
+            same_day = index_df.index.normalize().to_numpy()[safe_row] == entry_dates[mask].normalize().to_numpy()
+            up = index_df['vw_ret'].to_numpy()[safe_row] > 0
+            status[mask] = np.where((row >= 0) & same_day, up, True)
+        return status
+
+    def get_market_status(self, date, market_type='KOSPI'):
+        """단일 날짜의 시장 상승 추세 여부 (market_status와 같은 규칙)"""
+        return bool(self.market_status([pd.Timestamp(date)], [market_type])[0])
 
     def run_simulation(self):
         if not os.path.exists(self.report_path):
@@ -73,8 +120,6 @@ class AdvancedContextSimulator:
             report = pd.merge(report, self.codes[['code', 'upName', 'market_type']], 
                             left_on='Ticker', right_on='code', how='left')
         
-        results = {'Original': [], 'Market_Filter': [], 'Sector_Filter': [], 'Combined': []}
-        
         # 강세 섹터 선정 (상위 3개)
         if 'upName' in report.columns:
             top_sectors = report.groupby('upName')['Total Return [%]'].mean().nlargest(3).index.tolist()
@@ -82,52 +127,50 @@ class AdvancedContextSimulator:
         else:
             top_sectors = []
 
-        print("🚀 통합 시뮬레이션 시작 (샘플링)...")
-        # target_tickers = report['Ticker'].unique()[:200] # 속도를 위해 200개만
+        print("🚀 통합 시뮬레이션 시작...")
         target_tickers = report['Ticker'].unique() 
 
-        for ticker in tqdm(target_tickers):
-            trade_path = os.path.join(self.result_dir, f"trades_{ticker}.parquet")
-            if not os.path.exists(trade_path): continue
-            
-            trades = pd.read_parquet(trade_path)
-            ticker_info = report[report['Ticker'] == ticker].iloc[0]
-            market_type = ticker_info.get('market_type', 'KOSDAQ')
-            sector = ticker_info.get('upName', 'Unknown')
-            
-            for _, trade in trades.iterrows():
-                entry_date = pd.to_datetime(trade['entry_date']).tz_localize(None)
-                pnl = trade.get('return', 0)
-                
-                # 1. 원본
-                results['Original'].append(pnl)
-                
-                # 2. 마켓 타이밍 (지수 필터)
-                is_bull_market = self.get_market_status(entry_date, market_type)
-                if is_bull_market:
-                    results['Market_Filter'].append(pnl)
-                
-                # 3. 섹터 필터 (강세 섹터만)
-                is_good_sector = sector in top_sectors
-                if is_good_sector:
-                    results['Sector_Filter'].append(pnl)
-                
-                # 4. 통합 필터 (둘 다 만족)
-                if is_bull_market and is_good_sector:
-                    results['Combined'].append(pnl)
+        # 전 종목 거래 내역을 저장소에서 한 번에 스캔
+        trades = self.trade_store.scan(tickers=target_tickers, columns=['entry_date', 'return'])
+        if trades.empty:
+            print("❌ 거래 내역이 없습니다.")
+            return
+
+        # 종목 정보(시장 구분/섹터)를 거래 테이블 전체에 한 번에 매핑
+        info = report.drop_duplicates('Ticker').set_index('Ticker')
+        market_type = (trades['ticker'].map(info['market_type']) if 'market_type' in info.columns
+                       else pd.Series(np.nan, index=trades.index)).fillna('KOSDAQ')
+        sector = (trades['ticker'].map(info['upName']) if 'upName' in info.columns
+                  else pd.Series(np.nan, index=trades.index)).fillna('Unknown')
+
+        pnl = trades['return'].to_numpy(dtype=np.float64)
+        # 1. 마켓 타이밍 (지수 필터) / 2. 섹터 필터 (강세 섹터만)
+        is_bull_market = self.market_status(trades['entry_date'], market_type)
+        is_good_sector = sector.isin(top_sectors).to_numpy()
+
+        results = {
+            'Original': np.ones(len(pnl), dtype=np.bool_),
+            'Market_Filter': is_bull_market,
+            'Sector_Filter': is_good_sector,
+            'Combined': is_bull_market & is_good_sector,  # 둘 다 만족
+        }
+        # 3. 장중 필터 (합성 분봉 지수가 있을 때만)
+        if self.intraday_ok:
+            results['Intraday_Filter'] = self.intraday_status(trades['entry_date'], market_type)
 
         # 결과 출력
         print("\n" + "="*60)
         print(f"{'필터 종류':<15} | {'거래 횟수':<10} | {'평균 수익률':<12} | {'승률':<10}")
         print("-" * 60)
-        for key, vals in results.items():
-            if not vals: continue
+        for key, mask in results.items():
+            vals = pnl[mask]
+            if len(vals) == 0: continue
             avg_ret = np.mean(vals) * 100
-            win_rate = (np.array(vals) > 0).mean() * 100
+            win_rate = (vals > 0).mean() * 100
             count = len(vals)
             print(f"{key:<15} | {count:<10} | {avg_ret:>10.2f}% | {win_rate:>8.2f}%")
         print("="*60)
 
 if __name__ == "__main__":
     sim = AdvancedContextSimulator()
-    sim.run_simulation()
\ No newline at end of file
+    sim.run_simulation()
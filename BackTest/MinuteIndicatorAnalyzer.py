@@ -1,17 +1,27 @@
 import pandas as pd
-import numpy as np
 import os
+import sys
 import matplotlib.pyplot as plt
 import pandas_ta as ta
 from tqdm import tqdm
 import warnings
 
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.trade_store import TradeStore
+from Indicators.trade_join import join_trade_features
+
 warnings.filterwarnings('ignore')
 
 class MinuteIndicatorAnalyzer:
+    # 결합할 분봉 지표
+    FEATURE_COLUMNS = ['vol_spike', 'mom_10', 'dist_high', 'rsi_min']
+
     def __init__(self):
         self.report_path = os.path.join('data', 'backtest', 'volatility', 'summary', 'total_backtest_report.csv')
-        self.result_dir = os.path.join('data', 'backtest', 'volatility', 'result')
+        self.trade_store = TradeStore()
         self.minute_dir = os.path.join('data', 'chart', 'minute') # 분봉 경로
         
         self.report = pd.read_csv(self.report_path)
@@ -37,16 +47,14 @@ class MinuteIndicatorAnalyzer:
 
         return df
 
-    def get_minute_analysis(self, ticker):
+    def get_minute_analysis(self, ticker, trades_df):
         t_str = str(ticker).zfill(6)
-        trade_path = os.path.join(self.result_dir, f"trades_{t_str}.parquet")
         minute_path = os.path.join(self.minute_dir, f"{t_str}.parquet")
         
-        if not (os.path.exists(trade_path) and os.path.exists(minute_path)):
+        if trades_df is None or trades_df.empty or not os.path.exists(minute_path):
             return None
             
         try:
-            trades_df = pd.read_parquet(trade_path)
             m_df = pd.read_parquet(minute_path)
             
             # 시간 컬럼 전처리 (데이터 형식에 따라 수정 필요)
@@ -59,26 +67,15 @@ class MinuteIndicatorAnalyzer:
             # 미리 전체 지표 계산 (매수 시점마다 자르는 것보다 빠름)
             m_df = self.calculate_minute_indicators(m_df)
             
-            analysis_results = []
-            for _, trade in trades_df.iterrows():
-                # 매수 시점 (Timestamp)
-                entry_dt = pd.to_datetime(trade['entry_date']).tz_localize(None)
-                
-                # 매수 시점 '직전' 1분봉 데이터 추출
-                # 정확히 entry_dt에 찍힌 데이터는 해당 봉이 완성된 시점이므로 .iloc[-1] 사용
-                prev_data = m_df[m_df.index <= entry_dt]
-                if len(prev_data) < 10: continue
-                
-                ind = prev_data.iloc[-1]
-                pnl_val = trade.get('return', trade.get('pnl', 0))
-                
-                analysis_results.append({
-                    'is_win': float(pnl_val) > 0,
-                    'vol_spike': float(ind.get('vol_spike', np.nan)),
-                    'mom_10': float(ind.get('mom_10', np.nan)),
-                    'dist_high': float(ind.get('dist_high', np.nan)),
-                    'rsi_min': float(ind.get('rsi_min', np.nan))
-                })
+            # 매수 시점 이하(<=)의 마지막 분봉을 전 거래에 한 번에 결합
+            # 정확히 entry_dt에 찍힌 데이터는 해당 봉이 완성된 시점이므로 포함 (lag=0), 직전 10개 봉 미만이면 제외
+            joined = join_trade_features(trades_df, m_df, columns=self.FEATURE_COLUMNS, lag=0, min_history=10,
+                                         how='inner')
+            p_col = next((c for c in ['return', 'pnl'] if c in joined.columns), None)
+            pnl = joined[p_col].astype(float) if p_col else pd.Series(0.0, index=joined.index)
+
+            analysis_results = joined[self.FEATURE_COLUMNS].reset_index(drop=True)
+            analysis_results.insert(0, 'is_win', (pnl > 0).to_numpy())
             return analysis_results
         except Exception as e:
             # print(f"Error analyzing {ticker}: {e}")
@@ -89,15 +86,17 @@ class MinuteIndicatorAnalyzer:
         all_trade_data = []
         
         print(f"🚀 분봉 기반 전수 조사 시작 ({len(valid_tickers)}개 종목)...")
+        # 전 종목 거래 내역을 저장소에서 한 번에 스캔
+        trades_by_ticker = self.trade_store.by_ticker(tickers=valid_tickers, columns=['entry_date', 'return', 'pnl'])
         for ticker in tqdm(valid_tickers):
-            res = self.get_minute_analysis(ticker)
-            if res: all_trade_data.extend(res)
+            res = self.get_minute_analysis(ticker, trades_by_ticker.get(ticker))
+            if res is not None and not res.empty: all_trade_data.append(res)
                 
         if not all_trade_data:
             print("데이터를 찾을 수 없습니다.")
             return
 
-        df_res = pd.DataFrame(all_trade_data)
+        df_res = pd.concat(all_trade_data, ignore_index=True)
         
         # 결과 시각화
         metrics = [('vol_spike', 'Volume Spike (5/60)'), ('mom_10', '10min Momentum (%)'), 
@@ -1,23 +1,50 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 import matplotlib.pyplot as plt
 import pandas_ta as ta
 from tqdm import tqdm
 import warnings
 
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.trade_store import TradeStore
+from Indicators.trade_join import join_trade_features
+from BackTest.bootstrap import bootstrap_metrics, summarize_distribution
+from BackTest.rule_miner import mine_rules, apply_rules
+from Strategy.strategy import Rule
+
 warnings.filterwarnings('ignore')
 
 class MinuteIndicatorAnalyzer:
+    # 결합할 분봉 지표
+    FEATURE_COLUMNS = ['vol_spike', 'mom_10', 'dist_high', 'rsi_min']
+    # 데이터 기반 도출된 필터 조건 (모두 AND)
+    FILTER_RULES = (
+        Rule('vol_spike', '>', 1.5, '거래량 스파이크'),
+        Rule('rsi_min', '>', 60, '분봉 RSI'),
+        Rule('mom_10', '>', 0.5, '10분 모멘텀'),
+    )
+
     def __init__(self):
         # 1. 경로 설정
         self.report_path = os.path.join('data', 'backtest', 'volatility', 'summary', 'total_backtest_report.csv')
-        self.result_dir = os.path.join('data', 'backtest', 'volatility', 'result')
+        self.trade_store = TradeStore()
         self.minute_dir = os.path.join('data', 'chart', 'minute')
         
         # 2. 거래 비용 설정 (0.0025 = 0.25% : 수수료+세금)
         # 백테스트 결과(pnl)에 이미 비용이 포함되어 있다면 0으로 설정하세요.
         self.TRANSACTION_COST = 0.0025 
+
+        # 3. 부트스트랩 설정 (거래일 블록 재표본 경로 수)
+        self.N_PATHS = 10_000
+
+        # 4. 필터 규칙 탐색 설정 (최대 조건 수, 최소 거래 수)
+        self.MINE_DEPTH = 3
+        self.MINE_MIN_SUPPORT = 100
         
         self.report = pd.read_csv(self.report_path)
         self.report['Ticker'] = self.report['Ticker'].astype(str).str.zfill(6)
@@ -49,15 +76,22 @@ class MinuteIndicatorAnalyzer:
 
         return df
 
-    def apply_filters(self, df):
-        """데이터 기반 도출된 필터 조건 적용"""
-        filtered_df = df[
-            (df['vol_spike'] > 1.5) & 
-            (df['rsi_min'] > 60) & 
-            (df['mom_10'] > 0.5)
-        ].copy()
+    def apply_filters(self, df, rules=None):
+        """
+        필터 조건 적용
+        :param rules: Rule 목록 또는 mine_rules 결과의 conditions (None이면 FILTER_RULES)
+        """
+        filtered_df = df[apply_rules(df, rules if rules is not None else self.FILTER_RULES)].copy()
         return filtered_df
 
+    def mine_filters(self, df, top=10):
+        """
+        거래 테이블에서 기대값(수수료 차감 후 평균 수익) 상위 필터 조합 탐색
+        :return: mine_rules 결과 DataFrame (같은 표본에서 고른 규칙이므로 과최적화 주의)
+        """
+        return mine_rules(df, self.FEATURE_COLUMNS, profit='net_return', is_win='is_win',
+                          max_depth=self.MINE_DEPTH, min_support=self.MINE_MIN_SUPPORT, top=top)
+
     def get_metrics(self, df):
         """수익성 및 리스크 지표 계산 (단리 기준 수정)"""
         if df.empty: return None
@@ -90,16 +124,26 @@ class MinuteIndicatorAnalyzer:
             'Trade Count': len(df)
         }
 
-    def get_minute_analysis(self, ticker):
+    def get_bootstrap(self, df):
+        """
+        거래일 블록 부트스트랩으로 성과 지표의 분포를 계산합니다. (get_metrics와 같은 단리 기준, % 단위)
+        :return: 지표별 평균/분위수 DataFrame 또는 None
+        """
+        if df.empty: return None
+        dist = bootstrap_metrics(df['net_return'].to_numpy(), n_paths=self.N_PATHS, method='block',
+                                 days=df['entry_date'].to_numpy(), annualize=252, seed=42)
+        for col in ['total_return', 'mdd', 'win_rate']:
+            dist[col] *= 100
+        return summarize_distribution(dist)
+
+    def get_minute_analysis(self, ticker, trades_df):
         t_str = str(ticker).zfill(6)
-        trade_path = os.path.join(self.result_dir, f"trades_{t_str}.parquet")
         minute_path = os.path.join(self.minute_dir, f"{t_str}.parquet")
         
-        if not (os.path.exists(trade_path) and os.path.exists(minute_path)):
+        if trades_df is None or trades_df.empty or not os.path.exists(minute_path):
             return None
             
         try:
-            trades_df = pd.read_parquet(trade_path)
             m_df = pd.read_parquet(minute_path)
             
             # 시간 인덱스 처리
@@ -112,38 +156,29 @@ class MinuteIndicatorAnalyzer:
             # 지표 계산 (내부에서 shift(1) 적용됨)
             m_df = self.calculate_minute_indicators(m_df)
             
-            analysis_results = []
-            for _, trade in trades_df.iterrows():
-                entry_dt = pd.to_datetime(trade['entry_date']).tz_localize(None)
-                
-                # 매수 시점의 데이터 추출 (shift되었으므로 해당 시간의 행을 가져오면 됨)
-                # 단, 안전을 위해 entry_dt보다 같거나 작은 마지막 데이터를 사용
-                try:
-                    # entry_dt 시점의 데이터가 있으면 가져오고, 없으면 직전 데이터 (asof)
-                    ind_idx = m_df.index.get_indexer([entry_dt], method='pad')[0]
-                    if ind_idx == -1: continue
-                    ind = m_df.iloc[ind_idx]
-                except:
-                    continue
-                
-                # [수정] 수익률 단위 정규화
-                raw_return = trade.get('return', trade.get('pnl', 0))
-                
-                # 1.0 (100%) 보다 크면 퍼센트로 간주하고 100으로 나눔, 아니면 소수로 간주
-                # (데이터 특성에 따라 이 로직은 조정 필요. 여기서는 0.5(50%)를 기준으로 잡음)
-                real_return = raw_return / 100.0 if abs(raw_return) > 0.5 else raw_return
-                
-                # 수수료 차감 (이미 차감된 데이터라면 self.TRANSACTION_COST를 0으로 설정)
-                net_return = real_return - self.TRANSACTION_COST
-
-                analysis_results.append({
-                    'is_win': net_return > 0,
-                    'net_return': net_return, # 수수료 차감 후 수익률
-                    'vol_spike': float(ind.get('vol_spike', np.nan)),
-                    'mom_10': float(ind.get('mom_10', np.nan)),
-                    'dist_high': float(ind.get('dist_high', np.nan)),
-                    'rsi_min': float(ind.get('rsi_min', np.nan))
-                })
+            # 매수 시점 이하(<=)의 마지막 분봉을 전 거래에 한 번에 결합 (asof)
+            # 지표가 이미 shift되었으므로 진입 시각의 행을 그대로 사용
+            joined = join_trade_features(trades_df, m_df, columns=self.FEATURE_COLUMNS, lag=0, how='inner')
+
+            # [수정] 수익률 단위 정규화
+            p_col = next((c for c in ['return', 'pnl'] if c in joined.columns), None)
+            raw_return = joined[p_col].astype(float) if p_col else pd.Series(0.0, index=joined.index)
+
+            # 1.0 (100%) 보다 크면 퍼센트로 간주하고 100으로 나눔, 아니면 소수로 간주
+            # (데이터 특성에 따라 이 로직은 조정 필요. 여기서는 0.5(50%)를 기준으로 잡음)
+            real_return = raw_return.where(raw_return.abs() <= 0.5, raw_return / 100.0)
+
+            # 수수료 차감 (이미 차감된 데이터라면 self.TRANSACTION_COST를 0으로 설정)
+            net_return = real_return - self.TRANSACTION_COST
+
+            entry_date = pd.DatetimeIndex(joined['entry_date'])
+            if entry_date.tz is not None:
+                entry_date = entry_date.tz_localize(None)
+
+            analysis_results = joined[self.FEATURE_COLUMNS].reset_index(drop=True)
+            analysis_results.insert(0, 'entry_date', entry_date)
+            analysis_results.insert(1, 'is_win', (net_return > 0).to_numpy())
+            analysis_results.insert(2, 'net_return', net_return.to_numpy())  # 수수료 차감 후 수익률
             return analysis_results
         except Exception:
             return None
@@ -153,15 +188,17 @@ class MinuteIndicatorAnalyzer:
         all_trade_data = []
         
         print(f"🚀 [논리 수정본] 분봉 기반 수익률 심층 분석 시작 ({len(valid_tickers)}개 종목)...")
+        # 전 종목 거래 내역을 저장소에서 한 번에 스캔
+        trades_by_ticker = self.trade_store.by_ticker(tickers=valid_tickers, columns=['entry_date', 'return', 'pnl'])
         for ticker in tqdm(valid_tickers):
-            res = self.get_minute_analysis(ticker)
-            if res: all_trade_data.extend(res)
+            res = self.get_minute_analysis(ticker, trades_by_ticker.get(ticker))
+            if res is not None and not res.empty: all_trade_data.append(res)
                 
         if not all_trade_data:
             print("데이터를 찾을 수 없습니다.")
             return
 
-        df_res = pd.DataFrame(all_trade_data).dropna()
+        df_res = pd.concat(all_trade_data, ignore_index=True).dropna()
         
         # 필터 적용
         df_filtered = self.apply_filters(df_res)
@@ -192,6 +229,20 @@ class MinuteIndicatorAnalyzer:
         print(f"※ Total Return 및 MDD는 '단리(Simple Sum)' 기준입니다. (-100% 파산 오류 방지용)")
         print(f"※ 적용된 수수료(Cost): {self.TRANSACTION_COST * 100:.2f}%")
 
+        # 부트스트랩 신뢰구간 (거래일 블록 재표본)
+        for label, df in [('필터 전 (Base)', df_res), ('필터 후 (Filtered)', df_filtered)]:
+            boot = self.get_bootstrap(df)
+            if boot is None: continue
+            print(f"\n[부트스트랩 {self.N_PATHS:,}회 - {label}] (샤프는 일별 수익 합계 기준 연율화)")
+            print(boot.to_string(float_format=lambda x: f"{x:.2f}"))
+
+        # 필터 조합 탐색 (현재 필터와 비교용)
+        mined = self.mine_filters(df_res)
+        if not mined.empty:
+            print(f"\n[규칙 탐색] 후보 {mined.attrs['evaluated']:,}개 중 기대값 상위 (최소 {self.MINE_MIN_SUPPORT}건, 표본 내 성과)")
+            print(mined[['rule', 'count', 'win_rate', 'expectancy', 'profit_factor']].to_string(
+                float_format=lambda x: f"{x:.4f}"))
+
         # 2. 수익 곡선 시각화
         plt.figure(figsize=(12, 6))
         
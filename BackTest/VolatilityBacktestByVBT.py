@@ -1,10 +1,24 @@
 import vectorbt as vbt
 import pandas as pd
 import os
+import sys
 import numpy as np
+import pyarrow.parquet as pq
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Indicators.session import session_offsets, segmented_cumsum, first_true_mask, last_in_segment_mask
+from Indicators.daily_join import attach_daily_features
+from BackTest.breakout_simulator import simulate_breakout
+from Util.profiler import PROFILER
+
+# 결과 캐시(BackTest/result_cache.py) 무효화용 엔진 버전 - 지표/신호/체결 로직이 바뀌면 올립니다.
+ENGINE_VERSION = '2026.10.1'
 
 class VolatilityBacktester:
-    def __init__(self, slippage=0.001, fees=0.00015, tax=0.0015, stop_loss=0.02, k=0.6):
+    def __init__(self, slippage=0.001, fees=0.00015, tax=0.0015, stop_loss=0.02, k=0.6, slope_min=0.8, disp_min=1.0):
         self.daily_path = os.path.join("data", "chart", "daily")
         self.minute_path = os.path.join("data", "chart", "minute")
         self.k = k
@@ -12,9 +26,41 @@ class VolatilityBacktester:
         self.tax = tax
         self.stop_loss = stop_loss
         self.slippage = slippage
+        # 전일 5MA 기울기/이격도 필터 기준값 (워크포워드 최적화 대상, BackTest/walk_forward.py)
+        self.slope_min = slope_min
+        self.disp_min = disp_min
+        # {ticker: 일봉 DataFrame} - 병렬 러너 워커가 미리 로드한 일봉 패널 (없으면 파일에서 로드)
+        self.daily_cache = None
 
-    def _load_data(self, ticker):
+    def _load_daily(self, ticker):
+        """일봉 로드 (워커 일봉 패널 → 일봉 파일 순, 없으면 None)"""
         d_path = os.path.join(self.daily_path, f"{ticker}.parquet")
+        if self.daily_cache is not None and ticker in self.daily_cache:
+            d_df = self.daily_cache[ticker].copy()
+        elif os.path.exists(d_path):
+            d_df = pd.read_parquet(d_path, engine='fastparquet')
+            if 'date' in d_df.columns:
+                d_df.set_index('date', inplace=True)
+            d_df.index = pd.to_datetime(d_df.index)
+        else:
+            return None
+        self._to_float(d_df)
+        return d_df
+
+    @staticmethod
+    def _to_float(df):
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            if col in df.columns:
+                df[col] = df[col].astype('float64')
+
+    @staticmethod
+    def _resample_daily(m_df):
+        """분봉 → 일봉 (일봉 파일이 없을 때 대체)"""
+        return m_df.resample('D').agg({
+            'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+        }).dropna().sort_index()
+
+    def _load_data(self, ticker):
         m_path = os.path.join(self.minute_path, f"{ticker}.parquet")
         
         if not os.path.exists(m_path):
@@ -27,108 +73,342 @@ class VolatilityBacktester:
             if 'date' in m_df.columns:
                 m_df.set_index('date', inplace=True)
             m_df.index = pd.to_datetime(m_df.index)
-            
-            if os.path.exists(d_path):
-                d_df = pd.read_parquet(d_path, engine='fastparquet')
-                if 'date' in d_df.columns:
-                    d_df.set_index('date', inplace=True)
-                d_df.index = pd.to_datetime(d_df.index)
-            else:
-                d_df = m_df.resample('D').agg({
-                    'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
-                }).dropna().sort_index()
-            
-            for df in [d_df, m_df]:
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    if col in df.columns:
-                        df[col] = df[col].astype('float64')
+            # 세션 오프셋 기반 연산을 위해 시간순 정렬 보장
+            if not m_df.index.is_monotonic_increasing:
+                m_df.sort_index(inplace=True)
+            self._to_float(m_df)
+
+            d_df = self._load_daily(ticker)
+            if d_df is None:
+                d_df = self._resample_daily(m_df)
             
             return d_df, m_df
         except Exception:
             return None, None
 
+    def _iter_minute_slices(self, ticker, freq='M', batch_rows=20_000):
+        """
+        분봉 파일을 기간(freq: 'M' 월 / 'W' 주) 단위 조각으로 나누어 순서대로 반환합니다.
+        parquet를 batch_rows 행씩 읽어 기간 경계에서 자르므로, 메모리에는 조각 1개 + 읽기 배치 1개만 존재합니다.
+        ※ 분봉 파일이 시간순으로 저장되어 있어야 합니다 (조각 내부만 정렬 보장)
+        """
+        m_path = os.path.join(self.minute_path, f"{ticker}.parquet")
+        if not os.path.exists(m_path):
+            return
+
+        pf = pq.ParquetFile(m_path)
+        names = pf.schema_arrow.names
+        time_col = 'date' if 'date' in names else next(
+            (c for c in names if c not in ('open', 'high', 'low', 'close', 'volume')), None)
+        columns = [c for c in [time_col, 'open', 'high', 'low', 'close', 'volume'] if c in names]
+
+        pending = None
+        for batch in pf.iter_batches(batch_size=batch_rows, columns=columns):
+            # pandas 메타데이터로 시간 컬럼이 인덱스로 복원되지 않도록 무시 (to_parquet 저장 파일)
+            df = batch.to_pandas(ignore_metadata=True)
+            df.index = pd.to_datetime(df.pop(time_col))
+            self._to_float(df)
+            pending = df if pending is None else pd.concat([pending, df])
+
+            # 마지막 기간은 다음 배치에 이어질 수 있으므로 보류, 완성된 기간만 반환
+            periods = pending.index.to_period(freq)
+            last = periods[-1]
+            done = periods != last
+            if done.any():
+                for _, part in pending[done].groupby(periods[done], sort=True):
+                    yield part.sort_index()
+                pending = pending[~done]
+
+        if pending is not None and not pending.empty:
+            yield pending.sort_index()
+
+    def _prepare_features(self, d_df, m_df):
+        """
+        k / value_limit / 손절 / 익절과 무관한 일봉 지표·필터를 한 번만 계산해 분봉에 결합합니다.
+        :return: (offsets, base_cond, exits) - 파라미터 공통 진입 조건과 청산 신호 (numpy bool 배열)
+        """
+        # --- 1. 기본 지표 계산 ---
+        d_df['trading_value'] = d_df['close'] * d_df['volume']
+        d_df['avg_value_5d'] = d_df['trading_value'].rolling(window=5).mean()
+        ma5 = d_df['close'].rolling(window=5).mean()
+
+        # --- 2. [신규] 5MA 기울기 및 이격도 필터 (분석 결과 반영) ---
+        # 기울기 (Slope): (현재MA5 / 이전MA5 - 1) * 100
+        d_df['slope5'] = ((ma5 / ma5.shift(1)) - 1) * 100
+        # 이격도 (Disparity): (현재가 / MA5 - 1) * 100
+        d_df['disp5'] = ((d_df['close'] / ma5) - 1) * 100
+
+        # [통계 기반 필터 조건]
+        # 1. 승률 38% 최적 구간 (공격적 필터)
+        # is_opt_zone = (d_df['slope5'] > 1.3) & (d_df['slope5'] <= 1.74) & (d_df['disp5'] > 2.7) & (d_df['disp5'] <= 3.6)
+
+        # 2. 범용 승률 우위 구간 (기울기 양수 및 적정 이격도)
+        # 분석 결과 Win 평균인 slope5 > 1.0% 및 disp5 > 2.6% 근처를 기준으로 설정
+        # ※ 아래 필터들은 '해당 일봉 종가 기준' 값이며, 분봉 결합 시 lag=1로 전일 값을 사용
+        # 기준값 비교는 분봉 결합 후 수행 (워크포워드에서 원값을 재사용하기 위해 원값을 결합)
+        prev_filters = pd.DataFrame({
+            'prev_slope5': d_df['slope5'],
+            'prev_disp5': d_df['disp5'],
+            # --- 3. 기존 필터 유지 (유동성 기준값은 파라미터이므로 거래대금 원값을 결합) ---
+            'avg_value_5d': d_df['avg_value_5d'],
+            'is_trend_up': d_df['close'] > ma5,
+            'ref_vol': d_df['volume'].rolling(window=5).mean(),
+        }, index=d_df.index)
+
+        # 목표가(당일 시가 + 전일 변동폭 * k)의 구성 요소는 당일 시가 기반이므로 같은 날짜(lag=0)로 결합
+        today_cols = pd.DataFrame({
+            'day_open': d_df['open'],
+            'prev_range': (d_df['high'] - d_df['low']).shift(1),
+        }, index=d_df.index)
+
+        # --- 4. 데이터 매핑 (세션 오프셋 기반 일괄 as-of 결합) ---
+        m_df['date'] = m_df.index.normalize()
+        offsets = session_offsets(m_df.index)
+        attach_daily_features(m_df, today_cols, list(today_cols.columns), lag=0, offsets=offsets)
+        attach_daily_features(m_df, prev_filters, list(prev_filters.columns), lag=1, offsets=offsets)
+
+        m_df['cum_vol'] = segmented_cumsum(m_df['volume'].to_numpy(), offsets)
+
+        # --- 5. 파라미터 공통 진입 조건 (통계 필터 통합) ---
+        m_df['is_slope_good'] = m_df['prev_slope5'] > self.slope_min  # 전일 기준 기울기가 탄탄한가
+        m_df['is_disp_good'] = m_df['prev_disp5'] > self.disp_min     # 전일 기준 정배열 탄력이 붙었는가
+        base_cond = (
+            m_df['is_trend_up'].to_numpy() &
+            m_df['is_slope_good'].to_numpy() &  # 기울기 필터
+            m_df['is_disp_good'].to_numpy() &   # 이격도 필터
+            (m_df['cum_vol'] > m_df['ref_vol'] * 0.5).to_numpy()
+        )
+
+        exits = (m_df.index.hour == 15) & (m_df.index.minute == 19)
+        exits = exits | last_in_segment_mask(offsets)
+        return offsets, base_cond, exits
+
+    @staticmethod
+    def _target_price(m_df, k):
+        """목표가 = 당일 시가 + 전일 변동폭 * k"""
+        return m_df['day_open'].to_numpy() + m_df['prev_range'].to_numpy() * k
+
+    def _entry_signals(self, m_df, offsets, base_cond, k, value_limit):
+        """
+        (k, value_limit) 조합의 진입 신호와 체결 가격
+        :return: (entries, exec_price) numpy 배열
+        """
+        target_price = self._target_price(m_df, k)
+        condition = (
+            base_cond &
+            (m_df['high'].to_numpy() >= target_price) &
+            (m_df['avg_value_5d'].to_numpy() >= value_limit)
+        )
+
+        # 당일 첫 번째 신호만 진입 (세션 오프셋 기반 커널로 groupby/transform 대체)
+        entries = first_true_mask(condition, offsets)
+
+        # 시가가 목표가 위에서 시작하면 시가, 아니면 목표가에 체결
+        exec_price = m_df['close'].to_numpy().copy()
+        exec_price[entries] = np.maximum(m_df['open'].to_numpy(), target_price)[entries]
+        return entries, exec_price
+
     def run_backtest(self, ticker, value_limit=10_000_000_000):
         try:
-            d_df, m_df = self._load_data(ticker)
+            with PROFILER.stage('parquet_read'):
+                d_df, m_df = self._load_data(ticker)
             if d_df is None or m_df is None or d_df.empty or m_df.empty:
                 return None
-            
-            # --- 1. 기본 지표 계산 ---
-            d_df['trading_value'] = d_df['close'] * d_df['volume']
-            d_df['avg_value_5d'] = d_df['trading_value'].rolling(window=5).mean()
-            ma5 = d_df['close'].rolling(window=5).mean()
-            
-            # --- 2. [신규] 5MA 기울기 및 이격도 필터 (분석 결과 반영) ---
-            # 기울기 (Slope): (현재MA5 / 이전MA5 - 1) * 100
-            d_df['slope5'] = ((ma5 / ma5.shift(1)) - 1) * 100
-            # 이격도 (Disparity): (현재가 / MA5 - 1) * 100
-            d_df['disp5'] = ((d_df['close'] / ma5) - 1) * 100
-
-            # [통계 기반 필터 조건]
-            # 1. 승률 38% 최적 구간 (공격적 필터)
-            # is_opt_zone = (d_df['slope5'] > 1.3) & (d_df['slope5'] <= 1.74) & (d_df['disp5'] > 2.7) & (d_df['disp5'] <= 3.6)
-            
-            # 2. 범용 승률 우위 구간 (기울기 양수 및 적정 이격도)
-            # 분석 결과 Win 평균인 slope5 > 1.0% 및 disp5 > 2.6% 근처를 기준으로 설정
-            is_slope_good = d_df['slope5'].shift(1) > 0.8  # 전일 기준 기울기가 탄탄한가
-            is_disp_good = d_df['disp5'].shift(1) > 1.0    # 전일 기준 정배열 탄력이 붙었는가
-            
-            # --- 3. 기존 필터 유지 ---
-            is_liquid = d_df['avg_value_5d'].shift(1) >= value_limit
-            is_trend_up = d_df['close'].shift(1) > ma5.shift(1)
-            avg_vol_5d = d_df['volume'].rolling(window=5).mean()
-            
-            prev_range = (d_df['high'] - d_df['low']).shift(1)
-            target_price = d_df['open'] + prev_range * self.k
-            
-            # --- 4. 데이터 매핑 ---
-            m_df['date'] = m_df.index.normalize()
-            m_df['target_price'] = m_df['date'].map(target_price)
-            m_df['is_trend_up'] = m_df['date'].map(is_trend_up)
-            m_df['is_liquid'] = m_df['date'].map(is_liquid)
-            
-            # 신규 필터 매핑
-            m_df['is_slope_good'] = m_df['date'].map(is_slope_good)
-            m_df['is_disp_good'] = m_df['date'].map(is_disp_good)
-            
-            m_df['ref_vol'] = m_df['date'].map(avg_vol_5d.shift(1))
-            m_df['cum_vol'] = m_df.groupby('date')['volume'].cumsum()
-            
-            # --- 5. 신호 생성 (통계 필터 통합) ---
-            condition = (
-                (m_df['high'] >= m_df['target_price']) & 
-                (m_df['is_trend_up'] == True) & 
-                (m_df['is_liquid'] == True) & 
-                (m_df['is_slope_good'] == True) & # 기울기 필터
-                (m_df['is_disp_good'] == True) &  # 이격도 필터
-                (m_df['cum_vol'] > m_df['ref_vol'] * 0.5)
-            )
-            
-            entries = condition.groupby(m_df['date']).transform(lambda x: x & (x.cumsum() == 1))
-            exits = (m_df.index.hour == 15) & (m_df.index.minute == 19)
-            exits = exits | (m_df.groupby('date').cumcount(ascending=False) == 0)
+
+            with PROFILER.stage('indicators'):
+                offsets, base_cond, exits = self._prepare_features(d_df, m_df)
+            with PROFILER.stage('signals'):
+                entries, exec_price = self._entry_signals(m_df, offsets, base_cond, self.k, value_limit)
 
             if entries.sum() == 0: return None
 
             # --- 6. 시뮬레이션 ---
-            actual_entry = m_df['open'].where(m_df['open'] > m_df['target_price'], m_df['target_price'])
-            exec_price = m_df['close'].copy() 
-            exec_price.loc[entries] = actual_entry.loc[entries]
+            with PROFILER.stage('simulation'):
+                pf = vbt.Portfolio.from_signals(
+                    close=m_df['close'],
+                    entries=pd.Series(entries, index=m_df.index),
+                    exits=pd.Series(exits, index=m_df.index),
+                    price=pd.Series(exec_price, index=m_df.index),
+                    fees=self.fees + (self.tax / 2), slippage=self.slippage,
+                    open=m_df['open'], high=m_df['high'], low=m_df['low'],
+                    sl_stop=self.stop_loss, sl_trail=True,
+                    tp_stop=0.07,
+                    accumulate=False, freq='1min'
+                )
+            return pf
+        except Exception:
+            return None
+
+    def run_trades(self, ticker, value_limit=10_000_000_000, take_profit=0.07, exit_minute=15 * 60 + 19,
+                   stop_anchor='close'):
+        """
+        [고속 경로] numba 시뮬레이터(BackTest/breakout_simulator.py)로 거래 내역을 계산합니다.
+        run_backtest(VBT)와 같은 체결 규칙이며, trades_{ticker}.parquet와 같은 형식의 DataFrame을 반환합니다.
+
+        :param exit_minute: 강제 청산 시각 (장중 분, 기본 15:19)
+        :param stop_anchor: 손절/익절 기준가 ('close' = 진입 봉 종가(VBT와 동일), 'fill' = 실제 체결가)
+        :return: 거래 DataFrame 또는 None
+        """
+        try:
+            with PROFILER.stage('parquet_read'):
+                d_df, m_df = self._load_data(ticker)
+            if d_df is None or m_df is None or d_df.empty or m_df.empty:
+                return None
+
+            with PROFILER.stage('indicators'):
+                offsets, base_cond, _ = self._prepare_features(d_df, m_df)
+            can_enter = base_cond & (m_df['avg_value_5d'].to_numpy() >= value_limit)
+
+            with PROFILER.stage('simulation'):
+                trades = simulate_breakout(
+                    m_df, self._target_price(m_df, self.k), can_enter, exit_minute=exit_minute, offsets=offsets,
+                    fees=self.fees + (self.tax / 2), slippage=self.slippage,
+                    sl_stop=self.stop_loss, sl_trail=True, tp_stop=take_profit, stop_anchor=stop_anchor,
+                )
+            return trades if not trades.empty else None
+        except Exception:
+            return None
+
+    def run_trades_streaming(self, ticker, value_limit=10_000_000_000, take_profit=0.07,
+                             exit_minute=15 * 60 + 19, stop_anchor='close', freq='M'):
+        """
+        [스트리밍 모드] 분봉을 월(또는 주) 조각 단위로 읽어 run_trades와 같은 거래 내역을 계산합니다.
+
+        전략이 당일 청산(오버나이트 미보유)이므로 조각 경계에서 포지션은 항상 0이고,
+        조각 간에는 일봉 컨텍스트(일봉 파일 또는 지금까지의 분봉으로 만든 일봉)와 현금만 이어받습니다.
+        워커당 최대 메모리가 전체 기간이 아닌 조각 크기에 비례합니다.
+
+        :param freq: 조각 단위 ('M' 월 / 'W' 주)
+        :return: 거래 DataFrame (entry_idx/exit_idx는 전체 분봉 기준 위치) 또는 None
+        """
+        try:
+            d_df = self._load_daily(ticker)
+            daily_from_minute = d_df is None
+            daily_parts = []
+
+            frames = []
+            cash = 100.0
+            row_base = 0
+            for m_df in self._iter_minute_slices(ticker, freq=freq):
+                if daily_from_minute:
+                    # 일봉 파일이 없으면 지금까지 읽은 분봉으로 일봉 컨텍스트를 누적 (전일 지표용)
+                    daily_parts.append(self._resample_daily(m_df))
+                    d_df = pd.concat(daily_parts)
+
+                with PROFILER.stage('indicators'):
+                    offsets, base_cond, _ = self._prepare_features(d_df, m_df)
+                can_enter = base_cond & (m_df['avg_value_5d'].to_numpy() >= value_limit)
+                with PROFILER.stage('simulation'):
+                    trades = simulate_breakout(
+                        m_df, self._target_price(m_df, self.k), can_enter, exit_minute=exit_minute, offsets=offsets,
+                        fees=self.fees + (self.tax / 2), slippage=self.slippage,
+                        sl_stop=self.stop_loss, sl_trail=True, tp_stop=take_profit, stop_anchor=stop_anchor,
+                        init_cash=cash,
+                    )
+                if not trades.empty:
+                    cash += trades['pnl'].sum()
+                    trades[['entry_idx', 'exit_idx']] += row_base
+                    frames.append(trades)
+                row_base += len(m_df)
+                del m_df
+
+            if not frames:
+                return None
+            trades = pd.concat(frames, ignore_index=True)
+            trades['id'] = np.arange(len(trades))
+            trades['parent_id'] = trades['id']
+            return trades
+        except Exception:
+            return None
+
+    def grid_portfolio(self, ticker, k_values=(0.5,), stop_losses=(0.02,), take_profits=(0.07,),
+                       value_limits=(10_000_000_000,)):
+        """
+        [그리드 모드] 데이터를 한 번만 로드하고, 모든 파라미터 조합을 컬럼으로 쌓아
+        단일 vbt.Portfolio.from_signals 호출로 시뮬레이션합니다.
+
+        - 일봉 지표/필터 결합: 1회
+        - 진입 신호/체결가: (k, value_limit) 조합당 1회 (손절/익절 축으로는 재사용)
+        - 컬럼: (k, value_limit, stop_loss, take_profit) MultiIndex
+        ※ 메모리 사용량은 분봉 행 수 x 조합 수에 비례합니다.
+
+        :return: vbt.Portfolio (다중 컬럼) 또는 None
+        """
+        try:
+            d_df, m_df = self._load_data(ticker)
+            if d_df is None or m_df is None or d_df.empty or m_df.empty:
+                return None
+
+            offsets, base_cond, exits = self._prepare_features(d_df, m_df)
+
+            signal_keys = [(k, vl) for k in k_values for vl in value_limits]
+            stop_keys = [(sl, tp) for sl in stop_losses for tp in take_profits]
+            n_rows, n_stops = len(m_df), len(stop_keys)
+            n_cols = len(signal_keys) * n_stops
+
+            entries = np.empty((n_rows, n_cols), dtype=np.bool_)
+            prices = np.empty((n_rows, n_cols), dtype=np.float64)
+            for i, (k, vl) in enumerate(signal_keys):
+                e, p = self._entry_signals(m_df, offsets, base_cond, k, vl)
+                entries[:, i * n_stops:(i + 1) * n_stops] = e[:, None]
+                prices[:, i * n_stops:(i + 1) * n_stops] = p[:, None]
+
+            if not entries.any(): return None
+
+            columns = pd.MultiIndex.from_tuples(
+                [sig + stop for sig in signal_keys for stop in stop_keys],
+                names=['k', 'value_limit', 'stop_loss', 'take_profit'])
+            sl_stop = np.array([stop[0] for _ in signal_keys for stop in stop_keys], dtype=np.float64)
+            tp_stop = np.array([stop[1] for _ in signal_keys for stop in stop_keys], dtype=np.float64)
 
             pf = vbt.Portfolio.from_signals(
-                close=m_df['close'], entries=entries, exits=exits, price=exec_price,
+                close=m_df['close'],
+                entries=pd.DataFrame(entries, index=m_df.index, columns=columns),
+                exits=pd.Series(exits, index=m_df.index),
+                price=pd.DataFrame(prices, index=m_df.index, columns=columns),
                 fees=self.fees + (self.tax / 2), slippage=self.slippage,
-                high=m_df['high'], low=m_df['low'],
-                sl_stop=self.stop_loss, sl_trail=True,
-                tp_stop=0.07,
+                open=m_df['open'], high=m_df['high'], low=m_df['low'],
+                sl_stop=sl_stop[None, :], sl_trail=True,
+                tp_stop=tp_stop[None, :],
                 accumulate=False, freq='1min'
             )
             return pf
-        except Exception:
+        except Exception as e:
+            print(f"[!] {ticker} 그리드 백테스트 실패: {e}")
             return None
 
+    def run_grid(self, ticker, k_values=(0.5,), stop_losses=(0.02,), take_profits=(0.07,),
+                 value_limits=(10_000_000_000,)):
+        """
+        그리드 모드 실행 후 (ticker, 파라미터) → 성과 지표 형태의 tidy 테이블을 반환합니다.
+        지표 컬럼명은 pf.stats()와 동일합니다. (total_backtest_report.csv와 호환)
+
+        :return: DataFrame [Ticker, k, value_limit, stop_loss, take_profit, 지표...] 또는 None
+        """
+        pf = self.grid_portfolio(ticker, k_values, stop_losses, take_profits, value_limits)
+        if pf is None:
+            return None
+
+        metrics = pd.DataFrame({
+            'Total Return [%]': pf.total_return() * 100,
+            'Total Trades': pf.trades.count(),
+            'Win Rate [%]': pf.trades.win_rate() * 100,
+            'Profit Factor': pf.trades.profit_factor(),
+            'Expectancy': pf.trades.expectancy(),
+            'Max Drawdown [%]': -pf.max_drawdown() * 100,
+            'Sharpe Ratio': pf.sharpe_ratio(),
+        })
+        metrics = metrics.reset_index()
+        metrics.insert(0, 'Ticker', ticker)
+        return metrics
+
 if __name__ == "__main__":
     tester = VolatilityBacktester(stop_loss=0.03)
     result = tester.run_backtest('005930')
     if result:
-        print(result.stats())
\ No newline at end of file
+        print(result.stats())
+
+    # 그리드 모드: k x 손절 x 익절 조합을 한 번에 시뮬레이션
+    grid = tester.run_grid('005930', k_values=(0.4, 0.5, 0.6), stop_losses=(0.02, 0.03), take_profits=(0.05, 0.07))
+    if grid is not None:
+        print(grid.sort_values('Total Return [%]', ascending=False).to_string(index=False))
\ No newline at end of file
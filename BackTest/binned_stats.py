@@ -0,0 +1,311 @@
+"""
+구간(bin)별 승률 / 2-D 히트맵 엔진
+
+지표 값을 정수 구간 코드로 한 번만 바꾼 뒤 bincount(1-D) 또는 numba 누적 커널(2-D 다중 쌍)로
+구간별 거래 수 / 승리 수 / 수익 합계를 한 번에 셉니다. (지표마다 pd.cut + groupby, 쌍마다 pivot_table 대체)
+
+- 구간 규칙: pd.cut 기본값과 같은 오른쪽 닫힌 구간 (a, b], 범위 밖/NaN은 제외
+- 구간 경계: 명시 경계 / 분위수 범위(예: 5%~95%)의 등간격 / 분위수 등분
+- 신뢰구간: Wilson 점수 구간 (기본) 또는 푸아송 부트스트랩
+  (거래별 가중치 ~ Poisson(1) 재표본은 구간별 승리/패배 수가 각각 Poisson(승리 수)/Poisson(패배 수)인 것과 같으므로
+   거래 수와 무관하게 구간 수 x 경로 수 연산으로 계산)
+- 최소 거래 수 미만 구간은 NaN 처리 (min_count)
+
+    codes = bin_codes(df['slope5'], quantile_edges(df['slope5'], bins=10))
+    table = binned_win_rate(df['slope5'], df['is_win'], edges=[0, 20, 30, 100], profit=df['return'])
+    cells = scan_pairs(df, ['d_rsi', 'd_adx', 'm_vol_spike'], bins=10, min_count=100)
+"""
+import itertools
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+
+# ---------------------------------------------------------------
+# 1. 구간 경계 / 코드
+# ---------------------------------------------------------------
+
+def quantile_edges(values, bins: int = 10, clip=(0.05, 0.95), method: str = 'linear') -> np.ndarray:
+    """
+    구간 경계 계산
+    :param bins: 구간 수
+    :param clip: 경계 범위로 쓸 분위수 (이상치 제외, None이면 최소~최대)
+    :param method: 'linear' = 범위 등간격, 'quantile' = 거래 수 등분 (중복 경계 제거)
+    """
+    x = np.asarray(values, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    if len(x) == 0:
+        return np.array([0.0, 1.0])
+    lo, hi = np.quantile(x, clip) if clip is not None else (x.min(), x.max())
+    if method == 'quantile':
+        return np.unique(np.quantile(x[(x >= lo) & (x <= hi)], np.linspace(0, 1, bins + 1)))
+    if hi <= lo:
+        hi = lo + 1e-9
+    return np.linspace(lo, hi, bins + 1)
+
+
+@njit(cache=True)
+def _bin_kernel(x, edges, fill, out):
+    """
+    오른쪽 닫힌 구간 코드 (searchsorted side='left' - 1), 범위 밖/NaN은 fill
+    등간격 경계는 나눗셈으로 구간을 추정한 뒤 경계 비교로 보정 (부동소수 오차에도 pd.cut과 동일)
+    ±inf 경계(열린 구간)가 있으면 등간격 경로를 쓰지 않고 이진 탐색
+    """
+    n_bins = len(edges) - 1
+    width = (edges[n_bins] - edges[0]) / n_bins
+    uniform = np.isfinite(width) and width > 0
+    for k in range(n_bins):
+        if not uniform:
+            break
+        if abs((edges[k + 1] - edges[k]) - width) > 1e-9 * abs(width):
+            uniform = False
+    for i in range(len(x)):
+        v = x[i]
+        if not (v > edges[0]) or v > edges[n_bins]:  # NaN 포함
+            out[i] = fill
+            continue
+        if uniform:
+            k = min(max(int((v - edges[0]) / width), 0), n_bins - 1)
+            while k > 0 and edges[k] >= v:
+                k -= 1
+            while k < n_bins - 1 and edges[k + 1] < v:
+                k += 1
+            out[i] = k
+            continue
+        lo, hi = 0, n_bins
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if edges[mid] < v:
+                lo = mid
+            else:
+                hi = mid
+        out[i] = lo
+
+
+def bin_codes(values, edges) -> np.ndarray:
+    """
+    값 → 구간 코드 (pd.cut(values, edges).codes와 동일: 오른쪽 닫힌 구간, 범위 밖/NaN은 -1)
+    :return: int16 배열
+    """
+    codes = np.empty(len(values), dtype=np.int16)
+    _bin_kernel(np.ascontiguousarray(values, dtype=np.float64), np.asarray(edges, dtype=np.float64), -1, codes)
+    return codes
+
+
+def interval_labels(edges) -> pd.IntervalIndex:
+    """pd.cut과 같은 구간 라벨"""
+    return pd.IntervalIndex.from_breaks(np.asarray(edges, dtype=np.float64), closed='right')
+
+
+# ---------------------------------------------------------------
+# 2. 신뢰구간
+# ---------------------------------------------------------------
+
+def wilson_interval(wins, counts, z: float = 1.96):
+    """승률 Wilson 점수 구간 (거래 수 0이면 NaN)"""
+    wins = np.asarray(wins, dtype=np.float64)
+    n = np.asarray(counts, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = wins / n
+        denom = 1 + z * z / n
+        center = (p + z * z / (2 * n)) / denom
+        half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return center - half, center + half
+
+
+def bootstrap_interval(wins, counts, n_paths: int = 2_000, alpha: float = 0.05, seed: int = 42):
+    """
+    승률 푸아송 부트스트랩 구간
+    구간별 (승리, 패배) 수를 Poisson으로 재표본 → 경로별 승률의 분위수
+    """
+    wins = np.asarray(wins, dtype=np.float64)
+    losses = np.asarray(counts, dtype=np.float64) - wins
+    rng = np.random.default_rng(seed)
+    w = rng.poisson(wins, size=(n_paths,) + wins.shape)
+    l = rng.poisson(losses, size=(n_paths,) + losses.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = w / (w + l)
+        low, high = np.nanquantile(rate, [alpha / 2, 1 - alpha / 2], axis=0)
+    return low, high
+
+
+def _cell_frame(counts, wins, profit, ci: str, min_count: int, z: float) -> dict:
+    """누적 배열(같은 모양) → 구간 통계 컬럼 (최소 거래 수 미만은 NaN)"""
+    counts = counts.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        win_rate = wins / counts
+        profit_mean = profit / counts
+    if ci == 'bootstrap':
+        ci_low, ci_high = bootstrap_interval(wins, counts)
+    else:
+        ci_low, ci_high = wilson_interval(wins, counts, z=z)
+
+    masked = counts < max(min_count, 1)
+    out = {'count': counts, 'wins': wins, 'win_rate': win_rate, 'ci_low': ci_low, 'ci_high': ci_high,
+           'profit_sum': profit, 'profit_mean': profit_mean}
+    for key in ('win_rate', 'ci_low', 'ci_high', 'profit_mean'):
+        out[key] = np.where(masked, np.nan, out[key])
+    return out
+
+
+# ---------------------------------------------------------------
+# 3. 1-D 구간 승률
+# ---------------------------------------------------------------
+
+def binned_win_rate(values, is_win, edges=None, bins: int = 10, profit=None, labels=None,
+                    ci: str = 'wilson', min_count: int = 0, z: float = 1.96) -> pd.DataFrame:
+    """
+    한 지표의 구간별 거래 수 / 승률 / 신뢰구간 / 수익 합계·평균
+
+    :param edges: 구간 경계 (None이면 quantile_edges(values, bins))
+    :param profit: 거래별 수익 (None이면 수익 컬럼 0)
+    :param labels: 구간 이름 (None이면 구간 표기)
+    :param ci: 'wilson' 또는 'bootstrap'
+    :param min_count: 이 거래 수 미만 구간은 승률/구간/평균을 NaN 처리
+    :return: 구간 인덱스 DataFrame
+    """
+    edges = quantile_edges(values, bins) if edges is None else np.asarray(edges, dtype=np.float64)
+    n_bins = len(edges) - 1
+    codes = bin_codes(values, edges)
+    valid = codes >= 0
+    c = codes[valid]
+    win = np.asarray(is_win, dtype=np.float64)[valid]
+    pnl = np.zeros(len(c)) if profit is None else np.nan_to_num(np.asarray(profit, dtype=np.float64)[valid])
+
+    stats = _cell_frame(np.bincount(c, minlength=n_bins), np.bincount(c, weights=win, minlength=n_bins),
+                        np.bincount(c, weights=pnl, minlength=n_bins), ci, min_count, z)
+    index = pd.Index(labels, name='bin') if labels is not None else pd.Index(interval_labels(edges), name='bin')
+    return pd.DataFrame(stats, index=index)
+
+
+# ---------------------------------------------------------------
+# 4. 2-D 히트맵 (다중 지표 쌍)
+# ---------------------------------------------------------------
+
+# 승리 수를 거래 수와 함께 한 번에 누적하기 위한 비트 위치 (누적값 = 거래 수 + 승리 수 << 32)
+_WIN_SHIFT = 32
+
+
+@njit(parallel=True, cache=True)
+def _pair_kernel(codes, pairs, n_bins, packed, profit, use_profit):
+    """
+    지표 쌍별 2-D 누적 (쌍 단위 병렬)
+    범위 밖 코드는 n_bins(버림 구간)로 두어 분기 없이 누적하고, 거래 수/승리 수는 int64 하나에 묶어 1회만 기록
+
+    :param codes: (지표 수 x 거래 수) uint8 구간 코드 (n_bins = 제외, 지표별 연속 메모리)
+    :param pairs: (쌍 수 x 2) 지표 행 번호
+    :param packed: 거래별 1 + (승리 여부 << 32)
+    :return: (쌍 수 x (n_bins+1)^2) 묶음 누적값, 수익 합계
+    """
+    n_pairs = pairs.shape[0]
+    m = n_bins + 1
+    acc = np.zeros((n_pairs, m * m), dtype=np.int64)
+    psum = np.zeros((n_pairs, m * m), dtype=np.float64)
+    for p in prange(n_pairs):
+        xa = codes[pairs[p, 0]]
+        xb = codes[pairs[p, 1]]
+        cell_acc = acc[p]
+        cell_sum = psum[p]
+        for i in range(codes.shape[1]):
+            c = np.int64(xa[i]) * m + xb[i]
+            cell_acc[c] += packed[i]
+            if use_profit:
+                cell_sum[c] += profit[i]
+    return acc, psum
+
+
+def feature_codes(df: pd.DataFrame, features, bins: int = 10, clip=(0.05, 0.95), method: str = 'linear',
+                  edges: dict = None):
+    """
+    여러 지표를 한 번에 구간 코드로 변환
+    :param edges: {지표: 경계} (없는 지표는 quantile_edges로 계산)
+    :return: (지표 수 x 거래 수) uint8 코드 행렬 (범위 밖 = 구간 수 최댓값), {지표: 경계}
+    """
+    edges = dict(edges or {})
+    values = {}
+    for col in features:
+        # DataFrame 2-D 블록의 열은 strided 뷰이므로 연속 배열로 한 번 복사
+        values[col] = np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+        if col not in edges:
+            edges[col] = quantile_edges(values[col], bins, clip=clip, method=method)
+    n_bins = max(len(edges[col]) - 1 for col in features)
+    if n_bins >= 255:
+        raise ValueError("구간 수는 254개 이하여야 합니다.")
+
+    codes = np.empty((len(features), len(df)), dtype=np.uint8)
+    for j, col in enumerate(features):
+        _bin_kernel(values[col], np.asarray(edges[col], dtype=np.float64), n_bins, codes[j])
+    return codes, edges, n_bins
+
+
+def heatmap(x, y, is_win, x_edges=None, y_edges=None, bins: int = 10, profit=None, ci: str = 'wilson',
+            min_count: int = 0, z: float = 1.96) -> dict:
+    """
+    두 지표의 2-D 구간 통계 (pivot_table(aggfunc=['mean', 'count']) 대체)
+    :return: {통계 이름: DataFrame(index=y 구간, columns=x 구간)}
+    """
+    x_edges = quantile_edges(x, bins) if x_edges is None else np.asarray(x_edges, dtype=np.float64)
+    y_edges = quantile_edges(y, bins) if y_edges is None else np.asarray(y_edges, dtype=np.float64)
+    nx, ny = len(x_edges) - 1, len(y_edges) - 1
+    cx, cy = bin_codes(x, x_edges), bin_codes(y, y_edges)
+    valid = (cx >= 0) & (cy >= 0)
+    flat = cy[valid].astype(np.int64) * nx + cx[valid]
+    win = np.asarray(is_win, dtype=np.float64)[valid]
+    pnl = np.zeros(len(flat)) if profit is None else np.nan_to_num(np.asarray(profit, dtype=np.float64)[valid])
+
+    size = nx * ny
+    stats = _cell_frame(np.bincount(flat, minlength=size), np.bincount(flat, weights=win, minlength=size),
+                        np.bincount(flat, weights=pnl, minlength=size), ci, min_count, z)
+    index, columns = interval_labels(y_edges), interval_labels(x_edges)
+    return {key: pd.DataFrame(arr.reshape(ny, nx), index=index, columns=columns) for key, arr in stats.items()}
+
+
+def scan_pairs(df: pd.DataFrame, features, is_win='is_win', profit='return', bins: int = 10, clip=(0.05, 0.95),
+               method: str = 'linear', pairs=None, ci: str = 'wilson', min_count: int = 30,
+               z: float = 1.96) -> pd.DataFrame:
+    """
+    지표 쌍 전체의 2-D 구간 통계를 한 번에 계산합니다.
+
+    :param df: 거래별 피처 테이블 (예: FeatureStore.scan())
+    :param features: 지표 컬럼 목록 (pairs가 없으면 모든 2개 조합)
+    :param is_win: 승패 컬럼 / profit: 수익 컬럼 (None이면 0)
+    :param pairs: [(x, y), ...] 직접 지정
+    :param min_count: 이 거래 수 미만 셀은 결과에서 제외
+    :return: 셀 단위 DataFrame (x, y, x_bin, y_bin, count, wins, win_rate, ci_low, ci_high, profit_sum, profit_mean),
+             신뢰구간 하한(ci_low) 내림차순
+    """
+    features = list(features)
+    pairs = list(pairs) if pairs is not None else list(itertools.combinations(features, 2))
+    if not pairs:
+        return pd.DataFrame()
+    used = list(dict.fromkeys(f for pair in pairs for f in pair))
+    codes, edges, n_bins = feature_codes(df, used, bins=bins, clip=clip, method=method)
+
+    pos = {f: j for j, f in enumerate(used)}
+    pair_idx = np.array([[pos[a], pos[b]] for a, b in pairs], dtype=np.int64)
+    packed = 1 + (df[is_win].to_numpy(dtype=np.int64) << _WIN_SHIFT)
+    pnl = np.zeros(len(df)) if profit is None else np.nan_to_num(df[profit].to_numpy(dtype=np.float64))
+    acc, psum = _pair_kernel(codes, pair_idx, n_bins, packed, pnl, profit is not None)
+
+    # 버림 구간(마지막 행/열) 제거 → (쌍 수 x n_bins x n_bins)
+    m = n_bins + 1
+    acc = acc.reshape(-1, m, m)[:, :n_bins, :n_bins]
+    psum = psum.reshape(-1, m, m)[:, :n_bins, :n_bins]
+    counts = acc & ((1 << _WIN_SHIFT) - 1)
+    wins = (acc >> _WIN_SHIFT).astype(np.float64)
+
+    # 최소 거래 수 이상 셀만 남긴 뒤 통계/신뢰구간 계산
+    keep = counts.ravel() >= max(min_count, 1)
+    stats = _cell_frame(counts.ravel()[keep], wins.ravel()[keep], psum.ravel()[keep], ci, 0, z)
+    p_idx, x_idx, y_idx = np.unravel_index(np.flatnonzero(keep), counts.shape)
+
+    labels = {f: interval_labels(e).astype(str) for f, e in edges.items()}
+    xs = np.array([a for a, _ in pairs], dtype=object)[p_idx]
+    ys = np.array([b for _, b in pairs], dtype=object)[p_idx]
+    out = pd.DataFrame({
+        'x': xs, 'y': ys,
+        'x_bin': [labels[f][i] for f, i in zip(xs, x_idx)],
+        'y_bin': [labels[f][i] for f, i in zip(ys, y_idx)],
+        **stats,
+    })
+    return out.sort_values('ci_low', ascending=False, ignore_index=True)
@@ -0,0 +1,189 @@
+"""
+거래 내역 부트스트랩 / 몬테카를로 엔진
+
+단일 수익 곡선 대신 거래 순서를 수천~수만 번 재표본 추출하여
+총수익 / MDD / 손익비(Profit Factor) / 샤프 / 승률의 분포를 구합니다.
+
+- method='iid'  : 거래 단위 복원 추출 (경로 = 거래 수만큼 뽑은 거래 수익률 열)
+- method='block': 거래일 단위 블록 복원 추출 (같은 날 거래는 함께 뽑음 → 같은 날 종목 간 상관 보존)
+                  일별 합계로 먼저 묶은 뒤 (경로 x 거래일) 배열로 계산
+- 경로 x 단계 2-D 배열 연산을 경로 묶음(chunk) 단위로 수행하여 메모리 사용량을 max_chunk_bytes 이하로 제한
+  (예: 거래 100만 건 x 1만 경로도 묶음 크기만 줄어들 뿐 메모리는 일정)
+
+수익률 누적 방식은 MinuteIndicatorAnalyzerWithFilter.get_metrics와 같은 단리(합산)가 기본이며,
+compound=True면 복리(곱)로 계산합니다. 수익률/MDD는 소수 단위 (0.05 = 5%)
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+METRIC_COLUMNS = ['total_return', 'mdd', 'profit_factor', 'sharpe', 'win_rate']
+
+
+def _day_blocks(returns: np.ndarray, days) -> dict:
+    """거래를 거래일별로 묶은 합계 (단계 = 거래일)"""
+    codes, _ = pd.factorize(pd.DatetimeIndex(days).normalize(), sort=True)
+    n_days = codes.max() + 1
+    return {
+        'ret': np.bincount(codes, weights=returns, minlength=n_days),
+        'gain': np.bincount(codes, weights=np.where(returns > 0, returns, 0.0), minlength=n_days),
+        'wins': np.bincount(codes, weights=(returns > 0).astype(np.float64), minlength=n_days),
+        'count': np.bincount(codes, minlength=n_days).astype(np.float64),
+    }
+
+
+def _path_metrics(steps: np.ndarray, gains: np.ndarray, wins: np.ndarray, counts: np.ndarray,
+                  compound: bool, annualize) -> dict:
+    """
+    (경로 x 단계) 수익률 배열 → 경로별 지표
+    :param gains: 경로별 이익 합 / wins: 경로별 이익 거래 수 / counts: 경로별 거래 수
+    수익 곡선/고점은 steps와 같은 크기의 버퍼 2개에 out=으로 기록 (그 외 (경로 x 단계) 임시 배열 없음)
+    """
+    n = steps.shape[1]
+    total = steps.sum(axis=1)
+    mean = total / n
+    sumsq = np.einsum('ij,ij->i', steps, steps)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(np.maximum(sumsq - total * mean, 0.0) / (n - 1)) if n > 1 else np.full(len(steps), np.nan)
+
+    # 수익 곡선과 MDD (시작점 0 / 1 포함)
+    equity = np.empty_like(steps)
+    peak = np.empty_like(steps)
+    if compound:
+        np.add(steps, 1.0, out=equity)
+        np.cumprod(equity, axis=1, out=equity)
+        np.maximum.accumulate(equity, axis=1, out=peak)
+        np.maximum(peak, 1.0, out=peak)
+        np.divide(equity, peak, out=peak)
+        mdd = 1.0 - peak.min(axis=1)
+        total_return = equity[:, -1] - 1.0
+    else:
+        np.cumsum(steps, axis=1, out=equity)
+        np.maximum.accumulate(equity, axis=1, out=peak)
+        np.maximum(peak, 0.0, out=peak)
+        np.subtract(peak, equity, out=peak)
+        mdd = peak.max(axis=1)
+        total_return = total
+    del equity, peak
+
+    losses = gains - total  # 손실 합 (양수)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_factor = np.where(losses > 0, gains / losses, np.inf)
+        sharpe = mean / std * np.sqrt(annualize or 1.0)
+
+    return {
+        'total_return': total_return,
+        'mdd': mdd,
+        'profit_factor': profit_factor,
+        'sharpe': sharpe,
+        'win_rate': wins / counts,
+    }
+
+
+def bootstrap_metrics(returns, n_paths=10_000, method='iid', days=None, compound=False, annualize=None,
+                      seed=None, max_chunk_bytes=256 * 1024 ** 2, n_jobs=None) -> pd.DataFrame:
+    """
+    거래 수익률을 재표본 추출하여 경로별 성과 지표 분포를 반환합니다.
+
+    :param returns: 거래별 수익률 (소수 단위, 비용 차감 후)
+    :param n_paths: 경로 수
+    :param method: 'iid' (거래 단위) 또는 'block' (거래일 단위, days 필요)
+    :param days: 거래별 진입 일시 (method='block'일 때 블록 기준)
+    :param compound: True면 복리, False면 단리(합산) 수익 곡선
+    :param annualize: 샤프 연율화 계수 (예: block에서 252). None이면 단계(거래/거래일)당 샤프
+    :param seed: 난수 시드
+    :param max_chunk_bytes: 동시에 처리 중인 (경로 x 단계) 배열 전체의 메모리 상한
+                            (상한 안에 경로가 n_jobs개까지 들어가지 않으면 스레드 수를 줄이고, 1개도 안 들어가면 ValueError)
+    :param n_jobs: 묶음 병렬 스레드 수 (기본: CPU 코어 수)
+    :return: DataFrame [total_return, mdd, profit_factor, sharpe, win_rate] (경로당 1행)
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    valid = ~np.isnan(returns)
+    returns = returns[valid]
+    days = np.asarray(days)[valid] if days is not None else None
+    if len(returns) == 0:
+        return pd.DataFrame(columns=METRIC_COLUMNS)
+
+    if method == 'iid':
+        ret = gain = wins = count = returns
+    elif method == 'block':
+        if days is None:
+            raise ValueError("method='block'은 거래별 days(진입 일시)가 필요합니다.")
+        blocks = _day_blocks(returns, days)
+        ret, gain, wins, count = blocks['ret'], blocks['gain'], blocks['wins'], blocks['count']
+    else:
+        raise ValueError("method는 'iid' 또는 'block'이어야 합니다.")
+
+    n_steps = len(ret)
+    n_jobs = max(1, n_jobs or os.cpu_count() or 1)
+    index_dtype = np.int32 if n_steps < 2 ** 31 else np.int64
+    # 경로 묶음 크기: 경로 1개당 동시에 존재하는 (경로 x 단계) 배열 전체 기준으로 산정 (스레드 수로 분배)
+    # 추출 단계: 인덱스 + 수익률 + 이익/횟수 gather 버퍼 + 이익 여부(bool) / 지표 단계: 수익률 + 수익 곡선 + 고점
+    bytes_per_path = n_steps * (np.dtype(index_dtype).itemsize + 3 * 8 + 1)
+    if bytes_per_path > max_chunk_bytes:
+        raise ValueError(f"경로 1개에 {bytes_per_path:,} bytes가 필요해 max_chunk_bytes({max_chunk_bytes:,})를 넘습니다. "
+                         f"max_chunk_bytes를 늘리거나 method='block'으로 단계 수를 줄이세요.")
+    # 스레드마다 경로 1개 이상이 상한 안에 들어가도록 스레드 수를 먼저 줄임
+    n_jobs = min(n_jobs, max_chunk_bytes // bytes_per_path)
+    chunk = int(max(1, min(n_paths, max_chunk_bytes // n_jobs // bytes_per_path)))
+    starts = list(range(0, n_paths, chunk))
+    # 묶음별 독립 난수열 (스레드 수와 무관하게 seed가 같으면 같은 결과)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    out = {name: np.empty(n_paths) for name in METRIC_COLUMNS}
+
+    def _run_chunk(i):
+        start = starts[i]
+        stop = min(start + chunk, n_paths)
+        idx = np.random.default_rng(seeds[i]).integers(0, n_steps, size=(stop - start, n_steps), dtype=index_dtype)
+        steps = ret[idx]
+        buf = np.empty_like(steps)
+        if method == 'iid':
+            # 거래 단위: 이익 합/이익 거래 수는 추출된 수익률에서 바로 계산 (추가 gather 생략)
+            path_gain = np.maximum(steps, 0.0, out=buf).sum(axis=1)
+            path_wins = np.count_nonzero(steps > 0, axis=1).astype(np.float64)
+            path_count = np.full(len(steps), float(n_steps))
+        else:
+            # 블록 단위: 이익/이익 수/거래 수를 같은 버퍼에 차례로 gather
+            path_gain = np.take(gain, idx, out=buf).sum(axis=1)
+            path_wins = np.take(wins, idx, out=buf).sum(axis=1)
+            path_count = np.take(count, idx, out=buf).sum(axis=1)
+        del idx, buf
+        metrics = _path_metrics(steps, path_gain, path_wins, path_count, compound, annualize)
+        for name in METRIC_COLUMNS:
+            out[name][start:stop] = metrics[name]
+
+    # NumPy 연산은 GIL을 해제하므로 스레드로 묶음을 병렬 처리 (결과는 경로 위치별로 기록)
+    if n_jobs == 1 or len(starts) == 1:
+        for i in range(len(starts)):
+            _run_chunk(i)
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            list(pool.map(_run_chunk, range(len(starts))))
+
+    return pd.DataFrame(out)
+
+
+def observed_metrics(returns, days=None, compound=False, annualize=None) -> dict:
+    """재표본 추출 없이 원래 순서 그대로의 지표 (분포와 비교용)"""
+    returns = np.asarray(returns, dtype=np.float64)
+    if days is not None:
+        valid = ~np.isnan(returns)
+        blocks = _day_blocks(returns[valid], np.asarray(days)[valid])
+        ret, gain, wins, count = blocks['ret'], blocks['gain'], blocks['wins'], blocks['count']
+    else:
+        ret = returns[~np.isnan(returns)]
+        gain, wins, count = np.where(ret > 0, ret, 0.0), (ret > 0).astype(np.float64), np.ones(len(ret))
+    if len(ret) == 0:
+        return {}
+    metrics = _path_metrics(ret[None, :], gain.sum(keepdims=True), wins.sum(keepdims=True),
+                            count.sum(keepdims=True), compound, annualize)
+    return {name: float(value[0]) for name, value in metrics.items()}
+
+
+def summarize_distribution(dist: pd.DataFrame, percentiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.DataFrame:
+    """경로별 지표 분포 → 지표별 평균 / 분위수 표 (inf 손익비는 분위수 계산에서 그대로 상한으로 취급)"""
+    table = dist.quantile(list(percentiles)).T
+    table.columns = [f"p{int(round(p * 100))}" for p in percentiles]
+    table.insert(0, 'mean', dist.replace([np.inf, -np.inf], np.nan).mean())
+    return table
@@ -0,0 +1,218 @@
+"""
+장중 변동성 돌파 전용 이벤트 기반 시뮬레이터 (numba)
+
+vbt.Portfolio.from_signals(sl_stop, sl_trail, tp_stop) 경로를 대체하는 컴파일된 단일 루프입니다.
+체결 규칙 (VolatilityBacktester의 VBT 설정과 동일하게 맞춤):
+- 진입: 세션별 첫 돌파 봉에서 max(시가, 목표가) * (1 + slippage), 가용 현금 전액 (수수료 포함)
+- 손절/익절 기준가: 진입 봉 종가 (vbt 기본값 stop_entry_price='close'), stop_anchor='fill'이면 실제 체결가
+- 손절/익절 판정: 진입 다음 봉부터. 시가가 이미 손절가 이하(익절가 이상)면 시가, 아니면 봉 범위 안에서 손절가(익절가)에
+  슬리피지 없이 체결. 한 봉에서 둘 다 가능하면 손절 우선
+- 트레일링 손절: 판정 후 해당 봉 고가로 기준가 갱신
+- 강제 청산: 지정 분(exit_minute) 또는 세션 마지막 봉 종가 * (1 - slippage)
+- 청산 봉과 겹친 진입 신호는 무시 (vbt 진입/청산 충돌 'ignore' 규칙과 동일)
+결과는 vbt 거래 레코드와 같은 필드의 구조화 배열 (+ exit_reason)
+"""
+import numpy as np
+import pandas as pd
+from numba import njit
+
+from Indicators.session import session_offsets, first_true_mask, last_in_segment_mask
+
+# vbt pf.trades.records와 동일한 필드 + 청산 사유
+TRADE_DTYPE = np.dtype([
+    ('id', np.int64),
+    ('col', np.int64),
+    ('size', np.float64),
+    ('entry_idx', np.int64),
+    ('entry_price', np.float64),
+    ('entry_fees', np.float64),
+    ('exit_idx', np.int64),
+    ('exit_price', np.float64),
+    ('exit_fees', np.float64),
+    ('pnl', np.float64),
+    ('return', np.float64),
+    ('direction', np.int64),
+    ('status', np.int64),
+    ('parent_id', np.int64),
+    ('exit_reason', np.int64),
+])
+
+# exit_reason 코드
+EXIT_OPEN = -1     # 데이터 끝까지 보유 중 (미청산)
+EXIT_SIGNAL = 0    # 강제 청산 시각 / 세션 마지막 봉
+EXIT_STOP = 1      # 손절 (트레일링 포함)
+EXIT_TARGET = 2    # 익절
+
+
+@njit(cache=True)
+def _breakout_kernel(open_, high, low, close, entries, entry_price, exits,
+                     fees, slippage, sl_stop, sl_trail, tp_stop, anchor_fill, init_cash, out):
+    n = len(close)
+    cash = init_cash
+    size = 0.0
+    sl_price = np.nan
+    tp_base = np.nan
+    e_idx = -1
+    e_price = 0.0
+    e_fees = 0.0
+    k = 0
+
+    for i in range(n):
+        if size > 0:
+            # 1. 손절/익절 판정 (진입 다음 봉부터)
+            exit_px = np.nan
+            reason = EXIT_SIGNAL
+            if not np.isnan(sl_stop):
+                stop_px = sl_price * (1 - sl_stop)
+                if open_[i] <= stop_px:
+                    exit_px = open_[i]
+                    reason = EXIT_STOP
+                elif low[i] <= stop_px <= high[i]:
+                    exit_px = stop_px
+                    reason = EXIT_STOP
+            if np.isnan(exit_px) and not np.isnan(tp_stop):
+                target_px = tp_base * (1 + tp_stop)
+                if target_px <= open_[i]:
+                    exit_px = open_[i]
+                    reason = EXIT_TARGET
+                elif low[i] <= target_px <= high[i]:
+                    exit_px = target_px
+                    reason = EXIT_TARGET
+            if sl_trail and not np.isnan(sl_stop) and high[i] > sl_price:
+                sl_price = high[i]
+
+            # 2. 손절/익절이 없으면 강제 청산 신호 (종가 - 슬리피지)
+            if np.isnan(exit_px) and exits[i]:
+                exit_px = close[i] * (1 - slippage)
+                reason = EXIT_SIGNAL
+
+            if not np.isnan(exit_px):
+                proceeds = size * exit_px
+                x_fees = proceeds * fees
+                cash += proceeds - x_fees
+                pnl = proceeds - size * e_price - e_fees - x_fees
+                rec = out[k]
+                rec['id'] = k
+                rec['col'] = 0
+                rec['size'] = size
+                rec['entry_idx'] = e_idx
+                rec['entry_price'] = e_price
+                rec['entry_fees'] = e_fees
+                rec['exit_idx'] = i
+                rec['exit_price'] = exit_px
+                rec['exit_fees'] = x_fees
+                rec['pnl'] = pnl
+                rec['return'] = pnl / (size * e_price)
+                rec['direction'] = 0
+                rec['status'] = 1
+                rec['parent_id'] = k
+                rec['exit_reason'] = reason
+                k += 1
+                size = 0.0
+
+        elif entries[i] and not exits[i] and cash > 0:
+            # 3. 진입: 가용 현금 전액 (수수료 포함)
+            px = entry_price[i] * (1 + slippage)
+            max_cash = cash / (1 + fees)
+            size = max_cash / px
+            e_fees = cash - max_cash
+            e_price = px
+            e_idx = i
+            cash = 0.0
+            base = px if anchor_fill else close[i]
+            sl_price = base
+            tp_base = base
+
+    # 4. 미청산 포지션 (데이터 끝): 마지막 종가로 평가
+    if size > 0:
+        pnl = size * (close[n - 1] - e_price) - e_fees
+        rec = out[k]
+        rec['id'] = k
+        rec['col'] = 0
+        rec['size'] = size
+        rec['entry_idx'] = e_idx
+        rec['entry_price'] = e_price
+        rec['entry_fees'] = e_fees
+        rec['exit_idx'] = n - 1
+        rec['exit_price'] = close[n - 1]
+        rec['exit_fees'] = 0.0
+        rec['pnl'] = pnl
+        rec['return'] = pnl / (size * e_price)
+        rec['direction'] = 0
+        rec['status'] = 0
+        rec['parent_id'] = k
+        rec['exit_reason'] = EXIT_OPEN
+        k += 1
+    return k
+
+
+def breakout_signals(open_, high, target_price, can_enter, offsets, minute_of_day, exit_minute=15 * 60 + 19):
+    """
+    변동성 돌파 진입/청산 신호
+    :param can_enter: 일봉 필터 등 돌파 외 진입 조건 (bool 배열)
+    :param minute_of_day: 봉의 장중 분 (hour * 60 + minute)
+    :return: (entries, entry_price, exits)
+    """
+    open_ = np.asarray(open_, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    target_price = np.asarray(target_price, dtype=np.float64)
+
+    condition = np.asarray(can_enter, dtype=np.bool_) & (high >= target_price)
+    entries = first_true_mask(condition, offsets)
+    entry_price = np.maximum(open_, target_price)
+    exits = (np.asarray(minute_of_day) == exit_minute) | last_in_segment_mask(offsets)
+    return entries, entry_price, exits
+
+
+def simulate_trades(open_, high, low, close, entries, entry_price, exits, fees=0.0, slippage=0.0,
+                    sl_stop=np.nan, sl_trail=False, tp_stop=np.nan, stop_anchor='close', init_cash=100.0):
+    """
+    신호 배열로 시뮬레이션하여 거래 레코드 구조화 배열(TRADE_DTYPE)을 반환합니다.
+
+    :param fees: 편도 비율 수수료 (매도세는 fees에 합산해 전달, 예: fees + tax / 2)
+    :param sl_stop: 손절 비율 (NaN이면 미사용)
+    :param tp_stop: 익절 비율 (NaN이면 미사용)
+    :param stop_anchor: 'close' = 진입 봉 종가 기준 (vbt 기본), 'fill' = 실제 체결가 기준
+    """
+    if stop_anchor not in ('close', 'fill'):
+        raise ValueError("stop_anchor는 'close' 또는 'fill'이어야 합니다.")
+
+    entries = np.asarray(entries, dtype=np.bool_)
+    out = np.empty(int(entries.sum()), dtype=TRADE_DTYPE)
+    k = _breakout_kernel(
+        np.asarray(open_, dtype=np.float64), np.asarray(high, dtype=np.float64),
+        np.asarray(low, dtype=np.float64), np.asarray(close, dtype=np.float64),
+        entries, np.asarray(entry_price, dtype=np.float64), np.asarray(exits, dtype=np.bool_),
+        float(fees), float(slippage),
+        np.nan if sl_stop is None else float(sl_stop), bool(sl_trail),
+        np.nan if tp_stop is None else float(tp_stop),
+        stop_anchor == 'fill', float(init_cash), out,
+    )
+    return out[:k]
+
+
+def trades_to_frame(records: np.ndarray, index: pd.DatetimeIndex) -> pd.DataFrame:
+    """거래 레코드 → DataFrame (entry_date / exit_date 포함, trades_{ticker}.parquet 형식과 동일)"""
+    trades_df = pd.DataFrame(records)
+    trades_df['entry_date'] = index[trades_df['entry_idx'].to_numpy()]
+    trades_df['exit_date'] = index[trades_df['exit_idx'].to_numpy()]
+    return trades_df
+
+
+def simulate_breakout(m_df: pd.DataFrame, target_price, can_enter, exit_minute=15 * 60 + 19,
+                      offsets=None, **kwargs) -> pd.DataFrame:
+    """
+    datetime 인덱스 분봉에 대해 변동성 돌파를 시뮬레이션하고 거래 DataFrame을 반환합니다.
+    kwargs는 simulate_trades로 전달됩니다. (fees, slippage, sl_stop, sl_trail, tp_stop, stop_anchor, init_cash)
+    """
+    if offsets is None:
+        offsets = session_offsets(m_df.index)
+    minute_of_day = m_df.index.hour * 60 + m_df.index.minute
+
+    entries, entry_price, exits = breakout_signals(
+        m_df['open'].to_numpy(), m_df['high'].to_numpy(), target_price, can_enter,
+        offsets, minute_of_day, exit_minute=exit_minute)
+    records = simulate_trades(
+        m_df['open'].to_numpy(), m_df['high'].to_numpy(), m_df['low'].to_numpy(), m_df['close'].to_numpy(),
+        entries, entry_price, exits, **kwargs)
+    return trades_to_frame(records, m_df.index)
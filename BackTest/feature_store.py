@@ -0,0 +1,335 @@
+"""
+거래별 진입 시점 피처 저장소 (materialized feature store)
+
+백테스트 run마다 전 종목 거래에 진입 시점 기준 일봉/분봉 피처와 결과(수익/승패)를 붙인
+넓은 컬럼형 테이블을 한 번 만들어 두고, 탐색 분석(구간 승률, 히트맵, 필터 탐색)은
+종목별 지표 재계산/재결합 없이 이 테이블의 컬럼 스캔으로 처리합니다.
+
+    data/backtest/volatility/feature_store/version=2/run_id=20260101_120000_3fa2c1/part-....parquet
+
+- 미래 참조 방지: 일봉 피처는 진입일보다 엄격히 이전 일봉(전일 확정값), 분봉 피처는 진입 봉 직전 분봉 기준
+- 증분 추가: (run_id, ticker, entry_date, exit_date)가 이미 있는 거래는 건너뛰고 새 거래만 추가
+- 피처 재사용: 같은 버전에서 이미 계산된 (ticker, entry_date, chart_digest)의 피처는 이전 run에서 복사 (차트 재로드 없음)
+  chart_digest는 종목 분봉/일봉 파일 내용 해시(BackTest/result_cache.py)라 차트가 수정/재수집된 종목은 다시 계산
+- 버전: 피처 정의를 바꾸면 FEATURE_VERSION을 올림 → 새 version 파티션에 전체 재생성 (이전 버전은 그대로 유지)
+"""
+import os
+import sys
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import talib
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.trade_store import TradeStore
+from BackTest.result_cache import ResultCache
+from Indicators.factory import IndicatorFactory
+from Indicators.window_sweep import rolling_sweep
+from Indicators.session import session_offsets, session_vwap, segmented_cumsum, segmented_cummax, \
+    segmented_cummin, segmented_cumcount, broadcast_segments, segment_first
+from Indicators.trade_join import join_trade_features
+from Util.profiler import PROFILER
+
+# 피처 정의 버전 (아래 피처 수식/컬럼을 바꾸면 올릴 것)
+# 2: 피처 재사용 키용 chart_digest 컬럼 추가
+FEATURE_VERSION = 2
+
+# 일봉 피처: IndicatorFactory 전 그룹 + 이동평균 기울기/이격도 + 노이즈/등락률 (접두어 d_)
+DAILY_GROUPS = IndicatorFactory.ALL_GROUPS + ('custom',)
+SWEEP_WINDOWS = [5, 10, 20, 60]
+DAILY_FEATURES = (
+    ['d_' + c for g in DAILY_GROUPS for c in IndicatorFactory.GROUP_COLUMNS[g]]
+    + [f'd_{s}{w}' for s in ('slope', 'disp') for w in SWEEP_WINDOWS]
+    + ['d_noise5', 'd_ret_1d', 'd_range_pct', 'd_value_ma5']
+)
+
+# 분봉 피처 (진입 봉 직전 분봉 기준, 접두어 m_)
+MINUTE_FEATURES = ['m_vol_spike', 'm_mom_10', 'm_dist_high', 'm_rsi', 'm_ret_open', 'm_vwap_dist',
+                   'm_day_pos', 'm_cum_value', 'm_bars_from_open']
+
+# 거래 결과/메타 컬럼
+OUTCOME_COLUMNS = ['return', 'pnl', 'is_win', 'exit_reason', 'hold_minutes', 'entry_weekday', 'entry_minute']
+
+KEY_COLUMNS = ['ticker', 'entry_date', 'exit_date']
+FEATURE_COLUMNS = DAILY_FEATURES + MINUTE_FEATURES
+
+PARTITIONING = ds.partitioning(pa.schema([('version', pa.int32()), ('run_id', pa.string())]), flavor='hive')
+
+FEATURE_SCHEMA = pa.schema(
+    [('ticker', pa.string()), ('entry_date', pa.timestamp('ns')), ('exit_date', pa.timestamp('ns')),
+     ('chart_digest', pa.string())]
+    + [('return', pa.float64()), ('pnl', pa.float64()), ('is_win', pa.bool_()), ('exit_reason', pa.float64()),
+       ('hold_minutes', pa.float64()), ('entry_weekday', pa.int32()), ('entry_minute', pa.int32())]
+    + [(c, pa.float64()) for c in FEATURE_COLUMNS]
+)
+
+
+# ---------------------------------------------------------------
+# 1. 피처 계산 (종목 단위)
+# ---------------------------------------------------------------
+
+def daily_feature_frame(d_df: pd.DataFrame) -> pd.DataFrame:
+    """일봉 → 일봉 피처 DataFrame (같은 날짜 인덱스, 해당 일봉 마감 기준 값)"""
+    block = IndicatorFactory.compute_block(d_df, groups=DAILY_GROUPS)
+    sweep = rolling_sweep(d_df['close'].astype(np.float64), windows=SWEEP_WINDOWS, stats=('slope', 'disp'))
+
+    o, h, l, c = (d_df[col].to_numpy(dtype=np.float64) for col in ['open', 'high', 'low', 'close'])
+    v = d_df['volume'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        extra = pd.DataFrame({
+            'noise5': pd.Series(1 - np.abs(c - o) / (h - l + 1e-9)).rolling(5).mean().to_numpy(),
+            'ret_1d': (c / IndicatorFactory._shift(c) - 1) * 100,
+            'range_pct': (h - l) / IndicatorFactory._shift(c) * 100,
+            'value_ma5': talib.SMA(c * v, timeperiod=5),
+        }, index=d_df.index)
+
+    out = pd.concat([block, sweep, extra], axis=1)
+    out.columns = ['d_' + c for c in out.columns]
+    return out[DAILY_FEATURES]
+
+
+def minute_feature_frame(m_df: pd.DataFrame, offsets: np.ndarray = None) -> pd.DataFrame:
+    """분봉 → 분봉 피처 DataFrame (같은 시각 인덱스, 해당 분봉 마감 기준 값)"""
+    if offsets is None:
+        offsets = session_offsets(m_df.index)
+    h, l, c = (m_df[col].to_numpy(dtype=np.float64) for col in ['high', 'low', 'close'])
+    o = m_df['open'].to_numpy(dtype=np.float64)
+    v = m_df['volume'].to_numpy(dtype=np.float64)
+
+    vol = pd.Series(v)
+    day_high = segmented_cummax(h, offsets)
+    day_low = segmented_cummin(l, offsets)
+    day_open = broadcast_segments(segment_first(o, offsets), offsets)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = pd.DataFrame({
+            'm_vol_spike': (vol.rolling(5).mean() / (vol.rolling(60).mean() + 1e-9)).to_numpy(),
+            'm_mom_10': talib.ROC(c, timeperiod=10),
+            'm_dist_high': (c / talib.MAX(h, timeperiod=60) - 1) * 100,
+            'm_rsi': talib.RSI(c, timeperiod=14),
+            'm_ret_open': (c / day_open - 1) * 100,
+            'm_vwap_dist': (c / session_vwap(h, l, c, v, offsets) - 1) * 100,
+            'm_day_pos': (c - day_low) / (day_high - day_low),
+            'm_cum_value': segmented_cumsum(c * v, offsets),
+            'm_bars_from_open': segmented_cumcount(offsets).astype(np.float64),
+        }, index=m_df.index)
+    return out
+
+
+def trade_outcomes(trades_df: pd.DataFrame) -> pd.DataFrame:
+    """거래 결과/메타 컬럼 (수익률, 승패, 청산 사유, 보유 시간, 진입 요일/분)"""
+    entry = pd.DatetimeIndex(trades_df['entry_date'])
+    exit_ = pd.DatetimeIndex(trades_df['exit_date'])
+    ret = trades_df['return'].astype(np.float64) if 'return' in trades_df else pd.Series(np.nan, index=trades_df.index)
+    return pd.DataFrame({
+        'return': ret.to_numpy(),
+        'pnl': trades_df['pnl'].astype(np.float64).to_numpy() if 'pnl' in trades_df else np.nan,
+        'is_win': (ret > 0).to_numpy(),
+        'exit_reason': trades_df['exit_reason'].astype(np.float64).to_numpy() if 'exit_reason' in trades_df else np.nan,
+        'hold_minutes': ((exit_ - entry) / pd.Timedelta(minutes=1)).to_numpy(dtype=np.float64),
+        'entry_weekday': entry.weekday.to_numpy(dtype=np.int32),
+        'entry_minute': (entry.hour * 60 + entry.minute).to_numpy(dtype=np.int32),
+    }, index=trades_df.index)
+
+
+# ---------------------------------------------------------------
+# 2. 저장소
+# ---------------------------------------------------------------
+
+class FeatureStore:
+    def __init__(self, root=None, trade_store: TradeStore = None, backtester=None, version=FEATURE_VERSION,
+                 flush_rows=200_000, result_cache: ResultCache = None):
+        """
+        :param root: 저장 경로 (기본: data/backtest/volatility/feature_store)
+        :param trade_store: 거래 원본 저장소 (기본: TradeStore())
+        :param backtester: 차트 로드용 백테스터 (_load_data(ticker) → (d_df, m_df), 기본: VolatilityBacktester())
+        :param version: 피처 버전 파티션
+        :param flush_rows: 이 행 수마다 파일 1개로 기록
+        :param result_cache: 차트 파일 해시 재사용용 결과 캐시 (기본: 새 ResultCache, 해시 기록은 저장하지 않음)
+        """
+        self.root = root or os.path.join('data', 'backtest', 'volatility', 'feature_store')
+        self.trade_store = trade_store or TradeStore()
+        self._backtester = backtester
+        self.result_cache = result_cache
+        self.version = version
+        self.flush_rows = flush_rows
+
+    @property
+    def backtester(self):
+        if self._backtester is None:
+            from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+            self._backtester = VolatilityBacktester()
+        return self._backtester
+
+    def chart_digest(self, ticker) -> str:
+        """종목 분봉/일봉 파일 내용 해시 (피처 재사용 키, 파일이 없으면 'missing' 조합)"""
+        if self.result_cache is None:
+            self.result_cache = ResultCache()
+        paths = [os.path.join(self.backtester.minute_path, f"{ticker}.parquet"),
+                 os.path.join(self.backtester.daily_path, f"{ticker}.parquet")]
+        return '|'.join(self.result_cache.file_digest(p) for p in paths)
+
+    def dataset(self) -> ds.Dataset:
+        schema = FEATURE_SCHEMA.append(pa.field('version', pa.int32())).append(pa.field('run_id', pa.string()))
+        return ds.dataset(self.root, format='parquet', partitioning=PARTITIONING, schema=schema)
+
+    def _has_data(self) -> bool:
+        return os.path.isdir(os.path.join(self.root, f"version={self.version}"))
+
+    # ---------------------------------------------------------------
+    # 2-1. 생성
+    # ---------------------------------------------------------------
+
+    def compute_features(self, ticker, trades_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        한 종목 거래에 진입 시점 일봉/분봉 피처를 결합합니다.
+        :return: trades_df 인덱스와 같은 피처 DataFrame (차트가 없으면 전부 NaN)
+        """
+        out = pd.DataFrame(np.nan, index=trades_df.index, columns=FEATURE_COLUMNS)
+        d_df, m_df = self.backtester._load_data(ticker)
+        if d_df is None or m_df is None:
+            return out
+
+        m_df = m_df[~m_df.index.duplicated(keep='first')].sort_index()
+        # 일봉: 진입일보다 엄격히 이전인 마지막 일봉 (전일 확정값)
+        daily = join_trade_features(trades_df[['entry_date']], daily_feature_frame(d_df.sort_index()),
+                                    lag=1, by_day=True)
+        # 분봉: 진입 봉 직전 분봉 (진입 봉은 진입 시점에 아직 완성되지 않음)
+        minute = join_trade_features(trades_df[['entry_date']], minute_feature_frame(m_df), lag=1)
+
+        out[DAILY_FEATURES] = daily[DAILY_FEATURES].to_numpy()
+        out[MINUTE_FEATURES] = minute[MINUTE_FEATURES].to_numpy()
+        return out
+
+    def _existing(self, run_id) -> pd.DataFrame:
+        """이미 저장된 이 run의 거래 키"""
+        if not self._has_data():
+            return pd.DataFrame(columns=KEY_COLUMNS)
+        expr = (ds.field('version') == self.version) & (ds.field('run_id') == run_id)
+        return self.dataset().to_table(columns=KEY_COLUMNS, filter=expr).to_pandas()
+
+    def _known_features(self, digests: dict) -> pd.DataFrame:
+        """
+        같은 버전의 다른 run에서 이미 계산된 (ticker, entry_date) 피처
+        :param digests: {ticker: 현재 차트 해시} - 해시가 다른(차트가 바뀐) 종목의 피처는 제외
+        """
+        if not self._has_data():
+            return pd.DataFrame(columns=['ticker', 'entry_date'] + FEATURE_COLUMNS)
+        expr = (ds.field('version') == self.version) & ds.field('ticker').isin(list(digests))
+        columns = ['ticker', 'entry_date', 'chart_digest'] + FEATURE_COLUMNS
+        known = self.dataset().to_table(columns=columns, filter=expr).to_pandas()
+        known = known[known['chart_digest'].to_numpy() == known['ticker'].map(digests).to_numpy()]
+        return known.drop(columns='chart_digest').drop_duplicates(['ticker', 'entry_date'], keep='last')
+
+    def materialize(self, run_id=None, tickers=None) -> int:
+        """
+        run의 거래 중 아직 저장되지 않은 거래에 피처를 붙여 추가합니다.
+        :param run_id: 거래 저장소 run (기본: 가장 최근 run)
+        :param tickers: 대상 종목 (기본: run 전체)
+        :return: 추가된 거래 수
+        """
+        run_id = run_id or self.trade_store.latest_run()
+        if run_id is None:
+            print("[!] 저장된 거래 내역이 없습니다.")
+            return 0
+
+        with PROFILER.stage('feature_scan'):
+            trades = self.trade_store.scan(run_id=run_id, tickers=tickers)
+            if trades.empty:
+                return 0
+            trades = trades.drop(columns=['run_id', 'month'], errors='ignore')
+            existing = self._existing(run_id)
+            if not existing.empty:
+                seen = trades.merge(existing.assign(_seen=True), on=KEY_COLUMNS, how='left')['_seen'].notna()
+                trades = trades[~seen.to_numpy()]
+            trades = trades.reset_index(drop=True)
+            if trades.empty:
+                print(f"[*] 피처 저장소: run_id={run_id} 신규 거래 없음")
+                return 0
+
+            # 같은 버전 + 같은 차트 데이터에서 이미 계산된 진입 시점 피처 재사용
+            digests = {ticker: self.chart_digest(ticker) for ticker in trades['ticker'].unique()}
+            trades['chart_digest'] = trades['ticker'].map(digests)
+            known = self._known_features(digests)
+            features = trades[['ticker', 'entry_date']].merge(known, on=['ticker', 'entry_date'], how='left')
+            todo = features[FEATURE_COLUMNS].isna().all(axis=1).to_numpy()
+
+        reused = len(trades) - int(todo.sum())
+        for ticker, idx in trades[todo].groupby('ticker', sort=False).groups.items():
+            with PROFILER.stage('feature_compute', ticker):
+                try:
+                    computed = self.compute_features(ticker, trades.loc[idx])
+                    features.loc[idx, FEATURE_COLUMNS] = computed.to_numpy()
+                except Exception as e:
+                    print(f"[!] {ticker} 피처 계산 실패: {e}")
+
+        with PROFILER.stage('feature_write'):
+            table = pd.concat([trades[KEY_COLUMNS + ['chart_digest']], trade_outcomes(trades),
+                               features[FEATURE_COLUMNS]], axis=1)
+            for start in range(0, len(table), self.flush_rows):
+                self._write(table.iloc[start:start + self.flush_rows], run_id)
+
+        print(f"[✔] 피처 저장소: run_id={run_id} 거래 {len(trades):,}건 추가 "
+              f"(피처 재사용 {reused:,}건, 피처 {len(FEATURE_COLUMNS)}개, version={self.version})")
+        return len(trades)
+
+    def _write(self, df: pd.DataFrame, run_id):
+        df = df.reset_index(drop=True)
+        for col in ('entry_date', 'exit_date'):
+            df[col] = pd.to_datetime(df[col])
+            if df[col].dt.tz is not None:
+                df[col] = df[col].dt.tz_localize(None)
+        df['ticker'] = df['ticker'].astype(str)
+        table = pa.Table.from_pandas(df, schema=FEATURE_SCHEMA, preserve_index=False)
+        table = table.append_column('version', pa.array([self.version] * len(df), type=pa.int32()))
+        table = table.append_column('run_id', pa.array([run_id] * len(df), type=pa.string()))
+        ds.write_dataset(
+            table, self.root, format='parquet', partitioning=PARTITIONING,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+        )
+
+    # ---------------------------------------------------------------
+    # 2-2. 조회
+    # ---------------------------------------------------------------
+
+    def runs(self) -> list:
+        """이 버전에 피처가 저장된 run id 목록 (거래 저장소 run 기록 시각 기준 오래된 순)"""
+        path = os.path.join(self.root, f"version={self.version}")
+        if not os.path.isdir(path):
+            return []
+        run_ids = [d.split('=', 1)[1] for d in os.listdir(path) if d.startswith('run_id=')]
+        # 거래 저장소와 같은 run 순서 (최초 기록 시각, 이관 run은 가장 오래됨)
+        return self.trade_store.manifest.order(run_ids, path)
+
+    def scan(self, columns=None, run_id=None, tickers=None, filter=None) -> pd.DataFrame:
+        """
+        피처 테이블을 컬럼 스캔으로 읽습니다.
+
+        :param columns: 읽을 컬럼 (None이면 전체)
+        :param run_id: 조회할 run (기본: 이 버전의 가장 최근 run)
+        :param tickers: 종목 코드 리스트
+        :param filter: 추가 pyarrow 조건식 (예: ds.field('d_rsi') > 50)
+        :return: 거래별 피처 DataFrame (없으면 빈 DataFrame)
+        """
+        runs = self.runs()
+        run_id = run_id or (runs[-1] if runs else None)
+        if run_id is None:
+            print("[!] 저장된 피처가 없습니다. materialize()를 먼저 실행하세요.")
+            return pd.DataFrame()
+
+        expr = (ds.field('version') == self.version) & (ds.field('run_id') == run_id)
+        if tickers is not None:
+            expr = expr & ds.field('ticker').isin([str(t) for t in tickers])
+        if filter is not None:
+            expr = expr & filter
+        return self.dataset().to_table(columns=columns, filter=expr).to_pandas()
+
+
+if __name__ == "__main__":
+    # 가장 최근 백테스트 run의 거래 피처 생성
+    FeatureStore().materialize()
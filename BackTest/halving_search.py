@@ -0,0 +1,213 @@
+"""
+변동성 돌파 파라미터 연속 반감(successive halving) 탐색
+
+전체 그리드는 모든 조합을 전 종목 x 전 기간에 평가하지만, 명백히 나쁜 조합은 소수 종목만 보고도 걸러낼 수 있습니다.
+- 종목을 섞은 뒤 단계(rung)마다 평가 종목 수를 eta배씩 늘리며 (min_tickers → min_tickers*eta → ... → 전체)
+- 각 단계에서 생존 조합의 누적 성과로 순위를 매겨 상위 1/eta를 남기되,
+  평균 수익률 신뢰구간이 상위 top_n 경계와 겹치는 조합(아직 통계적으로 지고 있다고 보기 어려운 조합)은 함께 남기고
+- 마지막 단계(전 종목)는 생존 조합만 평가합니다.
+평가는 증분식입니다: 다음 단계에서는 새로 추가된 종목만 생존 조합으로 평가하고 누적 통계에 더합니다.
+종목별 평가는 MultiStrategyEngine으로 생존 조합 전체를 데이터 1회 로드로 처리합니다.
+"""
+import os
+import sys
+import math
+import time
+import itertools
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.multi_strategy import MultiStrategyEngine, run_multi_strategy_task
+from BackTest.parallel_runner import ParallelBacktestRunner
+from Strategy.volatility_breakout import DailyFilterBreakout
+
+# 전략 생성자가 아닌 시뮬레이션(MultiStrategyEngine.register) 인자
+SIM_KEYS = ('stop_loss', 'take_profit', 'exit_minute')
+OBJECTIVES = ('expectancy', 'sharpe')
+
+
+def param_grid(space: dict) -> list:
+    """{파라미터: 후보 목록} → 조합 dict 목록"""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+class SuccessiveHalvingSearch:
+    def __init__(self, space: dict, strategy_cls=DailyFilterBreakout, eta=3, min_tickers=50, top_n=5,
+                 objective='expectancy', min_trades=20, z=1.0, backtester=None, workers=1, seed=42):
+        """
+        :param space: {파라미터: 후보 목록} (전략 생성자 인자 + SIM_KEYS)
+        :param eta: 단계별 종목 증가 배수이자 생존 비율의 역수
+        :param min_tickers: 첫 단계 평가 종목 수
+        :param top_n: 마지막까지 최소한 남길 조합 수 (보고할 상위 개수)
+        :param objective: 'expectancy' (거래당 평균 수익률) 또는 'sharpe' (평균 / 표준편차 x sqrt(거래 수))
+        :param min_trades: 점수 계산 최소 거래 수 (미달 조합은 최하위)
+        :param z: 신뢰구간 폭 (평균 ± z x 표준오차). 상한이 top_n번째 조합의 하한 이상이면 탈락시키지 않음 (None이면 미사용)
+        :param backtester: 데이터 경로/비용 설정 (기본: VolatilityBacktester())
+        :param workers: 1이면 순차, 그 외에는 ParallelBacktestRunner로 종목 병렬 평가
+                        (병렬 평가는 워커마다 backtester의 pickle 복사본을 쓰므로 하위 클래스도 그대로 적용되지만,
+                        pickle할 수 없는 백테스터는 workers=1로 실행해야 함)
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective는 {OBJECTIVES} 중 하나여야 합니다.")
+        if min_tickers < 1:
+            raise ValueError("min_tickers는 1 이상이어야 합니다.")
+        if eta < 2:
+            raise ValueError("eta는 2 이상이어야 합니다.")
+        self.candidates = param_grid(space)
+        self.strategy_cls = strategy_cls
+        self.eta = eta
+        self.min_tickers = min_tickers
+        self.top_n = top_n
+        self.objective = objective
+        self.min_trades = min_trades
+        self.z = z
+        self.engine = MultiStrategyEngine(backtester)
+        self.workers = workers
+        self.seed = seed
+
+        # 조합별 누적 거래 통계 (거래 수, 수익률 합, 제곱합, 이익 거래 수, 평가 종목 수)
+        self.acc = np.zeros((len(self.candidates), 5))
+        self.evaluations = 0  # (조합, 종목) 평가 횟수
+
+    def _variants(self, cand_ids):
+        variants = {}
+        for cid in cand_ids:
+            params = self.candidates[cid]
+            strategy = self.strategy_cls(**{k: v for k, v in params.items() if k not in SIM_KEYS})
+            sim = {k: params[k] for k in SIM_KEYS if k in params}
+            self.engine.register(f"c{cid}", strategy, **sim)
+            variants[f"c{cid}"] = self.engine.variants[f"c{cid}"]
+        return variants
+
+    def _evaluate(self, cand_ids, tickers):
+        """생존 조합을 종목 묶음에 대해 평가하고 누적 통계에 더합니다."""
+        self.engine.variants = {}
+        variants = self._variants(cand_ids)
+
+        if self.workers == 1:
+            results = ({'ticker': t, 'variants': self.engine.run_ticker(t)} for t in tickers)
+        else:
+            runner = ParallelBacktestRunner(workers=self.workers, task=run_multi_strategy_task,
+                                            run_kwargs={'variants': variants}, backtester=self.engine.tester)
+            results = runner.iter_results(tickers)
+
+        for result in results:
+            for name, trades in (result.get('variants') or {}).items():
+                cid = int(name[1:])
+                self.acc[cid, 4] += 1
+                if trades is None or trades.empty:
+                    continue
+                r = trades['return'].to_numpy()
+                self.acc[cid, :4] += (len(r), r.sum(), (r * r).sum(), (r > 0).sum())
+        self.evaluations += len(cand_ids) * len(tickers)
+
+    def score(self, cand_ids) -> np.ndarray:
+        n, s, ss = self.acc[cand_ids, 0], self.acc[cand_ids, 1], self.acc[cand_ids, 2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = s / n
+            if self.objective == 'expectancy':
+                value = mean
+            else:
+                std = np.sqrt(np.maximum(ss / n - mean * mean, 0.0) * n / (n - 1))
+                value = mean / std * np.sqrt(n)
+        return np.where((n >= max(self.min_trades, 1)) & np.isfinite(value), value, -np.inf)
+
+    def bounds(self, cand_ids):
+        """거래당 평균 수익률의 (하한, 상한) - 거래 수 미달 조합은 (-inf, inf)"""
+        n, s, ss = self.acc[cand_ids, 0], self.acc[cand_ids, 1], self.acc[cand_ids, 2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = s / n
+            se = np.sqrt(np.maximum(ss / n - mean * mean, 0.0) / (n - 1))
+        enough = n >= max(self.min_trades, 2)
+        return np.where(enough, mean - self.z * se, -np.inf), np.where(enough, mean + self.z * se, np.inf)
+
+    def _prune(self, survivors, scores) -> list:
+        """상위 1/eta (최소 top_n) + 신뢰구간상 top_n 경계와 구분되지 않는 조합"""
+        keep = max(self.top_n, math.ceil(len(survivors) / self.eta))
+        order = np.argsort(-scores, kind='stable')
+        selected = set(order[:keep].tolist())
+        if self.z is not None:
+            lower, upper = self.bounds(survivors)
+            # 거래 수가 충분한(하한이 유한한) 조합끼리 top_n번째 하한을 경계로 삼고,
+            # 그 경계보다 상한이 높은 조합은 아직 상위권 가능성이 있음
+            # (거래 수 미달 조합은 상한이 inf이므로 상위 1/eta 몫으로만 생존)
+            finite = np.isfinite(lower)
+            ranked = order[finite[order]][:self.top_n]
+            if len(ranked):
+                cutoff = lower[ranked].min()
+                selected.update(np.flatnonzero(finite & (upper >= cutoff)).tolist())
+        return [survivors[i] for i in order if i in selected]
+
+    def _shuffled(self, tickers):
+        tickers = list(tickers)
+        np.random.default_rng(self.seed).shuffle(tickers)
+        return tickers
+
+    def run(self, tickers=None) -> pd.DataFrame:
+        """
+        연속 반감 탐색 실행
+        :return: 조합별 결과 (params, score, trades, win_rate, tickers, rung) - 최종 생존 조합이 상위
+        """
+        if tickers is None:
+            minute_path = self.engine.tester.minute_path
+            tickers = [f.split('.')[0] for f in os.listdir(minute_path) if f.endswith('.parquet')]
+        tickers = self._shuffled(tickers)
+
+        survivors = list(range(len(self.candidates)))
+        rung_of = np.zeros(len(self.candidates), dtype=int)
+        done, budget, rung = 0, self.min_tickers, 0
+        while True:
+            budget = min(budget, len(tickers))
+            start = time.time()
+            self._evaluate(survivors, tickers[done:budget])
+            done = budget
+            rung_of[survivors] = rung
+
+            scores = self.score(survivors)
+            print(f"[*] rung {rung}: 종목 {done}/{len(tickers)} | 조합 {len(survivors)}개 | {time.time() - start:.1f}s")
+            if done >= len(tickers):
+                break
+
+            survivors = self._prune(survivors, scores)
+            budget *= self.eta
+            rung += 1
+
+        return self._leaderboard(rung_of)
+
+    def full_grid(self, tickers=None) -> pd.DataFrame:
+        """[기준 비교용] 전 조합 x 전 종목 평가"""
+        if tickers is None:
+            minute_path = self.engine.tester.minute_path
+            tickers = [f.split('.')[0] for f in os.listdir(minute_path) if f.endswith('.parquet')]
+        self._evaluate(list(range(len(self.candidates))), list(tickers))
+        return self._leaderboard(np.zeros(len(self.candidates), dtype=int))
+
+    def _leaderboard(self, rung_of) -> pd.DataFrame:
+        ids = np.arange(len(self.candidates))
+        board = pd.DataFrame(self.candidates)
+        board['score'] = self.score(ids)
+        board['trades'] = self.acc[:, 0].astype(int)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            board['win_rate'] = self.acc[:, 3] / self.acc[:, 0] * 100
+        board['tickers'] = self.acc[:, 4].astype(int)
+        board['rung'] = rung_of
+        return board.sort_values(['rung', 'score'], ascending=False, ignore_index=True)
+
+
+if __name__ == "__main__":
+    space = {
+        'k': [0.4, 0.5, 0.6, 0.7],
+        'stop_loss_rate': [0.02, 0.03],
+        'slope_min': [0.0, 0.8],
+        'disp_min': [0.0, 1.0],
+        'take_profit': [0.05, 0.07],
+    }
+    search = SuccessiveHalvingSearch(space, min_tickers=100, workers=os.cpu_count())
+    board = search.run()
+    print(board.head(search.top_n).to_string(index=False))
+    print(f"[✔] 평가 횟수: {search.evaluations:,} (전체 그리드: {len(search.candidates) * board['tickers'].max():,})")
@@ -0,0 +1,208 @@
+"""
+다중 전략 단일 패스 엔진
+
+여러 Strategy 하위 클래스/파라미터 변형을 등록해 두고, 종목마다 데이터를 한 번만 읽어
+공유 컨텍스트(분봉, 세션 오프셋, 일봉 결합 지표, 지표 블록)를 만든 뒤 모든 변형을 평가합니다.
+변형 5개를 비교해도 데이터 로드/일봉 결합/지표 계산은 종목당 1회입니다.
+
+변형별로 달라지는 것은
+- Strategy.signal_columns(): 파라미터 의존 컬럼 (목표가 등) → 공유 프레임을 복사하지 않고 덧씌운 뷰로 평가
+- Strategy.get_signals(): 선언형 규칙(Rule) 배치 평가
+- 시뮬레이션: numba 돌파 시뮬레이터 (BackTest/breakout_simulator.py), 변형별 손절/익절/강제 청산 시각
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Indicators.factory import IndicatorFactory
+from Indicators.daily_join import attach_daily_features
+from Indicators.session import first_true_mask, last_in_segment_mask
+from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+from BackTest.breakout_simulator import simulate_trades, trades_to_frame
+from BackTest.parallel_runner import ParallelBacktestRunner, trade_stats, _WORKER
+
+
+class ColumnView:
+    """공유 프레임 위에 변형별 컬럼을 덧씌운 읽기 전용 뷰 (규칙 평가용, 컬럼은 numpy 배열로 반환)"""
+    def __init__(self, frame: pd.DataFrame, extra: dict):
+        self.frame = frame
+        self.extra = extra
+
+    def __getitem__(self, column):
+        if column in self.extra:
+            return self.extra[column]
+        return self.frame[column].to_numpy()
+
+    def __contains__(self, column):
+        return column in self.extra or column in self.frame.columns
+
+    def __len__(self):
+        return len(self.frame)
+
+
+class SharedContext:
+    """종목 1개의 공유 데이터: 한 번 로드한 분봉/일봉 + 일봉 결합 지표 + 요청된 지표 그룹 (메모이즈)"""
+    def __init__(self, tester: VolatilityBacktester, d_df: pd.DataFrame, m_df: pd.DataFrame):
+        self.d_df = d_df
+        self.frame = m_df
+        # 목표가 구성 요소, 전일 필터 원값, 누적 거래량 등 공통 컬럼 1회 결합
+        self.offsets, _, _ = tester._prepare_features(d_df, m_df)
+        self.minute_of_day = m_df.index.hour * 60 + m_df.index.minute
+        self.session_end = last_in_segment_mask(self.offsets)
+        self._daily_groups = set()
+        self._minute_groups = set()
+
+    @staticmethod
+    def _expand(groups):
+        """custom 그룹은 trend/volatility 결과를 참조하므로 함께 계산"""
+        groups = set(groups)
+        if 'custom' in groups:
+            groups |= {'trend', 'volatility'}
+        return [g for g in IndicatorFactory.GROUP_COLUMNS if g in groups]
+
+    def ensure(self, features: dict):
+        """요청된 지표 그룹 중 아직 계산하지 않은 것만 계산해 공유 프레임에 결합"""
+        daily = [g for g in self._expand(features.get('daily', ())) if g not in self._daily_groups]
+        if daily:
+            block = IndicatorFactory.compute_block(self.d_df, groups=daily)
+            mapping = {col: f"d_{col}" for col in block.columns}
+            attach_daily_features(self.frame, block, mapping, lag=1, offsets=self.offsets)
+            self._daily_groups.update(daily)
+
+        minute = [g for g in self._expand(features.get('minute', ())) if g not in self._minute_groups]
+        if minute:
+            block = IndicatorFactory.compute_block(self.frame, groups=minute)
+            for col in block.columns:
+                self.frame[col] = block[col].to_numpy()
+            self._minute_groups.update(minute)
+
+
+class MultiStrategyEngine:
+    def __init__(self, backtester: VolatilityBacktester = None):
+        """
+        :param backtester: 데이터 경로/비용(수수료, 세금, 슬리피지) 설정 (기본: VolatilityBacktester())
+        """
+        self.tester = backtester or VolatilityBacktester()
+        self.variants = {}
+
+    def register(self, name, strategy, stop_loss=None, take_profit=0.07, exit_minute=15 * 60 + 19, sl_trail=True):
+        """
+        평가할 전략 변형 등록
+        :param stop_loss: 손절 비율 (기본: strategy.params['stop_loss_rate'], 없으면 미사용)
+        :param take_profit: 익절 비율 (None이면 미사용)
+        :param exit_minute: 강제 청산 시각 (장중 분)
+        """
+        if stop_loss is None:
+            stop_loss = strategy.params.get('stop_loss_rate')
+        self.variants[name] = {'strategy': strategy, 'stop_loss': stop_loss, 'take_profit': take_profit,
+                               'exit_minute': exit_minute, 'sl_trail': sl_trail}
+        return self
+
+    def build_context(self, ticker):
+        d_df, m_df = self.tester._load_data(ticker)
+        if d_df is None or m_df is None or d_df.empty or m_df.empty:
+            return None
+        ctx = SharedContext(self.tester, d_df, m_df)
+        # 모든 변형이 요청한 지표 그룹을 합쳐 1회 계산
+        features = {'daily': set(), 'minute': set()}
+        for variant in self.variants.values():
+            for kind, groups in variant['strategy'].required_features().items():
+                features[kind].update(groups)
+        ctx.ensure(features)
+        return ctx
+
+    def _simulate(self, ctx: SharedContext, variant: dict) -> pd.DataFrame:
+        """공유 컨텍스트 위에서 한 변형의 신호 평가 + 시뮬레이션"""
+        frame = ctx.frame
+        strategy = variant['strategy']
+        view = ColumnView(frame, strategy.signal_columns(ColumnView(frame, {})))
+
+        raw_entries, rule_exits = strategy.get_signals(view)
+        # 세션별 첫 신호만 진입, 강제 청산 시각/세션 마지막 봉/청산 규칙에서 청산
+        entries = first_true_mask(raw_entries, ctx.offsets)
+        exits = (ctx.minute_of_day == variant['exit_minute']) | ctx.session_end | rule_exits
+        entry_price = view['entry_price'] if 'entry_price' in view else view['close']
+
+        records = simulate_trades(
+            frame['open'].to_numpy(), frame['high'].to_numpy(), frame['low'].to_numpy(), frame['close'].to_numpy(),
+            entries, entry_price, exits,
+            fees=self.tester.fees + self.tester.tax / 2, slippage=self.tester.slippage,
+            sl_stop=variant['stop_loss'], sl_trail=variant['sl_trail'], tp_stop=variant['take_profit'])
+        return trades_to_frame(records, frame.index)
+
+    def run_ticker(self, ticker) -> dict:
+        """한 종목 1회 로드로 모든 변형 평가 → {변형 이름: 거래 DataFrame}"""
+        ctx = self.build_context(ticker)
+        if ctx is None:
+            return {}
+        return {name: self._simulate(ctx, variant) for name, variant in self.variants.items()}
+
+    def run(self, tickers=None, workers=1):
+        """
+        전 종목 x 전 변형 평가
+        :param workers: 1이면 현재 프로세스에서 순차 실행, 그 외에는 ParallelBacktestRunner로 병렬 실행
+                        (워커는 self.tester의 복사본을 사용하므로 백테스터는 pickle 가능해야 함)
+        :return: (종목 x 변형 요약 DataFrame, 변형별 요약 DataFrame)
+        """
+        if tickers is None:
+            tickers = [f.split('.')[0] for f in os.listdir(self.tester.minute_path) if f.endswith('.parquet')]
+
+        if workers == 1:
+            results = ({'ticker': t, 'variants': self.run_ticker(t), 'error': None} for t in tickers)
+        else:
+            runner = ParallelBacktestRunner(workers=workers, task=run_multi_strategy_task,
+                                            run_kwargs={'variants': self.variants}, backtester=self.tester)
+            results = runner.iter_results(tickers)
+
+        rows = []
+        for result in results:
+            for name, trades in (result.get('variants') or {}).items():
+                if trades is None or trades.empty:
+                    continue
+                stats = trade_stats(trades, result['ticker'])
+                stats['Variant'] = name
+                rows.append(stats)
+
+        per_ticker = pd.DataFrame(rows)
+        if per_ticker.empty:
+            return per_ticker, per_ticker
+        by_variant = per_ticker.groupby('Variant').agg(**{
+            'Tickers': ('Ticker', 'count'),
+            'Total Trades': ('Total Trades', 'sum'),
+            'Avg Total Return [%]': ('Total Return [%]', 'mean'),
+            'Median Total Return [%]': ('Total Return [%]', 'median'),
+            'Avg Win Rate [%]': ('Win Rate [%]', 'mean'),
+        }).sort_values('Avg Total Return [%]', ascending=False)
+        return per_ticker, by_variant
+
+
+def run_multi_strategy_task(ticker):
+    """[워커 작업] 등록된 모든 변형을 한 종목에 대해 평가 (ParallelBacktestRunner task)"""
+    start = time.time()
+    try:
+        engine = MultiStrategyEngine(_WORKER['tester'])
+        engine.variants = _WORKER['run_kwargs']['variants']
+        return {'ticker': ticker, 'variants': engine.run_ticker(ticker), 'stats': None, 'trades': None,
+                'error': None, 'elapsed': time.time() - start}
+    except Exception as e:
+        return {'ticker': ticker, 'variants': None, 'stats': None, 'trades': None,
+                'error': str(e), 'elapsed': time.time() - start}
+
+
+if __name__ == "__main__":
+    from Strategy.volatility_breakout import DailyFilterBreakout
+
+    engine = MultiStrategyEngine()
+    for k in (0.4, 0.5, 0.6):
+        engine.register(f"k{k}", DailyFilterBreakout(k=k, stop_loss_rate=0.03))
+    engine.register("k0.5_no_slope", DailyFilterBreakout(k=0.5, stop_loss_rate=0.03, slope_min=-np.inf))
+    engine.register("k0.5_tp5", DailyFilterBreakout(k=0.5, stop_loss_rate=0.03), take_profit=0.05)
+
+    per_ticker, by_variant = engine.run(workers=os.cpu_count())
+    print(by_variant.to_string())
@@ -0,0 +1,436 @@
+"""
+전 종목 병렬 백테스트 러너
+
+- 스케줄링: 분봉 파일 크기 내림차순(largest-first)으로 제출 → 마지막에 큰 종목 하나가 늦게 끝나는 꼬리 지연 방지
+- 워커 상주 데이터: 일봉 패널을 부모가 iter_results 호출마다 그 종목들로 호출 전용 파일(panels/ 아래 고유 이름)에
+  만들고 워커 initializer가 1회 로드, 호출이 끝나면 삭제 (동시에 도는 다른 러너/탐색과 파일을 공유하지 않음)
+- 결과 스트리밍: 종목별 결과(요약 통계 + 거래 내역)가 끝나는 순서대로 반환되며,
+  거래 내역은 부모가 TradeStore(run_id/월 파티션 데이터셋)에 묶음 단위로 추가
+- 결과 캐시: (종목, 데이터 체크섬, 전략 + 파라미터, 엔진 버전) 키가 같은 종목은 저장된 결과를 재사용하고
+  데이터/파라미터가 바뀐 종목만 워커에 제출 (BackTest/result_cache.py)
+- 장애 격리: 워커 프로세스가 비정상 종료(BrokenProcessPool)되면 풀을 재생성해 나머지를 계속 진행하고,
+  당시 실행 중이던 종목은 마지막에 단독 재실행하여 원인 종목만 실패 처리
+"""
+import os
+import sys
+import time
+import glob
+import uuid
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.trade_store import TradeStore
+from BackTest.result_cache import ResultCache, params_hash
+from BackTest.feature_store import FeatureStore
+from Util.profiler import PROFILER
+
+# 워커 프로세스별 상주 상태 (initializer에서 채움)
+_WORKER = {}
+
+
+# ---------------------------------------------------------------
+# 1. 공유 데이터 준비 (부모 프로세스)
+# ---------------------------------------------------------------
+
+def largest_first(tickers, minute_dir):
+    """분봉 파일 크기 내림차순으로 정렬된 종목 리스트 (파일이 없는 종목 제외)"""
+    sizes = {}
+    for ticker in tickers:
+        path = os.path.join(minute_dir, f"{ticker}.parquet")
+        if os.path.exists(path):
+            sizes[ticker] = os.path.getsize(path)
+    return sorted(sizes, key=sizes.get, reverse=True)
+
+
+def build_daily_panel(daily_dir, tickers, panel_path):
+    """
+    종목별 일봉 파일을 하나의 패널 파일(ticker 컬럼 포함)로 합쳐 저장합니다.
+    워커는 수천 개의 작은 파일 대신 이 파일 하나만 읽습니다.
+    """
+    frames = []
+    for ticker in tickers:
+        path = os.path.join(daily_dir, f"{ticker}.parquet")
+        if not os.path.exists(path):
+            continue
+        try:
+            df = pd.read_parquet(path, engine='fastparquet')
+        except Exception:
+            continue
+        if df.empty:
+            continue
+        if 'date' not in df.columns:
+            df = df.reset_index().rename(columns={df.index.name or 'index': 'date'})
+        df = df[['date', 'open', 'high', 'low', 'close', 'volume']].copy()
+        df['ticker'] = ticker
+        frames.append(df)
+
+    if not frames:
+        return None
+
+    panel = pd.concat(frames, ignore_index=True)
+    panel['date'] = pd.to_datetime(panel['date'])
+    os.makedirs(os.path.dirname(panel_path), exist_ok=True)
+    panel.to_parquet(panel_path, engine='fastparquet', index=False)
+    return panel_path
+
+
+# ---------------------------------------------------------------
+# 2. 워커 프로세스
+# ---------------------------------------------------------------
+
+def _init_worker(panel_path, backtester_kwargs, run_kwargs, backtester=None):
+    """워커 initializer: 공유 데이터 1회 로드 + 백테스터 생성 (backtester가 있으면 그 복사본 사용)"""
+    # 프로세스 단위로 병렬화하므로 워커 내부 numba 스레드는 1개로 제한 (코어 과다 할당 방지)
+    try:
+        import numba
+        numba.set_num_threads(1)
+    except ImportError:
+        pass
+    # fork 방식이면 부모의 계측 기록이 복사되어 오므로 비우고 시작
+    PROFILER.reset()
+
+    from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+
+    tester = backtester if backtester is not None else VolatilityBacktester(**backtester_kwargs)
+    if panel_path and os.path.exists(panel_path):
+        panel = pd.read_parquet(panel_path, engine='fastparquet')
+        tester.daily_cache = {
+            ticker: df.drop(columns='ticker').set_index('date')
+            for ticker, df in panel.groupby('ticker', sort=False)
+        }
+
+    _WORKER['tester'] = tester
+    _WORKER['run_kwargs'] = run_kwargs
+
+
+def trades_frame(pf):
+    """거래 레코드에 진입/청산 일시를 붙인 DataFrame (거래가 없으면 None)"""
+    if pf.trades.records.empty:
+        return None
+    trades_df = pf.trades.records
+    idx_to_date = pf.wrapper.index
+    trades_df['entry_date'] = idx_to_date[trades_df['entry_idx']]
+    trades_df['exit_date'] = idx_to_date[trades_df['exit_idx']]
+    return trades_df
+
+
+def run_volatility_task(ticker):
+    """
+    [워커 작업] 한 종목 백테스트 → 요약 통계 + 거래 내역 반환
+    :return: {'ticker', 'stats'(Series 또는 None), 'trades'(DataFrame 또는 None), 'error'(str 또는 None), 'elapsed'}
+    """
+    start = time.time()
+    try:
+        with PROFILER.stage('backtest', ticker):
+            pf = _WORKER['tester'].run_backtest(ticker, **_WORKER['run_kwargs'])
+            stats, trades = None, None
+            if pf is not None:
+                with PROFILER.stage('stats'):
+                    stats = pf.stats()
+                    stats['Ticker'] = ticker
+                    trades = trades_frame(pf)
+                del pf
+        return {'ticker': ticker, 'stats': stats, 'trades': trades, 'error': None, 'elapsed': time.time() - start,
+                'profile': PROFILER.drain()}
+    except Exception as e:
+        return {'ticker': ticker, 'stats': None, 'trades': None, 'error': str(e), 'elapsed': time.time() - start,
+                'profile': PROFILER.drain()}
+
+
+def trade_stats(trades_df, ticker):
+    """
+    거래 내역만으로 만든 요약 통계 (스트리밍 모드용, pf.stats()의 주요 컬럼명과 동일)
+    전액 투자 + 당일 청산이므로 총수익률 = 거래 수익률의 복리 누적
+    """
+    returns = trades_df['return']
+    gains, losses = returns[returns > 0].sum(), -returns[returns < 0].sum()
+    return pd.Series({
+        'Start': trades_df['entry_date'].iloc[0],
+        'End': trades_df['exit_date'].iloc[-1],
+        'Total Return [%]': ((1 + returns).prod() - 1) * 100,
+        'Total Trades': len(trades_df),
+        'Win Rate [%]': (returns > 0).mean() * 100,
+        'Profit Factor': gains / losses if losses > 0 else np.inf,
+        'Expectancy': trades_df['pnl'].mean(),
+        'Ticker': ticker,
+    })
+
+
+def run_streaming_task(ticker):
+    """
+    [워커 작업] 월 단위 스트리밍 백테스트 (VolatilityBacktester.run_trades_streaming)
+    분봉 전체를 메모리에 올리지 않으므로 워커당 메모리가 작아 더 많은 워커를 띄울 수 있습니다.
+    """
+    start = time.time()
+    try:
+        with PROFILER.stage('backtest', ticker):
+            trades = _WORKER['tester'].run_trades_streaming(ticker, **_WORKER['run_kwargs'])
+            with PROFILER.stage('stats'):
+                stats = trade_stats(trades, ticker) if trades is not None else None
+        return {'ticker': ticker, 'stats': stats, 'trades': trades, 'error': None, 'elapsed': time.time() - start,
+                'profile': PROFILER.drain()}
+    except Exception as e:
+        return {'ticker': ticker, 'stats': None, 'trades': None, 'error': str(e), 'elapsed': time.time() - start,
+                'profile': PROFILER.drain()}
+
+
+# ---------------------------------------------------------------
+# 3. 러너
+# ---------------------------------------------------------------
+
+class ParallelBacktestRunner:
+    def __init__(self, workers=None, backtester_kwargs=None, run_kwargs=None, task=run_volatility_task,
+                 max_in_flight=2, run_id=None, use_cache=True, build_features=False, backtester=None):
+        """
+        :param workers: 프로세스 수 (기본: CPU 코어 수)
+        :param backtester_kwargs: VolatilityBacktester 생성 인자
+        :param run_kwargs: run_backtest 호출 인자 (예: value_limit)
+        :param task: 워커에서 종목별로 실행할 모듈 수준 함수 (ticker → 결과 dict)
+        :param max_in_flight: 워커당 동시 제출 작업 수 (제출 순서 = largest-first 유지)
+        :param run_id: 거래 저장소 run id (기본: 실행 시각)
+        :param use_cache: True면 결과 캐시에서 변경 없는 종목의 결과를 재사용
+        :param build_features: True면 실행 후 거래별 진입 시점 피처 테이블 생성 (BackTest/feature_store.py)
+                               피처 계산은 병렬 구간이 끝난 뒤 부모 프로세스에서 순차로 실행되므로 기본은 False
+                               (필요할 때 FeatureStore().materialize(run_id)를 따로 실행)
+        :param backtester: 이미 만든 백테스터 (하위 클래스 포함). 지정하면 backtester_kwargs 대신
+                           워커마다 이 객체의 복사본(pickle)을 쓰고, 데이터 경로도 이 객체를 따릅니다.
+        """
+        self.workers = workers or os.cpu_count()
+        self.backtester_kwargs = backtester_kwargs or {}
+        self.backtester = backtester
+        self.run_kwargs = run_kwargs or {}
+        self.task = task
+        self.max_in_flight = max_in_flight
+
+        self.daily_path = backtester.daily_path if backtester is not None else os.path.join("data", "chart", "daily")
+        self.minute_path = backtester.minute_path if backtester is not None else os.path.join("data", "chart", "minute")
+        self.trade_store = TradeStore()
+        self.run_id = run_id or TradeStore.new_run_id()
+        self.summary_path = os.path.join("data", "backtest", "volatility", "summary")
+        # 일봉 패널 파일 디렉터리 (None이면 패널 없이 워커가 종목별 일봉 파일을 읽음)
+        self.panel_dir = os.path.join("data", "backtest", "volatility", "cache", "panels")
+        self.result_cache = ResultCache() if use_cache else None
+        self.metrics_path = os.path.join("data", "backtest", "volatility", "metrics")
+        self.feature_store = FeatureStore(trade_store=self.trade_store, backtester=backtester,
+                                          result_cache=self.result_cache) if build_features else None
+
+        self.failed = []
+
+    def _pool(self, workers, panel_path):
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(panel_path, self.backtester_kwargs, self.run_kwargs, self.backtester),
+        )
+
+    def _drain(self, queue, workers, in_flight_limit, panel_path):
+        """
+        queue의 종목을 풀에 제출하고 결과를 끝나는 순서대로 반환합니다.
+        워커가 비정상 종료되면 ('crashed', [당시 실행 중이던 종목]) 을 반환하고 풀을 재생성해 계속 진행합니다.
+        """
+        while queue:
+            with self._pool(workers, panel_path) as pool:
+                in_flight = {}
+                broken = False
+                while (queue or in_flight) and not broken:
+                    while queue and len(in_flight) < in_flight_limit:
+                        ticker = queue.popleft()
+                        in_flight[pool.submit(self.task, ticker)] = ticker
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        ticker = in_flight.pop(fut)
+                        try:
+                            yield 'done', fut.result()
+                        except BrokenProcessPool:
+                            broken = True
+                            in_flight[fut] = ticker
+
+                if broken:
+                    yield 'crashed', list(in_flight.values())
+
+    def iter_results(self, tickers):
+        """
+        종목별 결과를 스트리밍합니다. (largest-first 순으로 제출)
+        워커가 로드할 일봉 패널은 이 종목들로 호출 전용 파일에 만들고, 결과를 모두 반환하면(또는 중단되면) 삭제합니다.
+        (panel_dir이 None이거나 만들 수 없으면 패널 없이 실행)
+        충돌에 연루된 종목은 마지막에 워커 1개로 하나씩 재실행하여, 다시 죽는 종목만 실패로 기록합니다.
+        """
+        self.failed = []
+        queue = deque(largest_first(tickers, self.minute_path))
+        suspects = []
+
+        panel_path = None
+        if self.panel_dir:
+            panel_path = os.path.join(self.panel_dir, f"daily_panel_{self.run_id}_{uuid.uuid4().hex[:8]}.parquet")
+        try:
+            with PROFILER.stage('daily_panel'):
+                if panel_path and build_daily_panel(self.daily_path, tickers, panel_path) is None:
+                    panel_path = None
+
+            for kind, payload in self._drain(queue, self.workers, self.workers * self.max_in_flight, panel_path):
+                if kind == 'done':
+                    yield payload
+                else:
+                    print(f"\n[!] 워커 비정상 종료: 실행 중이던 {len(payload)}개 종목은 마지막에 단독 재실행합니다.")
+                    suspects.extend(payload)
+
+            # 단독 재실행: 동시에 1개만 실행하므로 다시 죽으면 해당 종목이 원인
+            queue = deque(suspects)
+            for kind, payload in self._drain(queue, 1, 1, panel_path):
+                if kind == 'done':
+                    yield payload
+                else:
+                    print(f"\n[!] {payload[0]} 재실행 중 워커 비정상 종료 → 실패 처리")
+                    self.failed.extend(payload)
+                    yield {'ticker': payload[0], 'stats': None, 'trades': None, 'error': 'worker crashed',
+                           'elapsed': 0.0}
+        finally:
+            if panel_path and os.path.exists(panel_path):
+                os.remove(panel_path)
+
+    def run(self, tickers=None):
+        """
+        전 종목 병렬 백테스트 후 요약 리포트(total_backtest_report.csv)를 저장합니다.
+        :return: 요약 DataFrame (결과가 없으면 None)
+        """
+        os.makedirs(self.summary_path, exist_ok=True)
+
+        if tickers is None:
+            files = glob.glob(os.path.join(self.minute_path, "*.parquet"))
+            tickers = [os.path.basename(f).split('.')[0] for f in files]
+        total_count = len(tickers)
+        start_time = time.time()
+        PROFILER.reset()
+
+        print(f"🚀 총 {total_count}개 종목 병렬 백테스트 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"⚙️ 워커 프로세스: {self.workers}개 | 🗂️ run_id: {self.run_id}")
+
+        # 결과 캐시 조회: 키가 같은 종목은 재사용, 나머지만 계산
+        with PROFILER.stage('cache_lookup'):
+            keys, cached = self._cache_lookup(tickers)
+        pending = [t for t in tickers if t not in cached]
+        print(f"♻️ 캐시 재사용: {len(cached)}개 | 계산 대상: {len(pending)}개")
+
+        print("=" * 60)
+
+        summary_list = []
+        errors = 0
+        results = itertools.chain(cached.values(), self.iter_results(pending) if pending else [])
+        try:
+            with self.trade_store.writer(self.run_id) as writer:
+                for i, result in enumerate(results, 1):
+                    # 워커 단계 기록 (parquet_read / indicators / signals / simulation / stats) 합치기
+                    PROFILER.merge(result.get('profile'))
+                    if result['stats'] is not None:
+                        summary_list.append(result['stats'])
+                    with PROFILER.stage('write', result['ticker']):
+                        if result.get('trades') is not None:
+                            writer.add(result['ticker'], result['trades'])
+                        if result['error']:
+                            errors += 1
+                        elif self.result_cache is not None and result['ticker'] in keys and result['ticker'] not in cached:
+                            self.result_cache.put(result['ticker'], keys[result['ticker']],
+                                                  result['stats'], result.get('trades'))
+                    self._print_progress(i, total_count, start_time, len(summary_list), errors)
+
+            # 거래별 진입 시점 피처 테이블 (이번 run의 신규 거래만 추가)
+            if self.feature_store is not None and summary_list:
+                print()
+                with PROFILER.stage('feature_store'):
+                    self.feature_store.materialize(self.run_id)
+        finally:
+            if self.result_cache is not None:
+                self.result_cache.save()
+            self._export_metrics()
+
+        print("\n" + "=" * 60)
+        if not summary_list:
+            print("⚠️ 생성된 결과가 없습니다.")
+            return None
+
+        final_summary_df = pd.DataFrame(summary_list)
+        if 'Total Return [%]' in final_summary_df.columns:
+            final_summary_df.sort_values(by='Total Return [%]', ascending=False, inplace=True)
+
+        report_file = os.path.join(self.summary_path, "total_backtest_report.csv")
+        final_summary_df.to_csv(report_file, index=False, encoding='utf-8-sig')
+
+        print(f"✅ 전체 분석 완료! (총 소요시간: {str(timedelta(seconds=int(time.time() - start_time)))})")
+        print(f"📊 최종 리포트: {report_file}")
+        print(f"🗂️ 거래 내역: {self.trade_store.root} (run_id={self.run_id})")
+        if self.failed:
+            print(f"❌ 워커 충돌로 실패한 종목: {', '.join(self.failed)}")
+        return final_summary_df
+
+    def _export_metrics(self):
+        """단계별 계측 집계 출력 + metrics/{run_id}.parquet 저장 (워커 단계 시간은 워커 합산)"""
+        if not PROFILER.records:
+            return
+        PROFILER.report(f"단계별 계측 (run_id={self.run_id})")
+        path = PROFILER.export(os.path.join(self.metrics_path, f"{self.run_id}.parquet"),
+                               meta={'run_id': self.run_id, 'task': self.task.__name__, 'workers': self.workers})
+        print(f"⏱️ 계측 파일: {path}")
+
+    def _backtester_params(self):
+        """캐시 키용 백테스터 설정 (인스턴스를 받았으면 클래스 이름 + 속성, 워커 일봉 패널 제외)"""
+        if self.backtester is None:
+            return self.backtester_kwargs
+        params = {k: v for k, v in vars(self.backtester).items() if k != 'daily_cache'}
+        params['class'] = f"{type(self.backtester).__module__}.{type(self.backtester).__qualname__}"
+        return params
+
+    def _cache_lookup(self, tickers):
+        """
+        종목별 캐시 키 계산 및 적중 결과 로드
+        :return: (keys {ticker: key}, cached {ticker: 결과 dict})
+        """
+        if self.result_cache is None:
+            return {}, {}
+
+        from BackTest.VolatilityBacktestByVBT import ENGINE_VERSION
+
+        strategy_hash = params_hash(
+            f"{self.task.__module__}.{self.task.__qualname__}",
+            {'backtester': self._backtester_params(), 'run': self.run_kwargs})
+        keys, cached = {}, {}
+        for ticker in tickers:
+            data_paths = [os.path.join(self.minute_path, f"{ticker}.parquet"),
+                          os.path.join(self.daily_path, f"{ticker}.parquet")]
+            keys[ticker] = self.result_cache.key(ticker, data_paths, strategy_hash, ENGINE_VERSION)
+            entry = self.result_cache.get(ticker, keys[ticker])
+            if entry is not None:
+                cached[ticker] = {'ticker': ticker, 'stats': entry['stats'], 'trades': entry['trades'],
+                                  'error': None, 'elapsed': 0.0}
+        return keys, cached
+
+    @staticmethod
+    def _print_progress(i, total_count, start_time, traded, errors):
+        """한 줄 진행 바 출력 (경과/남은 시간 포함)"""
+        progress = i / total_count if total_count else 1.0
+        elapsed = time.time() - start_time
+        if i > 10:
+            eta_str = str(timedelta(seconds=int(elapsed / i * (total_count - i))))
+        else:
+            eta_str = "계산중..."
+
+        bar_length = 30
+        filled_length = int(bar_length * progress)
+        bar = '█' * filled_length + '-' * (bar_length - filled_length)
+        sys.stdout.write(f"\r[{bar}] {progress * 100:5.1f}% ({i}/{total_count}) | "
+                         f"경과: {str(timedelta(seconds=int(elapsed)))} | 남은시간: {eta_str} | "
+                         f"거래발생: {traded}건 | 에러: {errors}건")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    ParallelBacktestRunner().run()
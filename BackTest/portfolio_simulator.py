@@ -0,0 +1,290 @@
+"""
+포트폴리오 단위 다종목 변동성 돌파 시뮬레이터 (자금 / 보유 종목 수 제약)
+
+종목별 백테스트는 종목마다 독립된 전액 투자를 가정하지만, 실전에서는 같은 시각에 여러 종목이
+동시에 돌파하고 현금은 한정되어 있습니다. 두 단계로 나누어 전 종목을 한 번에 처리합니다.
+
+1. 후보 거래 (build_candidates): 종목별로 진입 시각/가격, 청산 시각/가격, 수익률을 계산합니다.
+   손절/익절/강제 청산 경로는 투입 금액과 무관하므로 종목 단위로 독립 계산(병렬)이 가능합니다.
+2. 시간순 스윕 (PortfolioSimulator): 전 종목 후보를 (진입 시각, 신호 강도 내림차순)으로 정렬한 뒤
+   numba 루프 한 번으로 청산 → 진입 순서로 처리하며 자금을 배분합니다.
+   - 같은 분에 여러 종목이 돌파하면 신호 강도(rank_by) 순으로 자리를 배정
+   - 진입 시각보다 먼저 청산된 포지션의 현금만 재사용 (같은 분 청산 금액은 다음 분부터 사용)
+   - 배분 금액 = min(가용 현금, 평가 자산 x position_pct, 5일 평균 거래대금 x max_value_pct), 정수 주식수
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from numba import njit
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.breakout_simulator import simulate_breakout
+from BackTest.parallel_runner import ParallelBacktestRunner, _WORKER
+from BackTest.result_cache import ResultCache, params_hash
+
+# 미체결 사유 코드
+SKIP_NONE = 0     # 체결
+SKIP_SLOTS = 1    # 보유 종목 수 한도
+SKIP_CASH = 2     # 현금/배분 금액 부족 (1주 미만)
+SKIP_HOLDING = 3  # 같은 종목 보유 중
+
+RANK_COLUMNS = ('avg_value_5d', 'breakout', 'slope5', 'disp5')
+CANDIDATE_CACHE_SLOT = '_portfolio_candidates'  # 결과 캐시에서 후보 거래 패널을 보관하는 항목 이름
+
+
+# ---------------------------------------------------------------
+# 1. 후보 거래 (종목 단위)
+# ---------------------------------------------------------------
+
+def build_candidates(tester, ticker, value_limit=10_000_000_000, take_profit=0.07, exit_minute=15 * 60 + 19):
+    """
+    한 종목의 후보 거래와 진입 시점 신호 강도 지표를 계산합니다. (VolatilityBacktester.run_trades와 같은 체결 규칙)
+
+    :param tester: VolatilityBacktester
+    :return: DataFrame [ticker, entry_date, exit_date, entry_price, exit_price, return, exit_reason,
+             avg_value_5d, breakout, slope5, disp5] 또는 None
+    """
+    d_df, m_df = tester._load_data(ticker)
+    if d_df is None or m_df is None or d_df.empty or m_df.empty:
+        return None
+
+    offsets, base_cond, _ = tester._prepare_features(d_df, m_df)
+    can_enter = base_cond & (m_df['avg_value_5d'].to_numpy() >= value_limit)
+    target_price = tester._target_price(m_df, tester.k)
+
+    trades = simulate_breakout(
+        m_df, target_price, can_enter, exit_minute=exit_minute, offsets=offsets,
+        fees=tester.fees + (tester.tax / 2), slippage=tester.slippage,
+        sl_stop=tester.stop_loss, sl_trail=True, tp_stop=take_profit,
+    )
+    if trades.empty:
+        return None
+
+    e_idx = trades['entry_idx'].to_numpy()
+    return pd.DataFrame({
+        'ticker': ticker,
+        'entry_date': trades['entry_date'].to_numpy(),
+        'exit_date': trades['exit_date'].to_numpy(),
+        'entry_price': trades['entry_price'].to_numpy(),
+        'exit_price': trades['exit_price'].to_numpy(),
+        'return': trades['return'].to_numpy(),
+        'exit_reason': trades['exit_reason'].to_numpy(),
+        # 신호 강도 후보: 유동성 / 돌파 봉 종가의 목표가 대비 초과율 / 전일 기울기 / 전일 이격도
+        'avg_value_5d': m_df['avg_value_5d'].to_numpy()[e_idx],
+        'breakout': m_df['close'].to_numpy()[e_idx] / target_price[e_idx] - 1,
+        'slope5': m_df['prev_slope5'].to_numpy()[e_idx],
+        'disp5': m_df['prev_disp5'].to_numpy()[e_idx],
+    })
+
+
+def run_candidate_task(ticker):
+    """[워커 작업] 한 종목 후보 거래 (ParallelBacktestRunner task)"""
+    start = time.time()
+    try:
+        candidates = build_candidates(_WORKER['tester'], ticker, **_WORKER['run_kwargs'])
+        return {'ticker': ticker, 'candidates': candidates, 'error': None, 'elapsed': time.time() - start}
+    except Exception as e:
+        return {'ticker': ticker, 'candidates': None, 'error': str(e), 'elapsed': time.time() - start}
+
+
+def build_candidate_panel(tickers=None, workers=None, backtester_kwargs=None, run_kwargs=None,
+                          result_cache: ResultCache = None):
+    """
+    전 종목 후보 거래를 병렬로 계산해 결과 캐시에 저장합니다.
+    캐시 키는 백테스터/실행 인자 + 종목 목록 + 엔진 버전의 해시이며, 키마다 별도 항목으로 보관하므로
+    이전에 계산한 인자 조합으로 돌아가도 다시 계산하지 않습니다.
+    :param result_cache: 결과 캐시 (기본: 새 ResultCache)
+    :return: 후보 거래 DataFrame 또는 None
+    """
+    from BackTest.VolatilityBacktestByVBT import ENGINE_VERSION
+
+    cache = result_cache or ResultCache()
+    runner = ParallelBacktestRunner(workers=workers, backtester_kwargs=backtester_kwargs,
+                                    run_kwargs=run_kwargs, task=run_candidate_task)
+    if tickers is None:
+        tickers = [f.split('.')[0] for f in os.listdir(runner.minute_path) if f.endswith('.parquet')]
+    cache_key = params_hash('portfolio_candidates', {
+        'backtester': runner.backtester_kwargs, 'run': runner.run_kwargs,
+        'tickers': sorted(tickers), 'engine_version': ENGINE_VERSION})
+
+    entry = cache.get(CANDIDATE_CACHE_SLOT, cache_key)
+    if entry is not None:
+        print(f"[*] 캐시된 후보 거래 사용: {cache_key[:12]}")
+        cache.save()
+        return entry['trades']
+
+    frames = []
+    start_time = time.time()
+    for i, result in enumerate(runner.iter_results(tickers), 1):
+        if result.get('candidates') is not None:
+            frames.append(result['candidates'])
+        runner._print_progress(i, len(tickers), start_time, len(frames), 0 if result['error'] is None else 1)
+    print()
+
+    if not frames:
+        print("[!] 생성된 후보 거래가 없습니다.")
+        return None
+
+    candidates = pd.concat(frames, ignore_index=True)
+    cache.put(CANDIDATE_CACHE_SLOT, cache_key, {'rows': len(candidates), 'tickers': len(tickers)}, candidates)
+    cache.save()
+    print(f"[✔] 후보 거래 저장: {cache_key[:12]} ({len(candidates):,}건)")
+    return candidates
+
+
+# ---------------------------------------------------------------
+# 2. 시간순 스윕 (자금 배분)
+# ---------------------------------------------------------------
+
+@njit(cache=True)
+def _portfolio_kernel(entry_time, exit_time, entry_price, exit_price, ticker_code, value_cap,
+                      init_cash, fees, max_positions, position_pct, shares_out, pnl_out, skip_out):
+    """
+    (진입 시각, 신호 강도) 순으로 정렬된 후보를 한 번 훑으며 자금을 배분합니다.
+    보유 포지션은 max_positions 크기의 슬롯 배열로 관리 (가장 이른 청산을 선형 탐색)
+    """
+    slot_exit = np.full(max_positions, np.iinfo(np.int64).max)
+    slot_idx = np.full(max_positions, -1)
+    slot_cost = np.zeros(max_positions)
+    holding = np.zeros(ticker_code.max() + 1, dtype=np.bool_)
+    cash = init_cash
+    n_open = 0
+
+    for i in range(len(entry_time)):
+        t = entry_time[i]
+
+        # 1. 진입 시각 이전에 청산된 포지션 정리
+        while n_open > 0:
+            s = np.argmin(slot_exit)
+            if slot_exit[s] >= t:
+                break
+            j = slot_idx[s]
+            cash += shares_out[j] * exit_price[j] * (1 - fees)
+            holding[ticker_code[j]] = False
+            slot_exit[s] = np.iinfo(np.int64).max
+            slot_idx[s] = -1
+            slot_cost[s] = 0.0
+            n_open -= 1
+
+        # 2. 진입 가능 여부
+        if holding[ticker_code[i]]:
+            skip_out[i] = SKIP_HOLDING
+            continue
+        if n_open >= max_positions:
+            skip_out[i] = SKIP_SLOTS
+            continue
+
+        # 3. 배분 금액 (평가 자산은 보유 포지션 취득원가 기준)
+        equity = cash + slot_cost.sum()
+        amount = min(cash, equity * position_pct, value_cap[i])
+        shares = np.floor(amount / (entry_price[i] * (1 + fees)))
+        if shares < 1:
+            skip_out[i] = SKIP_CASH
+            continue
+
+        cost = shares * entry_price[i] * (1 + fees)
+        cash -= cost
+        s = np.argmax(slot_idx == -1)
+        slot_exit[s] = exit_time[i]
+        slot_idx[s] = i
+        slot_cost[s] = cost
+        holding[ticker_code[i]] = True
+        n_open += 1
+
+        shares_out[i] = shares
+        pnl_out[i] = shares * (exit_price[i] * (1 - fees) - entry_price[i] * (1 + fees))
+        skip_out[i] = SKIP_NONE
+
+
+class PortfolioSimulator:
+    def __init__(self, init_cash=100_000_000, max_positions=5, position_pct=None, max_value_pct=0.01,
+                 rank_by='avg_value_5d', fees=0.00015, tax=0.0015):
+        """
+        :param init_cash: 초기 자금 (원)
+        :param max_positions: 동시 보유 종목 수 한도
+        :param position_pct: 종목당 평가 자산 대비 최대 비중 (기본: 1 / max_positions)
+        :param max_value_pct: 종목당 5일 평균 거래대금 대비 최대 매수 금액 비율 (None이면 미적용)
+        :param rank_by: 같은 분 동시 돌파 시 우선순위 지표 (RANK_COLUMNS 중 하나, 큰 값 우선)
+        :param fees / tax: 편도 수수료 / 매도세 (후보 거래 수익률과 같은 fees + tax / 2 규칙)
+        """
+        if rank_by not in RANK_COLUMNS:
+            raise ValueError(f"rank_by는 {RANK_COLUMNS} 중 하나여야 합니다.")
+        self.init_cash = float(init_cash)
+        self.max_positions = int(max_positions)
+        self.position_pct = position_pct if position_pct is not None else 1.0 / max_positions
+        self.max_value_pct = max_value_pct
+        self.rank_by = rank_by
+        self.fees = fees + tax / 2
+
+    def run(self, candidates: pd.DataFrame) -> dict:
+        """
+        전 종목 후보 거래를 시간순으로 처리합니다.
+        :return: {'trades': 체결 거래 DataFrame, 'candidates': 후보 + 체결/미체결 사유,
+                  'equity': 일별 자산 Series, 'stats': 요약 dict}
+        """
+        # 진입 시각 오름차순, 같은 시각은 신호 강도 내림차순 (NaN은 후순위)
+        cand = candidates.sort_values(['entry_date', self.rank_by], ascending=[True, False],
+                                      na_position='last', kind='mergesort', ignore_index=True)
+        ticker_code, _ = pd.factorize(cand['ticker'])
+
+        value_cap = np.full(len(cand), np.inf)
+        if self.max_value_pct is not None:
+            value_cap = np.nan_to_num(cand['avg_value_5d'].to_numpy(np.float64) * self.max_value_pct, nan=0.0)
+
+        shares = np.zeros(len(cand))
+        pnl = np.zeros(len(cand))
+        skip = np.full(len(cand), SKIP_NONE, dtype=np.int64)
+        _portfolio_kernel(
+            cand['entry_date'].to_numpy('datetime64[ns]').view(np.int64),
+            cand['exit_date'].to_numpy('datetime64[ns]').view(np.int64),
+            cand['entry_price'].to_numpy(np.float64), cand['exit_price'].to_numpy(np.float64),
+            ticker_code.astype(np.int64), value_cap, self.init_cash, self.fees,
+            self.max_positions, float(self.position_pct), shares, pnl, skip,
+        )
+
+        cand['shares'] = shares
+        cand['pnl'] = pnl
+        cand['skip_reason'] = skip
+        trades = cand[cand['skip_reason'] == SKIP_NONE].reset_index(drop=True)
+
+        # 일별 자산: 청산일 기준 실현 손익 누적 (장중 청산이므로 장 마감 기준 전량 현금)
+        days = pd.DatetimeIndex(cand['entry_date']).normalize().unique().sort_values()
+        daily_pnl = trades.groupby(pd.DatetimeIndex(trades['exit_date']).normalize())['pnl'].sum()
+        equity = self.init_cash + daily_pnl.reindex(days.union(daily_pnl.index), fill_value=0.0).cumsum()
+        equity.name = 'equity'
+
+        return {'trades': trades, 'candidates': cand, 'equity': equity, 'stats': self._stats(cand, trades, equity)}
+
+    def _stats(self, cand, trades, equity) -> dict:
+        if equity.empty:
+            return {}
+        peak = equity.cummax()
+        n_years = max((equity.index[-1] - equity.index[0]).days / 365.25, 1 / 365.25)
+        final = equity.iloc[-1]
+        return {
+            'Total Return [%]': (final / self.init_cash - 1) * 100,
+            'CAGR [%]': ((final / self.init_cash) ** (1 / n_years) - 1) * 100 if final > 0 else -100.0,
+            'Max Drawdown [%]': ((peak - equity) / peak).max() * 100,
+            'Candidates': len(cand),
+            'Total Trades': len(trades),
+            'Win Rate [%]': (trades['pnl'] > 0).mean() * 100 if len(trades) else np.nan,
+            'Skipped (Slots)': int((cand['skip_reason'] == SKIP_SLOTS).sum()),
+            'Skipped (Cash)': int((cand['skip_reason'] == SKIP_CASH).sum()),
+            'Skipped (Holding)': int((cand['skip_reason'] == SKIP_HOLDING).sum()),
+        }
+
+
+if __name__ == "__main__":
+    candidates = build_candidate_panel(backtester_kwargs={'stop_loss': 0.03},
+                                       run_kwargs={'value_limit': 10_000_000_000})
+    if candidates is not None:
+        for max_positions in (3, 5, 10):
+            result = PortfolioSimulator(max_positions=max_positions).run(candidates)
+            print(f"\n[포트폴리오] 최대 보유 {max_positions}종목")
+            for key, value in result['stats'].items():
+                print(f"  {key:<20}: {value:,.2f}" if isinstance(value, float) else f"  {key:<20}: {value:,}")
@@ -0,0 +1,137 @@
+"""
+백테스트 결과 캐시
+
+(종목, 봉 데이터 체크섬, 전략 클래스 + 파라미터 해시, 엔진 버전) 키로 종목별 요약 통계와 거래 내역을 저장합니다.
+키가 같으면 저장된 결과를 그대로 반환하고, 데이터가 갱신되었거나 파라미터/엔진이 바뀐 종목만 다시 계산합니다.
+
+- 데이터 체크섬: 분봉/일봉 파일 내용 해시 (blake2b). 파일 크기 + 수정 시각이 같으면 이전 해시를 재사용하므로
+  일일 재실행 시 실제로 해시를 다시 계산하는 것은 변경된 파일뿐입니다.
+- 엔진 버전: VolatilityBacktestByVBT.ENGINE_VERSION (체결/지표 로직 변경 시 올림)
+- 저장 구조: index.parquet (ticker, key, 마지막 사용 시각) + entries/{ticker}/{key}.pkl ({'key', 'stats', 'trades'})
+  종목마다 키 여러 개를 보관하므로 파라미터를 바꿨다가 되돌려도 이전 결과를 재사용합니다.
+- 정리 정책: 종목별로 최근 사용한 키 max_keys개만 남기고 나머지 항목 파일은 삭제 (LRU)
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+
+def params_hash(strategy: str, params: dict) -> str:
+    """전략 식별자 + 파라미터(키 정렬 JSON)의 해시"""
+    payload = json.dumps({'strategy': strategy, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root=None, max_keys=4):
+        """
+        :param root: 캐시 루트 디렉토리
+        :param max_keys: 종목별로 보관할 키 수 (초과 시 가장 오래 사용하지 않은 항목부터 삭제)
+        """
+        if max_keys < 1:
+            raise ValueError("max_keys는 1 이상이어야 합니다.")
+        self.root = root or os.path.join('data', 'backtest', 'volatility', 'cache', 'results')
+        self.max_keys = max_keys
+        self.entry_dir = os.path.join(self.root, 'entries')
+        self.index_path = os.path.join(self.root, 'index.parquet')
+        self.digest_path = os.path.join(self.root, 'file_digests.parquet')
+
+        # {ticker: {key: 마지막 사용 시각(ns)}}
+        self.index = {}
+        if os.path.exists(self.index_path):
+            df = pd.read_parquet(self.index_path)
+            used = df['used'] if 'used' in df.columns else pd.Series(0, index=df.index)
+            for ticker, key, last in zip(df['ticker'], df['key'], used):
+                self.index.setdefault(str(ticker), {})[key] = int(last)
+        # {path: (size, mtime_ns, digest)} - 파일이 바뀌지 않았으면 해시 재계산 생략
+        digests = pd.read_parquet(self.digest_path) if os.path.exists(self.digest_path) else pd.DataFrame()
+        self.digests = {row.path: (row.size, row.mtime_ns, row.digest) for row in digests.itertuples()}
+
+    # ---------------------------------------------------------------
+    # 1. 키 계산
+    # ---------------------------------------------------------------
+
+    def file_digest(self, path) -> str:
+        """파일 내용 해시 (없는 파일은 'missing'). 크기/수정 시각이 같으면 저장된 해시 재사용"""
+        if not os.path.exists(path):
+            return 'missing'
+        st = os.stat(path)
+        cached = self.digests.get(path)
+        if cached is not None and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        digest = h.hexdigest()
+        self.digests[path] = (st.st_size, st.st_mtime_ns, digest)
+        return digest
+
+    def key(self, ticker, data_paths, strategy_hash, engine_version) -> str:
+        """(종목, 데이터 체크섬, 전략 해시, 엔진 버전) 캐시 키"""
+        parts = [str(ticker), strategy_hash, str(engine_version)] + [self.file_digest(p) for p in data_paths]
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+    # ---------------------------------------------------------------
+    # 2. 조회 / 저장
+    # ---------------------------------------------------------------
+
+    def entry_path(self, ticker, key) -> str:
+        return os.path.join(self.entry_dir, str(ticker), f"{key}.pkl")
+
+    def is_hit(self, ticker, key) -> bool:
+        return key in self.index.get(str(ticker), {})
+
+    def get(self, ticker, key):
+        """
+        캐시된 결과 조회 (적중 시 마지막 사용 시각 갱신)
+        :return: {'stats', 'trades'} 또는 None (키 없음/파일 손상)
+        """
+        if not self.is_hit(ticker, key):
+            return None
+        try:
+            entry = pd.read_pickle(self.entry_path(ticker, key))
+        except Exception:
+            return None
+        if entry.get('key') != key:
+            return None
+        self.index[str(ticker)][key] = time.time_ns()
+        return {'stats': entry['stats'], 'trades': entry['trades']}
+
+    def put(self, ticker, key, stats, trades):
+        """종목 결과 저장 후 종목별 max_keys 초과분 정리 (index는 save()에서 기록)"""
+        path = self.entry_path(ticker, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 임시 파일에 쓴 뒤 교체 - 쓰는 도중 중단되어도 같은 키의 손상된 항목이 남지 않음
+        pd.to_pickle({'key': key, 'stats': stats, 'trades': trades}, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        keys = self.index.setdefault(str(ticker), {})
+        keys[key] = time.time_ns()
+        self._prune(str(ticker))
+
+    def _prune(self, ticker):
+        """종목의 키가 max_keys를 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+        keys = self.index[ticker]
+        for key in sorted(keys, key=keys.get)[:max(0, len(keys) - self.max_keys)]:
+            del keys[key]
+            try:
+                os.remove(self.entry_path(ticker, key))
+            except FileNotFoundError:
+                pass
+
+    def save(self):
+        """index와 파일 해시 기록을 저장합니다."""
+        os.makedirs(self.root, exist_ok=True)
+        rows = [(t, k, used) for t, keys in self.index.items() for k, used in keys.items()]
+        pd.DataFrame(rows, columns=['ticker', 'key', 'used']).to_parquet(self.index_path, index=False)
+        pd.DataFrame(
+            [(p, s, m, d) for p, (s, m, d) in self.digests.items()],
+            columns=['path', 'size', 'mtime_ns', 'digest']).to_parquet(self.digest_path, index=False)
@@ -0,0 +1,356 @@
+"""
+거래 피처 테이블 임계값 규칙 탐색 (rule mining)
+
+`vol_spike > 1.5 & rsi_min > 60 & mom_10 > 0.5` 같은 필터 조합을 히스토그램 눈대중 대신
+기대값 / 손익비 / 총수익 기준으로 찾습니다. 후보마다 DataFrame을 다시 거르지 않고
+
+1. 피처별 분위수 임계값 후보 T개로 값을 정수 코드로 한 번만 변환 (코드 c = 값보다 작은 임계값 수)
+   -> `x > t[j]` 는 c >= j+1, `x <= t[j]` 는 c < j+1 (NaN은 버림 코드로 두 방향 모두 불충족)
+2. 1단계: 피처별 코드 히스토그램(거래 수/승리 수/수익 합/이익 합)의 누적합으로 전 임계값 x 방향을 한 번에 평가
+3. 2단계: 전 피처 쌍의 2-D 히스토그램(numba, 쌍 단위 병렬) + 2-D 누적합으로 전 임계값 조합을 평가
+4. 3단계 이상: 직전 단계 상위 beam개 규칙의 충족 거래만 모아 나머지 피처의 1-D 히스토그램 + 누적합으로 확장
+
+- 최소 지지도(min_support) 미만, 또는 조건 하나를 빼도 거래 수가 같은(의미 없는 조건) 규칙은 제외
+- 결과 규칙은 Strategy.Rule 목록(to_rules)으로 바꿔 apply_rules / Strategy.evaluate_rules로 그대로 적용
+- 같은 표본에서 고른 규칙이므로 다른 기간(예: halving_search의 최종 구간)에서 다시 확인할 것
+
+    rules = mine_rules(df, ['m_vol_spike', 'm_rsi', 'm_mom_10'], profit='return', min_support=200)
+    filtered = df[apply_rules(df, rules.iloc[0]['conditions'])]
+"""
+import time
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+from BackTest.binned_stats import _WIN_SHIFT
+from Strategy.strategy import Rule, Strategy
+
+# 조건 방향 (코드 공간: '>' = [s, B), '<=' = [0, s))
+OPS = ('>', '<=')
+OBJECTIVES = ('expectancy', 'profit_factor', 'total', 'win_rate')
+
+# 통계 축 순서: 거래 수, 승리 수, 수익 합, 이익 합(수익 > 0인 거래의 합)
+_COUNT, _WINS, _PSUM, _GAIN = range(4)
+
+
+# ---------------------------------------------------------------
+# 1. 임계값 후보 / 코드
+# ---------------------------------------------------------------
+
+def threshold_codes(df: pd.DataFrame, features, n_thresholds: int = 20):
+    """
+    피처별 분위수 임계값 후보와 코드 행렬
+    :param n_thresholds: 피처별 임계값 후보 수 (거래 수 등분 분위수, 중복 제거로 더 적을 수 있음)
+    :return: (피처 수 x 거래 수) uint8 코드 (NaN = 구간 수), [피처별 임계값 배열], 구간 수
+    """
+    if n_thresholds >= 254:
+        raise ValueError("임계값 후보는 253개 이하여야 합니다.")
+    q = np.linspace(0, 1, n_thresholds + 2)[1:-1]
+    values, thresholds = [], []
+    for col in features:
+        x = df[col].to_numpy(dtype=np.float64)
+        finite = x[np.isfinite(x)]
+        values.append(x)
+        thresholds.append(np.unique(np.quantile(finite, q)) if len(finite) else np.empty(0))
+    n_bins = max(len(t) for t in thresholds) + 1
+
+    codes = np.empty((len(features), len(df)), dtype=np.uint8)
+    for j, (x, thr) in enumerate(zip(values, thresholds)):
+        c = np.searchsorted(thr, x, side='left')
+        c[~np.isfinite(x)] = n_bins
+        codes[j] = c
+    return codes, thresholds, n_bins
+
+
+# ---------------------------------------------------------------
+# 2. numba 히스토그램 커널
+# ---------------------------------------------------------------
+
+@njit(cache=True)
+def _rule_index(codes, feats, lo, hi):
+    """조건(피처 행, 코드 범위 [lo, hi))을 모두 충족하는 거래 위치"""
+    n = codes.shape[1]
+    out = np.empty(n, dtype=np.int64)
+    k = 0
+    for i in range(n):
+        ok = True
+        for j in range(len(feats)):
+            c = codes[feats[j], i]
+            if c < lo[j] or c >= hi[j]:
+                ok = False
+                break
+        if ok:
+            out[k] = i
+            k += 1
+    return out[:k]
+
+
+@njit(parallel=True, cache=True)
+def _subset_kernel(codes, idx, n_cells, packed, profit, gain):
+    """
+    거래 부분집합(idx)에 대한 피처별 1-D 히스토그램 (피처 단위 병렬)
+    :return: (피처 수 x n_cells) 묶음 누적값(거래 수 + 승리 수 << 32), 수익 합, 이익 합
+    """
+    n_feats = codes.shape[0]
+    acc = np.zeros((n_feats, n_cells), dtype=np.int64)
+    psum = np.zeros((n_feats, n_cells), dtype=np.float64)
+    gsum = np.zeros((n_feats, n_cells), dtype=np.float64)
+    for f in prange(n_feats):
+        x = codes[f]
+        for i in idx:
+            c = x[i]
+            acc[f, c] += packed[i]
+            psum[f, c] += profit[i]
+            gsum[f, c] += gain[i]
+    return acc, psum, gsum
+
+
+@njit(parallel=True, cache=True)
+def _pair_kernel(codes, pairs, n_cells, packed, profit, gain):
+    """
+    피처 쌍별 2-D 히스토그램 (쌍 단위 병렬, NaN 코드는 버림 칸으로 분기 없이 누적)
+    :return: (쌍 수 x n_cells^2) 묶음 누적값, 수익 합, 이익 합
+    """
+    n_pairs = pairs.shape[0]
+    acc = np.zeros((n_pairs, n_cells * n_cells), dtype=np.int64)
+    psum = np.zeros((n_pairs, n_cells * n_cells), dtype=np.float64)
+    gsum = np.zeros((n_pairs, n_cells * n_cells), dtype=np.float64)
+    for p in prange(n_pairs):
+        xa = codes[pairs[p, 0]]
+        xb = codes[pairs[p, 1]]
+        for i in range(codes.shape[1]):
+            c = np.int64(xa[i]) * n_cells + xb[i]
+            acc[p, c] += packed[i]
+            psum[p, c] += profit[i]
+            gsum[p, c] += gain[i]
+    return acc, psum, gsum
+
+
+def _stack(acc, psum, gsum) -> np.ndarray:
+    """커널 출력 -> 마지막 축 (거래 수, 승리 수, 수익 합, 이익 합) float64"""
+    counts = (acc & ((1 << _WIN_SHIFT) - 1)).astype(np.float64)
+    wins = (acc >> _WIN_SHIFT).astype(np.float64)
+    return np.stack([counts, wins, psum, gsum], axis=-1)
+
+
+# ---------------------------------------------------------------
+# 3. 누적합 -> 규칙 통계 / 점수
+# ---------------------------------------------------------------
+
+def _ranges(n_bins: int):
+    """방향별 코드 범위 [lo, hi) - 분할점 s = 1..n_bins-1 (s = 임계값 위치 + 1)"""
+    s = np.arange(1, n_bins)
+    return {0: (s, np.full_like(s, n_bins)), 1: (np.zeros_like(s), s)}
+
+
+def _rules_1d(hist: np.ndarray, n_bins: int) -> np.ndarray:
+    """(..., n_bins+1, 4) 히스토그램 -> (..., 방향 2, 분할점 n_bins-1, 4) 규칙 통계"""
+    cum = np.zeros(hist.shape[:-2] + (n_bins + 1, 4))
+    cum[..., 1:, :] = np.cumsum(hist[..., :n_bins, :], axis=-2)
+    out = []
+    for op in (0, 1):
+        lo, hi = _ranges(n_bins)[op]
+        out.append(cum[..., hi, :] - cum[..., lo, :])
+    return np.stack(out, axis=-3)
+
+
+def _rules_2d(hist: np.ndarray, n_bins: int) -> np.ndarray:
+    """(쌍, n_bins+1, n_bins+1, 4) 히스토그램 -> (쌍, 방향 2, 방향 2, 분할점, 분할점, 4) 규칙 통계"""
+    cum = np.zeros((hist.shape[0], n_bins + 1, n_bins + 1, 4))
+    cum[:, 1:, 1:] = hist[:, :n_bins, :n_bins].cumsum(axis=1).cumsum(axis=2)
+    ranges = _ranges(n_bins)
+    out = np.empty((hist.shape[0], 2, 2, n_bins - 1, n_bins - 1, 4))
+    for oa in (0, 1):
+        r0, r1 = ranges[oa][0][:, None], ranges[oa][1][:, None]
+        for ob in (0, 1):
+            c0, c1 = ranges[ob][0][None, :], ranges[ob][1][None, :]
+            out[:, oa, ob] = cum[:, r1, c1] - cum[:, r0, c1] - cum[:, r1, c0] + cum[:, r0, c0]
+    return out
+
+
+def _metrics(stats: np.ndarray) -> dict:
+    """규칙 통계(마지막 축 4) -> 거래 수/승률/기대값/손익비/총수익"""
+    count = stats[..., _COUNT]
+    psum, gain = stats[..., _PSUM], stats[..., _GAIN]
+    loss = gain - psum
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'count': count,
+            'win_rate': stats[..., _WINS] / count,
+            'expectancy': psum / count,
+            'profit_factor': np.where(loss > 1e-12, gain / loss, np.inf),
+            'total': psum,
+        }
+
+
+def _score(stats: np.ndarray, objective: str, min_support: float) -> np.ndarray:
+    """목적 함수 값, 최소 지지도 미만은 -inf"""
+    score = _metrics(stats)[objective]
+    return np.where(stats[..., _COUNT] >= min_support, score, -np.inf)
+
+
+def _top(score: np.ndarray, k: int) -> np.ndarray:
+    """유효(-inf 아님) 점수 상위 k개의 평탄화 위치 (점수 내림차순)"""
+    flat = score.ravel()
+    valid = np.flatnonzero(flat > -np.inf)
+    if len(valid) > k:
+        valid = valid[np.argpartition(-flat[valid], k - 1)[:k]]
+    return valid[np.argsort(-flat[valid], kind='stable')]
+
+
+# ---------------------------------------------------------------
+# 4. 탐색
+# ---------------------------------------------------------------
+
+def mine_rules(df: pd.DataFrame, features, profit='return', is_win='is_win', objective: str = 'expectancy',
+               n_thresholds: int = 20, max_depth: int = 3, min_support=100, beam: int = 200, top: int = 50,
+               pair_chunk: int = 256) -> pd.DataFrame:
+    """
+    임계값 규칙 AND 조합 탐색
+
+    :param df: 거래 피처 테이블 (FeatureStore.scan() 등)
+    :param features: 탐색할 숫자 피처 컬럼
+    :param profit: 거래별 수익률 컬럼 (NaN 거래 제외)
+    :param is_win: 승리 여부 컬럼 (None이거나 없으면 수익 > 0)
+    :param objective: 'expectancy'(평균 수익) / 'profit_factor' / 'total'(수익 합) / 'win_rate'
+    :param n_thresholds: 피처별 임계값 후보 수
+    :param max_depth: 최대 조건 수 (1, 2는 전수 평가, 3 이상은 빔 확장)
+    :param min_support: 최소 거래 수 (1 미만 실수면 전체 거래 대비 비율)
+    :param beam: 다음 단계로 확장할 단계별 상위 규칙 수
+    :param top: 반환할 규칙 수
+    :param pair_chunk: 2단계 히스토그램을 한 번에 계산할 쌍 수 (메모리 상한)
+    :return: 목적 함수 내림차순 규칙 DataFrame
+             (rule, depth, count, support, win_rate, expectancy, profit_factor, total, conditions)
+             attrs['evaluated'] = 평가한 후보 규칙 수, attrs['elapsed'] = 소요 초
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective는 {OBJECTIVES} 중 하나여야 합니다: {objective}")
+    start = time.perf_counter()
+    features = list(features)
+
+    p = df[profit].to_numpy(dtype=np.float64)
+    keep = np.isfinite(p)
+    data = df[keep]
+    p = np.ascontiguousarray(p[keep])
+    win = data[is_win].to_numpy(dtype=np.int64) if is_win and is_win in data.columns else (p > 0).astype(np.int64)
+    packed = 1 + (win << _WIN_SHIFT)
+    gain = np.maximum(p, 0.0)
+    n_trades = len(data)
+    if min_support < 1:
+        min_support = min_support * n_trades
+    min_support = max(float(min_support), 1.0)
+
+    codes, thresholds, n_bins = threshold_codes(data, features, n_thresholds)
+    n_cells = n_bins + 1
+    # 임계값 수가 적은 피처의 없는 분할점은 제외 (피처, 분할점 s-1)
+    split_ok = np.array([np.arange(1, n_bins) <= len(t) for t in thresholds]).reshape(len(features), n_bins - 1)
+
+    pool = []  # (조건 튜플, 통계) - 조건 = (피처 행, 방향, 분할점)
+    evaluated = 0
+    keep_k = max(top, beam)
+
+    # 1단계: 전 피처 x 방향 x 임계값
+    all_idx = np.arange(n_trades, dtype=np.int64)
+    hist1 = _stack(*_subset_kernel(codes, all_idx, n_cells, packed, p, gain))
+    single = _rules_1d(hist1, n_bins)  # (피처, 방향, 분할점, 4)
+    evaluated += int(split_ok.sum()) * 2
+    score1 = _score(single, objective, min_support)
+    score1[~np.broadcast_to(split_ok[:, None, :], score1.shape)] = -np.inf
+    level = []
+    for flat in _top(score1, keep_k):
+        f, op, s = np.unravel_index(flat, score1.shape)
+        conds = ((int(f), int(op), int(s) + 1),)
+        pool.append((conds, single[f, op, s]))
+        level.append((conds, single[f, op, s]))
+
+    # 2단계: 전 피처 쌍 x 방향 조합 x 임계값 조합
+    if max_depth >= 2 and len(features) >= 2:
+        pairs = np.array([(a, b) for a in range(len(features)) for b in range(a + 1, len(features))], dtype=np.int64)
+        best = []  # (점수, 쌍 위치, 방향a, 방향b, 분할점a, 분할점b, 통계)
+        for c0 in range(0, len(pairs), pair_chunk):
+            chunk = pairs[c0:c0 + pair_chunk]
+            acc, psum, gsum = _pair_kernel(codes, chunk, n_cells, packed, p, gain)
+            hist2 = _stack(acc, psum, gsum).reshape(len(chunk), n_cells, n_cells, 4)
+            both = _rules_2d(hist2, n_bins)  # (쌍, 방향a, 방향b, 분할점a, 분할점b, 4)
+            ok = (split_ok[chunk[:, 0]][:, None, None, :, None] & split_ok[chunk[:, 1]][:, None, None, None, :])
+            evaluated += int(ok.sum()) * 4
+            score2 = _score(both, objective, min_support)
+            # 두 조건이 모두 거래 수를 줄여야 의미 있는 조합
+            n_a = single[chunk[:, 0]][..., _COUNT][:, :, None, :, None]
+            n_b = single[chunk[:, 1]][..., _COUNT][:, None, :, None, :]
+            n2 = both[..., _COUNT]
+            score2[~(ok & (n2 < n_a) & (n2 < n_b))] = -np.inf
+            for flat in _top(score2, keep_k):
+                idx = np.unravel_index(flat, score2.shape)
+                best.append((score2[idx], c0 + idx[0], *map(int, idx[1:]), both[idx]))
+        best.sort(key=lambda r: -r[0])
+        level = []
+        for _, pi, oa, ob, sa, sb, stats in best[:keep_k]:
+            a, b = pairs[pi]
+            conds = ((int(a), oa, sa + 1), (int(b), ob, sb + 1))
+            pool.append((conds, stats))
+            level.append((conds, stats))
+
+    # 3단계 이상: 빔 확장 (직전 단계 상위 beam개 규칙 x 나머지 피처 x 방향 x 임계값)
+    ranges = _ranges(n_bins)
+    for _ in range(3, max_depth + 1):
+        seen, cand = set(), []
+        for conds, parent in level[:beam]:
+            feats = np.array([c[0] for c in conds], dtype=np.int64)
+            lo = np.array([ranges[op][0][s - 1] for _, op, s in conds], dtype=np.int64)
+            hi = np.array([ranges[op][1][s - 1] for _, op, s in conds], dtype=np.int64)
+            idx = _rule_index(codes, feats, lo, hi)
+            ext = _rules_1d(_stack(*_subset_kernel(codes, idx, n_cells, packed, p, gain)), n_bins)
+            ok = split_ok.copy()
+            ok[feats] = False
+            evaluated += int(ok.sum()) * 2
+            score = _score(ext, objective, min_support)
+            score[~(np.broadcast_to(ok[:, None, :], score.shape) & (ext[..., _COUNT] < parent[_COUNT]))] = -np.inf
+            for flat in _top(score, keep_k):
+                f, op, s = np.unravel_index(flat, score.shape)
+                new = tuple(sorted(conds + ((int(f), int(op), int(s) + 1),)))
+                if new not in seen:
+                    seen.add(new)
+                    cand.append((score[f, op, s], new, ext[f, op, s]))
+        cand.sort(key=lambda r: -r[0])
+        level = [(conds, stats) for _, conds, stats in cand[:keep_k]]
+        pool.extend(level)
+        if not level:
+            break
+
+    rows = []
+    for conds, stats in pool:
+        named = tuple((features[f], OPS[op], float(thresholds[f][s - 1])) for f, op, s in conds)
+        m = _metrics(stats)
+        rows.append({
+            'rule': ' & '.join(f"{col} {op} {thr:.6g}" for col, op, thr in named),
+            'depth': len(conds),
+            'count': int(m['count']),
+            'support': m['count'] / n_trades,
+            'win_rate': float(m['win_rate']),
+            'expectancy': float(m['expectancy']),
+            'profit_factor': float(m['profit_factor']),
+            'total': float(m['total']),
+            'conditions': named,
+        })
+    result = pd.DataFrame(rows, columns=['rule', 'depth', 'count', 'support', 'win_rate', 'expectancy',
+                                         'profit_factor', 'total', 'conditions'])
+    result = result.sort_values([objective, 'count'], ascending=False, kind='stable').head(top).reset_index(drop=True)
+    result.attrs['evaluated'] = evaluated
+    result.attrs['elapsed'] = time.perf_counter() - start
+    return result
+
+
+# ---------------------------------------------------------------
+# 5. 규칙 적용
+# ---------------------------------------------------------------
+
+def to_rules(conditions, desc: str = '탐색 규칙') -> list:
+    """mine_rules 결과의 conditions -> Strategy.Rule 목록 (ENTRY_RULES / apply_filters에 그대로 사용)"""
+    return [Rule(col, op, thr, desc) for col, op, thr in conditions]
+
+
+def apply_rules(df: pd.DataFrame, conditions) -> np.ndarray:
+    """조건(또는 Rule 목록)을 모두 충족하는 행의 bool 배열"""
+    rules = [c if isinstance(c, Rule) else Rule(*c) for c in conditions]
+    return Strategy.evaluate_rules(rules, df)
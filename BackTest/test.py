@@ -1,6 +1,13 @@
 import vectorbt as vbt
 import pandas as pd
 import os
+import sys
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Indicators.daily_join import join_daily_features
 
 class VolatilityBacktester:
     def __init__(self, slippage=0.001, fees=0.00015, tax=0.002, stop_loss=0.03, k=0.5):
@@ -60,12 +67,9 @@ class VolatilityBacktester:
             # --- 2. 분봉 데이터에 타겟가 매핑 ---
             m_df['date'] = m_df.index.date
             
-            # 매핑을 위한 시리즈 준비
-            target_map = target_price.copy()
-            target_map.index = target_map.index.date
-            
-            # 매핑 실행
-            m_df['target_price'] = m_df['date'].map(target_map)
+            # 같은 날짜의 일봉 타겟가를 세션 단위 as-of 결합으로 한 번에 매핑 (lag=0: 당일 시가 기반 값)
+            m_df['target_price'] = join_daily_features(m_df, target_price.to_frame('target_price'),
+                                                       ['target_price'], lag=0)['target_price'].to_numpy()
             
             # [디버깅 1] 타겟가가 제대로 들어갔는지 확인
             nan_count = m_df['target_price'].isna().sum()
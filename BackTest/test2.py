@@ -1,27 +1,33 @@
 import pandas as pd
-import glob
 import os
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+import sys
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Indicators.window_sweep import rolling_sweep
+from BackTest.trade_store import TradeStore
+from Indicators.trade_join import join_trade_features
 
 # 1. 경로 설정
-trade_dir = r'data\backtest\volatility\result'
 chart_dir = r'data\chart\daily'
 
 analysis_data = []
-trade_files = glob.glob(os.path.join(trade_dir, 'trades_*.parquet'))
+# 전 종목 거래 내역을 저장소에서 한 번에 스캔 (최근 run)
+trades_by_ticker = TradeStore().by_ticker(columns=['entry_date', 'pnl'])
 
-print(f"총 {len(trade_files)}개의 파일을 분석합니다...")
+print(f"총 {len(trades_by_ticker)}개 종목을 분석합니다...")
 
-for trade_file in trade_files:
+for ticker, df_t in trades_by_ticker.items():
     try:
-        ticker = os.path.basename(trade_file).replace('trades_', '').replace('.parquet', '')
         chart_file = os.path.join(chart_dir, f"{ticker}.parquet")
         
         if not os.path.exists(chart_file): continue
             
-        df_t = pd.read_parquet(trade_file)
         df_c = pd.read_parquet(chart_file)
         
         if df_t.empty or df_c.empty: continue
@@ -36,20 +42,15 @@ for trade_file in trade_files:
 
         # 2. 지표 계산 (이평선, 기울기, 이격도)
         df_c = df_c.sort_values('match_date')
-        for w in [5, 10, 20]:
-            ma = df_c['close'].rolling(window=w).mean()
-            # 기울기 (%)
-            df_c[f'slope{w}'] = ((ma / ma.shift(1)) - 1) * 100
-            # 이격도 (%): (현재가 / 이평선 - 1) * 100
-            df_c[f'disp{w}'] = ((df_c['close'] / ma) - 1) * 100
+        # 기울기 (%) 및 이격도 (%): (현재가 / 이평선 - 1) * 100 을 윈도우별로 일괄 계산
+        sweep = rolling_sweep(df_c['close'], windows=[5, 10, 20], stats=('slope', 'disp'))
+        df_c = pd.concat([df_c, sweep], axis=1)
             
-        # 진입 전날의 지표를 매칭하기 위해 shift(1)
-        indicator_cols = ['match_date', 'slope5', 'slope10', 'slope20', 'disp5', 'disp10', 'disp20']
-        df_ind = df_c[indicator_cols].copy()
-        df_ind.iloc[:, 1:] = df_ind.iloc[:, 1:].shift(1)
-        
-        # 3. 데이터 병합
-        merged = pd.merge(df_t, df_ind, on='match_date', how='inner')
+        # 3. 진입 전날까지 확정된 지표를 전 거래에 한 번에 결합 (as-of, 전일 행 기준)
+        indicator_cols = ['slope5', 'slope10', 'slope20', 'disp5', 'disp10', 'disp20']
+        df_ind = df_c.set_index('match_date')[indicator_cols]
+        merged = join_trade_features(df_t, df_ind, columns=indicator_cols, time_col='match_date', lag=1,
+                                     by_day=True, how='inner')
         if merged.empty: continue
 
         # 수익 여부 판단
@@ -1,24 +1,29 @@
 import pandas as pd
-import glob
 import os
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+import sys
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.trade_store import TradeStore
+from Indicators.trade_join import join_trade_features
 
 # 1. 경로 설정
-trade_dir = r'data\backtest\volatility\result'
 chart_dir = r'data\chart\daily'
 
 analysis_data = []
-trade_files = glob.glob(os.path.join(trade_dir, 'trades_*.parquet'))
+# 전 종목 거래 내역을 저장소에서 한 번에 스캔 (최근 run)
+trades_by_ticker = TradeStore().by_ticker(columns=['entry_date', 'pnl'])
 
-for trade_file in trade_files:
+for ticker, df_t in trades_by_ticker.items():
     try:
-        ticker = os.path.basename(trade_file).replace('trades_', '').replace('.parquet', '')
         chart_file = os.path.join(chart_dir, f"{ticker}.parquet")
         if not os.path.exists(chart_file): continue
             
-        df_t = pd.read_parquet(trade_file)
         df_c = pd.read_parquet(chart_file)
         
         # 날짜 정규화 (시간 제거)
@@ -33,11 +38,9 @@ for trade_file in trade_files:
         df_c['slope20'] = ((ma20 / ma20.shift(1)) - 1) * 100
         df_c['disp20'] = ((df_c['close'] / ma20) - 1) * 100
             
-        # 전날 지표 매칭
-        df_ind = df_c[['match_date', 'slope20', 'disp20']].copy()
-        df_ind[['slope20', 'disp20']] = df_ind[['slope20', 'disp20']].shift(1)
-        
-        merged = pd.merge(df_t, df_ind, on='match_date', how='inner')
+        # 전날 지표 매칭 (as-of 결합: 진입일보다 엄격히 이전인 마지막 일봉 행)
+        df_ind = df_c.set_index('match_date')[['slope20', 'disp20']]
+        merged = join_trade_features(df_t, df_ind, time_col='match_date', lag=1, by_day=True, how='inner')
         p_col = next((c for c in ['profit_rate', 'pnl', 'profit'] if c in merged.columns), None)
         merged['is_win'] = merged[p_col] > 0
         
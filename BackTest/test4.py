@@ -1,26 +1,32 @@
 import pandas as pd
-import glob
 import os
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+import sys
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.trade_store import TradeStore
+from Indicators.trade_join import join_trade_features
+from BackTest.binned_stats import heatmap
 
 # 1. 경로 설정
-trade_dir = r'data\backtest\volatility\result'
 chart_dir = r'data\chart\daily'
 
 analysis_data = []
-trade_files = glob.glob(os.path.join(trade_dir, 'trades_*.parquet'))
+# 전 종목 거래 내역을 저장소에서 한 번에 스캔 (최근 run)
+trades_by_ticker = TradeStore().by_ticker(columns=['entry_date', 'pnl'])
 
-print(f"총 {len(trade_files)}개 파일을 분석하여 최적 구간을 탐색합니다...")
+print(f"총 {len(trades_by_ticker)}개 종목을 분석하여 최적 구간을 탐색합니다...")
 
-for trade_file in trade_files:
+for ticker, df_t in trades_by_ticker.items():
     try:
-        ticker = os.path.basename(trade_file).replace('trades_', '').replace('.parquet', '')
         chart_file = os.path.join(chart_dir, f"{ticker}.parquet")
         if not os.path.exists(chart_file): continue
             
-        df_t = pd.read_parquet(trade_file)
         df_c = pd.read_parquet(chart_file)
         
         # 날짜 전처리
@@ -35,11 +41,9 @@ for trade_file in trade_files:
         df_c['slope5'] = ((ma5 / ma5.shift(1)) - 1) * 100
         df_c['disp5'] = ((df_c['close'] / ma5) - 1) * 100
             
-        # 진입 전날 지표 매칭 (Shift 1)
-        df_ind = df_c[['match_date', 'slope5', 'disp5']].copy()
-        df_ind[['slope5', 'disp5']] = df_ind[['slope5', 'disp5']].shift(1)
-        
-        merged = pd.merge(df_t, df_ind, on='match_date', how='inner')
+        # 진입 전날 지표 매칭 (as-of 결합: 진입일보다 엄격히 이전인 마지막 일봉 행)
+        df_ind = df_c.set_index('match_date')[['slope5', 'disp5']]
+        merged = join_trade_features(df_t, df_ind, time_col='match_date', lag=1, by_day=True, how='inner')
         p_col = next((c for c in ['profit_rate', 'pnl', 'profit'] if c in merged.columns), None)
         
         # 승률 계산용 (Win=1, Loss=0)
@@ -58,17 +62,14 @@ else:
     s_min, s_max = df['slope5'].quantile([0.05, 0.95])
     d_min, d_max = df['disp5'].quantile([0.05, 0.95])
     
-    # 10개 구간으로 등분
-    df['slope_bin'] = pd.cut(df['slope5'], bins=np.linspace(s_min, s_max, 11))
-    df['disp_bin'] = pd.cut(df['disp5'], bins=np.linspace(d_min, d_max, 11))
-    
-    # 3. 구간별 승률 데이터 생성 (Pivot Table)
+    # 10개 구간으로 등분 → 구간별 승률/거래 수를 bincount로 한 번에 계산 (BackTest/binned_stats.py)
     # mean은 승률, count는 해당 구간의 거래 횟수
-    pivot = df.pivot_table(index='disp_bin', columns='slope_bin', values='is_win', aggfunc=['mean', 'count'])
+    grid = heatmap(df['slope5'].to_numpy(), df['disp5'].to_numpy(), df['is_win'].to_numpy(),
+                   x_edges=np.linspace(s_min, s_max, 11), y_edges=np.linspace(d_min, d_max, 11))
     
     # 4. 히트맵 시각화
     plt.figure(figsize=(15, 10))
-    win_rate = pivot['mean'] * 100
+    win_rate = grid['win_rate'] * 100
     
     # 거래 횟수가 너무 적은 구간(전체의 0.5% 미만)은 신뢰도가 낮으므로 마스킹 처리할 수 있음
     sns.heatmap(win_rate, annot=True, fmt=".1f", cmap='RdYlBu', center=df['is_win'].mean()*100)
@@ -82,7 +83,7 @@ else:
 
     # 5. 최적값 상위 5개 구간 출력 (최소 거래 건수 보장)
     min_count = len(df) * 0.01 # 최소 전체 거래의 1% 이상인 구간만
-    valid_zones = win_rate[pivot['count'] >= min_count].stack().sort_values(ascending=False).head(5)
+    valid_zones = win_rate[grid['count'] >= min_count].stack().sort_values(ascending=False).head(5)
     
     print("\n" + "="*50)
     print(f"분석된 총 거래 건수: {len(df)}건")
@@ -90,4 +91,6 @@ else:
     print("="*50)
     print("--- [검증된 최적의 5MA 구간 TOP 5] ---")
     for (disp, slope), wr in valid_zones.items():
-        print(f"승률: {wr:.2f}% | 기울기 구간: {slope} | 이격도 구간: {disp}")
\ No newline at end of file
+        lo, hi = grid['ci_low'].loc[disp, slope] * 100, grid['ci_high'].loc[disp, slope] * 100
+        print(f"승률: {wr:.2f}% (95% CI {lo:.1f}~{hi:.1f}%, {int(grid['count'].loc[disp, slope])}건) "
+              f"| 기울기 구간: {slope} | 이격도 구간: {disp}")
\ No newline at end of file
@@ -0,0 +1,309 @@
+"""
+거래 내역 저장소 (단일 파티션 데이터셋)
+
+종목별 trades_{ticker}.parquet 수천 개 대신, 하나의 parquet 데이터셋에
+run_id / 월(month) 기준 hive 파티션으로 저장하고 ticker는 컬럼으로 둡니다.
+
+    data/backtest/volatility/trade_store/run_id=20260101_120000_3fa2c1/month=2025-03/part-....parquet
+
+- 기록: 백테스트 러너가 종목 결과를 버퍼에 모았다가 일정 행 수마다 한 번에 추가 (작은 파일 난립 방지)
+- 조회: scan()으로 run/기간/종목 필터와 컬럼 선택을 데이터셋 스캔 한 번에 처리 (파티션 가지치기)
+- run 순서: 루트의 _runs.json(run별 최초 기록 시각)으로 정렬 (run id 문자열 순서와 무관, 이관 run은 항상 가장 오래됨)
+  _runs.json 갱신은 잠금 파일(_runs.json.lock) 안에서 다시 읽고 쓰므로 동시에 도는 러너의 기록이 사라지지 않음
+"""
+import os
+import sys
+import glob
+import json
+import time
+import uuid
+import contextlib
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+# 거래 레코드 스키마 (vbt trades.records + 고속 시뮬레이터 exit_reason + 진입/청산 일시)
+TRADE_SCHEMA = pa.schema([
+    ('ticker', pa.string()),
+    ('id', pa.int64()),
+    ('col', pa.int64()),
+    ('size', pa.float64()),
+    ('entry_idx', pa.int64()),
+    ('entry_price', pa.float64()),
+    ('entry_fees', pa.float64()),
+    ('exit_idx', pa.int64()),
+    ('exit_price', pa.float64()),
+    ('exit_fees', pa.float64()),
+    ('pnl', pa.float64()),
+    ('return', pa.float64()),
+    ('direction', pa.int64()),
+    ('status', pa.int64()),
+    ('parent_id', pa.int64()),
+    ('exit_reason', pa.int64()),
+    ('entry_date', pa.timestamp('ns')),
+    ('exit_date', pa.timestamp('ns')),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([('run_id', pa.string()), ('month', pa.string())]), flavor='hive')
+
+
+class RunManifest:
+    """
+    run별 최초 기록 시각 목록 (root/_runs.json, '_' 접두어라 데이터셋 스캔에서 제외됨)
+    run id가 시각 형식이 아니어도(예: 'legacy') 기록 순서대로 정렬하기 위해 사용합니다.
+    """
+    FILE_NAME = '_runs.json'
+    # 이관(legacy) run의 기록 시각 - 이후의 어떤 run보다 먼저 정렬
+    LEGACY_TIME = '0000-00-00T00:00:00'
+    # 이 시간(초)보다 오래된 잠금 파일은 비정상 종료한 프로세스가 남긴 것으로 보고 제거
+    STALE_LOCK_SECONDS = 60
+
+    def __init__(self, root):
+        self.root = root
+        self.path = os.path.join(root, self.FILE_NAME)
+
+    def load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    @contextlib.contextmanager
+    def _lock(self, timeout=30.0):
+        """_runs.json 갱신 잠금 (O_EXCL로 만든 잠금 파일, 프로세스 간 공유)"""
+        os.makedirs(self.root, exist_ok=True)
+        lock_path = f"{self.path}.lock"
+        deadline = time.time() + timeout
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > self.STALE_LOCK_SECONDS:
+                        os.remove(lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.time() > deadline:
+                    raise TimeoutError(f"run 목록 잠금 대기 시간 초과: {lock_path}")
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            os.remove(lock_path)
+
+    def register(self, run_id: str, legacy: bool = False):
+        """run의 최초 기록 시각 저장 (이미 있으면 유지, 잠금 안에서 최신 목록을 다시 읽어 갱신)"""
+        if run_id in self.load():
+            return
+        with self._lock():
+            manifest = self.load()
+            if run_id in manifest:
+                return
+            manifest[run_id] = self.LEGACY_TIME if legacy else datetime.now().isoformat(timespec='microseconds')
+            tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+    def order(self, run_ids, run_dir) -> list:
+        """
+        run id를 오래된 순으로 정렬
+        목록에 없는 run(기록 시각 도입 전 저장분)은 run_dir/run_id=... 디렉터리 수정 시각을 사용
+        """
+        manifest = self.load()
+
+        def written_at(run_id):
+            if run_id in manifest:
+                return manifest[run_id]
+            mtime = os.path.getmtime(os.path.join(run_dir, f"run_id={run_id}"))
+            return datetime.fromtimestamp(mtime).isoformat(timespec='microseconds')
+
+        return sorted(run_ids, key=lambda r: (written_at(r), r))
+
+
+class TradeStore:
+    def __init__(self, root=None):
+        self.root = root or os.path.join('data', 'backtest', 'volatility', 'trade_store')
+        self.manifest = RunManifest(self.root)
+
+    @staticmethod
+    def new_run_id():
+        """
+        실행 시각 + 임의 접미어 run id (예: 20260101_120000_3fa2c1)
+        같은 초에 시작한 러너끼리 같은 run 파티션에 거래를 섞어 쓰지 않도록 접미어를 붙입니다.
+        """
+        return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+    # ---------------------------------------------------------------
+    # 1. 기록
+    # ---------------------------------------------------------------
+
+    def _to_table(self, trades_df: pd.DataFrame, run_id: str) -> pa.Table:
+        """스키마에 맞춰 정렬/형변환 (없는 컬럼은 null, 스키마 외 컬럼은 제외)"""
+        df = trades_df.reset_index(drop=True)
+        for col in ('entry_date', 'exit_date'):
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col])
+                if df[col].dt.tz is not None:
+                    df[col] = df[col].dt.tz_localize(None)
+
+        arrays = []
+        for field in TRADE_SCHEMA:
+            if field.name in df.columns:
+                arrays.append(pa.array(df[field.name].to_numpy(), type=field.type, from_pandas=True))
+            else:
+                arrays.append(pa.nulls(len(df), type=field.type))
+        table = pa.Table.from_arrays(arrays, schema=TRADE_SCHEMA)
+
+        month = df['entry_date'].dt.strftime('%Y-%m') if 'entry_date' in df.columns else pd.Series('unknown', index=df.index)
+        table = table.append_column('run_id', pa.array([run_id] * len(df), type=pa.string()))
+        return table.append_column('month', pa.array(month.to_numpy(), type=pa.string()))
+
+    def append(self, trades_df: pd.DataFrame, run_id: str, ticker: str = None):
+        """
+        거래 DataFrame을 run_id 파티션에 추가합니다.
+        :param ticker: 지정하면 ticker 컬럼을 채움 (여러 종목이 섞인 DataFrame은 ticker 컬럼 필수)
+        """
+        if trades_df is None or trades_df.empty:
+            return
+        if ticker is not None:
+            trades_df = trades_df.assign(ticker=str(ticker))
+        elif 'ticker' not in trades_df.columns:
+            raise ValueError("ticker 컬럼 또는 ticker 인자가 필요합니다.")
+
+        self.manifest.register(run_id)
+        ds.write_dataset(
+            self._to_table(trades_df, run_id), self.root, format='parquet',
+            partitioning=PARTITIONING,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+        )
+
+    def writer(self, run_id: str, flush_rows: int = 200_000):
+        """종목별 결과를 모아 flush_rows 단위로 기록하는 버퍼 writer"""
+        return TradeStoreWriter(self, run_id, flush_rows)
+
+    def import_legacy(self, result_dir=None, run_id=None):
+        """
+        기존 trades_{ticker}.parquet 파일들을 하나의 run으로 옮겨 담습니다.
+        이관 run은 가장 오래된 run으로 기록되므로 이후 latest_run()/scan() 기본값을 가리지 않습니다.
+        """
+        result_dir = result_dir or os.path.join('data', 'backtest', 'volatility', 'result')
+        run_id = run_id or 'legacy'
+        self.manifest.register(run_id, legacy=True)
+        files = glob.glob(os.path.join(result_dir, 'trades_*.parquet'))
+        with self.writer(run_id) as w:
+            for path in files:
+                ticker = os.path.basename(path).replace('trades_', '').replace('.parquet', '')
+                try:
+                    w.add(ticker, pd.read_parquet(path))
+                except Exception as e:
+                    print(f"[!] {ticker} 변환 실패: {e}")
+        print(f"[✔] {len(files)}개 파일 → run_id={run_id}")
+        return run_id
+
+    # ---------------------------------------------------------------
+    # 2. 조회
+    # ---------------------------------------------------------------
+
+    def runs(self) -> list:
+        """저장된 run id 목록 (최초 기록 시각 기준 오래된 순)"""
+        if not os.path.isdir(self.root):
+            return []
+        run_ids = [d.split('=', 1)[1] for d in os.listdir(self.root) if d.startswith('run_id=')]
+        return self.manifest.order(run_ids, self.root)
+
+    def latest_run(self):
+        runs = self.runs()
+        return runs[-1] if runs else None
+
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(self.root, format='parquet', partitioning=PARTITIONING,
+                          schema=TRADE_SCHEMA.append(pa.field('run_id', pa.string())).append(pa.field('month', pa.string())))
+
+    def scan(self, run_id=None, tickers=None, start=None, end=None, columns=None, filter=None) -> pd.DataFrame:
+        """
+        조건에 맞는 거래를 한 번의 데이터셋 스캔으로 읽습니다.
+
+        :param run_id: 조회할 run (기본: 가장 최근 run)
+        :param tickers: 종목 코드 리스트
+        :param start: 진입일 시작 (포함), 월 파티션 가지치기에도 사용
+        :param end: 진입일 끝 (포함)
+        :param columns: 읽을 컬럼 (ticker는 항상 포함)
+        :param filter: 추가 pyarrow 조건식 (예: ds.field('return') > 0)
+        :return: 거래 DataFrame (없으면 빈 DataFrame)
+        """
+        run_id = run_id or self.latest_run()
+        if run_id is None:
+            print("[!] 저장된 거래 내역이 없습니다.")
+            return pd.DataFrame()
+
+        expr = ds.field('run_id') == run_id
+        if tickers is not None:
+            expr = expr & ds.field('ticker').isin([str(t) for t in tickers])
+        if start is not None:
+            start = pd.Timestamp(start)
+            expr = expr & (ds.field('month') >= start.strftime('%Y-%m')) & (ds.field('entry_date') >= start)
+        if end is not None:
+            end = pd.Timestamp(end)
+            if end == end.normalize():
+                end = end + pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+            expr = expr & (ds.field('month') <= end.strftime('%Y-%m')) & (ds.field('entry_date') <= end)
+        if filter is not None:
+            expr = expr & filter
+
+        if columns is not None:
+            columns = ['ticker'] + [c for c in columns if c != 'ticker']
+        table = self.dataset().to_table(columns=columns, filter=expr)
+        return table.to_pandas()
+
+    def by_ticker(self, **scan_kwargs) -> dict:
+        """scan 결과를 {ticker: 거래 DataFrame}으로 묶어 반환 (종목 단위 분석용)"""
+        trades = self.scan(**scan_kwargs)
+        if trades.empty:
+            return {}
+        return {ticker: df.reset_index(drop=True) for ticker, df in trades.groupby('ticker', sort=False)}
+
+
+class TradeStoreWriter:
+    """종목별 거래를 메모리에 모아 flush_rows마다 TradeStore.append로 한 번에 기록"""
+    def __init__(self, store: TradeStore, run_id: str, flush_rows: int = 200_000):
+        self.store = store
+        self.run_id = run_id
+        self.flush_rows = flush_rows
+        self._buffer = []
+        self._rows = 0
+
+    def add(self, ticker, trades_df: pd.DataFrame):
+        if trades_df is None or trades_df.empty:
+            return
+        self._buffer.append(trades_df.assign(ticker=str(ticker)))
+        self._rows += len(trades_df)
+        if self._rows >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        self.store.append(pd.concat(self._buffer, ignore_index=True), self.run_id)
+        self._buffer = []
+        self._rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+
+if __name__ == "__main__":
+    # 기존 종목별 거래 파일을 저장소로 이관
+    TradeStore().import_legacy()
@@ -0,0 +1,344 @@
+"""
+변동성 돌파 전략 워크포워드 최적화 엔진
+
+전체 기간으로 맞춘 필터 기준값(slope5 > 0.8, disp5 > 1.0 등)의 과최적화를 점검하기 위해
+학습/검증 구간을 밀어가며 학습 구간에서 최적 파라미터를 고르고 다음 검증 구간에서 표본 외 성과를 측정합니다.
+
+속도를 위한 구조 (지표 재계산/재로딩은 종목당 1회):
+1. 일별 결과 패널 (build_day_outcomes): 종목마다 데이터를 한 번 로드해
+   - 세션별 필터 원값 (전일 slope5 / disp5 / 5일 평균 거래대금)
+   - (k, 손절, 익절) 조합별 해당 세션 거래 수익률 (거래 없으면 NaN)
+   을 계산합니다. 장중 청산이라 세션 간 거래가 독립이므로, 필터 기준값은 세션 단위 마스크로 정확히 재현됩니다.
+2. 누적 집계 (WalkForwardOptimizer): 패널을 (날짜 x 필터 조합 x 결과 조합) 거래 수/합/제곱합으로 한 번 집계해
+   날짜 축 누적합으로 만들어 두면, 어떤 학습/검증 구간이든 누적합 차분으로 O(조합 수)에 평가됩니다.
+"""
+import os
+import sys
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.breakout_simulator import breakout_signals, simulate_trades
+from BackTest.parallel_runner import ParallelBacktestRunner, _WORKER
+from BackTest.result_cache import ResultCache, params_hash
+
+FEATURE_COLUMNS = ['slope5', 'disp5', 'avg_value_5d']
+OBJECTIVES = ('expectancy', 'total', 'sharpe')
+OUTCOME_CACHE_SLOT = '_walk_forward_outcomes'  # 결과 캐시에서 일별 결과 패널을 보관하는 항목 이름
+
+
+# ---------------------------------------------------------------
+# 1. 일별 결과 패널 (종목당 1회 로드)
+# ---------------------------------------------------------------
+
+def outcome_grid(k_values, stop_losses, take_profits) -> pd.DataFrame:
+    """결과 조합 표 (행 번호 = 패널의 r{i} 컬럼 번호)"""
+    return pd.DataFrame(list(itertools.product(k_values, stop_losses, take_profits)),
+                        columns=['k', 'stop_loss', 'take_profit'])
+
+
+def build_day_outcomes(tester, ticker, k_values=(0.5,), stop_losses=(0.02,), take_profits=(0.07,),
+                       exit_minute=15 * 60 + 19):
+    """
+    한 종목의 세션별 필터 원값과 결과 조합별 거래 수익률을 계산합니다.
+
+    :param tester: VolatilityBacktester (수수료/슬리피지/데이터 경로 사용, 필터 기준값은 무시)
+    :return: DataFrame [date, ticker, slope5, disp5, avg_value_5d, r0, r1, ...] (float32) 또는 None
+    """
+    d_df, m_df = tester._load_data(ticker)
+    if d_df is None or m_df is None or d_df.empty or m_df.empty:
+        return None
+
+    # 필터 기준값을 -inf로 두면 base_cond에는 기준값과 무관한 조건(추세, 누적 거래량)만 남음
+    slope_min, disp_min = tester.slope_min, tester.disp_min
+    tester.slope_min = tester.disp_min = -np.inf
+    try:
+        offsets, base_cond, _ = tester._prepare_features(d_df, m_df)
+    finally:
+        tester.slope_min, tester.disp_min = slope_min, disp_min
+
+    starts = offsets[:-1]
+    day = pd.DataFrame({
+        'date': m_df.index[starts].normalize(),
+        'ticker': ticker,
+        'slope5': m_df['prev_slope5'].to_numpy()[starts],
+        'disp5': m_df['prev_disp5'].to_numpy()[starts],
+        'avg_value_5d': m_df['avg_value_5d'].to_numpy()[starts],
+    })
+
+    open_, high = m_df['open'].to_numpy(), m_df['high'].to_numpy()
+    low, close = m_df['low'].to_numpy(), m_df['close'].to_numpy()
+    minute_of_day = m_df.index.hour * 60 + m_df.index.minute
+    fees = tester.fees + tester.tax / 2
+
+    grid = outcome_grid(k_values, stop_losses, take_profits)
+    returns = np.full((len(starts), len(grid)), np.nan, dtype=np.float32)
+    for k in grid['k'].unique():
+        entries, entry_price, exits = breakout_signals(
+            open_, high, tester._target_price(m_df, k), base_cond, offsets, minute_of_day, exit_minute=exit_minute)
+        if not entries.any():
+            continue
+        for o in grid.index[grid['k'] == k]:
+            records = simulate_trades(
+                open_, high, low, close, entries, entry_price, exits, fees=fees, slippage=tester.slippage,
+                sl_stop=grid.at[o, 'stop_loss'], sl_trail=True, tp_stop=grid.at[o, 'take_profit'])
+            records = records[records['status'] == 1]  # 데이터 끝 미청산 거래 제외
+            session = np.searchsorted(offsets, records['entry_idx'], side='right') - 1
+            returns[session, o] = records['return']
+
+    for o in range(len(grid)):
+        day[f"r{o}"] = returns[:, o]
+    day[FEATURE_COLUMNS] = day[FEATURE_COLUMNS].astype(np.float32)
+    return day
+
+
+def run_outcome_task(ticker):
+    """[워커 작업] 한 종목 일별 결과 패널 (ParallelBacktestRunner task)"""
+    start = time.time()
+    try:
+        day = build_day_outcomes(_WORKER['tester'], ticker, **_WORKER['run_kwargs'])
+        return {'ticker': ticker, 'outcomes': day, 'error': None, 'elapsed': time.time() - start}
+    except Exception as e:
+        return {'ticker': ticker, 'outcomes': None, 'error': str(e), 'elapsed': time.time() - start}
+
+
+def build_outcome_panel(tickers=None, k_values=(0.4, 0.5, 0.6), stop_losses=(0.02, 0.03),
+                        take_profits=(0.05, 0.07), workers=None, backtester_kwargs=None,
+                        result_cache: ResultCache = None):
+    """
+    전 종목 일별 결과 패널을 병렬로 만들어 결과 캐시에 저장합니다.
+    캐시 키는 백테스터 인자 + 결과 조합 + 종목 목록 + 엔진 버전의 해시이며, 키마다 별도 항목으로 보관합니다.
+    :param result_cache: 결과 캐시 (기본: 새 ResultCache)
+    :return: (panel DataFrame, outcome_grid DataFrame)
+    """
+    from BackTest.VolatilityBacktestByVBT import ENGINE_VERSION
+
+    cache = result_cache or ResultCache()
+    grid = outcome_grid(k_values, stop_losses, take_profits)
+
+    runner = ParallelBacktestRunner(
+        workers=workers, backtester_kwargs=backtester_kwargs, task=run_outcome_task,
+        run_kwargs={'k_values': tuple(k_values), 'stop_losses': tuple(stop_losses),
+                    'take_profits': tuple(take_profits)})
+    if tickers is None:
+        tickers = [f.split('.')[0] for f in os.listdir(runner.minute_path) if f.endswith('.parquet')]
+    cache_key = params_hash('walk_forward_outcomes', {
+        'backtester': runner.backtester_kwargs, 'grid': grid.round(10).to_dict('list'),
+        'tickers': sorted(tickers), 'engine_version': ENGINE_VERSION})
+
+    entry = cache.get(OUTCOME_CACHE_SLOT, cache_key)
+    if entry is not None:
+        print(f"[*] 캐시된 일별 결과 패널 사용: {cache_key[:12]}")
+        cache.save()
+        return entry['trades'], grid
+
+    frames = []
+    start_time = time.time()
+    for i, result in enumerate(runner.iter_results(tickers), 1):
+        if result.get('outcomes') is not None:
+            frames.append(result['outcomes'])
+        runner._print_progress(i, len(tickers), start_time, len(frames), 0 if result['error'] is None else 1)
+    print()
+
+    if not frames:
+        print("[!] 생성된 일별 결과가 없습니다.")
+        return None, grid
+
+    panel = pd.concat(frames, ignore_index=True).sort_values(['date', 'ticker'], ignore_index=True)
+    cache.put(OUTCOME_CACHE_SLOT, cache_key, {'rows': len(panel), 'tickers': len(tickers)}, panel)
+    cache.save()
+    print(f"[✔] 일별 결과 패널 저장: {cache_key[:12]} ({len(panel):,}행, 결과 조합 {len(grid)}개)")
+    return panel, grid
+
+
+# ---------------------------------------------------------------
+# 2. 날짜별 누적 집계 + 구간 평가
+# ---------------------------------------------------------------
+
+@njit(parallel=True, cache=True)
+def _accumulate_kernel(date_idx, n_pass_slope, n_pass_disp, n_pass_value, returns,
+                       n_slope, n_disp, n_value, cnt, s, ss):
+    """
+    행(종목-세션)마다 통과한 필터 조합에 결과 조합별 수익률을 날짜 단위로 누적합니다.
+    기준값은 오름차순이므로 '원값 > 기준값'을 통과한 조합은 각 축의 앞쪽 n_pass개입니다.
+    결과 조합 축으로 병렬화 (쓰기 충돌 없음)
+    """
+    n_rows, n_out = returns.shape
+    for o in prange(n_out):
+        for r in range(n_rows):
+            x = returns[r, o]
+            if np.isnan(x):
+                continue
+            d = date_idx[r]
+            for a in range(n_pass_slope[r]):
+                for b in range(n_pass_disp[r]):
+                    for c in range(n_pass_value[r]):
+                        f = (a * n_disp + b) * n_value + c
+                        cnt[d, f, o] += 1.0
+                        s[d, f, o] += x
+                        ss[d, f, o] += x * x
+
+
+class WalkForwardOptimizer:
+    def __init__(self, panel: pd.DataFrame, outcomes: pd.DataFrame, slope_grid=(0.0, 0.4, 0.8, 1.2),
+                 disp_grid=(0.0, 1.0, 2.0, 3.0), value_grid=(5e9, 1e10, 2e10), objective='expectancy',
+                 min_trades=30):
+        """
+        :param panel: build_outcome_panel 결과 (종목-세션 행)
+        :param outcomes: outcome_grid 결과 (r{i} 컬럼 번호 → k / stop_loss / take_profit)
+        :param slope_grid: 전일 slope5 하한 후보 (slope5 > 기준값)
+        :param disp_grid: 전일 disp5 하한 후보 (disp5 > 기준값)
+        :param value_grid: 5일 평균 거래대금 하한 후보 (avg_value_5d >= 기준값)
+        :param objective: 학습 구간 선택 기준 ('expectancy' = 거래당 평균 수익률, 'total' = 수익률 합,
+                          'sharpe' = 평균 / 표준편차)
+        :param min_trades: 학습 구간 최소 거래 수 (미달 조합은 선택 제외)
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective는 {OBJECTIVES} 중 하나여야 합니다.")
+        self.outcomes = outcomes.reset_index(drop=True)
+        self.slope_grid = np.sort(np.asarray(slope_grid, dtype=np.float64))
+        self.disp_grid = np.sort(np.asarray(disp_grid, dtype=np.float64))
+        self.value_grid = np.sort(np.asarray(value_grid, dtype=np.float64))
+        self.objective = objective
+        self.min_trades = min_trades
+
+        self.filters = pd.DataFrame(
+            list(itertools.product(self.slope_grid, self.disp_grid, self.value_grid)),
+            columns=['slope_min', 'disp_min', 'value_limit'])
+        self.dates = pd.DatetimeIndex(np.sort(panel['date'].unique()))
+        self._cum = self._aggregate(panel)
+
+    def _aggregate(self, panel):
+        """(날짜+1, 필터 조합, 결과 조합) 누적 거래 수/합/제곱합 (cum[i] = 앞 i개 날짜 합계)"""
+        date_idx = self.dates.get_indexer(panel['date']).astype(np.int64)
+        # 원값 > 기준값(거래대금은 >=)을 통과하는 기준값 개수 (NaN은 0개)
+        n_pass_slope = np.searchsorted(self.slope_grid, panel['slope5'].to_numpy(np.float64), side='left')
+        n_pass_disp = np.searchsorted(self.disp_grid, panel['disp5'].to_numpy(np.float64), side='left')
+        n_pass_value = np.searchsorted(self.value_grid, panel['avg_value_5d'].to_numpy(np.float64), side='right')
+        for n_pass, col in ((n_pass_slope, 'slope5'), (n_pass_disp, 'disp5'), (n_pass_value, 'avg_value_5d')):
+            n_pass[np.isnan(panel[col].to_numpy(np.float64))] = 0
+
+        returns = panel[[f"r{o}" for o in range(len(self.outcomes))]].to_numpy(np.float64)
+        shape = (len(self.dates), len(self.filters), len(self.outcomes))
+        cnt, s, ss = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        _accumulate_kernel(date_idx, n_pass_slope.astype(np.int64), n_pass_disp.astype(np.int64),
+                           n_pass_value.astype(np.int64), returns,
+                           len(self.slope_grid), len(self.disp_grid), len(self.value_grid), cnt, s, ss)
+
+        zero = np.zeros((1,) + shape[1:])
+        return {name: np.concatenate((zero, np.cumsum(arr, axis=0))) for name, arr in
+                (('cnt', cnt), ('sum', s), ('sumsq', ss))}
+
+    def window_stats(self, start, end):
+        """날짜 위치 [start, end) 구간의 (필터 조합, 결과 조합)별 거래 수/합/제곱합"""
+        return {name: arr[end] - arr[start] for name, arr in self._cum.items()}
+
+    def score(self, stats):
+        """구간 통계 → 목적함수 값 (최소 거래 수 미달은 -inf)"""
+        cnt, total = stats['cnt'], stats['sum']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / cnt
+            if self.objective == 'expectancy':
+                value = mean
+            elif self.objective == 'total':
+                value = total
+            else:
+                var = (stats['sumsq'] - cnt * mean * mean) / (cnt - 1)
+                value = mean / np.sqrt(np.maximum(var, 0.0))
+        return np.where((cnt >= max(self.min_trades, 1)) & np.isfinite(value), value, -np.inf)
+
+    def windows(self, train_days=120, test_days=20, step_days=None, anchored=False):
+        """
+        학습/검증 구간 목록 (거래일 위치 기준)
+        :param anchored: True면 학습 시작을 처음으로 고정 (확장 구간)
+        :return: [(train_start, train_end, test_start, test_end), ...] (end 미포함)
+        """
+        step_days = step_days or test_days
+        n = len(self.dates)
+        result = []
+        train_start = 0
+        while train_start + train_days + test_days <= n:
+            train_end = train_start + train_days
+            result.append((0 if anchored else train_start, train_end, train_end, train_end + test_days))
+            train_start += step_days
+        return result
+
+    def _params(self, f, o):
+        return {**self.filters.iloc[f].to_dict(), **self.outcomes.iloc[o].to_dict()}
+
+    def run(self, train_days=120, test_days=20, step_days=None, anchored=False):
+        """
+        워크포워드 실행: 구간별 학습 최적 파라미터와 표본 내/외 성과
+        :return: DataFrame (구간당 1행). 검증 구간 날짜별 표본 외 결과는 self.oos_daily에 저장
+        """
+        rows = []
+        daily = []
+        n_out = len(self.outcomes)
+        for tr_s, tr_e, te_s, te_e in self.windows(train_days, test_days, step_days, anchored):
+            train = self.window_stats(tr_s, tr_e)
+            scores = self.score(train)
+            if not np.isfinite(scores).any():
+                continue
+            f, o = divmod(int(np.argmax(scores)), n_out)
+            test = self.window_stats(te_s, te_e)
+
+            n_is, n_oos = train['cnt'][f, o], test['cnt'][f, o]
+            rows.append({
+                'train_start': self.dates[tr_s], 'train_end': self.dates[tr_e - 1],
+                'test_start': self.dates[te_s], 'test_end': self.dates[te_e - 1],
+                **self._params(f, o),
+                'is_score': scores[f, o],
+                'is_trades': int(n_is),
+                'is_expectancy': train['sum'][f, o] / n_is,
+                'oos_trades': int(n_oos),
+                'oos_expectancy': test['sum'][f, o] / n_oos if n_oos else np.nan,
+                'oos_total': test['sum'][f, o],
+            })
+
+            # 검증 구간 날짜별 (선택 조합의 거래 수 / 수익률 합)
+            cnt = np.diff(self._cum['cnt'][te_s:te_e + 1, f, o])
+            total = np.diff(self._cum['sum'][te_s:te_e + 1, f, o])
+            daily.append(pd.DataFrame({'trades': cnt, 'return_sum': total}, index=self.dates[te_s:te_e]))
+
+        self.oos_daily = pd.concat(daily) if daily else pd.DataFrame(columns=['trades', 'return_sum'])
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def summarize(result: pd.DataFrame) -> dict:
+        """표본 외 전체 요약 (거래 가중 평균 수익률, 표본 내 대비 열화 비율)"""
+        if result.empty:
+            return {}
+        oos_trades = result['oos_trades'].sum()
+        oos_exp = result['oos_total'].sum() / oos_trades if oos_trades else np.nan
+        is_exp = (result['is_expectancy'] * result['is_trades']).sum() / result['is_trades'].sum()
+        return {
+            'windows': len(result),
+            'oos_trades': int(oos_trades),
+            'oos_expectancy': oos_exp,
+            'is_expectancy': is_exp,
+            'oos_is_ratio': oos_exp / is_exp if is_exp else np.nan,
+            'oos_positive_windows': int((result['oos_total'] > 0).sum()),
+        }
+
+
+if __name__ == "__main__":
+    panel, outcomes = build_outcome_panel()
+    if panel is not None:
+        start = time.time()
+        wfo = WalkForwardOptimizer(panel, outcomes)
+        print(f"[*] 누적 집계 완료 ({time.time() - start:.1f}s): 필터 {len(wfo.filters)}개 x 결과 {len(outcomes)}개")
+
+        result = wfo.run(train_days=120, test_days=20)
+        with pd.option_context('display.width', 200):
+            print(result.to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+        print(WalkForwardOptimizer.summarize(result))
+
+        save_dir = os.path.join("data", "backtest", "volatility", "walk_forward")
+        os.makedirs(save_dir, exist_ok=True)
+        result.to_csv(os.path.join(save_dir, "walk_forward_result.csv"), index=False, encoding='utf-8-sig')
@@ -0,0 +1,85 @@
+"""
+구간 승률 / 2-D 히트맵 엔진 벤치마크 (BackTest/binned_stats.py)
+
+합성 거래 피처 테이블에서
+- 기존 방식(pd.cut + pivot_table, 쌍마다 반복)과 scan_pairs의 셀 통계 일치 여부 (표본 쌍)
+- 전체 지표 쌍 스캔 시간
+을 비교합니다. 셀 통계가 다르면 종료 코드 1
+    python Benchmark/bench_binned.py --trades 1000000 --features 50
+"""
+import os
+import sys
+import time
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.binned_stats import scan_pairs, quantile_edges, interval_labels
+
+
+def build_trades(n_trades, n_features, seed=42) -> pd.DataFrame:
+    """정규분포 피처 + 앞 두 피처에 약한 승률 신호를 넣은 합성 거래 테이블 (피처별 결측 1%)"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({f'f{i}': rng.normal(size=n_trades) for i in range(n_features)})
+    for col in df.columns:
+        df.loc[rng.random(n_trades) < 0.01, col] = np.nan
+    edge = 0.05 * np.tanh(df['f0'].fillna(0) + df['f1'].fillna(0))
+    df['is_win'] = rng.random(n_trades) < 0.45 + edge
+    df['return'] = np.where(df['is_win'], 1, -1) * rng.exponential(0.02, n_trades)
+    return df
+
+
+def pivot_cells(df, x, y, bins):
+    """기존 방식: pd.cut + pivot_table (mean/count/sum), 구간 이름은 scan_pairs와 같은 표기"""
+    x_edges, y_edges = quantile_edges(df[x].to_numpy(), bins), quantile_edges(df[y].to_numpy(), bins)
+    tmp = pd.DataFrame({
+        'x': pd.cut(df[x], x_edges).cat.rename_categories(interval_labels(x_edges).astype(str)),
+        'y': pd.cut(df[y], y_edges).cat.rename_categories(interval_labels(y_edges).astype(str)),
+        'is_win': df['is_win'], 'return': df['return'],
+    })
+    return tmp.pivot_table(index=['x', 'y'], values=['is_win', 'return'], aggfunc=['mean', 'count', 'sum'],
+                           observed=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="구간 승률/히트맵 엔진 벤치마크")
+    parser.add_argument('--trades', type=int, default=1_000_000)
+    parser.add_argument('--features', type=int, default=50)
+    parser.add_argument('--bins', type=int, default=10)
+    parser.add_argument('--check-pairs', type=int, default=5, help="기존 방식과 비교할 표본 쌍 수")
+    args = parser.parse_args()
+
+    df = build_trades(args.trades, args.features)
+    features = [c for c in df.columns if c.startswith('f')]
+    pairs = list(itertools.combinations(features, 2))
+
+    # 컴파일 예열
+    scan_pairs(df.head(1_000), features[:2], bins=args.bins, min_count=1)
+
+    start = time.perf_counter()
+    cells = scan_pairs(df, features, bins=args.bins, min_count=1)
+    engine_s = time.perf_counter() - start
+
+    ok = True
+    start = time.perf_counter()
+    for x, y in pairs[:args.check_pairs]:
+        ref = pivot_cells(df, x, y, args.bins)
+        got = cells[(cells['x'] == x) & (cells['y'] == y)].set_index(['x_bin', 'y_bin']).loc[ref.index]
+        same = (np.array_equal(got['count'].to_numpy(), ref[('count', 'is_win')].to_numpy())
+                and np.allclose(got['win_rate'], ref[('mean', 'is_win')])
+                and np.allclose(got['profit_sum'], ref[('sum', 'return')]))
+        ok &= same
+        if not same:
+            print(f"[!] {x} x {y}: 셀 통계 불일치")
+    pivot_s = (time.perf_counter() - start) / max(min(args.check_pairs, len(pairs)), 1) * len(pairs)
+
+    print(f"[*] 거래 {args.trades:,}건 x 피처 {len(features)}개 = 쌍 {len(pairs):,}개, 셀 {len(cells):,}개")
+    print(f"[*] scan_pairs {engine_s:.2f}s | pd.cut + pivot_table 추정 {pivot_s:.1f}s ({pivot_s / engine_s:.0f}배)")
+    if not ok:
+        sys.exit(1)
+    print(f"[✔] 표본 {min(args.check_pairs, len(pairs))}개 쌍 셀 통계 일치")
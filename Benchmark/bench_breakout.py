@@ -0,0 +1,138 @@
+"""
+변동성 돌파 시뮬레이터 벤치마크: VBT 경로 vs numba 시뮬레이터 (BackTest/breakout_simulator.py)
+
+합성 종목 기준 세트에 대해
+- 거래 일치 여부 (진입/청산 봉, 상태 동일 + 가격/손익 상대 편차)
+- 시뮬레이션 단계 소요 시간 (공통 데이터 준비 제외)과 배속
+을 보고합니다. 거래가 하나라도 어긋나면 종료 코드 1
+    python Benchmark/bench_breakout.py --tickers 20 --days 500
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Benchmark.synthetic_market import SyntheticMarket, BARS_PER_DAY
+from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+from BackTest.breakout_simulator import simulate_trades, breakout_signals
+
+warnings.filterwarnings('ignore')
+
+MATCH_COLUMNS = ['entry_idx', 'exit_idx', 'status']
+VALUE_COLUMNS = ['size', 'entry_price', 'exit_price', 'entry_fees', 'exit_fees', 'pnl', 'return']
+MATCH_RTOL = 1e-9
+
+
+class SyntheticBacktester(VolatilityBacktester):
+    """파일 대신 합성 분봉/일봉을 사용하는 백테스터"""
+    def __init__(self, m_df, **kwargs):
+        super().__init__(**kwargs)
+        self.m_df = m_df
+
+    def _load_data(self, ticker):
+        m_df = self.m_df.copy()
+        d_df = m_df.resample('D').agg({
+            'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+        }).dropna()
+        return d_df, m_df
+
+
+def compare_trades(ref: pd.DataFrame, fast: pd.DataFrame) -> dict:
+    """VBT 거래 레코드 대비 일치 여부와 최대 상대 편차"""
+    same = len(ref) == len(fast) and (ref[MATCH_COLUMNS].to_numpy() == fast[MATCH_COLUMNS].to_numpy()).all()
+    if not same or len(ref) == 0:
+        return {'matched': same, 'max_rel_dev': np.nan if not same else 0.0}
+    r = ref[VALUE_COLUMNS].to_numpy()
+    f = fast[VALUE_COLUMNS].to_numpy()
+    dev = np.abs(r - f) / np.maximum(np.abs(r), 1e-12)
+    return {'matched': bool(dev.max() <= MATCH_RTOL), 'max_rel_dev': float(dev.max())}
+
+
+def run_case(m_df, k=0.5, stop_loss=0.02, take_profit=0.07, value_limit=1e9, repeat=3) -> dict:
+    """한 종목·파라미터 조합: 공통 신호를 만든 뒤 시뮬레이션 단계만 각각 측정"""
+    tester = SyntheticBacktester(m_df, k=k, stop_loss=stop_loss)
+    d_df, m = tester._load_data(None)
+    offsets, base_cond, _ = tester._prepare_features(d_df, m)
+    can_enter = base_cond & (m['avg_value_5d'].to_numpy() >= value_limit)
+    minute_of_day = m.index.hour * 60 + m.index.minute
+
+    entries, entry_price, exits = breakout_signals(
+        m['open'].to_numpy(), m['high'].to_numpy(), tester._target_price(m, k), can_enter, offsets, minute_of_day)
+    exec_price = m['close'].to_numpy().copy()
+    exec_price[entries] = entry_price[entries]
+    fees = tester.fees + tester.tax / 2
+
+    def _vbt():
+        pf = vbt.Portfolio.from_signals(
+            close=m['close'], entries=pd.Series(entries, index=m.index), exits=pd.Series(exits, index=m.index),
+            price=pd.Series(exec_price, index=m.index), fees=fees, slippage=tester.slippage,
+            open=m['open'], high=m['high'], low=m['low'],
+            sl_stop=stop_loss, sl_trail=True, tp_stop=take_profit, accumulate=False, freq='1min')
+        return pf.trades.records
+
+    def _fast():
+        return pd.DataFrame(simulate_trades(
+            m['open'].to_numpy(), m['high'].to_numpy(), m['low'].to_numpy(), m['close'].to_numpy(),
+            entries, entry_price, exits, fees=fees, slippage=tester.slippage,
+            sl_stop=stop_loss, sl_trail=True, tp_stop=take_profit))
+
+    timings = {}
+    results = {}
+    for name, fn in (('vbt', _vbt), ('fast', _fast)):
+        fn()  # 컴파일/캐시 예열
+        best = np.inf
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            results[name] = fn()
+            best = min(best, time.perf_counter() - t0)
+        timings[name] = best
+
+    return {
+        'rows': len(m), 'trades': len(results['vbt']),
+        'vbt_sec': timings['vbt'], 'fast_sec': timings['fast'],
+        'speedup': timings['vbt'] / timings['fast'] if timings['fast'] > 0 else np.inf,
+        **compare_trades(results['vbt'], results['fast']),
+    }
+
+
+def run_reference_set(n_tickers=20, n_days=500, repeat=3, seed=7) -> pd.DataFrame:
+    """합성 종목 x 파라미터 조합 기준 세트 실행"""
+    market = SyntheticMarket(seed=seed)
+    params = [(0.4, 0.02, 0.07), (0.5, 0.03, 0.05), (0.6, 0.015, 0.10)]
+    rows = []
+    for i in range(n_tickers):
+        m_df = market.minute_bars(n_days * BARS_PER_DAY, seed_offset=i, daily_vol=0.04 + 0.002 * (i % 10),
+                                  base_volume=200_000)
+        for k, sl, tp in params:
+            res = run_case(m_df, k=k, stop_loss=sl, take_profit=tp, repeat=repeat)
+            rows.append({'ticker': f"SYN{i:03d}", 'k': k, 'stop_loss': sl, 'take_profit': tp, **res})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VBT vs numba 돌파 시뮬레이터 벤치마크")
+    parser.add_argument('--tickers', type=int, default=20)
+    parser.add_argument('--days', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    result = run_reference_set(args.tickers, args.days, args.repeat)
+    with pd.option_context('display.width', 200):
+        print(result.to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+
+    total_vbt, total_fast = result['vbt_sec'].sum(), result['fast_sec'].sum()
+    print(f"\n[*] 거래 수: {result['trades'].sum():,} | VBT {total_vbt:.3f}s | numba {total_fast:.3f}s "
+          f"| 배속 x{total_vbt / total_fast:.1f}")
+
+    if not result['matched'].all():
+        print(f"[!] 거래 불일치: {(~result['matched']).sum()}건")
+        sys.exit(1)
+    print("[✔] 기준 세트 전 거래 일치")
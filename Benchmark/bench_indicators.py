@@ -0,0 +1,316 @@
+"""
+지표 백엔드 정확도/속도 벤치마크
+
+같은 지표를 talib(Indicators/factory.py), pandas_ta(AnalyzeIndicator, MinuteIndicatorAnalyzer),
+pandas, 자체 커널(Indicators/session.py, Indicators/window_sweep.py)로 계산하여
+크기별(기본 1천/10만/100만 행) 처리량(bars/sec)과 기준 구현 대비 최대 편차를 보고합니다.
+
+새로운(더 빠른) 지표 구현을 도입할 때의 관문(gate)으로 사용합니다.
+    python Benchmark/bench_indicators.py --gate-backend inhouse
+    → 기준 대비 상대 편차가 허용치를 넘으면 종료 코드 1
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Benchmark.synthetic_market import SyntheticMarket
+from Indicators.session import session_offsets, session_vwap
+from Indicators.window_sweep import sweep_block
+
+try:
+    import talib
+except ImportError:
+    talib = None
+
+try:
+    import pandas_ta as ta
+except ImportError:
+    ta = None
+
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+# 지표 초기 구간(EMA 시드 등 구현별 관례 차이)은 편차 비교에서 제외
+WARMUP = 300
+# 관문 허용 상대 편차 (기준 구현과 수치적으로 동일하다고 볼 수준)
+GATE_RTOL = 1e-8
+
+
+# ---------------------------------------------------------------
+# 1. 백엔드별 지표 구현 (입력: float64 배열 딕셔너리 → 1차원 배열)
+# ---------------------------------------------------------------
+
+def _rolling_view(x, w):
+    return np.lib.stride_tricks.sliding_window_view(x, w)
+
+
+def _pad(values, n):
+    out = np.full(n, np.nan)
+    out[n - len(values):] = values
+    return out
+
+
+def _np_sma(a, w=20):
+    return _pad(_rolling_view(a['close'], w).mean(axis=1), len(a['close']))
+
+
+def _np_std(a, w=20):
+    # 2-pass 표본표준편차 (ddof=1): 누적합/온라인 알고리즘의 상쇄 오차가 없는 기준값
+    return _pad(_rolling_view(a['close'], w).std(axis=1, ddof=1), len(a['close']))
+
+
+def _np_max(a, w=20):
+    return _pad(_rolling_view(a['close'], w).max(axis=1), len(a['close']))
+
+
+def _np_min(a, w=20):
+    return _pad(_rolling_view(a['close'], w).min(axis=1), len(a['close']))
+
+
+def _pd_vwap(a):
+    df = pd.DataFrame({'tpv': (a['high'] + a['low'] + a['close']) / 3 * a['volume'],
+                       'volume': a['volume'], 'date': a['date']})
+    grouped = df.groupby('date')
+    return (grouped['tpv'].cumsum() / grouped['volume'].cumsum()).to_numpy()
+
+
+def _sweep(a, stat, w=20):
+    block, _ = sweep_block(a['close'], [w], stats=(stat,))
+    return block[:, 0]
+
+
+def _ta_col(frame, prefix):
+    return frame[[c for c in frame.columns if c.startswith(prefix)][0]].to_numpy()
+
+
+INDICATORS = {
+    'sma20': {
+        'numpy': _np_sma,
+        'talib': lambda a: talib.SMA(a['close'], timeperiod=20),
+        'pandas_ta': lambda a: ta.sma(a['s_close'], length=20).to_numpy(),
+        'pandas': lambda a: a['s_close'].rolling(20).mean().to_numpy(),
+        'inhouse': lambda a: _sweep(a, 'ma'),
+    },
+    'std20': {
+        'numpy': _np_std,
+        'talib': lambda a: talib.STDDEV(a['close'], timeperiod=20),  # 모표준편차 (ddof=0)
+        'pandas_ta': lambda a: ta.stdev(a['s_close'], length=20).to_numpy(),
+        'pandas': lambda a: a['s_close'].rolling(20).std().to_numpy(),
+        'inhouse': lambda a: _sweep(a, 'std'),
+    },
+    'max20': {
+        'numpy': _np_max,
+        'talib': lambda a: talib.MAX(a['close'], timeperiod=20),
+        'pandas': lambda a: a['s_close'].rolling(20).max().to_numpy(),
+        'inhouse': lambda a: _sweep(a, 'max'),
+    },
+    'min20': {
+        'numpy': _np_min,
+        'talib': lambda a: talib.MIN(a['close'], timeperiod=20),
+        'pandas': lambda a: a['s_close'].rolling(20).min().to_numpy(),
+        'inhouse': lambda a: _sweep(a, 'min'),
+    },
+    'rsi14': {
+        'talib': lambda a: talib.RSI(a['close'], timeperiod=14),
+        'pandas_ta': lambda a: ta.rsi(a['s_close'], length=14).to_numpy(),
+    },
+    'macd_hist': {
+        'talib': lambda a: talib.MACD(a['close'], fastperiod=12, slowperiod=26, signalperiod=9)[2],
+        'pandas_ta': lambda a: _ta_col(ta.macd(a['s_close']), 'MACDh'),
+    },
+    'bb_upper20': {
+        'talib': lambda a: talib.BBANDS(a['close'], timeperiod=20, nbdevup=2, nbdevdn=2,
+                                        matype=talib.MA_Type.SMA)[0],
+        'pandas_ta': lambda a: _ta_col(ta.bbands(a['s_close'], length=20, std=2), 'BBU'),
+    },
+    'atr14': {
+        'talib': lambda a: talib.ATR(a['high'], a['low'], a['close'], timeperiod=14),
+        'pandas_ta': lambda a: ta.atr(a['s_high'], a['s_low'], a['s_close'], length=14).to_numpy(),
+    },
+    'adx14': {
+        'talib': lambda a: talib.ADX(a['high'], a['low'], a['close'], timeperiod=14),
+        'pandas_ta': lambda a: ta.adx(a['s_high'], a['s_low'], a['s_close'], length=14)['ADX_14'].to_numpy(),
+    },
+    'mfi14': {
+        'talib': lambda a: talib.MFI(a['high'], a['low'], a['close'], a['volume'], timeperiod=14),
+        'pandas_ta': lambda a: ta.mfi(a['s_high'], a['s_low'], a['s_close'], a['s_volume'], length=14).to_numpy(),
+    },
+    'obv': {
+        'talib': lambda a: talib.OBV(a['close'], a['volume']),
+        'pandas_ta': lambda a: ta.obv(a['s_close'], a['s_volume']).to_numpy(),
+    },
+    'vwap_session': {
+        'pandas': _pd_vwap,
+        'pandas_ta': lambda a: ta.vwap(a['s_high'], a['s_low'], a['s_close'], a['s_volume'], anchor='D').to_numpy(),
+        'inhouse': lambda a: session_vwap(a['high'], a['low'], a['close'], a['volume'], a['offsets']),
+    },
+}
+
+# 지표별 기준 구현 (정확도 비교 대상)
+REFERENCE = {
+    'sma20': 'numpy', 'std20': 'numpy', 'max20': 'numpy', 'min20': 'numpy',
+    'vwap_session': 'pandas',
+}
+DEFAULT_REFERENCE = 'talib'
+
+
+def available_backends() -> list:
+    """설치된 라이브러리 기준으로 실행 가능한 백엔드 목록"""
+    backends = ['numpy', 'pandas', 'inhouse']
+    if talib is not None:
+        backends.insert(1, 'talib')
+    else:
+        print("[!] TA-Lib 미설치: talib 백엔드를 건너뜁니다.")
+    if ta is not None:
+        backends.insert(2, 'pandas_ta')
+    else:
+        print("[!] pandas_ta 미설치: pandas_ta 백엔드를 건너뜁니다.")
+    return backends
+
+
+def make_inputs(df: pd.DataFrame) -> dict:
+    """분봉 DataFrame → 백엔드 공통 입력 (float64 배열 + pandas Series + 세션 오프셋)"""
+    a = {c: df[c].to_numpy(dtype=np.float64) for c in ['open', 'high', 'low', 'close', 'volume']}
+    for c in ['open', 'high', 'low', 'close', 'volume']:
+        a[f's_{c}'] = df[c].astype(np.float64)
+    a['date'] = df.index.normalize()
+    a['offsets'] = session_offsets(df.index)
+    return a
+
+
+# ---------------------------------------------------------------
+# 2. 측정
+# ---------------------------------------------------------------
+
+def _timed(fn, a, repeat):
+    """repeat회 실행 중 최소 시간(초)과 마지막 결과"""
+    best = np.inf
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(a)
+        best = min(best, time.perf_counter() - t0)
+    return best, np.asarray(out, dtype=np.float64)
+
+
+def deviation(values: np.ndarray, ref: np.ndarray, warmup: int = WARMUP) -> dict:
+    """
+    기준 대비 편차 (warmup 이후 구간)
+    :return: max_abs_dev, max_rel_dev, nan_mismatch (한쪽만 NaN인 행 수)
+    """
+    v, r = values[warmup:], ref[warmup:]
+    v_nan, r_nan = np.isnan(v), np.isnan(r)
+    both = ~v_nan & ~r_nan
+    if not both.any():
+        return {'max_abs_dev': np.nan, 'max_rel_dev': np.nan, 'nan_mismatch': int((v_nan ^ r_nan).sum())}
+    diff = np.abs(v[both] - r[both])
+    scale = np.maximum(np.abs(r[both]), 1e-12)
+    return {
+        'max_abs_dev': float(diff.max()),
+        'max_rel_dev': float((diff / scale).max()),
+        'nan_mismatch': int((v_nan ^ r_nan).sum()),
+    }
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, repeat: int = 3, indicators=None, backends=None,
+                  seed: int = 42) -> pd.DataFrame:
+    """
+    크기 x 지표 x 백엔드 벤치마크 실행
+
+    :return: size, indicator, backend, reference, seconds, bars_per_sec, max_abs_dev, max_rel_dev, nan_mismatch
+    """
+    backends = backends or available_backends()
+    names = indicators or list(INDICATORS)
+    market = SyntheticMarket(seed=seed)
+
+    # numba 커널 컴파일 시간이 측정에 섞이지 않도록 소량 데이터로 예열
+    warm = make_inputs(market.minute_bars(1_000))
+    _sweep(warm, 'ma')
+    session_vwap(warm['high'], warm['low'], warm['close'], warm['volume'], warm['offsets'])
+
+    rows = []
+    for size in sizes:
+        a = make_inputs(market.minute_bars(size))
+        print(f"[*] {size:,}행 측정 중...")
+        for name in names:
+            impls = INDICATORS[name]
+            ref_backend = REFERENCE.get(name, DEFAULT_REFERENCE)
+            results = {}
+            for backend in backends:
+                if backend not in impls:
+                    continue
+                try:
+                    results[backend] = _timed(impls[backend], a, repeat)
+                except Exception as e:
+                    print(f"[!] {name}/{backend} 실패: {e}")
+
+            ref = results.get(ref_backend, (None, None))[1]
+            for backend, (sec, values) in results.items():
+                dev = deviation(values, ref) if ref is not None else {
+                    'max_abs_dev': np.nan, 'max_rel_dev': np.nan, 'nan_mismatch': 0}
+                rows.append({
+                    'size': size,
+                    'indicator': name,
+                    'backend': backend,
+                    'reference': ref_backend if ref is not None else None,
+                    'seconds': sec,
+                    'bars_per_sec': size / sec if sec > 0 else np.inf,
+                    **dev,
+                })
+
+    return pd.DataFrame(rows)
+
+
+def check_gate(result: pd.DataFrame, backend: str = 'inhouse', rtol: float = GATE_RTOL) -> pd.DataFrame:
+    """관문 검사: 해당 백엔드 결과 중 허용 편차를 넘거나 NaN 위치가 어긋난 행"""
+    rows = result[(result['backend'] == backend) & result['reference'].notna()]
+    failed = (rows['max_rel_dev'] > rtol) | (rows['nan_mismatch'] > 0)
+    return rows[failed]
+
+
+def print_report(result: pd.DataFrame):
+    """지표별 처리량/편차 요약 출력"""
+    if result.empty:
+        print("[!] 측정 결과가 없습니다.")
+        return
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        for size, part in result.groupby('size'):
+            print(f"\n=== {size:,} bars ===")
+            view = part.set_index(['indicator', 'backend'])[
+                ['reference', 'bars_per_sec', 'max_abs_dev', 'max_rel_dev', 'nan_mismatch']]
+            print(view.to_string(float_format=lambda x: f"{x:.3g}"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="지표 백엔드 정확도/속도 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--indicators', nargs='+', default=None, choices=list(INDICATORS))
+    parser.add_argument('--gate-backend', default=None, help="관문 검사 대상 백엔드 (예: inhouse)")
+    parser.add_argument('--rtol', type=float, default=GATE_RTOL)
+    args = parser.parse_args()
+
+    result = run_benchmark(sizes=args.sizes, repeat=args.repeat, indicators=args.indicators)
+    print_report(result)
+
+    save_dir = os.path.join('data', 'benchmark')
+    os.makedirs(save_dir, exist_ok=True)
+    save_path = os.path.join(save_dir, 'indicator_benchmark.csv')
+    result.to_csv(save_path, index=False)
+    print(f"\n[✔] 결과 저장: {save_path}")
+
+    if args.gate_backend:
+        failed = check_gate(result, backend=args.gate_backend, rtol=args.rtol)
+        if not failed.empty:
+            print(f"[!] 관문 실패 ({args.gate_backend}, rtol={args.rtol:g}):")
+            print(failed[['size', 'indicator', 'reference', 'max_rel_dev', 'nan_mismatch']].to_string(index=False))
+            sys.exit(1)
+        print(f"[✔] 관문 통과 ({args.gate_backend}, rtol={args.rtol:g})")
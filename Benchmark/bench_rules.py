@@ -0,0 +1,69 @@
+"""
+임계값 규칙 탐색 벤치마크 (BackTest/rule_miner.py)
+
+합성 거래 피처 테이블에서
+- mine_rules의 후보 규칙 평가 속도 (규칙/분)
+- 상위 규칙 통계와 DataFrame 재필터(기존 방식) 결과 일치 여부, 재필터 방식의 추정 소요 시간
+을 비교합니다. 통계가 다르면 종료 코드 1
+    python Benchmark/bench_rules.py --trades 200000 --features 40 --depth 3
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Benchmark.bench_binned import build_trades
+from BackTest.rule_miner import mine_rules, apply_rules
+
+
+def filter_stats(df, conditions):
+    """기존 방식: 규칙마다 DataFrame을 다시 걸러 거래 수/기대값/손익비 계산"""
+    sub = df[apply_rules(df, conditions)]['return']
+    gain, loss = sub[sub > 0].sum(), -sub[sub <= 0].sum()
+    return len(sub), sub.mean(), (gain / loss if loss > 0 else np.inf)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="임계값 규칙 탐색 벤치마크")
+    parser.add_argument('--trades', type=int, default=200_000)
+    parser.add_argument('--features', type=int, default=40)
+    parser.add_argument('--thresholds', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--beam', type=int, default=200)
+    parser.add_argument('--min-support', type=int, default=500)
+    parser.add_argument('--check', type=int, default=20, help="재필터 방식과 비교할 상위 규칙 수")
+    args = parser.parse_args()
+
+    df = build_trades(args.trades, args.features)
+    features = [c for c in df.columns if c.startswith('f')]
+
+    # 컴파일 예열
+    mine_rules(df.head(1_000), features[:3], n_thresholds=4, max_depth=3, min_support=1)
+
+    rules = mine_rules(df, features, n_thresholds=args.thresholds, max_depth=args.depth, beam=args.beam,
+                       min_support=args.min_support, top=max(args.check, 10))
+    evaluated, engine_s = rules.attrs['evaluated'], rules.attrs['elapsed']
+
+    ok = True
+    start = time.perf_counter()
+    for _, row in rules.head(args.check).iterrows():
+        count, expectancy, pf = filter_stats(df, row['conditions'])
+        same = (count == row['count'] and np.isclose(expectancy, row['expectancy'])
+                and np.isclose(pf, row['profit_factor']))
+        ok &= same
+        if not same:
+            print(f"[!] {row['rule']}: 통계 불일치 ({count} vs {row['count']})")
+    filter_s = (time.perf_counter() - start) / max(min(args.check, len(rules)), 1) * evaluated
+
+    print(f"[*] 거래 {args.trades:,}건 x 피처 {len(features)}개, 임계값 {args.thresholds}개, 최대 {args.depth}개 조건")
+    print(f"[*] 후보 규칙 {evaluated:,}개 평가 {engine_s:.2f}s ({evaluated / engine_s * 60:,.0f} 규칙/분)"
+          f" | DataFrame 재필터 추정 {filter_s / 60:,.0f}분")
+    print(rules.head(10)[['rule', 'count', 'win_rate', 'expectancy', 'profit_factor']].to_string())
+    if not ok:
+        sys.exit(1)
+    print(f"[✔] 상위 {min(args.check, len(rules))}개 규칙 통계 일치")
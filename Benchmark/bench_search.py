@@ -0,0 +1,128 @@
+"""
+연속 반감 탐색 벤치마크: SuccessiveHalvingSearch vs 전체 그리드 (BackTest/halving_search.py)
+
+합성 종목 기준 세트에서
+- 상위 N개 조합 일치 여부 (집합 / 1위)
+- CPU 시간과 (조합, 종목) 평가 횟수
+를 비교합니다. 상위 N개 집합이 다르면 종료 코드 1
+    python Benchmark/bench_search.py --tickers 81 --days 250
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Benchmark.synthetic_market import SyntheticMarket, BARS_PER_DAY, round_to_tick
+from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+from BackTest.halving_search import SuccessiveHalvingSearch
+
+warnings.filterwarnings('ignore')
+
+SPACE = {
+    'k': [0.3, 0.5, 0.7, 0.9],
+    'stop_loss_rate': [0.01, 0.03],
+    'slope_min': [-100.0, 0.8],
+    'disp_min': [-100.0, 1.0],
+    'value_limit': [0],
+    'take_profit': [0.03, 0.07],
+}
+
+
+class SyntheticUniverse(VolatilityBacktester):
+    """파일 대신 종목별 합성 분봉을 사용하는 백테스터"""
+    def __init__(self, minute_frames: dict, **kwargs):
+        super().__init__(**kwargs)
+        self.minute_frames = minute_frames
+
+    def _load_data(self, ticker):
+        m_df = self.minute_frames[ticker].copy()
+        return self._resample_daily(m_df), m_df
+
+
+def add_trend_days(m_df, rng, trend_prob=0.3, trend_move=0.03):
+    """
+    일부 날짜에 장중 추세(하루 ±trend_move를 분봉에 고르게 배분)를 덧씌움
+    무작위 보행만으로는 파라미터 간 성과 차이가 잡음뿐이라 상위 N개가 정의되지 않으므로,
+    돌파 이후 추세가 이어지는 날을 섞어 파라미터가 실제로 우열을 갖는 기준 세트를 만듭니다.
+    """
+    n_days = -(-len(m_df) // BARS_PER_DAY)
+    day_drift = np.where(rng.random(n_days) < trend_prob, rng.choice([-1.0, 1.0], n_days) * trend_move, 0.0)
+    drift = np.repeat(day_drift / BARS_PER_DAY, BARS_PER_DAY)[:len(m_df)]
+    factor = np.exp(np.cumsum(drift))
+    for col in ('open', 'high', 'low', 'close'):
+        m_df[col] = round_to_tick(m_df[col].to_numpy() * factor)
+    m_df['high'] = m_df[['open', 'high', 'close']].max(axis=1)
+    m_df['low'] = m_df[['open', 'low', 'close']].min(axis=1)
+    return m_df
+
+
+def build_universe(n_tickers, n_days, seed=11) -> dict:
+    market = SyntheticMarket(seed=seed)
+    rng = np.random.default_rng(seed)
+    return {
+        f"SYN{i:03d}": add_trend_days(
+            market.minute_bars(n_days * BARS_PER_DAY, seed_offset=i, daily_vol=0.03 + 0.002 * (i % 15),
+                               base_volume=200_000), rng)
+        for i in range(n_tickers)
+    }
+
+
+def timed(fn):
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = fn()
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="연속 반감 탐색 vs 전체 그리드 벤치마크")
+    parser.add_argument('--tickers', type=int, default=81)
+    parser.add_argument('--days', type=int, default=250)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--min-tickers', type=int, default=9)
+    parser.add_argument('--top-n', type=int, default=5)
+    args = parser.parse_args()
+
+    frames = build_universe(args.tickers, args.days)
+    tickers = list(frames)
+
+    def _search():
+        return SuccessiveHalvingSearch(SPACE, eta=args.eta, min_tickers=args.min_tickers, top_n=args.top_n,
+                                       backtester=SyntheticUniverse(frames))
+
+    # 컴파일/캐시 예열
+    _search().full_grid(tickers[:1])
+
+    grid_search = _search()
+    grid, grid_wall, grid_cpu = timed(lambda: grid_search.full_grid(tickers))
+    halving_search = _search()
+    halving, sh_wall, sh_cpu = timed(lambda: halving_search.run(tickers))
+
+    params = list(SPACE)
+    top_grid = grid.head(args.top_n)[params]
+    top_sh = halving.head(args.top_n)[params]
+    key = lambda df: set(map(tuple, df.to_numpy().tolist()))
+    same_set = key(top_grid) == key(top_sh)
+    same_best = top_grid.iloc[0].equals(top_sh.iloc[0])
+
+    with pd.option_context('display.width', 200):
+        print("\n[전체 그리드 상위]")
+        print(grid.head(args.top_n).to_string(index=False))
+        print("\n[연속 반감 상위]")
+        print(halving.head(args.top_n).to_string(index=False))
+
+    print(f"\n[*] 평가 횟수: 그리드 {grid_search.evaluations:,} | 반감 {halving_search.evaluations:,} "
+          f"({halving_search.evaluations / grid_search.evaluations:.1%})")
+    print(f"[*] CPU 시간: 그리드 {grid_cpu:.2f}s | 반감 {sh_cpu:.2f}s ({sh_cpu / grid_cpu:.1%}) "
+          f"| 경과 {grid_wall:.2f}s vs {sh_wall:.2f}s")
+
+    if not same_set:
+        print(f"[!] 상위 {args.top_n}개 조합이 전체 그리드와 다릅니다. (1위 일치: {same_best})")
+        sys.exit(1)
+    print(f"[✔] 상위 {args.top_n}개 조합 일치 (1위 일치: {same_best})")
@@ -0,0 +1,344 @@
+"""
+합성 시장 통합 벤치마크 스위트 (수집 → 변환 → 지표 → 백테스트 → 분석)
+
+임시 디렉터리에 시드 고정 합성 유니버스(Benchmark/synthetic_market.py)를 수집기와 같은 형식으로 저장한 뒤
+실제 코드 경로를 그대로 실행해 단계별 시간/CPU/최대 메모리 증가분을 측정합니다.
+
+    case                내용
+    convert_to_daily    분봉 → 일봉 변환 (Collector/update_daily_chart.py)
+    indicators_daily    IndicatorFactory.compute_block (일봉, ALL_GROUPS + custom)
+    indicators_minute   IndicatorFactory.compute_block (분봉, ALL_GROUPS + custom)
+    run_backtest        VolatilityBacktester.run_backtest (VBT 경로, 종목별)
+    run_trades          VolatilityBacktester.run_trades (numba 경로, 종목별)
+    mass_backtest       ParallelBacktestRunner.run (리포트/거래 저장소 생성 포함, 결과 캐시 미사용)
+    analyzer_*          분석기 종목별 거래-지표 결합 루프 (시각화 제외, pandas_ta 필요)
+    pipeline            DataPipeline.run_pipeline (재생 대역 API, 결측일 보충 + 저장, win32com/pykrx 필요)
+
+결과는 커밋별로 data/benchmark/suite_history.parquet에 누적되며,
+직전(다른) 커밋의 같은 크기 결과 대비 느려진 케이스를 표시합니다. (--gate 지정 시 종료 코드 1)
+    python Benchmark/bench_suite.py --size small
+    python Benchmark/bench_suite.py --size medium --cases run_trades indicators_minute --gate 1.2
+"""
+import os
+import io
+import sys
+import shutil
+import argparse
+import platform
+import tempfile
+import warnings
+import subprocess
+import contextlib
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Benchmark.synthetic_market import SyntheticMarket, UNIVERSE_SIZES, BARS_PER_DAY
+from Collector.update_daily_chart import convert_to_daily
+from Indicators.factory import IndicatorFactory
+from Util.profiler import StageProfiler
+
+warnings.filterwarnings('ignore')
+
+HISTORY_PATH = os.path.join(BASE_DIR, 'data', 'benchmark', 'suite_history.parquet')
+# 직전 커밋 대비 이 배율 이상 느려지면 회귀로 표시
+DEFAULT_THRESHOLD = 1.25
+BLOCK_GROUPS = IndicatorFactory.ALL_GROUPS + ('custom',)
+
+
+# ---------------------------------------------------------------
+# 1. 실행 환경 / 커밋 정보
+# ---------------------------------------------------------------
+
+def git_commit() -> str:
+    """현재 커밋 해시 (추적 파일 변경이 있으면 '-dirty', git이 없으면 'unknown')"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BASE_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except Exception:
+        return 'unknown'
+
+
+@contextlib.contextmanager
+def _quiet():
+    """측정 대상 코드의 진행 출력 숨김"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@contextlib.contextmanager
+def _cwd(path):
+    """data/... 상대 경로를 쓰는 코드를 합성 유니버스 루트에서 실행"""
+    prev = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(prev)
+
+
+# ---------------------------------------------------------------
+# 2. 벤치마크 케이스 (각 함수: (root, tickers, frames, measure) → 처리 항목 수, 측정 구간은 with measure())
+# ---------------------------------------------------------------
+
+def case_convert_to_daily(root, tickers, frames, measure):
+    with measure():
+        for ticker in tickers:
+            convert_to_daily(frames[ticker])
+    return sum(len(frames[t]) for t in tickers)
+
+
+def case_indicators_daily(root, tickers, frames, measure):
+    daily = [pd.read_parquet(os.path.join(root, 'data', 'chart', 'daily', f"{t}.parquet")) for t in tickers]
+    with measure():
+        for d_df in daily:
+            IndicatorFactory.compute_block(d_df, groups=BLOCK_GROUPS)
+    return sum(len(d) for d in daily)
+
+
+def case_indicators_minute(root, tickers, frames, measure):
+    with measure():
+        for ticker in tickers:
+            IndicatorFactory.compute_block(frames[ticker], groups=BLOCK_GROUPS)
+    return sum(len(frames[t]) for t in tickers)
+
+
+def case_run_backtest(root, tickers, frames, measure):
+    from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+    tester = VolatilityBacktester()
+    with _cwd(root), measure():
+        for ticker in tickers:
+            tester.run_backtest(ticker, value_limit=0)
+    return len(tickers)
+
+
+def case_run_trades(root, tickers, frames, measure):
+    from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+    tester = VolatilityBacktester()
+    with _cwd(root), measure():
+        for ticker in tickers:
+            tester.run_trades(ticker, value_limit=0)
+    return len(tickers)
+
+
+def _mass_backtest(tickers):
+    from BackTest.parallel_runner import ParallelBacktestRunner
+    ParallelBacktestRunner(workers=1, run_kwargs={'value_limit': 0}, use_cache=False).run(tickers)
+
+
+def case_mass_backtest(root, tickers, frames, measure):
+    with _cwd(root), _quiet(), measure():
+        _mass_backtest(tickers)
+    return len(tickers)
+
+
+def _analyzer_case(module_name, method):
+    """분석기 run_analysis의 종목 루프(거래 저장소 스캔 + 종목별 거래-지표 결합)만 측정"""
+    def case(root, tickers, frames, measure):
+        module = __import__(f"BackTest.{module_name}", fromlist=['*'])
+        analyzer_cls = getattr(module, 'IndicatorAnalyzer', None) or getattr(module, 'MinuteIndicatorAnalyzer')
+        with _cwd(root), _quiet():
+            # 리포트/거래 저장소가 없으면 (mass_backtest 케이스를 건너뛴 경우) 먼저 생성
+            if not os.path.exists(os.path.join('data', 'backtest', 'volatility', 'summary',
+                                               'total_backtest_report.csv')):
+                _mass_backtest(tickers)
+            n = 0
+            with measure():
+                analyzer = analyzer_cls()
+                valid = analyzer.report[analyzer.report['Total Trades'] > 0]['Ticker'].unique()
+                trades = analyzer.trade_store.by_ticker(tickers=valid, columns=['entry_date', 'return', 'pnl'])
+                for ticker in valid:
+                    res = getattr(analyzer, method)(ticker, trades.get(ticker))
+                    n += len(res) if res is not None else 0
+        return n
+    return case
+
+
+def case_pipeline(root, tickers, frames, measure, missing_days=5):
+    """
+    최근 missing_days일이 빠진 분봉 파일을 재생 대역 API로 보충 → 저장 → 일봉 변환
+    (수집기의 2년 기간 필터에 걸리지 않도록 최근 날짜로 별도 유니버스를 만듦)
+    """
+    from Benchmark.replay import ReplayStockChart, ReplayPipeline
+
+    n_days = len(frames[tickers[0]]) // BARS_PER_DAY
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.offsets.BDay(1), periods=n_days)
+    market = SyntheticMarket(seed=7, start=str(days[0].date()))
+    recent = {t: m for t, m in zip(tickers, market.universe(len(tickers), n_days).values())}
+
+    pipe_root = tempfile.mkdtemp(prefix='bench_pipeline_')
+    try:
+        minute_dir = os.path.join(pipe_root, 'data', 'chart', 'minute')
+        os.makedirs(os.path.join(pipe_root, 'data', 'ticker'), exist_ok=True)
+        os.makedirs(minute_dir, exist_ok=True)
+        cutoff = days[-missing_days]
+        for ticker, m_df in recent.items():
+            m_df[m_df.index < cutoff].to_parquet(os.path.join(minute_dir, f"{ticker}.parquet"), compression='snappy')
+        pd.DataFrame({'code': tickers, 'listing_date': [None] * len(tickers)}).to_parquet(
+            os.path.join(pipe_root, 'data', 'ticker', 'filtered_tickers.parquet'), index=False)
+
+        pipeline = ReplayPipeline(pipe_root, ReplayStockChart(recent), market_days=days)
+        with _quiet(), measure():
+            pipeline.run_pipeline(save=True)
+    finally:
+        shutil.rmtree(pipe_root, ignore_errors=True)
+    return len(tickers)
+
+
+CASES = {
+    'convert_to_daily': (case_convert_to_daily, 'rows'),
+    'indicators_daily': (case_indicators_daily, 'rows'),
+    'indicators_minute': (case_indicators_minute, 'rows'),
+    'run_backtest': (case_run_backtest, 'tickers'),
+    'run_trades': (case_run_trades, 'tickers'),
+    'mass_backtest': (case_mass_backtest, 'tickers'),
+    'analyzer_daily': (_analyzer_case('AnalyzeIndicator', 'get_trade_analysis'), 'trades'),
+    'analyzer_minute': (_analyzer_case('MinuteIndicatorAnalyzer', 'get_minute_analysis'), 'trades'),
+    'analyzer_minute_filter': (_analyzer_case('MinuteIndicatorAnalyzerWithFilter', 'get_minute_analysis'), 'trades'),
+    'pipeline': (case_pipeline, 'tickers'),
+}
+
+
+# ---------------------------------------------------------------
+# 3. 실행 / 기록 / 회귀 비교
+# ---------------------------------------------------------------
+
+def _warmup(frames):
+    """numba 컴파일/라이브러리 로딩이 첫 케이스 측정에 섞이지 않도록 소량 데이터로 예열"""
+    from Benchmark.bench_breakout import SyntheticBacktester
+    m_df = next(iter(frames.values())).iloc[:20 * BARS_PER_DAY].copy()
+    with _quiet():
+        SyntheticBacktester(m_df).run_trades(None, value_limit=0)
+        IndicatorFactory.compute_block(m_df, groups=BLOCK_GROUPS)
+
+
+def run_suite(size='small', cases=None, repeat=1, seed=42) -> pd.DataFrame:
+    """
+    합성 유니버스를 만들어 케이스별 측정
+    :return: case, size, tickers, days, items, unit, seconds, cpu_s, peak_delta_mb, items_per_sec, status
+    """
+    n_tickers, n_days = UNIVERSE_SIZES[size]
+    names = cases or list(CASES)
+    root = tempfile.mkdtemp(prefix='bench_suite_')
+    rows = []
+    try:
+        print(f"[*] 합성 유니버스 생성: {n_tickers}종목 x {n_days}일 ({n_tickers * n_days * BARS_PER_DAY:,}분봉)")
+        market = SyntheticMarket(seed=seed)
+        tickers = market.write_universe(root, n_tickers, n_days)
+        frames = market.universe(n_tickers, n_days)
+        _warmup(frames)
+
+        for name in names:
+            fn, unit = CASES[name]
+            profiler = StageProfiler()
+            status, items = 'ok', 0
+            try:
+                for _ in range(repeat):
+                    items = fn(root, tickers, frames, lambda: profiler.stage(name))
+            except ImportError as e:
+                status = f"skipped ({e.name or e} 없음)"
+            except Exception as e:
+                status = f"error ({type(e).__name__}: {str(e)[:60]})"
+
+            rec = profiler.to_frame()
+            best = rec.loc[rec['wall_s'].idxmin()] if status == 'ok' and not rec.empty else None
+            rows.append({
+                'case': name, 'size': size, 'tickers': n_tickers, 'days': n_days,
+                'items': items, 'unit': unit,
+                'seconds': best['wall_s'] if best is not None else np.nan,
+                'cpu_s': best['cpu_s'] if best is not None else np.nan,
+                'peak_delta_mb': rec['peak_delta_mb'].max() if best is not None else np.nan,
+                'items_per_sec': items / best['wall_s'] if best is not None and best['wall_s'] > 0 else np.nan,
+                'status': status,
+            })
+            sec = rows[-1]['seconds']
+            print(f"    - {name:<24} {'-' if np.isnan(sec) else f'{sec:.3f}s':>10} | {status}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return pd.DataFrame(rows)
+
+
+def save_history(result: pd.DataFrame, commit: str, path=HISTORY_PATH) -> pd.DataFrame:
+    """결과에 커밋/시각/환경 정보를 붙여 이력 파일에 누적"""
+    result = result.assign(
+        commit=commit,
+        run_at=pd.Timestamp.now(),
+        python=platform.python_version(),
+        pandas=pd.__version__,
+        cpus=os.cpu_count(),
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        history = pd.concat([pd.read_parquet(path), result], ignore_index=True)
+    else:
+        history = result
+    history.to_parquet(path, index=False)
+    return history
+
+
+def compare_previous(history: pd.DataFrame, commit: str, size: str, threshold=DEFAULT_THRESHOLD) -> pd.DataFrame:
+    """
+    같은 크기에서 현재 커밋의 최신 결과와 직전(다른) 커밋의 최신 결과 비교
+    :return: case, prev_commit, prev_seconds, seconds, ratio, regressed
+    """
+    ok = history[(history['size'] == size) & (history['status'] == 'ok')]
+    current = ok[ok['commit'] == commit].groupby('case').tail(1).set_index('case')
+    others = ok[ok['commit'] != commit]
+    if current.empty or others.empty:
+        return pd.DataFrame()
+
+    prev_commit = others['commit'].iloc[-1]
+    prev = others[others['commit'] == prev_commit].groupby('case').tail(1).set_index('case')
+    joined = current[['seconds']].join(prev[['seconds']].rename(columns={'seconds': 'prev_seconds'}), how='inner')
+    joined['prev_commit'] = prev_commit
+    joined['ratio'] = joined['seconds'] / joined['prev_seconds']
+    joined['regressed'] = joined['ratio'] >= threshold
+    return joined.reset_index()[['case', 'prev_commit', 'prev_seconds', 'seconds', 'ratio', 'regressed']]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="합성 시장 통합 벤치마크 스위트")
+    parser.add_argument('--size', default='small', choices=list(UNIVERSE_SIZES))
+    parser.add_argument('--cases', nargs='+', default=None, choices=list(CASES))
+    parser.add_argument('--repeat', type=int, default=1, help="케이스별 반복 횟수 (최소 시간 기록)")
+    parser.add_argument('--no-save', action='store_true', help="이력 파일에 기록하지 않음")
+    parser.add_argument('--gate', type=float, default=None,
+                        help=f"직전 커밋 대비 이 배율 이상 느려진 케이스가 있으면 종료 코드 1 (예: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    print(f"🚀 벤치마크 스위트: commit={commit} | size={args.size} | repeat={args.repeat}")
+    result = run_suite(size=args.size, cases=args.cases, repeat=args.repeat)
+
+    with pd.option_context('display.width', 200):
+        print()
+        print(result.drop(columns=['size', 'tickers', 'days']).to_string(
+            index=False, float_format=lambda x: f"{x:,.3f}"))
+
+    if args.no_save:
+        sys.exit(0)
+
+    history = save_history(result, commit)
+    print(f"\n[✔] 이력 저장: {HISTORY_PATH} (누적 {len(history)}행)")
+
+    threshold = args.gate or DEFAULT_THRESHOLD
+    diff = compare_previous(history, commit, args.size, threshold=threshold)
+    if diff.empty:
+        print("[*] 비교할 이전 커밋 결과가 없습니다.")
+        sys.exit(0)
+
+    print(f"\n[직전 커밋({diff['prev_commit'].iloc[0]}) 대비]")
+    print(diff.drop(columns='prev_commit').to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+    regressed = diff[diff['regressed']]
+    if regressed.empty:
+        print(f"[✔] x{threshold:g} 이상 느려진 케이스 없음")
+    else:
+        print(f"[!] 회귀 의심 ({len(regressed)}건): {', '.join(regressed['case'])}")
+        if args.gate:
+            sys.exit(1)
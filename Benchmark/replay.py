@@ -0,0 +1,111 @@
+"""
+데이터 파이프라인 재생(replay) 대역 - 대신증권 API/네트워크 없이 DataPipeline 전체 흐름 측정용
+
+- ReplayStockChart: CpStockChart.request와 같은 인자/반환 형식(date, time, OHLCV, 최신순)으로
+  미리 만든 분봉을 돌려주는 대역. 개수 조회(retrieve_type="2")는 page_rows씩 연속 조회(Continue) 지원
+- ReplayMinuteUpdater: API 객체와 영업일 조회(pykrx)를 대역으로 바꾼 MinuteChartUpdater
+- ReplayPipeline: 경로를 임시 루트로 바꾼 DataPipeline
+
+※ Collector 모듈은 win32com/pykrx를 import하므로 해당 패키지가 있는 환경(Windows 수집 PC)에서만 동작합니다.
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Collector.update_minute_chart import MinuteChartUpdater
+from Collector.data_pipeline import DataPipeline
+from Collector.index_store import IndexStore
+from Collector.minute_index import MinuteIndexBuilder
+
+
+class _ChartObject:
+    """CpSysDib.StockChart 중 수집기가 참조하는 속성만 흉내 (연속 조회 여부)"""
+    def __init__(self):
+        self.Continue = 0
+
+
+class ReplayStockChart:
+    def __init__(self, minute_frames: dict, page_rows=2_000, latency=0.0):
+        """
+        :param minute_frames: {종목코드(6자리): 분봉 DataFrame (datetime 인덱스)}
+        :param page_rows: 1회 응답 최대 행 수 (초과분은 Continue=1로 이어서 조회)
+        :param latency: 요청당 지연(초) - API 왕복 시간 모사 (0이면 순수 처리 비용만 측정)
+        """
+        self.page_rows = page_rows
+        self.latency = latency
+        self.obj_stock_chart = _ChartObject()
+        self.requests = 0
+        self._frames = {code: self._to_api_format(df) for code, df in minute_frames.items()}
+        self._cursor = None  # 연속 조회 위치 (code, 다음 시작 행)
+
+    @staticmethod
+    def _to_api_format(m_df):
+        """datetime 인덱스 분봉 → API 응답 형식 (date=YYYYMMDD, time=HHMM 정수, 최신순)"""
+        idx = m_df.index
+        df = pd.DataFrame({
+            'date': (idx.year * 10000 + idx.month * 100 + idx.day).to_numpy(),
+            'time': (idx.hour * 100 + idx.minute).to_numpy(),
+            'open': m_df['open'].to_numpy(), 'high': m_df['high'].to_numpy(),
+            'low': m_df['low'].to_numpy(), 'close': m_df['close'].to_numpy(),
+            'volume': m_df['volume'].to_numpy(),
+        })
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def request(self, code, retrieve_type="1", toDate=None, fromDate=None, retrieve_limit=500, caller=None,
+                chart_type='D', interval=1, gap_adjustment="2", adjust_price="1", continue_query=False):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        frame = self._frames.get(code[1:] if code.startswith('A') else code)
+        if frame is None or chart_type != 'm':
+            self.obj_stock_chart.Continue = 0
+            return False
+
+        if retrieve_type == "1":
+            mask = np.ones(len(frame), dtype=bool) if fromDate is None else frame['date'].to_numpy() >= fromDate
+            if toDate is not None:
+                mask &= frame['date'].to_numpy() <= toDate
+            self.obj_stock_chart.Continue = 0
+            out = frame[mask]
+        else:
+            start = self._cursor[1] if continue_query and self._cursor and self._cursor[0] == code else 0
+            limit = min(self.page_rows, retrieve_limit)
+            out = frame.iloc[start:start + limit]
+            end = start + len(out)
+            self._cursor = (code, end)
+            self.obj_stock_chart.Continue = int(end < len(frame) and limit == self.page_rows)
+
+        if out.empty:
+            return False
+        return out.reset_index(drop=True)
+
+
+class ReplayMinuteUpdater(MinuteChartUpdater):
+    def __init__(self, api: ReplayStockChart, save_dir, market_days):
+        """API 객체/저장 경로/영업일 목록을 주입 (부모 __init__의 COM 객체 생성 생략)"""
+        self.api = api
+        self.save_dir = save_dir
+        self.market_days = pd.DatetimeIndex(market_days)
+        os.makedirs(self.save_dir, exist_ok=True)
+
+    def get_market_days(self, start, end):
+        days = self.market_days
+        return days[(days >= pd.Timestamp(start)) & (days <= pd.Timestamp(end))]
+
+
+class ReplayPipeline(DataPipeline):
+    def __init__(self, root, api: ReplayStockChart, market_days):
+        """root/data 아래 티커 목록/분봉/일봉을 사용하는 DataPipeline"""
+        self.ticker_path = os.path.join(root, "data", "ticker", "filtered_tickers.parquet")
+        self.daily_save_dir = os.path.join(root, "data", "chart", "daily")
+        self.min_updater = ReplayMinuteUpdater(api, os.path.join(root, "data", "chart", "minute"), market_days)
+        self.metrics_dir = os.path.join(root, "data", "metrics", "pipeline")
+        self.index_builder = MinuteIndexBuilder(IndexStore(root=os.path.join(root, "data", "chart", "index", "daily")),
+                                                root=root)
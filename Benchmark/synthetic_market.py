@@ -0,0 +1,156 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Collector.update_daily_chart import convert_to_daily
+
+# KRX 장중 분봉 시각: 09:01 ~ 15:20 (연속매매 380개) + 15:30 (종가 단일가 1개)
+SESSION_MINUTES = np.concatenate((np.arange(9 * 60 + 1, 15 * 60 + 21), [15 * 60 + 30]))
+BARS_PER_DAY = len(SESSION_MINUTES)
+
+# 벤치마크 유니버스 크기 프리셋: (종목 수, 거래일 수)
+UNIVERSE_SIZES = {
+    'small': (10, 120),
+    'medium': (50, 250),
+    'large': (200, 500),
+}
+
+# KRX 호가가격단위 (2023년 개편 기준, 가격 상한 미만 → 호가 단위)
+KRX_TICK_TABLE = [
+    (2_000, 1),
+    (5_000, 5),
+    (20_000, 10),
+    (50_000, 50),
+    (200_000, 100),
+    (500_000, 500),
+    (np.inf, 1_000),
+]
+
+
+def krx_tick_size(price: np.ndarray) -> np.ndarray:
+    """가격 배열에 해당하는 KRX 호가 단위"""
+    price = np.asarray(price, dtype=np.float64)
+    bounds = np.array([b for b, _ in KRX_TICK_TABLE])
+    ticks = np.array([t for _, t in KRX_TICK_TABLE], dtype=np.float64)
+    return ticks[np.searchsorted(bounds, price, side='right').clip(max=len(ticks) - 1)]
+
+
+def round_to_tick(price: np.ndarray) -> np.ndarray:
+    """가격을 KRX 호가 단위로 반올림"""
+    tick = krx_tick_size(price)
+    return np.maximum(np.round(price / tick) * tick, tick)
+
+
+class SyntheticMarket:
+    """
+    시드 고정 KRX 유사 분봉/일봉 생성기 (벤치마크/검증용, 네트워크·실데이터 불필요)
+    - 장중 세션: 09:01~15:20 + 15:30 종가 (하루 381봉)
+    - 호가 단위 반올림, 장중 변동성/거래량 U자형 패턴, 전일 대비 시가 갭
+    """
+    def __init__(self, seed: int = 42, start: str = '2015-01-02'):
+        self.seed = seed
+        self.start = pd.Timestamp(start)
+
+    def minute_bars(self, n_rows: int, base_price: float = 50_000, daily_vol: float = 0.025,
+                    gap_vol: float = 0.01, base_volume: float = 2_000, seed_offset: int = 0) -> pd.DataFrame:
+        """
+        n_rows개 분봉 생성 (datetime 인덱스, open/high/low/close/volume)
+        MinuteChartUpdater가 저장하는 분봉 형식과 동일합니다.
+        """
+        rng = np.random.default_rng(self.seed + seed_offset)
+        n_days = max(1, -(-n_rows // BARS_PER_DAY))
+        days = pd.bdate_range(self.start, periods=n_days)
+
+        # 1. 장중 U자형 가중치 (장 시작/마감 부근 변동성·거래량 확대)
+        t = np.linspace(-1.0, 1.0, BARS_PER_DAY)
+        u_shape = 1.0 + 1.5 * t ** 2
+        vol_weight = u_shape / np.sqrt(np.mean(u_shape ** 2))
+        minute_vol = daily_vol / np.sqrt(BARS_PER_DAY)
+
+        # 2. 로그 수익률: 장중 분봉 + 일별 갭(가끔 큰 갭)
+        rets = rng.standard_normal((n_days, BARS_PER_DAY)) * minute_vol * vol_weight
+        gaps = rng.standard_normal(n_days) * gap_vol
+        jumps = rng.random(n_days) < 0.03
+        gaps[jumps] += rng.standard_normal(jumps.sum()) * gap_vol * 4
+        rets[:, 0] += gaps
+        rets[0, 0] = 0.0
+
+        log_close = np.log(base_price) + np.cumsum(rets.ravel())
+        close = np.exp(log_close)
+        open_ = np.empty_like(close)
+        open_[0] = close[0]
+        open_[1:] = close[:-1]
+        # 첫 봉 시가는 갭이 반영된 가격 (직전 종가 → 갭 후 가격 사이)
+        first = np.arange(0, len(close), BARS_PER_DAY)
+        open_[first] = np.exp(log_close[first] - rets.ravel()[first] * rng.random(n_days) * 0.5)
+
+        wick = np.abs(rng.standard_normal((2, len(close)))) * minute_vol * 0.6 * np.tile(vol_weight, n_days)
+        high = np.maximum(open_, close) * (1 + wick[0])
+        low = np.minimum(open_, close) * (1 - wick[1])
+
+        # 3. 호가 단위 반올림 후 OHLC 일관성 보정
+        open_, close = round_to_tick(open_), round_to_tick(close)
+        high = np.maximum(round_to_tick(high), np.maximum(open_, close))
+        low = np.minimum(round_to_tick(low), np.minimum(open_, close))
+
+        # 4. 거래량: 일별 활동도 x 장중 U자형 x 로그정규 잡음 (종가 단일가 봉은 크게)
+        day_activity = np.exp(rng.standard_normal(n_days) * 0.5)
+        vol_curve = np.tile(u_shape, n_days) * np.repeat(day_activity, BARS_PER_DAY)
+        vol_curve[BARS_PER_DAY - 1::BARS_PER_DAY] *= 5
+        volume = np.floor(base_volume * vol_curve * np.exp(rng.standard_normal(len(close)) * 0.7)).astype(np.int64)
+
+        minutes = np.tile(SESSION_MINUTES, n_days)
+        index = pd.DatetimeIndex(np.repeat(days.values, BARS_PER_DAY) + pd.to_timedelta(minutes, unit='min').values,
+                                 name='datetime')
+
+        df = pd.DataFrame({
+            'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume,
+        }, index=index)
+        return df.iloc[:n_rows]
+
+    def daily_bars(self, n_days: int, **kwargs) -> pd.DataFrame:
+        """n_days일 분봉을 생성해 convert_to_daily로 변환한 일봉 (date 컬럼, 수집기 저장 형식과 동일)"""
+        minute_df = self.minute_bars(n_days * BARS_PER_DAY, **kwargs)
+        return convert_to_daily(minute_df)
+
+    def universe(self, n_tickers: int, n_days: int, first_code: int = 900_000) -> dict:
+        """
+        {종목코드(6자리): 분봉 DataFrame} 유니버스 (종목별 변동성/거래대금 분산)
+        종목코드는 실제 종목과 겹치지 않는 9xxxxx 대역을 사용합니다.
+        """
+        return {
+            f"{first_code + i:06d}": self.minute_bars(
+                n_days * BARS_PER_DAY, seed_offset=i, base_price=5_000 * (1 + i % 20),
+                daily_vol=0.02 + 0.002 * (i % 15), base_volume=20_000 * (1 + i % 10))
+            for i in range(n_tickers)
+        }
+
+    def write_universe(self, root: str, n_tickers: int, n_days: int) -> list:
+        """
+        수집기와 같은 형식으로 root 아래에 유니버스를 저장합니다.
+        - data/chart/minute/{ticker}.parquet (datetime 인덱스, MinuteChartUpdater 형식)
+        - data/chart/daily/{ticker}.parquet (date 컬럼, convert_to_daily 형식)
+        - data/ticker/filtered_tickers.parquet (code, listing_date)
+        :return: 종목코드 목록
+        """
+        minute_dir = os.path.join(root, 'data', 'chart', 'minute')
+        daily_dir = os.path.join(root, 'data', 'chart', 'daily')
+        ticker_dir = os.path.join(root, 'data', 'ticker')
+        for d in (minute_dir, daily_dir, ticker_dir):
+            os.makedirs(d, exist_ok=True)
+
+        tickers = []
+        for ticker, m_df in self.universe(n_tickers, n_days).items():
+            m_df.to_parquet(os.path.join(minute_dir, f"{ticker}.parquet"), compression='snappy')
+            convert_to_daily(m_df).to_parquet(os.path.join(daily_dir, f"{ticker}.parquet"),
+                                              engine='fastparquet', compression='snappy', index=True)
+            tickers.append(ticker)
+
+        pd.DataFrame({'code': tickers, 'listing_date': [None] * len(tickers)}).to_parquet(
+            os.path.join(ticker_dir, 'filtered_tickers.parquet'), index=False)
+        return tickers
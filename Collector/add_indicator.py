@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import os
 import sys
 
@@ -13,10 +14,14 @@ class ChartIndicatorAdder:
         self.min_dir = os.path.join(BASE_DIR, "data", "chart", "minute")
         self.daily_dir = os.path.join(BASE_DIR, "data", "chart", "daily")
 
-    def add_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def add_indicators(self, df: pd.DataFrame, copy: bool = True, dtype=np.float64) -> pd.DataFrame:
         """
         외부에서 받은 2년치 df에 지표를 추가합니다.
         데이터가 너무 적으면 지표 계산 결과가 부정확하므로 종료합니다.
+
+        :param copy: False이고 입력이 이미 시간순 정렬되어 있으면 방어적 복사/정렬을 생략하고
+            반환 DataFrame이 원본 봉 컬럼을 그대로 공유합니다. (지표는 반환값에만 추가되며 입력 df는 변경되지 않음)
+        :param dtype: 지표 블록 dtype (np.float32 사용 시 지표 메모리 절반)
         """
         # 1. 데이터 존재 여부 및 최소 행 수 체크
         # 최소 150행은 있어야 120일 이평선 등 주요 지표가 계산됩니다.
@@ -31,24 +36,44 @@ class ChartIndicatorAdder:
             print("[*] 지표 계산을 중단하고 빈 데이터프레임을 반환합니다.")
             return pd.DataFrame()
 
-        # 2. 데이터 복사 및 정렬
+        # 2. 정렬 (필요할 때만 복사)
         # 지표는 순서가 중요하므로 시간순 정렬을 보장합니다.
-        combined_df = df.copy()
-        sort_cols = ['date', 'time'] if 'time' in combined_df.columns else ['date']
-        combined_df = combined_df.sort_values(sort_cols).reset_index(drop=True)
+        sort_cols = [c for c in ['date', 'time'] if c in df.columns]
+        if not copy and self._is_sorted(df, sort_cols):
+            combined_df = df
+        elif sort_cols:
+            combined_df = df.sort_values(sort_cols, ignore_index=True)
+        else:
+            # datetime 인덱스 분봉 데이터 (date/time 컬럼 없음)
+            combined_df = df.sort_index()
 
         # print(f"[*] {len(combined_df)}행의 데이터를 확인했습니다. 지표 계산을 시작합니다.")
 
         # 3. 지표 계산 (factory 활용)
+        # 모든 지표를 단일 블록에 기록한 뒤 한 번에 결합 (컬럼별 삽입/블록 통합 비용 제거)
         try:
-            combined_df = IndicatorFactory.add_all_indicators(combined_df)
-            combined_df = IndicatorFactory.add_custom_indicators(combined_df)
+            groups = IndicatorFactory.ALL_GROUPS + ('custom',)
+            combined_df = IndicatorFactory.add_indicator_block(combined_df, groups=groups, dtype=dtype,
+                                                               share_input=True)
         except Exception as e:
             print(f"[!] 지표 계산 중 오류 발생: {e}")
             return pd.DataFrame()
 
         return combined_df
 
+    @staticmethod
+    def _is_sorted(df: pd.DataFrame, sort_cols: list) -> bool:
+        """정렬 키(date, time 또는 인덱스) 기준으로 이미 오름차순인지 확인"""
+        if not sort_cols:
+            return df.index.is_monotonic_increasing
+        if len(sort_cols) == 1:
+            return df[sort_cols[0]].is_monotonic_increasing
+
+        d = df[sort_cols[0]].to_numpy()
+        t = df[sort_cols[1]].to_numpy()
+        same_day = d[1:] == d[:-1]
+        return bool(np.all((d[1:] > d[:-1]) | (same_day & (t[1:] >= t[:-1]))))
+
 # 테스트 코드
 if __name__ == "__main__":
     # 삼성전자 분봉 parquet파일을 로드
@@ -11,12 +11,16 @@ sys.path.append(BASE_DIR)
 # 수집기 및 변환기 임포트 
 from Collector.update_minute_chart import MinuteChartUpdater
 from Collector.update_daily_chart import convert_to_daily
+from Collector.minute_index import MinuteIndexBuilder
+from Util.profiler import PROFILER
 
 class DataPipeline:
     def __init__(self):
         self.ticker_path = os.path.join(BASE_DIR, "data", "ticker", "filtered_tickers.parquet")
         self.daily_save_dir = os.path.join(BASE_DIR, "data", "chart", "daily")
         self.min_updater = MinuteChartUpdater()
+        self.metrics_dir = os.path.join(BASE_DIR, "data", "metrics", "pipeline")
+        self.index_builder = MinuteIndexBuilder()
 
     def run_pipeline(self, save=True):
         """
@@ -33,6 +37,8 @@ class DataPipeline:
         success_count = 0
         fail_count = 0
         start_time = time.time()
+        run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        PROFILER.reset()
 
         print("=" * 60)
         print(f"🚀 데이터 파이프라인 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -55,16 +61,18 @@ class DataPipeline:
 
             try:
                 # 2. 분봉 업데이트 (이미 내부에서 datetime 인덱스로 변환됨)
-                df_min = self.min_updater.get_updated_data(ticker, listing_date=listing_date, save=save)
+                with PROFILER.stage('minute_update', ticker):
+                    df_min = self.min_updater.get_updated_data(ticker, listing_date=listing_date, save=save)
 
                 if df_min is not None and not df_min.empty:
                     # 3. 일봉 변환 및 저장 (datetime 인덱스를 인식하여 resample로 동작)
-                    convert_to_daily(
-                        df=df_min, 
-                        ticker=ticker, 
-                        save=save, 
-                        save_dir=self.daily_save_dir
-                    )
+                    with PROFILER.stage('daily_convert', ticker):
+                        convert_to_daily(
+                            df=df_min,
+                            ticker=ticker,
+                            save=save,
+                            save_dir=self.daily_save_dir
+                        )
                     success_count += 1
                     status = "완료"
                     # 메모리 해제 지원
@@ -89,6 +97,20 @@ class DataPipeline:
         print(f"🏁 파이프라인 종료: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"✅ 성공: {success_count} | ❌ 실패: {fail_count} | ⏱ 총 소요시간: {total_elapsed/60:.1f}분")
         print(f"📊 평균 종목당 소요시간: {avg_time:.2f}초")
+
+        # 4. 갱신된 분봉으로 합성 분봉 지수 증분 생성 (저장 모드에서만)
+        if save:
+            try:
+                with PROFILER.stage('minute_index'):
+                    self.index_builder.run()
+            except Exception as e:
+                print(f"[!] 합성 분봉 지수 생성 실패: {e}")
+
+        # 단계별 계측 (API 대기/전송, parquet 읽기/쓰기, 변환) 집계 및 저장
+        PROFILER.report("파이프라인 단계별 계측")
+        metrics_file = PROFILER.export(os.path.join(self.metrics_dir, f"{run_id}.json"),
+                                       meta={'run_id': run_id, 'tickers': total, 'save': save})
+        print(f"⏱️ 계측 파일: {metrics_file}")
         print("=" * 60)
 
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+"""
+시장 지수 로컬 저장소 (KOSPI / KOSDAQ 등 일봉 + 구성 종목 분봉으로 만든 합성 분봉 지수)
+
+지수 일봉을 data/chart/index/daily/{심볼}.parquet 에 저장하고, 갱신 시에는
+마지막 저장일 - overlap_days 부터만 내려받아 병합합니다. (실행마다 전체 기간 재다운로드 대체)
+조회(load)는 네트워크 없이 로컬 파일만 읽으므로 시뮬레이터/분석은 오프라인으로 동작합니다.
+
+- 다운로드: FinanceDataReader 우선, 실패 시 yfinance (둘 다 갱신할 때만 import)
+- 컬럼: 분봉/일봉 차트와 같은 open/high/low/close/volume 소문자, 인덱스 date
+- 장 마감(15:30) 전 당일 행은 저장하지 않음 (update_minute_chart와 같은 규칙)
+
+합성 분봉 지수(Collector/minute_index.py가 생성)는 data/chart/index/minute/{YYYYMMDD}.parquet 에
+거래일 하나당 파일 하나(긴 형식: datetime, index, ew, vw, ew_ret, vw_ret, n, value)로 저장됩니다.
+
+    python Collector/index_store.py            # 기본 지수 증분 갱신
+    kospi = IndexStore().load('KS11', start='2024-01-01')
+    kospi_min = IndexStore().load_minute('KOSPI', start='2024-01-01')
+"""
+import os
+import sys
+import pandas as pd
+import pyarrow.dataset as ds
+from datetime import datetime
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Util.profiler import PROFILER
+
+INDEX_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# 합성 분봉 지수 컬럼 (ew/vw = 동일가중/시가총액가중 지수 값, *_ret = 전일 종가 대비 수익률)
+MINUTE_INDEX_COLUMNS = ['datetime', 'index', 'ew', 'vw', 'ew_ret', 'vw_ret', 'n', 'value']
+
+
+class IndexStore:
+    # 시장 구분 -> 지수 심볼 (FinanceDataReader 기준)
+    MARKETS = {'KOSPI': 'KS11', 'KOSDAQ': 'KQ11'}
+    # yfinance 백업용 심볼
+    YF_SYMBOLS = {'KS11': '^KS11', 'KQ11': '^KQ11'}
+
+    def __init__(self, root=None, minute_root=None):
+        self.root = root or os.path.join(BASE_DIR, "data", "chart", "index", "daily")
+        self.minute_root = minute_root or os.path.join(os.path.dirname(self.root), "minute")
+        os.makedirs(self.root, exist_ok=True)
+        os.makedirs(self.minute_root, exist_ok=True)
+
+    def path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol}.parquet")
+
+    @classmethod
+    def market_symbol(cls, market_type) -> str:
+        """시장 구분 문자열 -> 지수 심볼 ('KOSPI' 포함이면 KOSPI, 그 외 KOSDAQ)"""
+        return cls.MARKETS['KOSPI'] if 'KOSPI' in str(market_type).upper() else cls.MARKETS['KOSDAQ']
+
+    def load(self, symbol: str, start=None, end=None) -> pd.DataFrame:
+        """로컬 지수 일봉 조회 (없으면 빈 DataFrame)"""
+        file_path = self.path(symbol)
+        if not os.path.exists(file_path):
+            return pd.DataFrame(columns=INDEX_COLUMNS)
+        with PROFILER.stage('parquet_read'):
+            df = pd.read_parquet(file_path)
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index <= pd.Timestamp(end)]
+        return df
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """다운로드 결과 -> date 인덱스 + 소문자 OHLCV (yfinance 다중 컬럼 포함)"""
+        if df is None or df.empty:
+            return pd.DataFrame(columns=INDEX_COLUMNS)
+        if isinstance(df.columns, pd.MultiIndex):
+            df = df.droplevel(1, axis=1)
+        df = df.rename(columns=str.lower)
+        df.index = pd.DatetimeIndex(df.index).tz_localize(None).normalize()
+        df.index.name = 'date'
+        return df.reindex(columns=INDEX_COLUMNS).astype('float64')
+
+    def download(self, symbol: str, start, end=None) -> pd.DataFrame:
+        """외부 소스에서 지수 일봉 다운로드 (FinanceDataReader -> yfinance 순)"""
+        try:
+            import FinanceDataReader as fdr
+            with PROFILER.stage('api_request', symbol):
+                df = fdr.DataReader(symbol, start, end)
+            if not df.empty:
+                return self._normalize(df)
+        except Exception as e:
+            print(f"[!] {symbol}: FDR 실패 ({e}), YFinance 시도...")
+
+        import yfinance as yf
+        with PROFILER.stage('api_request', symbol):
+            df = yf.download(self.YF_SYMBOLS.get(symbol, symbol), start=start, end=end, progress=False)
+        return self._normalize(df)
+
+    def update(self, symbols=None, start='2015-01-01', overlap_days: int = 5) -> dict:
+        """
+        지수 일봉 증분 갱신
+        :param symbols: 갱신할 심볼 (기본: MARKETS 전체)
+        :param start: 로컬 파일이 없을 때 수집 시작일
+        :param overlap_days: 마지막 저장일 이전부터 다시 받을 일수 (수정 반영)
+        :return: {심볼: 새로 추가된 행 수}
+        """
+        symbols = symbols or list(self.MARKETS.values())
+        now = datetime.now()
+        added = {}
+        for symbol in symbols:
+            df = self.load(symbol)
+            fetch_start = pd.Timestamp(start) if df.empty else df.index.max() - pd.Timedelta(days=overlap_days)
+            try:
+                new_df = self.download(symbol, fetch_start.strftime('%Y-%m-%d'))
+            except Exception as e:
+                print(f"[!] {symbol}: 지수 다운로드 실패 ({e}) - 기존 데이터 유지")
+                added[symbol] = 0
+                continue
+
+            # 장 마감 전 당일 행 제외
+            if now.time() < datetime.strptime("15:30", "%H:%M").time():
+                new_df = new_df[new_df.index.date != now.date()]
+
+            with PROFILER.stage('merge', symbol):
+                before = len(df)
+                merged = pd.concat([df, new_df]) if not df.empty else new_df
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            with PROFILER.stage('write', symbol):
+                merged.to_parquet(self.path(symbol), compression='snappy')
+            added[symbol] = len(merged) - before
+            print(f"[✔] {symbol}: 지수 갱신 완료 (+{added[symbol]}행, 총 {len(merged)}행, ~{merged.index.max().date()})")
+        return added
+
+    # ---------------------------------------------------------------
+    # 합성 분봉 지수
+    # ---------------------------------------------------------------
+
+    def minute_days(self) -> list:
+        """합성 분봉 지수가 저장된 거래일 (Timestamp, 오름차순)"""
+        names = sorted(f for f in os.listdir(self.minute_root) if f.endswith('.parquet'))
+        return [pd.Timestamp(f[:8]) for f in names]
+
+    def write_minute_day(self, day, df: pd.DataFrame):
+        """거래일 하나의 합성 분봉 지수 저장 (같은 날짜 파일은 덮어씀)"""
+        file_path = os.path.join(self.minute_root, f"{pd.Timestamp(day).strftime('%Y%m%d')}.parquet")
+        with PROFILER.stage('write'):
+            df[MINUTE_INDEX_COLUMNS].to_parquet(file_path, compression='snappy', index=False)
+
+    def last_minute_levels(self) -> dict:
+        """가장 최근 저장일의 지수별 마지막 값 {지수: (ew, vw)} (다음 거래일 연결용)"""
+        days = self.minute_days()
+        if not days:
+            return {}
+        df = pd.read_parquet(os.path.join(self.minute_root, f"{days[-1].strftime('%Y%m%d')}.parquet"))
+        last = df.sort_values('datetime').groupby('index').last()
+        return {name: (row['ew'], row['vw']) for name, row in last.iterrows()}
+
+    def load_minute(self, names, start=None, end=None, columns=None) -> pd.DataFrame:
+        """
+        합성 분봉 지수 조회 (한 번의 데이터셋 스캔)
+        :param names: 지수 이름 또는 목록 (예: 'KOSPI', ['KOSDAQ', 'sector:반도체'])
+        :param columns: 읽을 컬럼 (기본: 전체)
+        :return: 지수가 하나면 datetime 인덱스 DataFrame, 여럿이면 index 컬럼 포함 (없으면 빈 DataFrame)
+        """
+        single = isinstance(names, str)
+        names = [names] if single else list(names)
+        if not self.minute_days():
+            return pd.DataFrame(columns=[c for c in MINUTE_INDEX_COLUMNS if c != 'datetime'])
+
+        expr = ds.field('index').isin(names)
+        if start is not None:
+            expr = expr & (ds.field('datetime') >= pd.Timestamp(start))
+        if end is not None:
+            end = pd.Timestamp(end)
+            if end == end.normalize():
+                end = end + pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+            expr = expr & (ds.field('datetime') <= end)
+        if columns is not None:
+            columns = ['datetime', 'index'] + [c for c in columns if c not in ('datetime', 'index')]
+
+        with PROFILER.stage('parquet_read'):
+            table = ds.dataset(self.minute_root, format='parquet').to_table(columns=columns, filter=expr)
+        df = table.to_pandas().sort_values(['index', 'datetime'], kind='stable').set_index('datetime')
+        return df.drop(columns='index') if single else df
+
+
+if __name__ == "__main__":
+    IndexStore().update()
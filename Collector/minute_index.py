@@ -0,0 +1,279 @@
+"""
+구성 종목 분봉으로 만드는 합성 분봉 지수 (KOSPI / KOSDAQ / 전체 / 업종별, 동일가중 + 시가총액가중)
+
+저장된 종목 분봉(data/chart/minute)과 종목 정보(filtered_tickers.parquet의 market, market_cap, prev_price,
+업종은 stock_codes.csv의 upName)로 거래일마다 다음을 한 번에 계산합니다.
+
+1. 거래일의 (분 x 종목) 종가 행렬 - 체결 없는 분은 직전 체결가, 장 시작 전 체결이 없으면 전일 종가
+2. 전일 종가 대비 상대 가격 rel = P / 전일 종가
+3. 지수 소속 행렬 G (종목 x 지수)와 행렬곱으로 전 지수를 한 번에 집계
+   - 동일가중(ew): (rel @ G) / 구성 종목 수   (매일 전일 종가 기준 동일 비중 재조정)
+   - 시가총액가중(vw): (rel * 전일 시가총액) @ G / (전일 시가총액 @ G)  (주식 수 = market_cap / prev_price)
+   - 거래대금(value): (종가 x 거래량) @ G
+4. 지수 값 = 전일 마지막 지수 값 x 집계 rel (첫 거래일 1000)
+
+당일 분봉이 없는 종목(거래정지 등)과 전일 종가가 없는 종목(신규 상장일)은 그날 지수에서 제외합니다.
+마지막 저장일 이후 거래일만 month 단위 묶음으로 읽어 증분 생성하며, 장 마감(15:30) 전 당일은 만들지 않습니다.
+
+    python Collector/minute_index.py
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Collector.index_store import IndexStore, MINUTE_INDEX_COLUMNS
+from Util.profiler import PROFILER
+
+BASE_LEVEL = 1000.0
+
+
+class MinuteIndexBuilder:
+    def __init__(self, index_store: IndexStore = None, root=None, code_path=None):
+        """
+        :param root: 프로젝트 데이터 루트 (기본: BASE_DIR) - data/chart/minute, data/ticker 를 사용
+        :param code_path: 업종 정보 파일 (code, upName), 없으면 시장 지수만 생성
+        """
+        root = root or BASE_DIR
+        self.index_store = index_store or IndexStore()
+        self.minute_dir = os.path.join(root, "data", "chart", "minute")
+        self.ticker_path = os.path.join(root, "data", "ticker", "filtered_tickers.parquet")
+        self.code_path = code_path or os.path.join(root, "stock_codes.csv")
+
+    # ---------------------------------------------------------------
+    # 1. 구성 종목 / 지수 소속
+    # ---------------------------------------------------------------
+
+    def load_universe(self) -> pd.DataFrame:
+        """
+        구성 종목 정보 (code 인덱스: market, shares, sector)
+        주식 수는 market_cap / prev_price (종목 정보 수집 시점 기준, 없으면 NaN = 시가총액가중에서 제외)
+        """
+        tickers = pd.read_parquet(self.ticker_path)
+        tickers['code'] = tickers['code'].astype(str).str.zfill(6)
+        universe = pd.DataFrame(index=pd.Index(tickers['code'].to_numpy(), name='code'))
+        universe['market'] = tickers['market'].to_numpy() if 'market' in tickers.columns else None
+
+        if {'market_cap', 'prev_price'} <= set(tickers.columns):
+            price = pd.to_numeric(tickers['prev_price'], errors='coerce').to_numpy(dtype=np.float64)
+            cap = pd.to_numeric(tickers['market_cap'], errors='coerce').to_numpy(dtype=np.float64)
+            universe['shares'] = np.where(price > 0, cap / np.where(price > 0, price, 1.0), np.nan)
+        else:
+            print("[!] market_cap/prev_price 정보가 없어 시가총액가중 지수는 NaN으로 저장됩니다.")
+            universe['shares'] = np.nan
+
+        universe['sector'] = None
+        if os.path.exists(self.code_path):
+            codes = pd.read_csv(self.code_path)
+            codes['code'] = codes['code'].astype(str).str.zfill(6)
+            universe['sector'] = universe.index.map(codes.drop_duplicates('code').set_index('code')['upName'])
+        return universe[~universe.index.duplicated()]
+
+    @staticmethod
+    def membership(universe: pd.DataFrame):
+        """
+        지수 소속 행렬
+        :return: 지수 이름 목록, (종목 수 x 지수 수) float64 0/1 행렬
+        """
+        names = ['ALL']
+        columns = [np.ones(len(universe))]
+        market = universe['market'].astype(str).str.upper()
+        for name in ('KOSPI', 'KOSDAQ'):
+            names.append(name)
+            columns.append((market == name).to_numpy(dtype=np.float64))
+        for sector in sorted(universe['sector'].dropna().unique()):
+            names.append(f"sector:{sector}")
+            columns.append((universe['sector'] == sector).to_numpy(dtype=np.float64))
+        return names, np.column_stack(columns)
+
+    # ---------------------------------------------------------------
+    # 2. 분봉 읽기 (묶음 단위)
+    # ---------------------------------------------------------------
+
+    def _read_bars(self, codes, lo, hi):
+        """
+        [lo, hi] 구간 분봉을 전 종목에서 읽어 (종목, 시각) 순 긴 배열로 반환
+        :return: 시각(int64 ns), 종목 위치, 종가, 거래대금
+        """
+        times, tk, close, value = [], [], [], []
+        for j, code in enumerate(codes):
+            path = os.path.join(self.minute_dir, f"{code}.parquet")
+            if not os.path.exists(path):
+                continue
+            try:
+                df = pd.read_parquet(path, columns=['close', 'volume'],
+                                     filters=[('datetime', '>=', lo), ('datetime', '<=', hi)])
+            except Exception as e:
+                print(f"[!] {code}: 분봉 로드 실패 ({e})")
+                continue
+            if df.empty:
+                continue
+            idx = pd.DatetimeIndex(df.index)
+            if idx.tz is not None:
+                idx = idx.tz_localize(None)
+            order = np.argsort(idx.asi8, kind='stable')
+            c = df['close'].to_numpy(dtype=np.float64)[order]
+            times.append(idx.asi8[order])
+            tk.append(np.full(len(df), j, dtype=np.int64))
+            close.append(c)
+            value.append(c * df['volume'].to_numpy(dtype=np.float64)[order])
+        if not times:
+            empty = np.empty(0)
+            return empty.astype(np.int64), empty.astype(np.int64), empty, empty
+        return np.concatenate(times), np.concatenate(tk), np.concatenate(close), np.concatenate(value)
+
+    @staticmethod
+    def _prev_close(tk, day, close):
+        """
+        (종목, 시각) 순 긴 배열의 각 분봉에 대해, 그 종목의 직전 거래일 마지막 종가 (없으면 NaN)
+        """
+        n = len(tk)
+        new_group = np.ones(n, dtype=np.bool_)
+        new_group[1:] = (tk[1:] != tk[:-1]) | (day[1:] != day[:-1])
+        group = np.cumsum(new_group) - 1
+        starts = np.flatnonzero(new_group)
+        ends = np.append(starts[1:], n) - 1
+        last_close = close[ends]
+        # 같은 종목의 직전 (종목, 날짜) 묶음의 마지막 종가
+        prev = np.full(len(starts), np.nan)
+        same_ticker = tk[starts[1:]] == tk[starts[:-1]]
+        prev[1:][same_ticker] = last_close[:-1][same_ticker]
+        return prev[group]
+
+    # ---------------------------------------------------------------
+    # 3. 거래일 집계
+    # ---------------------------------------------------------------
+
+    @staticmethod
+    def aggregate_day(times, tk, close, value, prev_close, n_tickers, G, weights, names, levels) -> pd.DataFrame:
+        """
+        거래일 하나의 분봉(긴 배열)을 (분 x 종목) 행렬로 펼쳐 전 지수를 행렬곱으로 집계
+
+        :param weights: 종목별 주식 수 (NaN = 시가총액가중 제외)
+        :param levels: {지수: (ew, vw)} 전일 마지막 지수 값 (갱신됨)
+        :return: 긴 형식 DataFrame (MINUTE_INDEX_COLUMNS)
+        """
+        stamps, t_idx = np.unique(times, return_inverse=True)
+        n_t = len(stamps)
+        P = np.full((n_t, n_tickers), np.nan)
+        V = np.zeros((n_t, n_tickers))
+        P[t_idx, tk] = close
+        V[t_idx, tk] = value
+        base = np.full(n_tickers, np.nan)
+        base[tk] = prev_close
+
+        # 체결 없는 분은 직전 체결가 (열 방향 forward fill), 첫 체결 전은 전일 종가
+        row = np.where(np.isnan(P), 0, np.arange(n_t)[:, None])
+        np.maximum.accumulate(row, axis=0, out=row)
+        P = P[row, np.arange(n_tickers)]
+        P = np.where(np.isnan(P), base[None, :], P)
+
+        # 당일 분봉이 있고 전일 종가가 있는 종목만
+        active = np.zeros(n_tickers, dtype=np.bool_)
+        active[tk] = True
+        active &= np.isfinite(base) & (base > 0)
+        rel = np.where(active[None, :], P / np.where(active, base, 1.0)[None, :], 0.0)
+
+        count = active.astype(np.float64) @ G
+        cap = np.where(active & np.isfinite(weights), weights * np.where(active, base, 0.0), 0.0)
+        cap_sum = cap @ G
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ew_rel = (rel @ G) / count
+            vw_rel = ((rel * cap[None, :]) @ G) / cap_sum
+        value_sum = V @ G
+
+        frames = []
+        for k, name in enumerate(names):
+            if count[k] == 0:
+                continue
+            prev_ew, prev_vw = levels.get(name, (BASE_LEVEL, BASE_LEVEL))
+            prev_ew = prev_ew if np.isfinite(prev_ew) else BASE_LEVEL
+            prev_vw = prev_vw if np.isfinite(prev_vw) else BASE_LEVEL
+            frames.append(pd.DataFrame({
+                'datetime': pd.DatetimeIndex(stamps),
+                'index': name,
+                'ew': prev_ew * ew_rel[:, k],
+                'vw': prev_vw * vw_rel[:, k],
+                'ew_ret': ew_rel[:, k] - 1,
+                'vw_ret': vw_rel[:, k] - 1,
+                'n': np.full(n_t, int(count[k]), dtype=np.int32),
+                'value': value_sum[:, k],
+            }))
+            last_vw = vw_rel[-1, k]
+            levels[name] = (prev_ew * ew_rel[-1, k], prev_vw * last_vw if np.isfinite(last_vw) else prev_vw)
+        if not frames:
+            return pd.DataFrame(columns=MINUTE_INDEX_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    # ---------------------------------------------------------------
+    # 4. 증분 생성
+    # ---------------------------------------------------------------
+
+    def run(self, start=None, end=None, lookback_days: int = 14) -> int:
+        """
+        마지막 저장일 이후 거래일의 합성 분봉 지수 생성
+        :param start: 저장된 지수가 없을 때 시작일 (기본: 2년 전, 분봉 수집 기간과 동일)
+        :param end: 마지막 날짜 (기본: 오늘, 장 마감 전이면 어제)
+        :param lookback_days: 묶음 첫날의 전일 종가를 찾기 위해 더 읽을 일수 (연휴 포함)
+        :return: 생성한 거래일 수
+        """
+        now = datetime.now()
+        universe = self.load_universe()
+        names, G = self.membership(universe)
+        codes = universe.index.tolist()
+        weights = universe['shares'].to_numpy(dtype=np.float64)
+
+        done = self.index_store.minute_days()
+        if done:
+            first = done[-1] + pd.Timedelta(days=1)
+        else:
+            first = pd.Timestamp(start) if start is not None else pd.Timestamp(now.date()) - pd.DateOffset(years=2)
+        last = pd.Timestamp(end) if end is not None else pd.Timestamp(now.date())
+        if end is None and now.time() < datetime.strptime("15:30", "%H:%M").time():
+            last -= pd.Timedelta(days=1)
+        if first > last:
+            print("[*] 합성 분봉 지수: 새로 만들 거래일이 없습니다.")
+            return 0
+
+        levels = self.index_store.last_minute_levels()
+        built = 0
+        print(f"[*] 합성 분봉 지수 생성: {first.date()} ~ {last.date()} (종목 {len(codes)}개, 지수 {len(names)}개)")
+        for month_start in pd.date_range(first.to_period('M').to_timestamp(), last, freq='MS'):
+            lo = max(first, month_start)
+            hi = min(last, month_start + pd.offsets.MonthEnd(0))
+            with PROFILER.stage('minute_index_read'):
+                times, tk, close, value = self._read_bars(
+                    codes, lo - pd.Timedelta(days=lookback_days), hi + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns'))
+            if len(times) == 0:
+                continue
+
+            with PROFILER.stage('minute_index_build'):
+                day = times.astype('datetime64[ns]').astype('datetime64[D]')
+                prev_close = self._prev_close(tk, day, close)
+                # 거래일 순으로 분봉 위치 정렬 (같은 날 안에서는 종목, 시각 순 유지)
+                order = np.argsort(day, kind='stable')
+                day_sorted = day[order]
+                targets = np.unique(day_sorted[day_sorted >= np.datetime64(lo.date())])
+                bounds = np.searchsorted(day_sorted, targets, side='left')
+                bounds = np.append(bounds, len(day_sorted))
+                for d, a, b in zip(targets, bounds[:-1], bounds[1:]):
+                    sel = order[a:b]
+                    df = self.aggregate_day(times[sel], tk[sel], close[sel], value[sel], prev_close[sel],
+                                            len(codes), G, weights, names, levels)
+                    if df.empty:
+                        continue
+                    self.index_store.write_minute_day(pd.Timestamp(d), df)
+                    built += 1
+            print(f"    - {month_start.strftime('%Y-%m')} 완료 (누적 {built}일)", end="\r")
+
+        print(f"\n[✔] 합성 분봉 지수 {built}일 생성 완료")
+        return built
+
+
+if __name__ == "__main__":
+    MinuteIndexBuilder().run()
@@ -10,6 +10,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
 from API.Daishin.stock_chart import CpStockChart
+from Util.profiler import profiled, PROFILER
 
 class MinuteChartUpdater:
     def __init__(self):
@@ -17,6 +18,7 @@ class MinuteChartUpdater:
         self.save_dir = os.path.join(BASE_DIR, "data", "chart", "minute")
         os.makedirs(self.save_dir, exist_ok=True)
 
+    @profiled('schema_normalize')
     def _combine_datetime(self, df):
         """date(int)와 time(int) 컬럼을 결합하여 datetime 인덱스로 변환"""
         if df is None or df.empty:
@@ -99,7 +101,8 @@ class MinuteChartUpdater:
         # 1. 기존 데이터 로드 (이미 datetime 인덱스인 상태) 
         if os.path.exists(file_path):
             try:
-                df = pd.read_parquet(file_path)
+                with PROFILER.stage('parquet_read'):
+                    df = pd.read_parquet(file_path)
                 # 인덱스가 datetime이 아닌 경우를 대비해 보정
                 if not isinstance(df.index, pd.DatetimeIndex):
                     df = self._combine_datetime(df)
@@ -113,7 +116,8 @@ class MinuteChartUpdater:
             if full_df is not None:
                 full_df = full_df[full_df.index >= limit_dt]
                 if save:
-                    full_df.to_parquet(file_path, compression='snappy')
+                    with PROFILER.stage('write'):
+                        full_df.to_parquet(file_path, compression='snappy')
                 return full_df
             return None
 
@@ -139,12 +143,13 @@ class MinuteChartUpdater:
                 new_data_list.append(self._combine_datetime(recent_df))
 
         # 5. 병합 및 최종 필터링
-        if new_data_list:
-            new_data_df = pd.concat(new_data_list)
-            df = pd.concat([df, new_data_df])
-        
-        df = df[~df.index.duplicated(keep='last')].sort_index()
-        df = df[df.index >= limit_dt]
+        with PROFILER.stage('merge'):
+            if new_data_list:
+                new_data_df = pd.concat(new_data_list)
+                df = pd.concat([df, new_data_df])
+
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+            df = df[df.index >= limit_dt]
 
         # 6. 장 마감(15:30) 전 오늘 데이터 삭제 로직
         if now.date() in df.index.date:
@@ -155,7 +160,8 @@ class MinuteChartUpdater:
                 df = df[df.index.date != now.date()]
 
         if save:
-            df.to_parquet(file_path, compression='snappy')
+            with PROFILER.stage('write'):
+                df.to_parquet(file_path, compression='snappy')
             print(f"[✔] {ticker}: 업데이트 완료. (총 {len(df)}행)")
         
         return df
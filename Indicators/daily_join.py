@@ -0,0 +1,117 @@
+"""
+일봉 지표 → 분봉 as-of 결합 엔진
+
+분봉의 각 세션(거래일)에 대해 일봉 행 위치를 searchsorted로 한 번만 찾고,
+세션 오프셋으로 행 단위로 펼친 뒤 여러 일봉 컬럼을 한 번에 가져옵니다.
+(컬럼별 m_df['date'].map(...) 해시 매핑 대체)
+
+lag 규칙 (미래 참조 방지):
+- lag=0 : 같은 날짜의 일봉 행 (당일 시가 기반 목표가처럼 장 시작 시 확정되는 값 전용)
+- lag=1 : 세션 날짜보다 엄격히 이전인 마지막 일봉 행 (전일 확정 지표, 기본값)
+- lag=k : 그보다 k-1개 더 이전 일봉 행
+"""
+import numpy as np
+import pandas as pd
+
+from Indicators.session import session_offsets
+
+
+def _to_day_array(values) -> np.ndarray:
+    """날짜/일시 배열을 datetime64[D]로 정규화 (타임존 제거)"""
+    idx = pd.DatetimeIndex(values)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.to_numpy().astype('datetime64[D]')
+
+
+def daily_row_index(session_dates, daily_dates, lag: int = 1) -> np.ndarray:
+    """
+    세션 날짜별로 결합할 일봉 행 위치를 계산합니다.
+
+    :param session_dates: 세션(거래일) 날짜 배열 (정렬됨)
+    :param daily_dates: 일봉 날짜 배열 (정렬됨)
+    :param lag: 0 = 같은 날짜, 1 이상 = 엄격히 이전 일봉 기준 lag번째
+    :return: int64 배열, 결합할 행이 없으면 -1
+    """
+    if lag < 0:
+        raise ValueError("lag는 0 이상이어야 합니다. (음수 lag는 미래 참조)")
+
+    s_days = _to_day_array(session_dates)
+    d_days = _to_day_array(daily_dates)
+
+    pos = np.searchsorted(d_days, s_days, side='left').astype(np.int64)
+    if lag == 0:
+        # 같은 날짜의 일봉이 있을 때만 결합
+        found = pos < len(d_days)
+        found[found] = d_days[pos[found]] == s_days[found]
+        return np.where(found, pos, -1)
+
+    row = pos - lag
+    row[row < 0] = -1
+    return row
+
+
+def join_daily_features(m_df: pd.DataFrame, d_df: pd.DataFrame, columns, lag: int = 1,
+                        offsets: np.ndarray = None) -> pd.DataFrame:
+    """
+    일봉 컬럼 묶음을 분봉 행에 정렬된 DataFrame으로 반환합니다. (m_df는 변경하지 않음)
+
+    :param m_df: datetime 인덱스(시간순 정렬)의 분봉 데이터
+    :param d_df: datetime 인덱스의 일봉 데이터 (또는 일봉 지표 DataFrame)
+    :param columns: 가져올 일봉 컬럼 리스트 또는 {원본 컬럼: 결과 컬럼} 딕셔너리
+    :param lag: 일봉 시프트 (기본 1 = 전일 확정값)
+    :param offsets: 미리 계산된 세션 오프셋 (없으면 m_df.index로 계산)
+    :return: m_df.index와 정렬된 DataFrame. 결합할 일봉이 없는 행은 NaN(불리언은 False)
+    """
+    mapping = dict(columns) if isinstance(columns, dict) else {c: c for c in columns}
+    if offsets is None:
+        offsets = session_offsets(m_df.index)
+
+    d_df = d_df if d_df.index.is_monotonic_increasing else d_df.sort_index()
+
+    session_dates = m_df.index[offsets[:-1]]
+    day_row = daily_row_index(session_dates, d_df.index, lag=lag)
+
+    # 세션 단위 행 위치 → 분봉 행 단위로 한 번만 펼침
+    row_idx = np.repeat(day_row, np.diff(offsets))
+    missing = row_idx < 0
+    safe_idx = np.where(missing, 0, row_idx)
+
+    out = {}
+    for src, dst in mapping.items():
+        values = d_df[src].to_numpy()
+        if len(values) == 0:
+            out[dst] = np.full(len(row_idx), np.nan)
+            continue
+        taken = values.take(safe_idx)
+        if values.dtype == np.bool_:
+            taken[missing] = False
+        else:
+            taken = taken.astype(np.float64)
+            taken[missing] = np.nan
+        out[dst] = taken
+
+    return pd.DataFrame(out, index=m_df.index)
+
+
+def attach_daily_features(m_df: pd.DataFrame, d_df: pd.DataFrame, columns, lag: int = 1,
+                          offsets: np.ndarray = None) -> pd.DataFrame:
+    """join_daily_features 결과를 m_df에 컬럼으로 붙여 반환합니다. (m_df 자체를 수정)"""
+    joined = join_daily_features(m_df, d_df, columns, lag=lag, offsets=offsets)
+    for col in joined.columns:
+        m_df[col] = joined[col].to_numpy()
+    return m_df
+
+
+def latest_daily_features(d_df: pd.DataFrame, columns, session_date, lag: int = 1) -> dict:
+    """
+    [실시간 장전 작업용] 특정 세션 날짜에 적용할 일봉 지표 값을 딕셔너리로 반환합니다.
+    백테스트와 동일한 lag 규칙을 사용하므로 장전 필터 값이 백테스트와 어긋나지 않습니다.
+    """
+    mapping = dict(columns) if isinstance(columns, dict) else {c: c for c in columns}
+    d_df = d_df if d_df.index.is_monotonic_increasing else d_df.sort_index()
+
+    row = daily_row_index([pd.Timestamp(session_date)], d_df.index, lag=lag)[0]
+    if row < 0:
+        return {dst: np.nan for dst in mapping.values()}
+    return {dst: d_df[src].iloc[row] for src, dst in mapping.items()}
@@ -2,12 +2,30 @@ import pandas as pd
 import numpy as np
 import talib
 
+from Indicators.session import session_offsets, session_vwap
+
 class IndicatorFactory:
     """
-    기술적 지표 생성기: 
+    기술적 지표 생성기:
     사용자가 정의한 4가지 분석 관점(추세, 모멘텀, 변동성, 거래량)을 기반으로 지표를 생성합니다.
+
+    지표 수식은 그룹별 생성기(_trend_values 등) 한 곳에만 정의되며,
+    - add_* 메서드: 기존처럼 df에 컬럼을 하나씩 추가
+    - compute_block / add_indicator_block: 미리 할당한 단일 2-D 블록에 기록 후 한 번에 결합
+    두 경로가 같은 생성기를 공유하므로 결과가 어긋나지 않습니다.
     """
 
+    # 그룹별 출력 컬럼 (블록 사전 할당용, 생성기 yield 순서와 동일)
+    GROUP_COLUMNS = {
+        'trend': ['ma5', 'ma20', 'ma60', 'ma120', 'disparity20', 'trend_strength'],
+        'momentum': ['rsi', 'macd', 'macd_signal', 'macd_hist', 'macd_hist_slope'],
+        'volatility': ['atr', 'bb_upper', 'lower_band', 'band_p'],
+        'volume': ['volume_ma20', 'volume_ratio', 'obv'],
+        'advanced': ['mfi', 'body_ratio', 'gap_ratio'],
+        'custom': ['bb_width', 'prev_high', 'prev_low', 'break_high', 'break_low', 'vwap', 'trading_value'],
+    }
+    ALL_GROUPS = ('trend', 'momentum', 'volatility', 'volume', 'advanced')
+
     @staticmethod
     def add_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
         """모든 주요 기술적 지표를 데이터프레임에 추가합니다."""
@@ -21,112 +39,248 @@ class IndicatorFactory:
     @staticmethod
     def add_trend(df: pd.DataFrame) -> pd.DataFrame:
         """1. 추세 강도 및 이동평균선 분석"""
+        return IndicatorFactory._add_group(df, 'trend')
+
+    @staticmethod
+    def add_momentum(df: pd.DataFrame) -> pd.DataFrame:
+        """2. 과매수/과매도 및 모멘텀 (RSI, MACD)"""
+        return IndicatorFactory._add_group(df, 'momentum')
+
+    @staticmethod
+    def add_volatility(df: pd.DataFrame) -> pd.DataFrame:
+        """3. 변동성 및 가격 위치 (ATR, 볼린저 밴드)"""
+        return IndicatorFactory._add_group(df, 'volatility')
+
+    @staticmethod
+    def add_volume(df: pd.DataFrame) -> pd.DataFrame:
+        """4. 거래량 유효성 분석"""
+        return IndicatorFactory._add_group(df, 'volume')
+
+    @staticmethod
+    def add_advanced(df: pd.DataFrame) -> pd.DataFrame:
+        """에너지 및 가격 위치 심화 분석"""
+        return IndicatorFactory._add_group(df, 'advanced')
+
+    @staticmethod
+    def add_custom_indicators(df: pd.DataFrame) -> pd.DataFrame:
+        """사용자 요청 지표: 밴드폭, 전일 돌파, VWAP, 거래대금 추가"""
+        return IndicatorFactory._add_group(df, 'custom')
+
+    # ---------------------------------------------------------------
+    # 단일 블록 출력 모드
+    # ---------------------------------------------------------------
+
+    @staticmethod
+    def compute_block(df: pd.DataFrame, groups=ALL_GROUPS, dtype=np.float64) -> pd.DataFrame:
+        """
+        요청한 지표 그룹 전체를 미리 할당한 단일 2-D 블록에 기록하고,
+        df와 같은 인덱스를 갖는 별도 DataFrame으로 반환합니다. (df는 변경하지 않음)
+
+        :param groups: GROUP_COLUMNS의 그룹 이름 목록 (예: ALL_GROUPS + ('custom',))
+        :param dtype: 블록 dtype (np.float32 사용 시 메모리 절반)
+        """
+        columns = [col for g in groups for col in IndicatorFactory.GROUP_COLUMNS[g]]
+        block = np.empty((len(df), len(columns)), dtype=dtype, order='F')
+        pos = {name: j for j, name in enumerate(columns)}
+
+        x = IndicatorFactory._source_arrays(df)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for g in groups:
+                for name, values in IndicatorFactory._GENERATORS[g](x):
+                    block[:, pos[name]] = values
+                    # 후속 그룹(예: custom의 bb_width)이 참조할 수 있도록 블록 열 뷰를 등록
+                    x[name] = block[:, pos[name]]
+
+        return pd.DataFrame(block, index=df.index, columns=columns)
+
+    @staticmethod
+    def add_indicator_block(df: pd.DataFrame, groups=ALL_GROUPS, dtype=np.float64,
+                            share_input: bool = False) -> pd.DataFrame:
+        """
+        compute_block 결과를 df 옆에 한 번에 결합한 새 DataFrame을 반환합니다.
+
+        :param share_input: True면 원본 봉 컬럼을 복사하지 않고 메모리를 공유합니다.
+            (최대 메모리 ≈ 원본 봉 데이터 + 지표 블록 1개)
+            ※ 결과의 기존 컬럼을 제자리 수정하면 원본 df에도 반영되므로,
+               원본을 더 이상 쓰지 않거나 이미 복사본인 경우에만 사용하세요.
+        """
+        block_df = IndicatorFactory.compute_block(df, groups=groups, dtype=dtype)
+        overlap = [c for c in block_df.columns if c in df.columns]
+        if overlap:
+            df = df.drop(columns=overlap)
+
+        if share_input:
+            # Copy-on-Write 모드에서는 concat이 기존 블록을 복사하지 않고 참조만 연결함
+            with pd.option_context('mode.copy_on_write', True):
+                return pd.concat([df, block_df], axis=1)
+        return pd.concat([df, block_df], axis=1)
+
+    # ---------------------------------------------------------------
+    # 내부 구현: 그룹별 지표 생성기 (수식 정의는 이곳 한 곳에만 존재)
+    # ---------------------------------------------------------------
+
+    @staticmethod
+    def _source_arrays(df: pd.DataFrame) -> dict:
+        """지표 계산에 필요한 원본 배열 (TA-Lib은 float 입력을 권장하므로 float64로 변환)"""
+        x = {col: df[col].to_numpy(dtype=np.float64) for col in ['open', 'high', 'low', 'close', 'volume']}
+        # custom 그룹 단독 호출 시 참조하는 기존 지표 컬럼
+        for col in ['ma20', 'bb_upper', 'lower_band']:
+            if col in df.columns:
+                x[col] = df[col].to_numpy(dtype=np.float64)
+        # 분봉 데이터(date, time 컬럼 존재)인 경우 VWAP 세션 키
+        x['session_keys'] = df['date'] if ('time' in df.columns and 'date' in df.columns) else None
+        return x
+
+    @staticmethod
+    def _add_group(df: pd.DataFrame, group: str) -> pd.DataFrame:
+        """생성기 결과를 df에 컬럼 단위로 추가 (기존 add_* 동작)"""
+        x = IndicatorFactory._source_arrays(df)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name, values in IndicatorFactory._GENERATORS[group](x):
+                df[name] = values
+                x[name] = values
+        return df
+
+    @staticmethod
+    def _trend_values(x: dict):
+        c, h, l = x['close'], x['high'], x['low']
         # 이동평균선 (정배열/역배열 확인용)
-        df['ma5'] = talib.SMA(df['close'], timeperiod=5)
-        df['ma20'] = talib.SMA(df['close'], timeperiod=20)
-        df['ma60'] = talib.SMA(df['close'], timeperiod=60)
-        df['ma120'] = talib.SMA(df['close'], timeperiod=120)
+        yield 'ma5', talib.SMA(c, timeperiod=5)
+        ma20 = talib.SMA(c, timeperiod=20)
+        yield 'ma20', ma20
+        yield 'ma60', talib.SMA(c, timeperiod=60)
+        yield 'ma120', talib.SMA(c, timeperiod=120)
 
         # 이격도 (현재가가 이평선 대비 얼마나 떨어져 있는가)
-        df['disparity20'] = (df['close'] / df['ma20']) * 100
-        
+        yield 'disparity20', (c / ma20) * 100
+
         # 추세 강도 (ADX)
-        df['trend_strength'] = talib.ADX(df['high'], df['low'], df['close'], timeperiod=14)
-        
-        return df
+        yield 'trend_strength', talib.ADX(h, l, c, timeperiod=14)
 
     @staticmethod
-    def add_momentum(df: pd.DataFrame) -> pd.DataFrame:
-        """2. 과매수/과매도 및 모멘텀 (RSI, MACD)"""
+    def _momentum_values(x: dict):
+        c = x['close']
         # RSI (14일 기준)
-        df['rsi'] = talib.RSI(df['close'], timeperiod=14)
+        yield 'rsi', talib.RSI(c, timeperiod=14)
 
         # MACD (12, 26, 9)
-        macd, macd_signal, macd_hist = talib.MACD(df['close'], fastperiod=12, slowperiod=26, signalperiod=9)
-        
-        df['macd'] = macd
-        df['macd_signal'] = macd_signal
-        df['macd_hist'] = df['macd'] - df['macd_signal']
-        
+        macd, macd_signal, _ = talib.MACD(c, fastperiod=12, slowperiod=26, signalperiod=9)
+        yield 'macd', macd
+        yield 'macd_signal', macd_signal
+        macd_hist = macd - macd_signal
+        yield 'macd_hist', macd_hist
+
         # MACD 히스토그램 기울기 (추세 약화 감지용)
-        df['macd_hist_slope'] = df['macd_hist'].diff()
-        
-        return df
+        yield 'macd_hist_slope', IndicatorFactory._diff(macd_hist)
 
     @staticmethod
-    def add_volatility(df: pd.DataFrame) -> pd.DataFrame:
-        """3. 변동성 및 가격 위치 (ATR, 볼린저 밴드)"""
+    def _volatility_values(x: dict):
+        c, h, l = x['close'], x['high'], x['low']
         # ATR (Average True Range) - 14일 기준
-        df['atr'] = talib.ATR(df['high'], df['low'], df['close'], timeperiod=14)
+        yield 'atr', talib.ATR(h, l, c, timeperiod=14)
 
         # 볼린저 밴드 (20일, 2표준편차)
-        df['bb_upper'], _, df['lower_band'] = talib.BBANDS(df['close'], timeperiod=20, nbdevup=2, nbdevdn=2, matype=talib.MA_Type.SMA)
-        
+        bb_upper, _, lower_band = talib.BBANDS(c, timeperiod=20, nbdevup=2, nbdevdn=2, matype=talib.MA_Type.SMA)
+        yield 'bb_upper', bb_upper
+        yield 'lower_band', lower_band
+
         # 밴드 내 위치 (%B)
-        df['band_p'] = (df['close'] - df['lower_band']) / (df['bb_upper'] - df['lower_band'])
-        
-        return df
+        yield 'band_p', (c - lower_band) / (bb_upper - lower_band)
 
     @staticmethod
-    def add_volume(df: pd.DataFrame) -> pd.DataFrame:
-        """4. 거래량 유효성 분석"""
+    def _volume_values(x: dict):
+        c, v = x['close'], x['volume']
         # 최근 20일 평균 거래량 대비 비율
-        # TA-Lib은 float 입력을 권장
-        df['volume_ma20'] = talib.SMA(df['volume'].astype(float), timeperiod=20)
-        df['volume_ratio'] = (df['volume'] / df['volume_ma20']) * 100
+        volume_ma20 = talib.SMA(v, timeperiod=20)
+        yield 'volume_ma20', volume_ma20
+        yield 'volume_ratio', (v / volume_ma20) * 100
 
         # OBV (On-Balance Volume)
-        df['obv'] = talib.OBV(df['close'], df['volume'].astype(float))
-        
-        return df
-    
+        yield 'obv', talib.OBV(c, v)
+
     @staticmethod
-    def add_advanced(df: pd.DataFrame) -> pd.DataFrame:
-        """에너지 및 가격 위치 심화 분석"""
+    def _advanced_values(x: dict):
+        o, h, l, c, v = x['open'], x['high'], x['low'], x['close'], x['volume']
         # 1. MFI (Money Flow Index) - 거래량 포함 RSI
-        df['mfi'] = talib.MFI(df['high'], df['low'], df['close'], df['volume'].astype(float), timeperiod=14)
+        yield 'mfi', talib.MFI(h, l, c, v, timeperiod=14)
 
         # 2. 캔들 몸통 비율 (Body Ratio)
-        df['body_ratio'] = (df['close'] - df['open']).abs() / (df['high'] - df['low'])
-        
+        yield 'body_ratio', np.abs(c - o) / (h - l)
+
         # 3. 전일 종가 대비 시가 갭 (Gap)
-        df['gap_ratio'] = (df['open'] - df['close'].shift(1)) / df['close'].shift(1)
-        
-        return df
-    
+        prev_close = IndicatorFactory._shift(c)
+        yield 'gap_ratio', (o - prev_close) / prev_close
+
     @staticmethod
-    def add_custom_indicators(df: pd.DataFrame) -> pd.DataFrame:
-        """사용자 요청 지표: 밴드폭, 전일 돌파, VWAP, 거래대금 추가"""
-        
+    def _custom_values(x: dict):
+        h, l, c, v = x['high'], x['low'], x['close'], x['volume']
+
         # 1. 볼린저 밴드 폭 (Bandwidth)
         # 밴드가 수축(Squeeze)하는지 발산하는지 측정
-        df['bb_width'] = (df['bb_upper'] - df['lower_band']) / df['ma20']
-        
+        yield 'bb_width', (x['bb_upper'] - x['lower_band']) / x['ma20']
+
         # 2. 전일 고가/저가 돌파 여부
         # 고가 돌파: 1, 저가 이탈: -1, 유지: 0
-        df['prev_high'] = df['high'].shift(1)
-        df['prev_low'] = df['low'].shift(1)
-        df['break_high'] = (df['close'] > df['prev_high']).astype(int)
-        df['break_low'] = (df['close'] < df['prev_low']).astype(int) * -1
-        
+        prev_high = IndicatorFactory._shift(h)
+        prev_low = IndicatorFactory._shift(l)
+        yield 'prev_high', prev_high
+        yield 'prev_low', prev_low
+        yield 'break_high', (c > prev_high).astype(int)
+        yield 'break_low', (c < prev_low).astype(int) * -1
+
         # 3. VWAP (Volume Weighted Average Price)
         # 일봉 기준으로는 20일 누적 거래대금을 누적 거래량으로 나누어 계산
         # (분봉일 경우 당일 누적으로직으로 변경 필요)
-        v = df['volume']
-        tp = (df['high'] + df['low'] + df['close']) / 3  # Typical Price
-        
-        if 'time' in df.columns and 'date' in df.columns:
+        if x['session_keys'] is not None:
             # 분봉 데이터(date, time 컬럼 존재)인 경우: 당일 누적 VWAP 계산
-            tp_v = tp * v
-            cum_tp_v = tp_v.groupby(df['date']).cumsum()
-            cum_v = v.groupby(df['date']).cumsum()
-            df['vwap'] = cum_tp_v / cum_v
+            yield 'vwap', IndicatorFactory._session_vwap(h, l, c, v, x['session_keys'])
         else:
             # 일봉 데이터 혹은 date 컬럼이 없는 경우: 20일 이동 VWAP
-            df['vwap'] = (tp * v).rolling(window=20).sum() / v.rolling(window=20).sum()
-        
+            tp = (h + l + c) / 3  # Typical Price
+            yield 'vwap', talib.SUM(tp * v, timeperiod=20) / talib.SUM(v, timeperiod=20)
+
         # 4. 거래대금 (Trading Value)
         # 단위가 너무 커질 수 있어 보통 10억(1e9)이나 1백만(1e6)으로 나눕니다.
-        df['trading_value'] = df['close'] * df['volume']
-        
-        return df
\ No newline at end of file
+        yield 'trading_value', c * v
+
+    @staticmethod
+    def _session_vwap(h, l, c, v, keys) -> np.ndarray:
+        """
+        date 기준 당일 누적 VWAP (groupby(date) 누적과 동일)
+        세션 오프셋 커널은 인접한 키 변화로만 세션을 나누므로, date가 정렬되어 있지 않으면
+        date 기준 안정 정렬(같은 날짜 내 행 순서 유지) 순서로 계산한 뒤 원래 행 순서로 되돌립니다.
+        """
+        keys = np.asarray(keys)
+        if len(keys) < 2 or np.all(keys[1:] >= keys[:-1]):
+            return session_vwap(h, l, c, v, session_offsets(keys))
+
+        order = np.argsort(keys, kind='stable')
+        out = np.empty(len(keys), dtype=np.float64)
+        out[order] = session_vwap(h[order], l[order], c[order], v[order], session_offsets(keys[order]))
+        return out
+
+    @staticmethod
+    def _shift(values: np.ndarray) -> np.ndarray:
+        """pandas shift(1)과 동일 (첫 행 NaN)"""
+        out = np.empty_like(values, dtype=np.float64)
+        out[0:1] = np.nan
+        out[1:] = values[:-1]
+        return out
+
+    @staticmethod
+    def _diff(values: np.ndarray) -> np.ndarray:
+        """pandas diff()와 동일 (첫 행 NaN)"""
+        out = np.empty_like(values, dtype=np.float64)
+        out[0:1] = np.nan
+        out[1:] = values[1:] - values[:-1]
+        return out
+
+
+IndicatorFactory._GENERATORS = {
+    'trend': IndicatorFactory._trend_values,
+    'momentum': IndicatorFactory._momentum_values,
+    'volatility': IndicatorFactory._volatility_values,
+    'volume': IndicatorFactory._volume_values,
+    'advanced': IndicatorFactory._advanced_values,
+    'custom': IndicatorFactory._custom_values,
+}
@@ -0,0 +1,204 @@
+"""
+세션(거래일) 단위 분할 연산 커널
+
+분봉 데이터는 날짜별로 연속 구간(세션)을 이루므로, groupby('date') 대신
+세션 경계 오프셋(offsets)을 한 번만 계산해 두고 모든 누적/집계 연산을
+np.*.reduceat 또는 numba 루프로 처리합니다.
+
+offsets 형식: [0, s1, s2, ..., n]  (i번째 세션 = offsets[i] ~ offsets[i+1]-1 행)
+※ 입력 데이터는 세션 키 기준으로 정렬되어 있어야 합니다.
+"""
+import numpy as np
+import pandas as pd
+from numba import njit
+
+
+def session_offsets(keys) -> np.ndarray:
+    """
+    정렬된 세션 키(날짜 또는 datetime) 배열에서 세션 경계 오프셋을 계산합니다.
+
+    :param keys: DatetimeIndex / Series / ndarray. datetime 타입이면 일(Day) 단위로 절삭하여 비교
+    :return: int64 배열 [0, s1, ..., n]
+    """
+    if isinstance(keys, (pd.Series, pd.Index)):
+        if isinstance(keys.dtype, pd.DatetimeTZDtype):
+            keys = keys.tz_localize(None) if isinstance(keys, pd.Index) else keys.dt.tz_localize(None)
+        keys = keys.to_numpy()
+    keys = np.asarray(keys)
+
+    if np.issubdtype(keys.dtype, np.datetime64):
+        keys = keys.astype('datetime64[D]')
+
+    n = len(keys)
+    if n == 0:
+        return np.zeros(1, dtype=np.int64)
+
+    starts = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    return np.concatenate(([0], starts, [n])).astype(np.int64)
+
+
+def segment_lengths(offsets: np.ndarray) -> np.ndarray:
+    """세션별 행 수"""
+    return np.diff(offsets)
+
+
+def broadcast_segments(seg_values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """세션 단위 값(세션 수 길이)을 행 단위로 펼칩니다."""
+    return np.repeat(np.asarray(seg_values), np.diff(offsets))
+
+
+# ---------------------------------------------------------------
+# 1. 세션별 집계 (reduceat 기반, 결과 길이 = 세션 수)
+# ---------------------------------------------------------------
+
+def segment_first(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """세션별 첫 값 (예: 당일 시가)"""
+    return np.asarray(values)[offsets[:-1]]
+
+
+def segment_last(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """세션별 마지막 값 (예: 당일 종가)"""
+    return np.asarray(values)[offsets[1:] - 1]
+
+
+def segment_sum(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """세션별 합계 (예: 당일 거래량)"""
+    if len(offsets) < 2:
+        return np.empty(0, dtype=np.float64)
+    return np.add.reduceat(np.asarray(values), offsets[:-1])
+
+
+def segment_max(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """세션별 최댓값 (예: 당일 고가)"""
+    if len(offsets) < 2:
+        return np.empty(0, dtype=np.float64)
+    return np.maximum.reduceat(np.asarray(values), offsets[:-1])
+
+
+def segment_min(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """세션별 최솟값 (예: 당일 저가)"""
+    if len(offsets) < 2:
+        return np.empty(0, dtype=np.float64)
+    return np.minimum.reduceat(np.asarray(values), offsets[:-1])
+
+
+# ---------------------------------------------------------------
+# 2. 세션 내 누적 연산 (결과 길이 = 행 수)
+# ---------------------------------------------------------------
+
+@njit(cache=True)
+def _segmented_cumsum(values, offsets):
+    out = np.empty(len(values), dtype=np.float64)
+    for s in range(len(offsets) - 1):
+        acc = 0.0
+        for i in range(offsets[s], offsets[s + 1]):
+            v = values[i]
+            if not np.isnan(v):
+                acc += v
+            out[i] = acc
+    return out
+
+
+@njit(cache=True)
+def _segmented_cummax(values, offsets):
+    out = np.empty(len(values), dtype=np.float64)
+    for s in range(len(offsets) - 1):
+        acc = -np.inf
+        for i in range(offsets[s], offsets[s + 1]):
+            v = values[i]
+            if v > acc:
+                acc = v
+            out[i] = acc
+    return out
+
+
+@njit(cache=True)
+def _segmented_cummin(values, offsets):
+    out = np.empty(len(values), dtype=np.float64)
+    for s in range(len(offsets) - 1):
+        acc = np.inf
+        for i in range(offsets[s], offsets[s + 1]):
+            v = values[i]
+            if v < acc:
+                acc = v
+            out[i] = acc
+    return out
+
+
+@njit(cache=True)
+def _segment_argfirst_true(mask, offsets):
+    n_seg = len(offsets) - 1
+    out = np.full(n_seg, -1, dtype=np.int64)
+    for s in range(n_seg):
+        for i in range(offsets[s], offsets[s + 1]):
+            if mask[i]:
+                out[s] = i
+                break
+    return out
+
+
+def segmented_cumsum(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """세션 내 누적합 (groupby('date').cumsum() 대체, NaN은 0으로 취급)"""
+    return _segmented_cumsum(np.asarray(values, dtype=np.float64), offsets)
+
+
+def segmented_cummax(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """세션 내 누적 최댓값 (예: 당일 현재까지의 고가)"""
+    return _segmented_cummax(np.asarray(values, dtype=np.float64), offsets)
+
+
+def segmented_cummin(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """세션 내 누적 최솟값 (예: 당일 현재까지의 저가)"""
+    return _segmented_cummin(np.asarray(values, dtype=np.float64), offsets)
+
+
+def segmented_cumcount(offsets: np.ndarray, ascending: bool = True) -> np.ndarray:
+    """세션 내 순번 (groupby('date').cumcount() 대체)"""
+    n = int(offsets[-1])
+    lengths = np.diff(offsets)
+    pos = np.arange(n, dtype=np.int64) - np.repeat(offsets[:-1], lengths)
+    if ascending:
+        return pos
+    return np.repeat(lengths, lengths) - 1 - pos
+
+
+def segment_argfirst_true(mask: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """세션별로 처음 True가 나오는 행 위치 (없으면 -1)"""
+    return _segment_argfirst_true(np.asarray(mask, dtype=np.bool_), offsets)
+
+
+def first_true_mask(mask: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    세션별 첫 번째 True만 남긴 마스크
+    condition.groupby('date').transform(lambda x: x & (x.cumsum() == 1)) 대체
+    """
+    mask = np.asarray(mask, dtype=np.bool_)
+    out = np.zeros(len(mask), dtype=np.bool_)
+    idx = _segment_argfirst_true(mask, offsets)
+    out[idx[idx >= 0]] = True
+    return out
+
+
+def last_in_segment_mask(offsets: np.ndarray) -> np.ndarray:
+    """세션 마지막 행 위치만 True (groupby('date').cumcount(ascending=False) == 0 대체)"""
+    out = np.zeros(int(offsets[-1]), dtype=np.bool_)
+    if len(offsets) > 1:
+        out[offsets[1:] - 1] = True
+    return out
+
+
+def session_vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                 volume: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """당일 누적 VWAP (Typical Price 기준). 누적 거래량이 0인 구간은 NaN"""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+
+    tp = (high + low + close) / 3
+    cum_tp_v = _segmented_cumsum(tp * volume, offsets)
+    cum_v = _segmented_cumsum(volume, offsets)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = cum_tp_v / cum_v
+    vwap[cum_v == 0] = np.nan
+    return vwap
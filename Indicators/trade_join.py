@@ -0,0 +1,100 @@
+"""
+거래 → 지표 as-of 결합 엔진 (일봉/분봉 공용)
+
+거래 테이블 전체의 진입 시각을 지표 인덱스에 searchsorted로 한 번에 매칭하고,
+필요한 지표 컬럼을 take로 한 번에 가져옵니다.
+(거래마다 d_df[d_df.index < entry_dt] / m_df[m_df.index <= entry_dt] 로 자르던 iterrows 루프 대체)
+
+lag 규칙 (merge_asof backward와 같은 방향, 미래 참조 방지):
+- lag=0 : 진입 시각 이하(<=)의 마지막 행 (분봉: 진입 시각에 찍힌 봉 포함)
+- lag=1 : 진입 시각보다 엄격히 이전(<)의 마지막 행 (기본값)
+- lag=k : 그보다 k-1개 더 이전 행
+by_day=True면 진입 시각과 지표 인덱스를 날짜로 내려 비교합니다. (일봉 지표: lag=1 = 진입 전날까지 확정된 행)
+"""
+import numpy as np
+import pandas as pd
+
+from Indicators.daily_join import _to_day_array
+
+
+def _to_time_array(values, by_day: bool) -> np.ndarray:
+    """날짜/일시 배열을 datetime64[ns] (by_day면 datetime64[D])로 정규화 (타임존 제거)"""
+    if by_day:
+        return _to_day_array(values)
+    idx = pd.DatetimeIndex(values)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.to_numpy().astype('datetime64[ns]')
+
+
+def asof_row_index(event_times, bar_times, lag: int = 1, by_day: bool = False) -> np.ndarray:
+    """
+    이벤트(진입 시각)별로 결합할 지표 행 위치를 계산합니다.
+
+    :param event_times: 진입 시각 배열 (정렬 불필요, NaT 허용)
+    :param bar_times: 지표 인덱스 (시간순 정렬)
+    :param lag: 0 = 이하(<=), 1 이상 = 엄격히 이전(<) 기준 lag번째 행
+    :param by_day: True면 날짜 단위로 비교
+    :return: int64 배열, 결합할 행이 없으면 -1
+    """
+    if lag < 0:
+        raise ValueError("lag는 0 이상이어야 합니다. (음수 lag는 미래 참조)")
+
+    events = _to_time_array(event_times, by_day)
+    bars = _to_time_array(bar_times, by_day)
+
+    if lag == 0:
+        row = np.searchsorted(bars, events, side='right').astype(np.int64) - 1
+    else:
+        row = np.searchsorted(bars, events, side='left').astype(np.int64) - lag
+    row[row < 0] = -1
+    row[np.isnat(events)] = -1
+    return row
+
+
+def join_trade_features(trades: pd.DataFrame, features: pd.DataFrame, columns=None, time_col='entry_date',
+                        lag: int = 1, by_day: bool = False, min_history: int = 0,
+                        how: str = 'left') -> pd.DataFrame:
+    """
+    거래 테이블에 진입 시점 기준 지표 컬럼을 결합한 DataFrame을 반환합니다. (trades는 변경하지 않음)
+
+    :param trades: 거래 테이블 (time_col 컬럼에 진입 시각)
+    :param features: datetime 인덱스의 지표 DataFrame (일봉 또는 분봉)
+    :param columns: 가져올 숫자 컬럼 목록 또는 {원본: 결과 이름} 딕셔너리 (None이면 전체, 없는 컬럼은 NaN)
+    :param time_col: 진입 시각 컬럼
+    :param lag: 모듈 docstring의 lag 규칙
+    :param by_day: True면 날짜 단위 비교 (일봉 지표)
+    :param min_history: 결합 행까지 최소 행 수 (예: 10이면 진입 시점까지 10개 봉 미만인 거래 제외)
+    :param how: 'left' = 결합 행이 없으면 NaN, 'inner' = 결합 행이 없는 거래 제외
+    :return: trades 컬럼 + 지표 컬럼 (trades의 인덱스/순서 유지)
+    """
+    if how not in ('left', 'inner'):
+        raise ValueError(f"how는 'left' 또는 'inner'여야 합니다: {how}")
+    if columns is None:
+        columns = list(features.columns)
+    mapping = dict(columns) if isinstance(columns, dict) else {c: c for c in columns}
+
+    if not isinstance(features.index, pd.DatetimeIndex):
+        features = features.set_axis(pd.to_datetime(features.index))
+    if not features.index.is_monotonic_increasing:
+        # 같은 시각의 행은 원래 순서를 유지 (마지막 행이 결합되도록)
+        features = features.sort_index(kind='mergesort')
+
+    row = asof_row_index(trades[time_col], features.index, lag=lag, by_day=by_day)
+    if min_history > 1:
+        row[row < min_history - 1] = -1
+    missing = row < 0
+    safe_row = np.where(missing, 0, row)
+
+    out = trades.copy()
+    for src, dst in mapping.items():
+        if src not in features.columns or len(features) == 0:
+            out[dst] = np.nan
+            continue
+        taken = features[src].to_numpy().take(safe_row).astype(np.float64)
+        taken[missing] = np.nan
+        out[dst] = taken
+
+    if how == 'inner':
+        out = out[~missing]
+    return out
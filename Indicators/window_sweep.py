@@ -0,0 +1,154 @@
+"""
+다중 윈도우 이동 통계 일괄 계산 (파라미터 탐색용)
+
+여러 윈도우 길이(예: 5~120)에 대해 이동평균/기울기/이격도/표준편차/최고/최저를
+한 번에 계산합니다.
+- 평균: 공유 누적합(prefix sum) 1회 계산 후 윈도우별 차분
+- 최고/최저: 공유 희소 테이블(sparse table) 1회 구성 후 윈도우별 O(1) 질의
+- 표준편차: 윈도우 길이마다 기준값을 재설정하는 증분 합산 (누적합 상쇄 오차 방지)
+결과는 (행 수 x 통계 수*윈도우 수) 크기의 단일 float 블록으로 반환됩니다.
+"""
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+# 통계 이름 → 결과 컬럼 접두어 (기존 분석 스크립트 컬럼명과 동일: slope5, disp5 등)
+SWEEP_STATS = ('ma', 'slope', 'disp', 'std', 'max', 'min')
+
+
+def _sparse_table(values: np.ndarray, max_window: int, op) -> np.ndarray:
+    """
+    구간 최고/최저 질의용 희소 테이블 (levels x n, 범위 밖은 NaN)
+    table[k, j] = op(values[j : j + 2**k])
+    """
+    n = len(values)
+    levels = max(max_window, 1).bit_length()
+    table = np.full((levels, n), np.nan)
+    table[0] = values
+    for k in range(1, levels):
+        half = 1 << (k - 1)
+        if half >= n:
+            break
+        table[k, :n - half] = op(table[k - 1, :n - half], table[k - 1, half:])
+    return table
+
+
+@njit(parallel=True, cache=True)
+def _sweep_kernel(x, cs, cnan, center, windows, col_ma, col_slope, col_disp, col_std,
+                  col_max, col_min, max_table, min_table, out):
+    n = len(x)
+    n_win = len(windows)
+    for j in prange(n_win):
+        w = windows[j]
+        if w > n:
+            continue
+        k = 0
+        while (1 << (k + 1)) <= w:
+            k += 1
+        span = 1 << k
+
+        prev_ma = np.nan
+        anchor = 0.0
+        s = 0.0
+        q = 0.0
+        for i in range(w - 1, n):
+            start = i - w + 1
+            valid = (cnan[i + 1] - cnan[start]) == 0
+
+            # 1. 이동평균 (공유 누적합 차분)
+            if valid:
+                ma = (cs[i + 1] - cs[start]) / w + center
+            else:
+                ma = np.nan
+            if col_ma >= 0:
+                out[i, col_ma + j] = ma
+            if col_slope >= 0:
+                out[i, col_slope + j] = (ma / prev_ma - 1) * 100
+            if col_disp >= 0:
+                out[i, col_disp + j] = (x[i] / ma - 1) * 100
+            prev_ma = ma
+
+            # 2. 표준편차 (w행마다 기준값 재설정 후 정확 재계산, 그 사이는 증분 갱신)
+            if col_std >= 0 and w > 1:
+                if (i - (w - 1)) % w == 0:
+                    anchor = ma if valid else center
+                    s = 0.0
+                    q = 0.0
+                    for t in range(start, i + 1):
+                        if not np.isnan(x[t]):
+                            d = x[t] - anchor
+                            s += d
+                            q += d * d
+                else:
+                    if not np.isnan(x[i]):
+                        d = x[i] - anchor
+                        s += d
+                        q += d * d
+                    if not np.isnan(x[start - 1]):
+                        d = x[start - 1] - anchor
+                        s -= d
+                        q -= d * d
+                if valid:
+                    var = (q - s * s / w) / (w - 1)  # 표본분산 (pandas rolling std와 동일한 ddof=1)
+                    # 반올림 오차 수준 이하의 분산은 0 처리 (가격 변동 없는 구간이 sqrt로 증폭되는 것 방지)
+                    out[i, col_std + j] = np.sqrt(var) if var > 1e-12 * q / (w - 1) else 0.0
+
+            # 3. 최고/최저 (희소 테이블 두 구간 겹침 질의)
+            if col_max >= 0:
+                a = max_table[k, start]
+                b = max_table[k, i - span + 1]
+                out[i, col_max + j] = a if a > b or np.isnan(a) else b
+            if col_min >= 0:
+                a = min_table[k, start]
+                b = min_table[k, i - span + 1]
+                out[i, col_min + j] = a if a < b or np.isnan(a) else b
+
+
+def sweep_block(values, windows, stats=SWEEP_STATS, dtype=np.float64):
+    """
+    다중 윈도우 이동 통계를 단일 2-D 블록으로 계산합니다.
+
+    :param values: 1차원 가격 배열 (예: 종가)
+    :param windows: 윈도우 길이 목록 (예: range(5, 121))
+    :param stats: SWEEP_STATS 중 계산할 통계 이름
+    :param dtype: 결과 블록 dtype (float32로 메모리 절감 가능)
+    :return: (block, columns) - block[:, j]가 columns[j] ('slope5' 등)에 해당
+    """
+    x = np.asarray(values, dtype=np.float64)
+    windows = np.array(sorted({int(w) for w in windows}), dtype=np.int64)
+    stats = [s for s in SWEEP_STATS if s in stats]
+    n = len(x)
+
+    if len(windows) == 0 or windows[0] < 1:
+        raise ValueError("윈도우 길이는 1 이상이어야 합니다.")
+
+    columns = [f"{s}{w}" for s in stats for w in windows]
+    # 컬럼 단위 연속 쓰기를 위해 Fortran 순서로 할당
+    block = np.full((n, len(columns)), np.nan, dtype=dtype, order='F')
+    if n == 0:
+        return block, columns
+
+    # 1. 공유 누적합 (정밀도 확보를 위해 평균을 빼고 누적, NaN 개수는 별도 누적)
+    nan_mask = np.isnan(x)
+    center = float(np.nanmean(x)) if not nan_mask.all() else 0.0
+    xc = np.where(nan_mask, 0.0, x - center)
+    cs = np.concatenate(([0.0], np.cumsum(xc)))
+    cnan = np.concatenate(([0], np.cumsum(nan_mask))).astype(np.int64)
+
+    # 2. 공유 희소 테이블 (최장 윈도우 기준 1회 구성)
+    empty = np.empty((1, 1))
+    max_table = _sparse_table(x, int(windows[-1]), np.maximum) if 'max' in stats else empty
+    min_table = _sparse_table(x, int(windows[-1]), np.minimum) if 'min' in stats else empty
+
+    col = {s: i * len(windows) for i, s in enumerate(stats)}
+    _sweep_kernel(x, cs, cnan, center, windows,
+                  col.get('ma', -1), col.get('slope', -1), col.get('disp', -1), col.get('std', -1),
+                  col.get('max', -1), col.get('min', -1), max_table, min_table, block)
+
+    return block, columns
+
+
+def rolling_sweep(series: pd.Series, windows, stats=SWEEP_STATS, dtype=np.float64) -> pd.DataFrame:
+    """sweep_block 결과를 원본 인덱스에 정렬된 DataFrame으로 반환합니다."""
+    block, columns = sweep_block(series.to_numpy(), windows, stats=stats, dtype=dtype)
+    return pd.DataFrame(block, index=series.index, columns=columns)
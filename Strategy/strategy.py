@@ -1,10 +1,64 @@
+import operator
+import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
 
+# 규칙 비교 연산자 (numpy 배열/스칼라 모두 동작, NaN이 낀 비교는 '!='까지 모두 False - Rule.evaluate 참고)
+RULE_OPS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+
+class Rule:
+    """
+    선언형 신호 규칙: column <op> threshold
+    threshold가 문자열이면 같은 행의 다른 컬럼과 비교합니다. (예: Rule('close', '>=', 'target_price'))
+    같은 규칙 정의로 전체 프레임(배치)과 단일 행(실시간)을 모두 평가하므로 두 경로의 로직이 어긋나지 않습니다.
+    """
+    def __init__(self, column: str, op: str, threshold, desc: str = ''):
+        if op not in RULE_OPS:
+            raise ValueError(f"지원하지 않는 연산자입니다: {op} (가능: {list(RULE_OPS)})")
+        self.column = column
+        self.op = op
+        self.threshold = threshold
+        self.desc = desc
+
+    @staticmethod
+    def _values(data, column):
+        """프레임(DataFrame/컬럼 매핑)이면 numpy 배열, 행(Series/dict)이면 스칼라"""
+        value = data[column]
+        return value.to_numpy() if isinstance(value, pd.Series) else value
+
+    def evaluate(self, data):
+        left = self._values(data, self.column)
+        right = self._values(data, self.threshold) if isinstance(self.threshold, str) else self.threshold
+        result = RULE_OPS[self.op](left, right)
+        if self.op == '!=':
+            # NaN != x 는 True이므로 값이 없는 행은 다른 연산자와 같이 False로 맞춤 (배치/단일 행 공통)
+            result = np.logical_and(result, np.logical_not(np.logical_or(pd.isna(left), pd.isna(right))))
+        return result
+
+    def __repr__(self):
+        return f"Rule({self.column} {self.op} {self.threshold})"
+
+
 class Strategy(ABC):
     """
     주가 데이터를 기반으로 전략을 수행하는 최상위 부모 클래스
+
+    진입/청산 조건은 entry_rules / exit_rules(Rule 목록, 모두 AND)로 선언하고
+    - get_signals(df): 전체 프레임/패널에 대한 진입·청산 bool 배열 (백테스트용 배치 평가)
+    - rule_signal(row): 같은 규칙으로 단일 행 평가 (실시간 get_signal에서 사용)
     """
+    # 자식 클래스에서 정의 (또는 인스턴스 파라미터에 따라 entry_rules()/exit_rules()를 재정의)
+    ENTRY_RULES = ()
+    EXIT_RULES = ()
+
     def __init__(self, name: str, params: dict = None):
         self.name = name
         self.params = params if params else {}
@@ -28,6 +82,54 @@ class Strategy(ABC):
             return False
         pass
 
+    def entry_rules(self):
+        return list(self.ENTRY_RULES)
+
+    def exit_rules(self):
+        return list(self.EXIT_RULES)
+
+    def required_features(self) -> dict:
+        """
+        [다중 전략 엔진용] 규칙 평가에 필요한 공유 지표 그룹 (IndicatorFactory.GROUP_COLUMNS 그룹명)
+        예: {'daily': ('momentum',), 'minute': ('trend',)} - 일봉 지표는 전일 값이 d_ 접두어로 결합됨
+        """
+        return {}
+
+    def signal_columns(self, data) -> dict:
+        """
+        [다중 전략 엔진용] 파라미터에 따라 달라지는 컬럼 (예: k별 목표가)
+        공유 프레임을 수정하지 않고 {컬럼명: 배열}로 반환하면 엔진이 규칙 평가 시 덧씌웁니다.
+        'entry_price'를 반환하면 해당 가격으로 체결 (없으면 종가)
+        """
+        return {}
+
+    @staticmethod
+    def evaluate_rules(rules, data):
+        """
+        규칙 목록을 AND로 평가합니다.
+        :param data: 행(Series/dict)이면 bool, 그 외 프레임(DataFrame 또는 컬럼 배열 매핑)이면 행 수 길이의 bool 배열
+        """
+        if isinstance(data, (pd.Series, dict)):
+            return all(bool(rule.evaluate(data)) for rule in rules) if rules else True
+        result = np.ones(len(data), dtype=np.bool_)
+        for rule in rules:
+            result &= rule.evaluate(data)
+        return result
+
+    def get_signals(self, df: pd.DataFrame):
+        """
+        [배치] 전체 프레임(또는 여러 종목 패널)의 진입/청산 신호
+        :return: (entries, exits) - 행 수 길이의 numpy bool 배열 (청산 규칙이 없으면 exits는 전부 False)
+        """
+        entries = self.evaluate_rules(self.entry_rules(), df)
+        exit_rules = self.exit_rules()
+        exits = self.evaluate_rules(exit_rules, df) if exit_rules else np.zeros(len(df), dtype=np.bool_)
+        return entries, exits
+
+    def rule_signal(self, row) -> bool:
+        """[실시간] 단일 행(Series/dict)의 진입 신호 - get_signals와 같은 규칙 정의 사용"""
+        return bool(self.evaluate_rules(self.entry_rules(), row))
+
     def calculate_common_indicators(self, df: pd.DataFrame):
         """
         [공통 기능] 이동평균선, RSI 등 여러 전략에서 자주 쓰는 지표를 계산합니다.
@@ -36,4 +138,4 @@ class Strategy(ABC):
         # 예시: 종가 기준 5일, 20일 이동평균선
         df['ma5'] = df['close'].rolling(window=5).mean()
         df['ma20'] = df['close'].rolling(window=20).mean()
-        return df
\ No newline at end of file
+        return df
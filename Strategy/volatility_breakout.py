@@ -1,10 +1,33 @@
-from .strategy import Strategy
+import numpy as np
+from .strategy import Strategy, Rule
 from Indicators.factory import IndicatorFactory
 
 class VolatilityBreakout(Strategy):
+    # 진입 규칙 (모두 충족 시 매수) - 배치(get_signals)와 실시간(get_signal)이 같은 정의를 사용
+    ENTRY_RULES = (
+        # 기본 조건: 현재가가 목표가 돌파
+        Rule('close', '>=', 'target_price', '목표가 돌파'),
+        # 필터 1: 강한 상승 가속도 (d_macd_hist_slope)
+        # 수익 거래 평균(99.13)이 손실 거래(25.93)보다 압도적으로 높음
+        Rule('d_macd_hist_slope', '>', 30, '모멘텀'),
+        # 필터 2: 캔들 몸통 비율 (d_body_ratio)
+        # 수익 거래(0.70)가 손실 거래(0.34)보다 2배 이상 높음
+        Rule('d_body_ratio', '>', 0.5, '캔들 형태'),
+        # 필터 3: 추세 확인 (d_band_p)
+        # 수익 거래는 볼린저 밴드 상단(0.68)에 위치하는 경향이 있음
+        Rule('d_band_p', '>', 0.6, '추세'),
+        # 필터 4: 과도한 갭 상승 제외 (d_gap_ratio)
+        # 수익 거래의 갭은 마이너스(-0.0006)인 반면 손실은 플러스(0.0002)
+        Rule('d_gap_ratio', '<', 0.02, '갭'),
+    )
+    # 청산 규칙: 손절가 터치
+    EXIT_RULES = (
+        Rule('close', '<=', 'stop_price', '손절'),
+    )
+
     def __init__(self, k=0.5, stop_loss_rate=0.02):
         # 결과 폴더명 설정
-        self.name = "VolatilityBreakout" 
+        super().__init__("VolatilityBreakout", {'k': k, 'stop_loss_rate': stop_loss_rate})
         self.k = k
         # [추가] 손절 비율 설정 (기본값 2%)
         self.stop_loss_rate = stop_loss_rate
@@ -28,31 +51,58 @@ class VolatilityBreakout(Strategy):
         df = IndicatorFactory.add_all_indicators(df)
         return df
 
+    def required_features(self):
+        # d_macd_hist_slope / d_band_p / d_body_ratio, d_gap_ratio (전일 일봉 지표)
+        return {'daily': ('momentum', 'volatility', 'advanced')}
+
+    def signal_columns(self, data):
+        """다중 전략 엔진용: 당일 시가 + 전일 변동폭 * k 목표가와 손절가"""
+        target_price = data['day_open'] + data['prev_range'] * self.k
+        return {'target_price': target_price, 'stop_price': target_price * (1 - self.stop_loss_rate)}
+
     def get_signal(self, row):
         """
-        분석 데이터를 기반으로 필터 조건이 추가된 시그널 판단
+        분석 데이터를 기반으로 필터 조건이 추가된 시그널 판단 (단일 행)
+        조건은 ENTRY_RULES에 정의되어 있으며 get_signals(df)의 배치 평가와 동일합니다.
         """
-        # 기본 조건: 현재가가 목표가 돌파
-        is_breakout = row['close'] >= row['target_price']
-        
-        # 필터 1: 강한 상승 가속도 (d_macd_hist_slope)
-        # 수익 거래 평균(99.13)이 손실 거래(25.93)보다 압도적으로 높음
-        momentum_filter = row['d_macd_hist_slope'] > 30 
-        
-        # 필터 2: 캔들 몸통 비율 (d_body_ratio)
-        # 수익 거래(0.70)가 손실 거래(0.34)보다 2배 이상 높음
-        shape_filter = row['d_body_ratio'] > 0.5
-        
-        # 필터 3: 추세 확인 (d_band_p)
-        # 수익 거래는 볼린저 밴드 상단(0.68)에 위치하는 경향이 있음
-        trend_filter = row['d_band_p'] > 0.6
-        
-        # 필터 4: 과도한 갭 상승 제외 (d_gap_ratio)
-        # 수익 거래의 갭은 마이너스(-0.0006)인 반면 손실은 플러스(0.0002)
-        gap_filter = row['d_gap_ratio'] < 0.02
+        return self.rule_signal(row)
+
+
+class DailyFilterBreakout(VolatilityBreakout):
+    """
+    VolatilityBacktester와 같은 조건의 변동성 돌파 (고가 돌파 + 전일 5MA 기울기/이격도, 추세, 거래대금, 누적 거래량)
+    파라미터만 바꾼 여러 변형을 다중 전략 엔진(BackTest/multi_strategy.py)에 함께 등록해 비교할 수 있습니다.
+    """
+    def __init__(self, k=0.6, stop_loss_rate=0.02, slope_min=0.8, disp_min=1.0, value_limit=10_000_000_000):
+        super().__init__(k, stop_loss_rate)
+        self.name = "DailyFilterBreakout"
+        self.slope_min = slope_min
+        self.disp_min = disp_min
+        self.value_limit = value_limit
+        self.params.update({'slope_min': slope_min, 'disp_min': disp_min, 'value_limit': value_limit})
+
+    def entry_rules(self):
+        return [
+            Rule('high', '>=', 'target_price', '목표가 돌파'),
+            Rule('is_trend_up', '==', True, '전일 종가 > 5MA'),
+            Rule('prev_slope5', '>', self.slope_min, '전일 5MA 기울기'),
+            Rule('prev_disp5', '>', self.disp_min, '전일 5MA 이격도'),
+            Rule('cum_vol', '>', 'vol_floor', '당일 누적 거래량'),
+            Rule('avg_value_5d', '>=', self.value_limit, '5일 평균 거래대금'),
+        ]
+
+    def exit_rules(self):
+        # 손절은 시뮬레이터의 트레일링 손절로 처리
+        return []
+
+    def required_features(self):
+        return {}
 
-        # 모든 조건 충족 시 매수 시그널 발생
-        if is_breakout and momentum_filter and shape_filter and trend_filter and gap_filter:
-            return True
-            
-        return False
\ No newline at end of file
+    def signal_columns(self, data):
+        target_price = data['day_open'] + data['prev_range'] * self.k
+        return {
+            'target_price': target_price,
+            # 시가가 목표가 위에서 시작하면 시가, 아니면 목표가에 체결
+            'entry_price': np.maximum(data['open'], target_price),
+            'vol_floor': data['ref_vol'] * 0.5,
+        }
@@ -0,0 +1,182 @@
+"""
+단계별 시간/메모리 계측 (파이프라인, 백테스트 공용)
+
+    from Util.profiler import PROFILER
+
+    with PROFILER.stage('parquet_read', ticker):
+        df = pd.read_parquet(path)
+
+    @profiled('indicators')
+    def compute(...): ...
+
+- 단계마다 경과 시간(wall), CPU 시간, 종료 시점 RSS, 단계 중 갱신된 프로세스 최대 RSS 증가분을 기록
+  (CPU 시간이 wall보다 훨씬 작으면 대기/IO 단계 - 예: api_wait)
+- 단계는 중첩 가능하며 'backtest/simulation'처럼 경로 이름으로 기록
+- 워커 프로세스는 drain()으로 기록을 넘기고 부모가 merge()로 합칩니다.
+- summary(): 단계별 합계/평균/최대/점유율, export(): .json 또는 .parquet 저장
+기록 1건당 비용은 수 µs ~ 수십 µs (psutil 호출 포함)라 종목 단위 단계 계측에는 무시할 수 있는 수준입니다.
+"""
+import os
+import sys
+import json
+import time
+import functools
+from contextlib import contextmanager
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:  # 메모리 계측 없이 시간만 기록
+    psutil = None
+
+RECORD_COLUMNS = ['stage', 'ticker', 'wall_s', 'cpu_s', 'rss_mb', 'peak_delta_mb', 'pid']
+
+_MB = 1024 * 1024
+
+
+class StageProfiler:
+    def __init__(self, enabled=True, track_memory=True):
+        """
+        :param enabled: False면 stage()가 아무것도 기록하지 않음
+        :param track_memory: False면 시간만 기록 (psutil 호출 생략)
+        """
+        self.enabled = enabled
+        self.track_memory = track_memory and psutil is not None
+        self.records = []
+        self._stack = []
+        self._process = psutil.Process() if self.track_memory else None
+
+    # ---------------------------------------------------------------
+    # 1. 계측
+    # ---------------------------------------------------------------
+
+    def _memory(self):
+        """(현재 RSS, 프로세스 최대 RSS) 바이트"""
+        info = self._process.memory_info()
+        peak = getattr(info, 'peak_wset', None)  # Windows
+        if peak is None:
+            try:
+                import resource
+                scale = 1 if sys.platform == 'darwin' else 1024  # macOS는 바이트, Linux는 KB
+                peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+            except ImportError:
+                peak = info.rss
+        return info.rss, peak
+
+    @contextmanager
+    def stage(self, name, ticker=None):
+        """단계 계측 컨텍스트 (중첩 시 상위 단계 이름이 경로로 붙고, ticker를 생략하면 상위 단계의 ticker 사용)"""
+        if not self.enabled:
+            yield
+            return
+
+        if ticker is None and self._stack:
+            ticker = self._stack[-1][1]  # 하위 단계는 상위 단계의 종목을 물려받음
+        self._stack.append((name, ticker))
+        path = '/'.join(n for n, _ in self._stack)
+        peak_start = self._memory()[1] if self.track_memory else 0
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            rss, peak = self._memory() if self.track_memory else (0, 0)
+            self._stack.pop()
+            self.records.append((path, ticker, wall, cpu, rss / _MB, (peak - peak_start) / _MB, os.getpid()))
+
+    def wrap(self, name):
+        """함수 데코레이터 버전의 stage()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ---------------------------------------------------------------
+    # 2. 수집 / 집계
+    # ---------------------------------------------------------------
+
+    def drain(self) -> list:
+        """[워커] 지금까지의 기록을 넘기고 비움 (결과 dict에 담아 부모로 전달)"""
+        records, self.records = self.records, []
+        return records
+
+    def merge(self, records):
+        """[부모] 워커 기록 합치기"""
+        if records:
+            self.records.extend(records)
+
+    def reset(self):
+        self.records = []
+        self._stack = []
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records, columns=RECORD_COLUMNS)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        단계별 집계 (총 시간 내림차순)
+        share_pct는 같은 깊이(최상위 단계끼리, 하위 단계는 부모 기준)의 총 시간 대비 점유율
+        """
+        df = self.to_frame()
+        if df.empty:
+            return pd.DataFrame()
+
+        summary = df.groupby('stage').agg(
+            calls=('wall_s', 'size'),
+            total_s=('wall_s', 'sum'),
+            mean_ms=('wall_s', 'mean'),
+            max_ms=('wall_s', 'max'),
+            cpu_s=('cpu_s', 'sum'),
+            rss_max_mb=('rss_mb', 'max'),
+            peak_delta_mb=('peak_delta_mb', 'max'),
+        )
+        summary[['mean_ms', 'max_ms']] *= 1000
+        # 대기 비율: CPU를 쓰지 않은 시간 비중 (API 대기/IO 단계 판별용, 워커 합산이라 근사치)
+        summary['wait_pct'] = (1 - summary['cpu_s'] / summary['total_s']).clip(lower=0) * 100
+
+        parent = summary.index.to_series().str.rpartition('/')[0]
+        level_total = summary['total_s'].groupby(parent).transform('sum')
+        summary['share_pct'] = summary['total_s'] / level_total * 100
+        return summary.sort_values('total_s', ascending=False)
+
+    def report(self, title="단계별 계측"):
+        summary = self.summary()
+        if summary.empty:
+            return
+        with pd.option_context('display.width', 200, 'display.float_format', '{:,.2f}'.format):
+            print(f"\n⏱️ [{title}]")
+            print(summary.to_string())
+
+    def export(self, path, meta: dict = None):
+        """
+        기록 저장 (.parquet: 원본 기록 / .json: 메타 + 단계별 집계 + 원본 기록)
+        :param meta: 실행 정보 (run_id, 파라미터 등)
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if path.endswith('.parquet'):
+            df = self.to_frame()
+            for key, value in (meta or {}).items():
+                df[key] = str(value)
+            df.to_parquet(path, index=False)
+            return path
+
+        payload = {
+            'meta': meta or {},
+            'summary': self.summary().reset_index().to_dict(orient='records'),
+            'records': [dict(zip(RECORD_COLUMNS, r)) for r in self.records],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=1, default=str)
+        return path
+
+
+# 프로세스 기본 계측기 (모듈 간 공유, 워커 프로세스에서는 프로세스별로 따로 생성됨)
+PROFILER = StageProfiler()
+
+
+def profiled(name):
+    """기본 계측기(PROFILER)로 함수 실행을 한 단계로 기록하는 데코레이터"""
+    return PROFILER.wrap(name)
@@ -0,0 +1,74 @@
+import os
+import sys
+
+# numba parallel 커널(TBB 스레딩 레이어)을 쓴 프로세스가 병렬 러너 테스트에서 fork하면 종료 시 멈출 수 있으므로
+# 테스트 프로세스는 workqueue 레이어 사용 (numba import 전에 설정해야 적용됨)
+os.environ.setdefault('NUMBA_THREADING_LAYER', 'workqueue')
+
+import pandas as pd
+import pytest
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+
+@pytest.fixture
+def fake_iter_results(tmp_path, monkeypatch):
+    """
+    ParallelBacktestRunner.iter_results를 워커 없는 가짜로 대체 (작업 디렉토리는 tmp_path)
+    사용: calls = fake_iter_results(lambda runner, ticker: {'candidates': ...})
+    :return: 설치 함수 - 호출마다 (정렬된 종목 목록, 러너)를 기록하는 리스트 반환
+    """
+    from BackTest.parallel_runner import ParallelBacktestRunner
+
+    monkeypatch.chdir(tmp_path)
+
+    def install(make_result):
+        calls = []
+
+        def iter_results(self, tickers):
+            calls.append((sorted(tickers), self))
+            for ticker in tickers:
+                yield {'ticker': ticker, 'error': None, 'elapsed': 0.0, **make_result(self, ticker)}
+
+        monkeypatch.setattr(ParallelBacktestRunner, 'iter_results', iter_results)
+        return calls
+
+    return install
+
+
+@pytest.fixture
+def synthetic_universe(tmp_path, monkeypatch):
+    """
+    SyntheticMarket 종목 파일을 tmp_path/universe 아래에 쓰고 작업 디렉토리를 tmp_path로 옮김
+    :return: 생성 함수 (seed, n_tickers, n_days) → (universe 루트, 종목 목록)
+    """
+    from Benchmark.synthetic_market import SyntheticMarket
+
+    monkeypatch.chdir(tmp_path)
+
+    def make(seed, n_tickers, n_days):
+        root = str(tmp_path / 'universe')
+        return root, SyntheticMarket(seed=seed).write_universe(root, n_tickers=n_tickers, n_days=n_days)
+
+    return make
+
+
+@pytest.fixture
+def assert_parallel_matches():
+    """
+    run(workers)를 순차(1)/병렬(2)로 실행해 결과 DataFrame이 같은지 확인
+    :return: 비교 함수 (run, key=정렬 컬럼, columns=비교 컬럼) → 순차 결과
+    """
+    def check(run, key=None, columns=None):
+        sequential, parallel = run(1), run(2)
+        assert len(sequential) > 0
+        if key is not None:
+            sequential = sequential.sort_values(key, ignore_index=True)
+            parallel = parallel.sort_values(key, ignore_index=True)
+        columns = list(columns or sequential.columns)
+        pd.testing.assert_frame_equal(sequential[columns], parallel[columns])
+        return sequential
+
+    return check
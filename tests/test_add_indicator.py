@@ -0,0 +1,23 @@
+import os
+import sys
+import numpy as np
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Benchmark.synthetic_market import SyntheticMarket
+from Collector.add_indicator import ChartIndicatorAdder
+
+
+def test_copy_false_shares_bars_without_changing_input():
+    m_df = SyntheticMarket(seed=9).minute_bars(2_000)
+    columns = list(m_df.columns)
+
+    shared = ChartIndicatorAdder().add_indicators(m_df, copy=False)
+    copied = ChartIndicatorAdder().add_indicators(m_df)
+
+    assert shared.equals(copied)
+    assert list(m_df.columns) == columns
+    assert np.shares_memory(shared['close'].to_numpy(), m_df['close'].to_numpy())
+    assert not np.shares_memory(copied['close'].to_numpy(), m_df['close'].to_numpy())
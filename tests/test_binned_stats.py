@@ -0,0 +1,38 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.binned_stats import bin_codes, binned_win_rate
+
+
+def _values(n=500, seed=0):
+    x = np.random.default_rng(seed).normal(size=n) * 2
+    x[:5] = [np.nan, np.inf, -np.inf, 0.0, 1.0]
+    return x
+
+
+def test_bin_codes_open_ended_edges_match_pd_cut():
+    x = _values()
+    for edges in ([-np.inf, 0, 1, np.inf], [-np.inf, -1, 0, 1, np.inf], [-1, 0, 1, np.inf], [-np.inf, 0.5]):
+        expected = pd.cut(x, edges).codes
+        np.testing.assert_array_equal(bin_codes(x, edges), expected)
+
+
+def test_bin_codes_uniform_edges_match_pd_cut():
+    x = _values(seed=1)
+    edges = np.linspace(-3, 3, 11)
+    np.testing.assert_array_equal(bin_codes(x, edges), pd.cut(x, edges).codes)
+
+
+def test_binned_win_rate_open_ended_edges():
+    x = _values(seed=2)
+    edges = [-np.inf, -1, 0, 1, np.inf]
+    table = binned_win_rate(x, x > 0, edges=edges)
+    expected = pd.Series(x > 0).groupby(pd.cut(x, edges), observed=False).agg(['count', 'mean'])
+    np.testing.assert_array_equal(table['count'].to_numpy(), expected['count'].to_numpy())
+    np.testing.assert_allclose(table['win_rate'].to_numpy(), expected['mean'].to_numpy())
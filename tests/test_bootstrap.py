@@ -0,0 +1,49 @@
+import os
+import sys
+import tracemalloc
+import numpy as np
+import pytest
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.bootstrap import bootstrap_metrics
+
+CAP = 8 * 1024 * 1024
+
+
+def _peak_bytes(**kwargs):
+    """bootstrap_metrics 실행 중 numpy 할당을 포함한 실제 메모리 최고치 (tracemalloc)"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        dist = bootstrap_metrics(**kwargs)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return peak, dist
+
+
+@pytest.mark.parametrize('compound', [False, True])
+@pytest.mark.parametrize('method', ['iid', 'block'])
+def test_peak_memory_within_cap(compound, method):
+    returns = np.random.default_rng(0).normal(0.001, 0.02, 2_000)
+    days = np.repeat(np.arange(500), 4) if method == 'block' else None
+    peak, dist = _peak_bytes(returns=returns, n_paths=2_000, method=method, days=days, compound=compound,
+                             seed=1, max_chunk_bytes=CAP, n_jobs=1)
+    assert peak <= CAP, f"{peak:,} > {CAP:,}"
+    assert len(dist) == 2_000 and dist['mdd'].notna().all()
+
+
+def test_peak_memory_within_cap_with_threads():
+    returns = np.random.default_rng(0).normal(0.001, 0.02, 2_000)
+    peak, dist = _peak_bytes(returns=returns, n_paths=2_000, seed=1, max_chunk_bytes=CAP, n_jobs=4)
+    assert peak <= CAP, f"{peak:,} > {CAP:,}"
+    assert len(dist) == 2_000
+
+
+def test_single_path_over_cap_raises():
+    with pytest.raises(ValueError):
+        bootstrap_metrics(np.full(1_000, 0.01), n_paths=10, max_chunk_bytes=1_000 * 8)
@@ -0,0 +1,36 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Benchmark.synthetic_market import SyntheticMarket
+from Indicators.factory import IndicatorFactory
+
+GROUPS = IndicatorFactory.ALL_GROUPS + ('custom',)
+
+
+def _reference_vwap(df):
+    """이전 구현: date별 groupby 누적 VWAP (행 순서 그대로)"""
+    tp = (df['high'] + df['low'] + df['close']) / 3
+    return ((tp * df['volume']).groupby(df['date']).cumsum() / df['volume'].groupby(df['date']).cumsum()).to_numpy()
+
+
+def test_session_vwap_matches_groupby_on_unsorted_dates():
+    m_df = SyntheticMarket(seed=11).minute_bars(4_000)
+    df = pd.DataFrame({'date': m_df.index.strftime('%Y%m%d').astype(int),
+                       'time': m_df.index.strftime('%H%M').astype(int)})
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = m_df[col].to_numpy(dtype=np.float64)
+    # 날짜 블록 순서를 뒤섞고 같은 날짜가 떨어진 위치에 다시 나오도록 구성
+    days = df['date'].unique()
+    order = np.random.default_rng(0).permutation(len(days))
+    shuffled = pd.concat([df[df['date'] == days[i]] for i in order], ignore_index=True)
+    shuffled = pd.concat([shuffled.iloc[::2], shuffled.iloc[1::2]], ignore_index=True)
+
+    for frame in (df, shuffled):
+        vwap = IndicatorFactory.compute_block(frame, groups=GROUPS)['vwap'].to_numpy()
+        np.testing.assert_allclose(vwap, _reference_vwap(frame), rtol=1e-10)
@@ -0,0 +1,51 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Benchmark.synthetic_market import SyntheticMarket
+from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+from BackTest.trade_store import TradeStore
+from BackTest.feature_store import FeatureStore
+
+
+def _trades(m_df):
+    entry = m_df.index[[400, 900, 1300]]
+    return pd.DataFrame({'entry_date': entry, 'exit_date': entry + pd.Timedelta(minutes=30),
+                         'return': [0.01, -0.02, 0.03], 'pnl': [1.0, -2.0, 3.0]})
+
+
+def test_features_recomputed_when_chart_changes(tmp_path):
+    root = str(tmp_path / 'universe')
+    ticker = SyntheticMarket(seed=5).write_universe(root, n_tickers=1, n_days=40)[0]
+    tester = VolatilityBacktester()
+    tester.minute_path = os.path.join(root, 'data', 'chart', 'minute')
+    tester.daily_path = os.path.join(root, 'data', 'chart', 'daily')
+    minute_file = os.path.join(tester.minute_path, f"{ticker}.parquet")
+    m_df = pd.read_parquet(minute_file)
+
+    trade_store = TradeStore(root=str(tmp_path / 'trade_store'))
+    store = FeatureStore(root=str(tmp_path / 'feature_store'), trade_store=trade_store, backtester=tester)
+
+    def materialize(run_id):
+        with trade_store.writer(run_id) as w:
+            w.add(ticker, _trades(m_df))
+        assert store.materialize(run_id) == 3
+        return store.scan(run_id=run_id).sort_values('entry_date', ignore_index=True)
+
+    first = materialize('20261019_090000')
+    same = materialize('20261019_090100')
+    np.testing.assert_allclose(same['m_rsi'], first['m_rsi'])
+    assert (same['chart_digest'] == first['chart_digest']).all()
+
+    # 같은 (종목, 진입 시각)이라도 분봉 파일이 바뀌면 이전 run의 피처를 재사용하지 않음
+    changed = m_df.copy()
+    changed['close'] = changed['close'] * np.linspace(0.9, 1.1, len(changed))
+    changed.to_parquet(minute_file, compression='snappy')
+    fresh = materialize('20261019_090200')
+    assert (fresh['chart_digest'] != first['chart_digest']).all()
+    assert not np.allclose(fresh['m_rsi'], first['m_rsi'], equal_nan=True)
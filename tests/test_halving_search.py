@@ -0,0 +1,72 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+from BackTest.halving_search import SuccessiveHalvingSearch
+
+SPACE = {'k': [0.3, 0.6], 'stop_loss_rate': [0.02], 'slope_min': [-100.0], 'disp_min': [-100.0],
+         'value_limit': [0], 'take_profit': [0.03, 0.07]}
+REFERENCE_SPACE = {'k': [0.3, 0.5, 0.7], 'stop_loss_rate': [0.01, 0.03], 'slope_min': [-100.0], 'disp_min': [-100.0],
+                   'value_limit': [0], 'take_profit': [0.03, 0.07]}
+
+
+class RootedBacktester(VolatilityBacktester):
+    """데이터 경로만 바꾼 하위 클래스 (병렬 워커에도 그대로 전달되어야 함)"""
+    def __init__(self, root, **kwargs):
+        super().__init__(**kwargs)
+        self.minute_path = os.path.join(root, 'data', 'chart', 'minute')
+        self.daily_path = os.path.join(root, 'data', 'chart', 'daily')
+
+
+@pytest.mark.parametrize('kwargs', [{'min_tickers': 0}, {'eta': 1}])
+def test_rejects_non_shrinking_schedule(kwargs):
+    with pytest.raises(ValueError):
+        SuccessiveHalvingSearch(SPACE, **kwargs)
+
+
+def test_parallel_search_uses_custom_backtester(synthetic_universe, assert_parallel_matches):
+    root, tickers = synthetic_universe(seed=3, n_tickers=4, n_days=30)
+
+    def search(workers):
+        return SuccessiveHalvingSearch(SPACE, eta=2, min_tickers=2, top_n=2, min_trades=1, z=None,
+                                       backtester=RootedBacktester(root, slippage=0.004),
+                                       workers=workers).run(tickers)
+
+    sequential = assert_parallel_matches(search, columns=['trades', 'tickers', 'rung'])
+    assert sequential['trades'].sum() > 0
+
+
+def test_halving_finds_full_grid_top_n(synthetic_universe):
+    root, tickers = synthetic_universe(seed=2, n_tickers=8, n_days=40)
+
+    def search():
+        return SuccessiveHalvingSearch(REFERENCE_SPACE, eta=2, min_tickers=2, top_n=2, min_trades=5, z=None,
+                                       backtester=RootedBacktester(root, slippage=0.004))
+
+    halving, full = search(), search()
+    board, reference = halving.run(tickers), full.full_grid(tickers)
+
+    # 절반의 평가로 전체 그리드와 같은 상위 top_n (마지막 단계는 전 종목 평가라 점수도 동일)
+    params = list(REFERENCE_SPACE)
+    top = board.head(2)
+    assert (top['rung'] == top['rung'].max()).all() and (top['tickers'] == len(tickers)).all()
+    pd.testing.assert_frame_equal(top[params + ['score', 'trades']], reference.head(2)[params + ['score', 'trades']])
+    assert halving.evaluations < full.evaluations
+
+def test_prune_ignores_under_sampled_bounds():
+    survivors = [0, 1, 2, 3]
+    # c0: 확실한 1위 / c1: 상한이 c0 하한 위 / c2: 상한이 c0 하한 아래 / c3: 거래 수 미달 (하한 -inf, 상한 inf)
+    search = SuccessiveHalvingSearch(SPACE, eta=4, top_n=1, min_trades=5, z=1.0)
+    search.acc[:, :3] = [[10, 1.0, 0.11], [10, 0.8, 0.1], [10, -0.5, 0.03], [2, 0.4, 0.08]]
+    assert search._prune(survivors, search.score(survivors)) == [0, 1]
+
+    # 거래 수 충분한 조합이 top_n보다 적어도 경계는 유한한 하한으로만 산정 - 미달 조합은 1/eta 몫으로만 생존
+    search = SuccessiveHalvingSearch(SPACE, eta=4, top_n=2, min_trades=5, z=1.0)
+    search.acc[:, :3] = [[10, 1.0, 0.11], [3, 0.3, 0.03], [2, 0.4, 0.08], [1, 0.2, 0.04]]
+    assert search._prune(survivors, search.score(survivors)) == [0, 1]
@@ -0,0 +1,26 @@
+import os
+import sys
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+from BackTest.multi_strategy import MultiStrategyEngine
+from Strategy.volatility_breakout import DailyFilterBreakout
+
+
+def _engine(root):
+    tester = VolatilityBacktester(slippage=0.004)
+    tester.minute_path = os.path.join(root, 'data', 'chart', 'minute')
+    tester.daily_path = os.path.join(root, 'data', 'chart', 'daily')
+    engine = MultiStrategyEngine(tester)
+    for k in (0.3, 0.6):
+        engine.register(f"k{k}", DailyFilterBreakout(k=k, stop_loss_rate=0.02, slope_min=-100.0,
+                                                     disp_min=-100.0, value_limit=0))
+    return engine
+
+
+def test_parallel_run_matches_sequential(synthetic_universe, assert_parallel_matches):
+    root, tickers = synthetic_universe(seed=1, n_tickers=3, n_days=30)
+    assert_parallel_matches(lambda workers: _engine(root).run(tickers, workers=workers)[0], key=['Ticker', 'Variant'])
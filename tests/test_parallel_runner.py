@@ -0,0 +1,27 @@
+import os
+import sys
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Benchmark.synthetic_market import SyntheticMarket
+from BackTest.parallel_runner import ParallelBacktestRunner, run_streaming_task
+
+
+def test_daily_panel_is_private_to_each_call_and_removed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tickers = SyntheticMarket(seed=4).write_universe(str(tmp_path), n_tickers=2, n_days=30)
+    runners = [ParallelBacktestRunner(workers=1, task=run_streaming_task, run_kwargs={'value_limit': 0},
+                                      run_id='20261019_100000') for _ in range(2)]
+    panel_dir = runners[0].panel_dir
+
+    # 같은 run_id로 동시에 진행 중인 두 호출도 서로 다른 패널 파일을 사용
+    streams = [r.iter_results(tickers) for r in runners]
+    first = [next(s) for s in streams]
+    assert len(os.listdir(panel_dir)) == 2
+    assert all(result['error'] is None for result in first)
+
+    for s in streams:
+        list(s)
+    assert os.listdir(panel_dir) == []
@@ -0,0 +1,56 @@
+import os
+import sys
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest import portfolio_simulator
+
+
+def test_candidate_cache_keyed_on_params(fake_iter_results):
+    calls = fake_iter_results(lambda runner, ticker: {
+        'candidates': pd.DataFrame({'ticker': [ticker], 'return': [runner.run_kwargs.get('take_profit', 0.07)]})})
+
+    first = portfolio_simulator.build_candidate_panel(tickers=['000001'], run_kwargs={'take_profit': 0.05})
+    again = portfolio_simulator.build_candidate_panel(tickers=['000001'], run_kwargs={'take_profit': 0.05})
+    assert len(calls) == 1
+    assert again['return'].tolist() == first['return'].tolist() == [0.05]
+
+    # 실행 인자나 종목 목록이 바뀌면 캐시를 쓰지 않고 다시 계산
+    changed = portfolio_simulator.build_candidate_panel(tickers=['000001'], run_kwargs={'take_profit': 0.07})
+    assert changed['return'].tolist() == [0.07]
+    portfolio_simulator.build_candidate_panel(tickers=['000001', '000002'], run_kwargs={'take_profit': 0.07})
+    assert len(calls) == 3
+
+    # 이전 인자로 돌아가면 키별로 보관된 결과를 재사용
+    back = portfolio_simulator.build_candidate_panel(tickers=['000001'], run_kwargs={'take_profit': 0.05})
+    assert len(calls) == 3 and back['return'].tolist() == [0.05]
+
+
+def test_kernel_slot_cash_and_holding_rules():
+    rows = [
+        # ticker, 진입, 청산, 진입가, 청산가, 신호 강도
+        ('A', '09:00', '10:00', 1_000, 1_100, 3.0),      # 체결: 자산 50% → 500주
+        ('B', '09:00', '11:00', 1_000, 1_000, 2.0),      # 체결: 남은 현금 50만 → 500주
+        ('C', '09:00', '09:30', 1_000, 1_000, 1.0),      # 슬롯 2개 모두 사용 중
+        ('A', '09:30', '10:30', 1_000, 1_000, 1.0),      # A 보유 중
+        ('D', '10:00', '10:30', 1_000, 1_000, 1.0),      # A 청산과 같은 분 - 현금/슬롯은 다음 분부터 재사용
+        ('E', '10:01', '10:30', 2_000_000, 2_000_000, 2.0),  # A 청산 후 슬롯은 비었지만 1주도 못 삼
+        ('F', '10:01', '10:30', 2_000, 2_000, 1.0),      # 체결: min(현금 55만, 자산 105만 x 50%) → 262주
+    ]
+    candidates = pd.DataFrame(rows, columns=['ticker', 'entry_date', 'exit_date', 'entry_price', 'exit_price',
+                                             'avg_value_5d'])
+    for col in ('entry_date', 'exit_date'):
+        candidates[col] = pd.to_datetime('2025-03-03 ' + candidates[col])
+
+    result = portfolio_simulator.PortfolioSimulator(init_cash=1_000_000, max_positions=2, max_value_pct=None,
+                                                    fees=0.0, tax=0.0).run(candidates)
+    cand = result['candidates']
+    assert cand['skip_reason'].tolist() == [
+        portfolio_simulator.SKIP_NONE, portfolio_simulator.SKIP_NONE, portfolio_simulator.SKIP_SLOTS,
+        portfolio_simulator.SKIP_HOLDING, portfolio_simulator.SKIP_SLOTS, portfolio_simulator.SKIP_CASH,
+        portfolio_simulator.SKIP_NONE]
+    assert cand['shares'].tolist() == [500, 500, 0, 0, 0, 0, 262]
+    assert result['trades']['pnl'].sum() == 500 * 100
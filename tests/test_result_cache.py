@@ -0,0 +1,41 @@
+import os
+import sys
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.result_cache import ResultCache
+
+
+def _trades(value):
+    return pd.DataFrame({'return': [value]})
+
+
+def test_keeps_several_keys_per_ticker(tmp_path):
+    cache = ResultCache(str(tmp_path), max_keys=3)
+    cache.put('000001', 'a', {'n': 1}, _trades(0.01))
+    cache.put('000001', 'b', {'n': 2}, _trades(0.02))
+    cache.save()
+
+    # 파라미터를 바꿨다가 되돌려도 (다른 프로세스에서도) 두 결과 모두 적중
+    reloaded = ResultCache(str(tmp_path), max_keys=3)
+    assert reloaded.get('000001', 'a')['stats'] == {'n': 1}
+    assert reloaded.get('000001', 'b')['trades']['return'].tolist() == [0.02]
+    assert reloaded.get('000001', 'c') is None
+
+
+def test_prunes_least_recently_used_keys(tmp_path):
+    cache = ResultCache(str(tmp_path), max_keys=2)
+    cache.put('000001', 'a', {}, _trades(0.01))
+    cache.put('000001', 'b', {}, _trades(0.02))
+    assert cache.get('000001', 'a') is not None  # a를 최근 사용으로 갱신
+    cache.put('000001', 'c', {}, _trades(0.03))
+
+    assert set(cache.index['000001']) == {'a', 'c'}
+    assert not os.path.exists(cache.entry_path('000001', 'b'))
+    assert sorted(os.listdir(os.path.join(cache.entry_dir, '000001'))) == ['a.pkl', 'c.pkl']
+    # 다른 종목의 항목은 영향 없음
+    cache.put('000002', 'a', {}, _trades(0.04))
+    assert cache.get('000001', 'a') is not None and cache.get('000002', 'a') is not None
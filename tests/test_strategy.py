@@ -0,0 +1,24 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Strategy.strategy import RULE_OPS, Rule, Strategy
+
+
+@pytest.mark.parametrize('op', list(RULE_OPS))
+def test_nan_comparisons_are_false_in_batch_and_row_mode(op):
+    df = pd.DataFrame({'a': [1.0, np.nan, 2.0, 1.0], 'b': [1.0, 1.0, np.nan, 2.0]})
+    for rule in (Rule('a', op, 'b'), Rule('a', op, 1.0)):
+        batch = Strategy.evaluate_rules([rule], df)
+        rows = [Strategy.evaluate_rules([rule], row) for _, row in df.iterrows()]
+        assert batch.tolist() == rows
+        # a가 NaN인 행은 어떤 연산자든 False, 컬럼끼리 비교하면 b가 NaN인 행도 False
+        assert not batch[1]
+        if rule.threshold == 'b':
+            assert not batch[2]
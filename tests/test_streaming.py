@@ -0,0 +1,25 @@
+import os
+import sys
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from Benchmark.synthetic_market import SyntheticMarket
+from BackTest.VolatilityBacktestByVBT import VolatilityBacktester
+
+
+def test_streaming_matches_run_trades_on_to_parquet_file(tmp_path):
+    # write_universe는 수집기처럼 DataFrame.to_parquet로 저장 (datetime 인덱스가 pandas 메타데이터에 기록됨)
+    ticker = SyntheticMarket(seed=7).write_universe(str(tmp_path), n_tickers=1, n_days=90)[0]
+    tester = VolatilityBacktester(slope_min=-100.0, disp_min=-100.0)
+    tester.minute_path = str(tmp_path / 'data' / 'chart' / 'minute')
+    tester.daily_path = str(tmp_path / 'data' / 'chart' / 'daily')
+
+    expected = tester.run_trades(ticker, value_limit=0)
+    streamed = tester.run_trades_streaming(ticker, value_limit=0)
+    assert expected is not None and len(expected) > 0
+    assert streamed is not None
+    pd.testing.assert_frame_equal(streamed.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False)
@@ -0,0 +1,48 @@
+import os
+import sys
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest.trade_store import TradeStore, RunManifest
+
+
+def _trades(n, ret):
+    entry = pd.date_range('2025-03-03 09:05', periods=n, freq='D')
+    return pd.DataFrame({'entry_date': entry, 'exit_date': entry + pd.Timedelta(hours=1), 'return': ret})
+
+
+def test_legacy_import_does_not_shadow_new_run(tmp_path):
+    result_dir = tmp_path / 'result'
+    result_dir.mkdir()
+    _trades(3, -0.01).to_parquet(result_dir / 'trades_000001.parquet')
+
+    store = TradeStore(root=str(tmp_path / 'trade_store'))
+    store.import_legacy(result_dir=str(result_dir))
+    assert store.latest_run() == 'legacy'
+
+    with store.writer('20261019_073000') as w:
+        w.add('000001', _trades(2, 0.02))
+    assert store.runs() == ['legacy', '20261019_073000']
+    assert store.latest_run() == '20261019_073000'
+    assert (store.scan()['return'] == 0.02).all()
+
+    # 새 run 이후에 다시 이관해도 이관 run은 가장 오래된 run으로 유지
+    store.import_legacy(result_dir=str(result_dir), run_id='legacy_2')
+    assert store.latest_run() == '20261019_073000'
+
+
+def test_run_ids_unique_within_same_second():
+    assert len({TradeStore.new_run_id() for _ in range(50)}) == 50
+
+
+def test_concurrent_register_keeps_every_run(tmp_path):
+    store = TradeStore(root=str(tmp_path / 'trade_store'))
+    run_ids = [f"run_{i:03d}" for i in range(40)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda r: RunManifest(store.root).register(r), run_ids))
+    assert sorted(store.manifest.load()) == run_ids
+    assert not os.path.exists(store.manifest.path + '.lock')
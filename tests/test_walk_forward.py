@@ -0,0 +1,29 @@
+import os
+import sys
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from BackTest import walk_forward
+
+
+def test_outcome_cache_keyed_on_params(fake_iter_results):
+    calls = fake_iter_results(lambda runner, ticker: {
+        'outcomes': pd.DataFrame({'date': [pd.Timestamp('2025-03-03')], 'ticker': [ticker], 'r0': [0.01]})})
+
+    panel, grid = walk_forward.build_outcome_panel(tickers=['000001'], backtester_kwargs={'slippage': 0.001})
+    walk_forward.build_outcome_panel(tickers=['000001'], backtester_kwargs={'slippage': 0.001})
+    assert len(calls) == 1
+
+    # 결과 조합이 같아도 백테스터 인자 / 종목 목록이 바뀌면 다시 계산
+    walk_forward.build_outcome_panel(tickers=['000001'], backtester_kwargs={'slippage': 0.002})
+    walk_forward.build_outcome_panel(tickers=['000001', '000002'], backtester_kwargs={'slippage': 0.002})
+    assert len(calls) == 3
+    walk_forward.build_outcome_panel(tickers=['000001'], k_values=(0.5,), backtester_kwargs={'slippage': 0.002})
+    assert len(calls) == 4
+
+    # 이전 인자로 돌아가면 키별로 보관된 패널을 재사용
+    again, _ = walk_forward.build_outcome_panel(tickers=['000001'], backtester_kwargs={'slippage': 0.001})
+    assert len(calls) == 4 and again['ticker'].tolist() == panel['ticker'].tolist()